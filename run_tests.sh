@@ -85,6 +85,26 @@ run_api_tests() {
     pytest tests/integration/test_api_endpoints.py -v -m api
 }
 
+run_benchmarks() {
+    print_status "Running microbenchmarks..."
+    mkdir -p .benchmarks
+    PYTHONPATH=src pytest tests/benchmarks --benchmark-only --benchmark-json=.benchmarks/current.json
+    PYTHONPATH=src python -m backend.testing.bench_compare compare .benchmarks/current.json \
+        --threshold "${BENCH_THRESHOLD:-0.25}"
+}
+
+save_benchmark_baseline() {
+    print_status "Refreshing benchmark baseline..."
+    mkdir -p .benchmarks
+    PYTHONPATH=src pytest tests/benchmarks --benchmark-only --benchmark-json=.benchmarks/current.json
+    PYTHONPATH=src python -m backend.testing.bench_compare save .benchmarks/current.json
+}
+
+run_load_tests() {
+    print_status "Running load tests against local fake upstream..."
+    PYTHONPATH=src python -m backend.testing.loadtest "$@"
+}
+
 # Run all tests
 run_all_tests() {
     print_status "Running all tests..."
@@ -139,6 +159,16 @@ main() {
         "api")
             run_api_tests
             ;;
+        "bench")
+            run_benchmarks
+            ;;
+        "bench-baseline")
+            save_benchmark_baseline
+            ;;
+        "load")
+            shift
+            run_load_tests "$@"
+            ;;
         "coverage")
             run_all_tests
             generate_coverage_report
@@ -162,6 +192,9 @@ main() {
             echo "  vector-store  Run vector store tests"
             echo "  config        Run configuration tests"
             echo "  api           Run API tests"
+            echo "  bench         Run microbenchmarks and compare with baseline (BENCH_THRESHOLD=0.25)"
+            echo "  bench-baseline  Refresh tests/benchmarks/baseline.json"
+            echo "  load          Run load-test harness (results in loadtest-results/)"
             echo "  coverage      Run all tests with coverage report"
             echo "  fast          Run tests with fast fail"
             echo "  parallel      Run tests in parallel"
@@ -13,6 +13,8 @@ from pydantic import BaseModel
 
 from backend.config import settings
 from backend.core.llm_providers.provider_factory import provider_factory, ProviderType
+from backend.core.llm_providers.prompt_assembler import PromptAssembler
+from backend.agents.orchestrator import ToolOrchestrator, tool_orchestrator
 
 logger = logging.getLogger(__name__)
 
@@ -187,7 +189,7 @@ class BaseAgent(ABC):
 class GeneralConversationAgent(BaseAgent):
     """General conversation agent for basic chat interactions"""
     
-    def __init__(self) -> None:
+    def __init__(self, orchestrator: Optional[ToolOrchestrator] = None) -> None:
         config = AgentConfig(
             agent_type="general_conversation",
             name="General Conversation Agent",
@@ -195,6 +197,7 @@ class GeneralConversationAgent(BaseAgent):
             priority=1,
         )
         super().__init__(config)
+        self.orchestrator = orchestrator or tool_orchestrator
     
     async def process_query(
         self, 
@@ -202,23 +205,44 @@ class GeneralConversationAgent(BaseAgent):
         context: Optional[AgentContext] = None,
         **kwargs: Any
     ) -> AgentResponse:
-        """Process general conversation query"""
+        """
+        Process general conversation query.
+        
+        Web search, vector retrieval and OCR of attached images (``images``
+        kwarg or ``context.metadata["images"]``, base64) run concurrently
+        before the LLM call and are merged into the prompt.
+        """
         start_time = time.time()
+        images = kwargs.pop("images", None) or (context.metadata.get("images", []) if context else [])
         
         try:
-            self.request_count += 1
+            # Tools first - their latency is bounded by the slowest one
+            tool_results = await self.orchestrator.run(self, query, images)
             
-            # Get LLM provider
-            provider = await self._get_llm_provider()
+            # Get LLM provider (query-based preference only if it is configured)
+            preferred = self._select_provider(query)
+            if preferred not in provider_factory.get_configured_providers():
+                preferred = None
+            provider = await self._get_llm_provider(preferred)
             
-            # Prepare messages
-            messages = [
-                {"role": "system", "content": "You are a helpful AI assistant. Provide clear, concise, and accurate responses."},
-                {"role": "user", "content": query}
-            ]
+            # Prepare messages - tool output is cut to the model's token budget
+            provider_type = preferred or provider_factory.get_best_provider()
+            assembler = PromptAssembler.for_model(
+                kwargs.get("model"),
+                provider_type.value if provider_type else None,
+                kwargs.get("max_tokens"),
+            )
+            prompt = assembler.assemble(
+                [
+                    {"role": "system", "content": "You are a helpful AI assistant. Provide clear, concise, and accurate responses."},
+                    {"role": "user", "content": query}
+                ],
+                self.orchestrator.sections(tool_results),
+            )
+            messages = prompt.messages
             
             # Generate response
-            response_text = await self._execute_with_timeout(
+            result = await self._execute_with_timeout(
                 provider.chat(messages=messages, **kwargs)
             )
             
@@ -226,22 +250,23 @@ class GeneralConversationAgent(BaseAgent):
             
             return AgentResponse(
                 success=True,
-                content=response_text,
+                content=result.text,
                 agent_type=self.config.agent_type,
-                provider_used=getattr(provider, 'provider_type', provider.__class__.__name__),
-                tokens_used=kwargs.get('tokens_used', 0),
-                cost=kwargs.get('cost', 0.0),
+                provider_used=result.provider,
+                tokens_used=result.total_tokens,
+                cost=result.cost,
                 processing_time=processing_time,
                 metadata={
                     "query_length": len(query),
-                    "response_length": len(response_text),
-                    "context": context.dict() if context else {}
+                    "response_length": len(result.text),
+                    "context": context.dict(exclude={"metadata"}) if context else {},
+                    "tools": [r.summary() for r in tool_results],
+                    "prompt": prompt.summary(),
                 }
             )
             
         except Exception as e:
-            self.error_count += 1
-            self.last_error = str(e)
+            # Counted by the registry from the unsuccessful response
             logger.error(f"Error in general conversation agent: {e}")
             
             return AgentResponse(
@@ -0,0 +1,219 @@
+"""
+Tool orchestrator for agents.
+Planuje narzędzia (web search, RAG, OCR) i uruchamia je równolegle przed wywołaniem LLM.
+"""
+
+import asyncio
+import base64
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from backend.config import settings
+from backend.core.llm_providers.prompt_assembler import PromptSection
+from backend.core.llm_providers.provider_factory import provider_factory
+from backend.core.ocr_providers.ocr_factory import ocr_provider_factory
+from backend.services.vector_store import get_vector_store_client
+from backend.services.web_search import format_search_results, perform_web_search, should_use_web_search
+
+if TYPE_CHECKING:
+    from backend.agents.base_agent import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+WEB_SEARCH_RESULTS = 3
+RAG_TOP_K = 3
+RAG_MIN_SCORE = 0.5
+
+
+@dataclass
+class ToolResult:
+    """Output of one tool run."""
+
+    name: str
+    content: str = ""
+    sources: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Tool succeeded and produced something for the prompt"""
+        return self.error is None and bool(self.content)
+
+    def summary(self) -> Dict[str, Any]:
+        """Short form for response metadata"""
+        return {
+            "tool": self.name,
+            "ok": self.ok,
+            "elapsed": round(self.elapsed, 3),
+            "error": self.error,
+            "sources": len(self.sources),
+        }
+
+
+class Tool:
+    """Base class for orchestrated tools."""
+
+    name = "tool"
+    # Heading of the prompt section built from this tool's content
+    heading = ""
+    # Largest fraction of the prompt token budget the section may take
+    share = 0.2
+
+    async def run(self, query: str, images: Sequence[str]) -> ToolResult:
+        """Run the tool; exceptions are turned into failed results by the orchestrator"""
+        raise NotImplementedError
+
+
+class WebSearchTool(Tool):
+    """Current information via the web search providers."""
+
+    name = "web_search"
+    heading = "Aktualne informacje z internetu:"
+
+    async def run(self, query: str, images: Sequence[str]) -> ToolResult:
+        results = await perform_web_search(query, max_results=WEB_SEARCH_RESULTS)
+        return ToolResult(self.name, content="\n".join(format_search_results(results)), sources=results)
+
+
+class VectorSearchTool(Tool):
+    """Retrieval of knowledge base fragments from the vector store."""
+
+    name = "rag"
+    heading = "Fragmenty z bazy wiedzy:"
+    share = 0.3
+
+    async def run(self, query: str, images: Sequence[str]) -> ToolResult:
+        provider_type = provider_factory.get_best_provider()
+        if not provider_type:
+            raise Exception("No LLM provider available for embeddings")
+        vector = await provider_factory.create_provider(provider_type).embed(query)
+        result = await get_vector_store_client().query_vectors(query_vector=vector, top_k=RAG_TOP_K)
+        matches = [m for m in result.get("matches", []) if m.get("score", 0) >= RAG_MIN_SCORE]
+        content = "\n".join(f"- {m['text']}" for m in matches if m.get("text"))
+        return ToolResult(self.name, content=content, sources=matches)
+
+
+class OCRTool(Tool):
+    """Text extraction from images attached to the message (base64)."""
+
+    name = "ocr"
+    heading = "Tekst z załączonych obrazów:"
+    share = 0.3
+
+    async def run(self, query: str, images: Sequence[str]) -> ToolResult:
+        provider_type = ocr_provider_factory.get_best_provider()
+        if not provider_type:
+            raise Exception("No OCR provider available")
+        provider = ocr_provider_factory.create_provider(provider_type)
+        extracted = await asyncio.gather(
+            *(provider.extract_text(base64.b64decode(image)) for image in images)
+        )
+        texts = [item.get("text", "").strip() for item in extracted]
+        content = "\n\n".join(f"[obraz {i}]\n{text}" for i, text in enumerate(texts, 1) if text)
+        return ToolResult(self.name, content=content, sources=[{"image": i} for i in range(1, len(texts) + 1)])
+
+
+class ToolOrchestrator:
+    """
+    Plans the tools a query needs and runs them concurrently.
+
+    All planned tools share one deadline, so the added latency is bounded by
+    the slowest tool (or the deadline), not by the sum. Failed and timed-out
+    tools are reported but never fail the query; whatever finished in time is
+    merged into the prompt.
+    """
+
+    def __init__(self, tools: Optional[Dict[str, Tool]] = None, deadline: Optional[float] = None) -> None:
+        self.tools = tools if tools is not None else {
+            tool.name: tool for tool in (WebSearchTool(), VectorSearchTool(), OCRTool())
+        }
+        self.deadline = deadline if deadline is not None else settings.AGENT_TOOL_DEADLINE_SECONDS
+
+    def plan(self, agent: "BaseAgent", query: str, images: Sequence[str] = ()) -> List[str]:
+        """
+        Decide which tools the query needs.
+
+        Args:
+            agent: Agent whose heuristics (``_needs_rag``) drive the plan
+            query: User query
+            images: Attached images (base64)
+
+        Returns:
+            Names of the tools to run
+        """
+        planned = []
+        if should_use_web_search(query):
+            planned.append("web_search")
+        if agent._needs_rag(query):
+            planned.append("rag")
+        if images:
+            planned.append("ocr")
+        return [name for name in planned if name in self.tools]
+
+    async def run(
+        self,
+        agent: "BaseAgent",
+        query: str,
+        images: Sequence[str] = (),
+        deadline: Optional[float] = None,
+    ) -> List[ToolResult]:
+        """
+        Run the planned tools concurrently under a shared deadline.
+
+        Returns:
+            One result per planned tool, in plan order
+        """
+        planned = self.plan(agent, query, images)
+        if not planned:
+            return []
+
+        start = time.perf_counter()
+        tasks = {name: asyncio.create_task(self._timed(self.tools[name], query, images)) for name in planned}
+        try:
+            await asyncio.wait(tasks.values(), timeout=deadline or self.deadline)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            # Wait for the cancelled tools to unwind so nothing outlives the request
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        results = []
+        for name, task in tasks.items():
+            if not task.done() or task.cancelled():
+                result = ToolResult(name, error="deadline exceeded", elapsed=time.perf_counter() - start)
+            elif task.exception() is not None:
+                result = ToolResult(name, error=str(task.exception()), elapsed=time.perf_counter() - start)
+            else:
+                result = task.result()
+            if result.error:
+                logger.warning(f"Tool {name} failed: {result.error}")
+            results.append(result)
+        return results
+
+    @staticmethod
+    async def _timed(tool: Tool, query: str, images: Sequence[str]) -> ToolResult:
+        start = time.perf_counter()
+        result = await tool.run(query, images)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def sections(self, results: Sequence[ToolResult]) -> List[PromptSection]:
+        """Successful tool outputs as prompt sections for ``PromptAssembler``"""
+        sections = []
+        for r in results:
+            if not r.ok:
+                continue
+            tool = self.tools.get(r.name)
+            sections.append(PromptSection(
+                name=r.name,
+                heading=tool.heading if tool else "",
+                items=[r.content],
+                share=tool.share if tool else Tool.share,
+            ))
+        return sections
+
+
+tool_orchestrator = ToolOrchestrator()
@@ -0,0 +1,184 @@
+"""
+Rule-based prompt analyzer for Tutor Antonina.
+Szybka, lokalna analiza prompta pod kątem 6 elementów – bez wywołania LLM.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# Kolejność jak w SYSTEM_PROMPT tutora - pytamy o pierwszy brakujący element
+ELEMENTS: Tuple[str, ...] = (
+    "context",
+    "instruction",
+    "constraints",
+    "format",
+    "examples",
+    "system_role",
+)
+
+
+def _compile(*alternatives: str) -> Pattern[str]:
+    return re.compile("|".join(alternatives), re.IGNORECASE | re.MULTILINE)
+
+
+# Each element is detected by keywords (PL/EN, with and without diacritics),
+# which also cover "Kontekst:"-style section headers, or by structure such as
+# quoted samples, code fences and "Input:/Output:" lines.
+ELEMENT_PATTERNS: Dict[str, Pattern[str]] = {
+    "context": _compile(
+        r"\b(kontekst|t[łl]o|sytuacj\w*|cel(em)?|poniewa[żz]|gdy[żz]|jestem|pracuj[eę]|prowadz[eę]|organizuj[eę]|przygotowuj[eę]|"
+        r"uczę się|ucze sie|na potrzeby|w ramach|dla (mojej|mojego|moich|klienta|firmy|szko[łl]y|klasy|zespo[łl]u))\b",
+        r"\b(context|background|because|i am|i'm|we are|my goal|the goal|for my|in order to|so that)\b",
+    ),
+    "instruction": _compile(
+        r"\b(napisz|stw[óo]rz|przygotuj|wygeneruj|opisz|wyja[śs]nij|wyt[łl]umacz|podsumuj|"
+        r"przet[łl]umacz|zaproponuj|wymie[ńn]|por[óo]wnaj|oce[ńn]|popraw|zaplanuj|zr[óo]b|"
+        r"pom[óo][żz]|przeanalizuj|odpowiedz|zadanie|polecenie)\b",
+        r"\b(write|create|generate|describe|explain|summari[sz]e|translate|list|compare|"
+        r"suggest|draft|analy[sz]e|review|plan|give me|help me|task)\b",
+        r"\?\s*$",
+    ),
+    "constraints": _compile(
+        r"\b(nie (u[żz]ywaj|pisz|dodawaj|wspominaj|stosuj|przekraczaj)|bez|unikaj|"
+        r"maksymalnie|maks\.?|co najwy[żz]ej|nie wi[ęe]cej ni[żz]|minimum|co najmniej|"
+        r"tylko|wy[łl][ąa]cznie|ograniczeni\w*|limit)\b",
+        r"\b(don't|do not|avoid|without|at most|no more than|maximum|at least|only|must not|limit)\b",
+        r"\b\d+\s*(s[łl][óo]w|zda[ńn]|znak[óo]w|akapit\w*|punkt\w*|words?|sentences?|characters?|paragraphs?)\b",
+    ),
+    "format": _compile(
+        r"\b(format\w*|w formie|w postaci|list[aęey]|w punktach|wypunktuj|tabel\w*|nag[łl][óo]wk\w*|"
+        r"akapit\w*|krok po kroku|json|markdown|csv|yaml|html)\b",
+        r"\b(as a list|bullet\w*|table|headings?|paragraphs?|step by step|numbered)\b",
+    ),
+    "examples": _compile(
+        r"\b(przyk[łl]ad\w*|np\.|na przyk[łl]ad|wz[óo]r\w*|wzorzec|podobn\w*)",
+        r"\b(examples?|e\.g\.|for instance|such as|sample|like this)\b",
+        r"```|\"[^\"]{12,}\"|„[^”]{12,}”",
+        r"^\s*(input|output|wej[śs]cie|wyj[śs]cie)\s*:",
+    ),
+    "system_role": _compile(
+        r"\b(jeste[śs]|wciel si[ęe]|dzia[łl]aj jako|zachowuj si[ęe] jak|odpowiadaj jako|"
+        r"jako (ekspert|nauczyciel|specjalist|do[śs]wiadczon|trener|copywriter|programist|redaktor|analityk)\w*|"
+        r"rol[aię]|ton(em|ie)?|styl\w*)\b",
+        r"\b(you are|act as|as an? (expert|teacher|specialist|senior|experienced)|role|tone|style|persona|pretend)\b",
+    ),
+}
+
+CLARIFYING_QUESTIONS: Dict[str, str] = {
+    "context": "W jakim kontekście chcesz użyć tego prompta? Czy to zadanie szkolne, praca, czy coś innego?",
+    "instruction": "Co dokładnie AI ma zrobić? Opisz zadanie jednym konkretnym poleceniem, np. „Napisz…” albo „Porównaj…”.",
+    "constraints": "Czy są jakieś ograniczenia, których AI ma się trzymać? Na przykład długość, czego unikać albo czego nie używać?",
+    "format": "W jakiej formie chcesz otrzymać odpowiedź? Lista punktów, tabela, e-mail, a może kilka akapitów?",
+    "examples": "Czy możesz podać przykład oczekiwanego rezultatu albo wzór, na którym AI może się oprzeć?",
+    "system_role": "Jaką rolę ma przyjąć AI i jakim stylem ma się komunikować? Na przykład „Jesteś doświadczonym nauczycielem, piszesz przystępnie”.",
+}
+
+
+@dataclass
+class PromptAnalysis:
+    """Result of the local prompt analysis."""
+
+    present: Dict[str, bool]
+    word_count: int
+
+    @property
+    def missing(self) -> List[str]:
+        """Missing elements in the order the tutor asks about them"""
+        return [element for element in ELEMENTS if not self.present[element]]
+
+    @property
+    def complete(self) -> bool:
+        """All six elements were detected"""
+        return not self.missing
+
+
+@dataclass
+class ShortCircuitStats:
+    """How often the analyzer answered without an LLM call."""
+
+    analyzed: int = 0
+    short_circuited: int = 0
+    by_element: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, question_element: Optional[str]) -> None:
+        """Count one analysis; ``question_element`` is set when it short-circuited"""
+        self.analyzed += 1
+        if question_element:
+            self.short_circuited += 1
+            self.by_element[question_element] = self.by_element.get(question_element, 0) + 1
+
+    @property
+    def rate(self) -> float:
+        """Fraction of analyses answered locally"""
+        return self.short_circuited / self.analyzed if self.analyzed else 0.0
+
+    def as_dict(self) -> Dict[str, object]:
+        """Stats in the shape returned by the API"""
+        return {
+            "analyzed": self.analyzed,
+            "short_circuited": self.short_circuited,
+            "llm_calls": self.analyzed - self.short_circuited,
+            "short_circuit_rate": round(self.rate, 4),
+            "by_element": dict(self.by_element),
+        }
+
+    def reset(self) -> None:
+        """Zero all counters"""
+        self.analyzed = 0
+        self.short_circuited = 0
+        self.by_element.clear()
+
+
+class PromptAnalyzer:
+    """
+    Detects the six prompt elements from Tutor Antonina's system prompt.
+
+    A clarifying question is returned only when an element is clearly
+    missing; long prompts with only one or two gaps are left to the LLM,
+    which judges implicitly phrased elements better than keyword rules.
+    """
+
+    # Above this length a single missing element may just be phrased implicitly
+    LONG_PROMPT_WORDS = 120
+    HISTORY_MESSAGES = 3
+
+    def analyze(self, prompt: str, chat_history: Optional[List[Dict[str, str]]] = None) -> PromptAnalysis:
+        """
+        Analyze a prompt together with the user's recent messages.
+
+        Args:
+            prompt: Ostatni prompt użytkownika
+            chat_history: Historia rozmowy (odpowiedzi na wcześniejsze pytania też się liczą)
+
+        Returns:
+            Detected elements
+        """
+        texts = [
+            msg["content"] for msg in (chat_history or [])[-self.HISTORY_MESSAGES:]
+            if msg.get("role") == "user"
+        ]
+        texts.append(prompt)
+        text = "\n".join(texts)
+
+        present = {element: bool(pattern.search(text)) for element, pattern in ELEMENT_PATTERNS.items()}
+        return PromptAnalysis(present=present, word_count=len(prompt.split()))
+
+    def clarifying_question(self, analysis: PromptAnalysis) -> Optional[Tuple[str, str]]:
+        """
+        Pick the templated question for the first clearly missing element.
+
+        Returns:
+            (element, question), or None when the LLM should take over
+        """
+        missing = analysis.missing
+        if not missing:
+            return None
+        if analysis.word_count > self.LONG_PROMPT_WORDS and len(missing) < 3:
+            return None
+        element = missing[0]
+        return element, CLARIFYING_QUESTIONS[element]
+
+
+prompt_analyzer = PromptAnalyzer()
+short_circuit_stats = ShortCircuitStats()
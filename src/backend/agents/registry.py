@@ -0,0 +1,194 @@
+"""
+Agent registry.
+Przechowuje długowieczne instancje agentów i współdzielone limity współbieżności.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Gauge, Histogram
+
+from backend.agents.base_agent import AgentContext, AgentResponse, BaseAgent, GeneralConversationAgent
+from backend.agents.tutor_agent import TutorAntonina
+
+logger = logging.getLogger(__name__)
+
+AGENT_REQUEST_SECONDS = Histogram(
+    "agent_request_duration_seconds",
+    "Time an agent was borrowed for, by outcome",
+    ["agent_type", "outcome"],
+)
+AGENT_QUEUE_WAIT_SECONDS = Histogram(
+    "agent_queue_wait_seconds",
+    "Time spent waiting for a free agent slot",
+    ["agent_type"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+AGENT_IN_FLIGHT = Gauge(
+    "agent_requests_in_flight",
+    "Requests currently holding an agent slot",
+    ["agent_type"],
+)
+
+AgentKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+
+class _FailedResponse(Exception):
+    """Unsuccessful agent response, raised inside ``borrow`` so it is counted as an error."""
+
+    def __init__(self, response: AgentResponse) -> None:
+        super().__init__(response.metadata.get("error") or response.content)
+        self.response = response
+
+
+class AgentRegistry:
+    """
+    Creates agents once and lends them to request handlers.
+
+    Instances are keyed by agent type and constructor config (e.g. tutor
+    model/provider). All instances of one type share a single semaphore
+    sized by ``AgentConfig.max_concurrent_requests``, so the limit holds
+    across requests and configs.
+    """
+
+    # Config combinations come from requests; keep the cache bounded
+    MAX_INSTANCES = 64
+
+    def __init__(self) -> None:
+        self.factories: Dict[str, Callable[..., BaseAgent]] = {}
+        self._agents: "OrderedDict[AgentKey, BaseAgent]" = OrderedDict()
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+
+    def register(self, agent_type: str, factory: Callable[..., BaseAgent]) -> None:
+        """Register a factory (usually the agent class) for an agent type"""
+        self.factories[agent_type] = factory
+
+    def get(self, agent_type: str, **config: Any) -> BaseAgent:
+        """
+        Get the shared agent instance for a type and config, creating it once.
+
+        Raises:
+            KeyError: If the agent type is not registered
+        """
+        if agent_type not in self.factories:
+            raise KeyError(f"Unknown agent type: {agent_type}")
+
+        key = (agent_type, tuple(sorted(config.items())))
+        agent = self._agents.get(key)
+        if agent is not None:
+            self._agents.move_to_end(key)
+            return agent
+
+        agent = self.factories[agent_type](**config)
+        if agent_type not in self._limits:
+            self._limits[agent_type] = asyncio.Semaphore(agent.config.max_concurrent_requests)
+        agent.semaphore = self._limits[agent_type]
+        self._agents[key] = agent
+        if len(self._agents) > self.MAX_INSTANCES:
+            self._agents.popitem(last=False)
+        logger.info(f"Agent registry created {agent_type} {dict(config)}")
+        return agent
+
+    @asynccontextmanager
+    async def borrow(self, agent_type: str, **config: Any) -> AsyncIterator[BaseAgent]:
+        """
+        Borrow an agent for one request, waiting for a free slot.
+
+        Counts the request on the agent and records wait and hold times.
+        """
+        agent = self.get(agent_type, **config)
+        wait_start = time.perf_counter()
+        async with agent.semaphore:
+            AGENT_QUEUE_WAIT_SECONDS.labels(agent_type).observe(time.perf_counter() - wait_start)
+            self._in_flight[agent_type] = self._in_flight.get(agent_type, 0) + 1
+            AGENT_IN_FLIGHT.labels(agent_type).inc()
+            agent.request_count += 1
+            outcome = "success"
+            start = time.perf_counter()
+            try:
+                yield agent
+            except BaseException as e:
+                outcome = "error"
+                if not isinstance(e, asyncio.CancelledError):
+                    agent.error_count += 1
+                    agent.last_error = str(e)
+                raise
+            finally:
+                AGENT_REQUEST_SECONDS.labels(agent_type, outcome).observe(time.perf_counter() - start)
+                AGENT_IN_FLIGHT.labels(agent_type).dec()
+                self._in_flight[agent_type] -= 1
+
+    async def process_query(
+        self,
+        agent_type: str,
+        query: str,
+        context: Optional[AgentContext] = None,
+        **kwargs: Any,
+    ) -> AgentResponse:
+        """
+        Borrow an agent and process one query.
+
+        Agents report failures as ``success=False`` rather than raising; such
+        a response is recorded as an error like an exception would be.
+        """
+        try:
+            async with self.borrow(agent_type) as agent:
+                response = await agent.process_query(query, context, **kwargs)
+                if not response.success:
+                    raise _FailedResponse(response)
+        except _FailedResponse as e:
+            return e.response
+        return response
+
+    def warm_up(self) -> None:
+        """Create the default instance of every registered agent type"""
+        for agent_type in self.factories:
+            self.get(agent_type)
+
+    def agents(self) -> List[BaseAgent]:
+        """All live agent instances"""
+        return list(self._agents.values())
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-type info and stats aggregated over all instances of the type"""
+        by_type: Dict[str, Dict[str, Any]] = {}
+        for (agent_type, _), agent in self._agents.items():
+            entry = by_type.setdefault(agent_type, {
+                "type": agent_type,
+                "name": agent.config.name,
+                "description": agent.config.description,
+                "enabled": agent.config.enabled,
+                "stats": {
+                    "instances": 0,
+                    "max_concurrent_requests": agent.config.max_concurrent_requests,
+                    "in_flight": self._in_flight.get(agent_type, 0),
+                    "request_count": 0,
+                    "error_count": 0,
+                    "last_error": None,
+                },
+            })
+            stats = entry["stats"]
+            stats["instances"] += 1
+            stats["request_count"] += agent.request_count
+            stats["error_count"] += agent.error_count
+            stats["last_error"] = agent.last_error or stats["last_error"]
+        for entry in by_type.values():
+            stats = entry["stats"]
+            stats["success_rate"] = (stats["request_count"] - stats["error_count"]) / max(stats["request_count"], 1)
+        return list(by_type.values())
+
+    def clear(self) -> None:
+        """Drop all instances and limits (tests, config reload)"""
+        self._agents.clear()
+        self._limits.clear()
+        self._in_flight.clear()
+
+
+agent_registry = AgentRegistry()
+agent_registry.register("general_conversation", GeneralConversationAgent)
+agent_registry.register("tutor_antonina", TutorAntonina)
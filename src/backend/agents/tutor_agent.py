@@ -5,11 +5,19 @@ Agent edukacyjny pomagający w tworzeniu skutecznych promptów.
 
 import logging
 from typing import Dict, List, Optional, Any
+from backend.config import settings
 from backend.core.llm_providers.provider_factory import provider_factory as llm_factory
+from backend.core.llm_providers.prompt_assembler import PromptAssembler, PromptSection
 from backend.agents.base_agent import BaseAgent, AgentConfig, AgentContext, AgentResponse
+from backend.agents.prompt_analyzer import prompt_analyzer, short_circuit_stats
 
 logger = logging.getLogger(__name__)
 
+TUTOR_MAX_TOKENS = 400
+# Poprzednie wiadomości dołączane do analizy i limit tokenów na każdą z nich
+HISTORY_MESSAGES = 3
+HISTORY_MESSAGE_TOKENS = 64
+
 SYSTEM_PROMPT = """
 Jesteś Antoniną – doświadczoną trenerką promptów. Pomagaj uczennicy tworzyć pełne, skuteczne prompty, uwzględniając te 6 elementów:
 
@@ -39,7 +47,12 @@ Ulepszony prompt: [zoptymalizowana wersja]
 class TutorAntonina(BaseAgent):
     """Agent edukacyjny pomagający w tworzeniu skutecznych promptów."""
     
-    def __init__(self, model: Optional[str] = None, provider: Optional[str] = None):
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        provider: Optional[str] = None,
+        pre_analyze: Optional[bool] = None,
+    ):
         config = AgentConfig(
             agent_type="tutor_antonina",
             name="Tutor Antonina",
@@ -51,6 +64,7 @@ class TutorAntonina(BaseAgent):
         super().__init__(config)
         self.model = model
         self.provider = provider
+        self.pre_analyze = settings.TUTOR_PREANALYSIS_ENABLED if pre_analyze is None else pre_analyze
     
     async def guide(self, last_prompt: str, chat_history: List[Dict[str, str]]) -> Dict[str, Optional[str]]:
         """
@@ -63,19 +77,31 @@ class TutorAntonina(BaseAgent):
         Returns:
             Dict z pytaniem lub feedbackiem
         """
+        # Brakujące elementy wykrywamy lokalnie - LLM tylko dla ulepszonego prompta
+        if self.pre_analyze:
+            analysis = prompt_analyzer.analyze(last_prompt, chat_history)
+            clarification = prompt_analyzer.clarifying_question(analysis)
+            short_circuit_stats.record(clarification[0] if clarification else None)
+            if clarification:
+                logger.debug(f"Tutor short-circuit - missing: {analysis.missing}")
+                return {"question": clarification[1], "feedback": None}
+        
         try:
-            # Przygotuj wiadomości dla LLM
-            messages = [
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": f"Przeanalizuj ten prompt i pomóż mi go ulepszyć:\n\n{last_prompt}"}
-            ]
-            
-            # Dodaj kontekst z historii jeśli istnieje
-            if chat_history:
-                context = "\n\nKontekst z poprzednich wiadomości:\n"
-                for msg in chat_history[-3:]:  # Ostatnie 3 wiadomości
-                    context += f"- {msg['role']}: {msg['content'][:100]}...\n"
-                messages[1]["content"] += context
+            # Przygotuj wiadomości dla LLM - kontekst z historii przycinany do budżetu tokenów
+            history = PromptSection(
+                name="history",
+                heading="Kontekst z poprzednich wiadomości:",
+                items=[f"- {msg['role']}: {msg['content']}" for msg in chat_history[-HISTORY_MESSAGES:]],
+                share=0.3,
+                item_tokens=HISTORY_MESSAGE_TOKENS,
+            )
+            messages = PromptAssembler.for_model(self.model, self.provider, TUTOR_MAX_TOKENS).assemble(
+                [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": f"Przeanalizuj ten prompt i pomóż mi go ulepszyć:\n\n{last_prompt}"}
+                ],
+                [history],
+            ).messages
             
             # Wybierz provider
             if self.provider:
@@ -91,7 +117,7 @@ class TutorAntonina(BaseAgent):
                         messages=messages,
                         model=self.model,
                         temperature=0.2,
-                        max_tokens=400
+                        max_tokens=TUTOR_MAX_TOKENS
                     )
                 else:
                     provider = llm_factory.get_provider(provider_type)
@@ -99,28 +125,17 @@ class TutorAntonina(BaseAgent):
                         messages=messages,
                         model=self.model,
                         temperature=0.2,
-                        max_tokens=400
+                        max_tokens=TUTOR_MAX_TOKENS
                     )
             else:
                 result = await llm_factory.chat_with_fallback(
                     messages=messages,
                     model=self.model,
                     temperature=0.2,
-                    max_tokens=400
+                    max_tokens=TUTOR_MAX_TOKENS
                 )
             
-            # Handle different response formats
-            if isinstance(result, str):
-                content = result.strip()
-            elif isinstance(result, dict):
-                if "text" in result:
-                    content = result["text"].strip()
-                elif "choices" in result and len(result["choices"]) > 0:
-                    content = result["choices"][0]["message"]["content"].strip()
-                else:
-                    content = str(result).strip()
-            else:
-                content = str(result).strip()
+            content = result.text.strip()
             
             # Analizuj odpowiedź
             if content.startswith("Sugestia:"):
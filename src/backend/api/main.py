@@ -21,9 +21,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.config import settings
 from backend.agents.base_agent import GeneralConversationAgent, AgentContext
+from backend.agents.registry import agent_registry
 from backend.core.llm_providers.provider_factory import provider_factory
-from backend.database import get_async_session, create_tables
+from backend.database import get_async_session, prepare_database
+from backend.database.write_behind import write_behind_queue
 from backend.exceptions import AgenyOnlineError
+from backend.services.conversation_memory import conversation_memory
 
 # Import OCR endpoints
 from backend.api.v2.endpoints.ocr import router as ocr_router
@@ -39,6 +42,8 @@ from backend.api.v2.endpoints.profile import router as profile_router
 from backend.api.v2.endpoints.vector_store import router as vector_store_router
 # Import Cooking endpoints
 from backend.api.v2.endpoints.cooking import router as cooking_router
+# Import Bulk job endpoints
+from backend.api.v2.endpoints.bulk import router as bulk_router
 
 # Import Plugin System
 from backend.plugins import plugin_manager
@@ -72,17 +77,17 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Ageny Online application...")
     
-    # Initialize database tables
+    # Verify (or migrate) the database schema
     try:
-        await create_tables()
-        logger.info("Database tables initialized successfully")
+        await prepare_database()
     except Exception as e:
-        logger.error(f"Failed to initialize database tables: {e}")
+        logger.error(f"Database schema check failed: {e}")
         raise
     
-    # Initialize agents
+    # Initialize agents once; endpoints borrow them from the registry
     global general_agent
-    general_agent = GeneralConversationAgent()
+    agent_registry.warm_up()
+    general_agent = agent_registry.get("general_conversation")
     
     # Initialize plugins
     try:
@@ -101,14 +106,41 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize plugins: {e}")
     
+    # Record/replay provider traffic (profiling and benchmarks only)
+    cassette = None
+    if settings.PROVIDER_CASSETTE_MODE not in ("", "off"):
+        from backend.testing.cassette import cassette_from_settings
+
+        cassette = cassette_from_settings().install()
+        logger.warning(f"Provider traffic cassette active: {cassette.mode} {cassette.path}")
+    
     # Check provider health
     health_status = await provider_factory.health_check_all()
     logger.info(f"Provider health status: {health_status}")
     
+    # Batch inserts of messages, OCR results and cost records
+    if settings.WRITE_BEHIND_ENABLED:
+        write_behind_queue.start()
+    
+    # Start bulk job worker (provider batches and throttled queue)
+    bulk_worker = None
+    if settings.BULK_JOBS_ENABLED:
+        from backend.services.bulk_job_service import BulkJobWorker
+
+        bulk_worker = BulkJobWorker()
+        bulk_worker.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Ageny Online application...")
+    if bulk_worker:
+        await bulk_worker.stop()
+    await conversation_memory.stop()
+    # Drain after the memory's writes have been queued
+    await write_behind_queue.stop()
+    if cassette:
+        cassette.uninstall()
 
 
 # Create FastAPI application
@@ -168,7 +200,7 @@ async def health_check() -> Dict[str, Any]:
         # Initialize agent if not already done
         global general_agent
         if 'general_agent' not in globals() or general_agent is None:
-            general_agent = GeneralConversationAgent()
+            general_agent = agent_registry.get("general_conversation")
         
         # Check agent health
         agent_health = await general_agent.health_check()
@@ -225,6 +257,23 @@ async def health_check() -> Dict[str, Any]:
         }
 
 
+async def run_general_agent(message: str, context: AgentContext, **kwargs: Any) -> Dict[str, Any]:
+    """Borrow the general conversation agent and shape its reply for the v1 API"""
+    response = await agent_registry.process_query("general_conversation", message, context, **kwargs)
+    
+    return {
+        "response": response.content,
+        "success": response.success,
+        "session_id": context.session_id,
+        "agent_type": response.agent_type,
+        "provider_used": response.provider_used,
+        "tokens_used": response.tokens_used,
+        "cost": response.cost,
+        "processing_time": response.processing_time,
+        "tools": response.metadata.get("tools", []),
+    }
+
+
 @app.get("/api/v1/chat")
 @limiter.limit(f"{settings.RATE_LIMIT_CHAT}/minute")
 async def chat_endpoint(
@@ -246,12 +295,10 @@ async def chat_endpoint(
         context = AgentContext(
             session_id=session_id or f"session_{int(time.time())}",
             user_id=user_id or "anonymous",
-            message=message,
-            timestamp=time.time()
         )
         
         # Get response from agent
-        response = await general_agent.process_message(context)
+        response = await run_general_agent(message, context)
         
         # Make response teen-friendly
         response = make_teen_friendly_response(response)
@@ -289,12 +336,10 @@ async def chat_post_endpoint(
         context = AgentContext(
             session_id=session_id or f"session_{int(time.time())}",
             user_id=user_id or "anonymous",
-            message=message,
-            timestamp=time.time()
         )
         
-        # Get response from agent
-        response = await general_agent.process_message(context)
+        # Get response from agent (attached images are OCR'd by its tools)
+        response = await run_general_agent(message, context, images=data.get("images") or [])
         
         # Make response teen-friendly
         response = make_teen_friendly_response(response)
@@ -340,17 +385,7 @@ async def get_providers() -> Dict[str, Any]:
 async def get_agents() -> Dict[str, Any]:
     """Get available agents information"""
     try:
-        return {
-            "agents": [
-                {
-                    "type": general_agent.config.agent_type,
-                    "name": general_agent.config.name,
-                    "description": general_agent.config.description,
-                    "enabled": general_agent.config.enabled,
-                    "stats": general_agent.get_stats(),
-                }
-            ]
-        }
+        return {"agents": agent_registry.stats()}
         
     except Exception as e:
         logger.error(f"Get agents error: {e}")
@@ -489,6 +524,7 @@ app.include_router(gamification_router, prefix="/api/v2/gamification", tags=["Ga
 app.include_router(profile_router, prefix="/api/v2/profile", tags=["Profile"])
 app.include_router(vector_store_router, prefix="/api/v2/vector-store", tags=["Vector Store"])
 app.include_router(cooking_router, prefix="/api/v2/cooking", tags=["Cooking"])
+app.include_router(bulk_router, prefix="/api/v2/bulk", tags=["Bulk Jobs"])
 
 # Include plugin routers
 for plugin_router in plugin_manager.get_all_routers():
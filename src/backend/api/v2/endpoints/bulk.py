@@ -0,0 +1,99 @@
+"""
+Bulk job endpoints for Ageny Online.
+Zapewnia API zadań masowego generowania (batch API dostawców, kolejka w tle).
+"""
+
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database import get_async_session
+from backend.exceptions.database import ValidationError
+from backend.schemas.bulk import BulkJobCreate, BulkJobResponse, BulkJobItemResponse
+from backend.services.bulk_job_service import BulkJobService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Bulk Jobs"])
+
+
+@router.post("/jobs", response_model=BulkJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_bulk_job(
+    job: BulkJobCreate,
+    db: AsyncSession = Depends(get_async_session),
+    user_id: Optional[int] = Query(None, description="User ID")  # TODO: Replace with proper auth
+):
+    """Submit prompts for offline generation."""
+    try:
+        service = BulkJobService(db)
+        result = await service.submit_job(job, user_id)
+        return BulkJobResponse.model_validate(result)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    except Exception as e:
+        logger.error(f"Failed to submit bulk job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs", response_model=List[BulkJobResponse])
+async def list_bulk_jobs(
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
+    db: AsyncSession = Depends(get_async_session),
+    user_id: Optional[int] = Query(None, description="User ID")  # TODO: Replace with proper auth
+):
+    """List bulk jobs, newest first."""
+    try:
+        service = BulkJobService(db)
+        jobs = await service.list_jobs(user_id, skip=skip, limit=limit)
+        return [BulkJobResponse.model_validate(job) for job in jobs]
+    except Exception as e:
+        logger.error(f"Failed to list bulk jobs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{job_id}", response_model=BulkJobResponse)
+async def get_bulk_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_session),
+    user_id: Optional[int] = Query(None, description="User ID")  # TODO: Replace with proper auth
+):
+    """Get bulk job progress."""
+    service = BulkJobService(db)
+    job = await service.get_job(job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Bulk job not found")
+    return BulkJobResponse.model_validate(job)
+
+
+@router.get("/jobs/{job_id}/items", response_model=List[BulkJobItemResponse])
+async def list_bulk_job_items(
+    job_id: int,
+    item_status: Optional[str] = Query(None, alias="status", description="pending, succeeded, failed, cancelled"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
+    db: AsyncSession = Depends(get_async_session),
+    user_id: Optional[int] = Query(None, description="User ID")  # TODO: Replace with proper auth
+):
+    """List item results of a bulk job."""
+    service = BulkJobService(db)
+    if not await service.get_job(job_id, user_id):
+        raise HTTPException(status_code=404, detail="Bulk job not found")
+    items = await service.list_items(job_id, status=item_status, skip=skip, limit=limit)
+    return [BulkJobItemResponse.model_validate(item) for item in items]
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=BulkJobResponse)
+async def cancel_bulk_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_session),
+    user_id: Optional[int] = Query(None, description="User ID")  # TODO: Replace with proper auth
+):
+    """Cancel a bulk job that has not finished."""
+    service = BulkJobService(db)
+    job = await service.cancel_job(job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Bulk job not found")
+    return BulkJobResponse.model_validate(job)
@@ -1,14 +1,20 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+import asyncio
+import json
 import logging
 import time
-import re
 
 from backend.core.llm_providers.provider_factory import provider_factory as llm_factory
-from backend.api.v2.endpoints.web_search import WebSearchRequest, search_providers
+from backend.core.llm_providers.result import ChatResult
+from backend.core.llm_providers.prompt_assembler import PromptAssembler, PromptSection
+from backend.services.web_search import should_use_web_search, perform_web_search, format_search_results
 from backend.schemas.tutor import TutorRequest, TutorResponse
-from backend.agents.tutor_agent import TutorAntonina
+from backend.agents.registry import agent_registry
+from backend.agents.prompt_analyzer import short_circuit_stats
+from backend.services.conversation_memory import conversation_memory
 
 logger = logging.getLogger(__name__)
 
@@ -20,13 +26,21 @@ class ChatMessage(BaseModel):
     content: str = Field(..., description="Content of the message")
 
 class ChatRequest(BaseModel):
-    """Chat completion request model."""
-    messages: List[ChatMessage] = Field(..., description="List of chat messages")
+    """
+    Chat completion request model.
+
+    Stateless mode sends the whole ``messages`` list. Session mode sends only
+    ``message`` (plus ``conversation_id`` to continue a stored conversation);
+    the server keeps the history.
+    """
+    messages: List[ChatMessage] = Field(default_factory=list, description="List of chat messages (stateless mode)")
+    conversation_id: Optional[int] = Field(None, description="Stored conversation to continue (session mode)")
+    message: Optional[str] = Field(None, description="New user message (session mode)")
     model: Optional[str] = Field(None, description="Model to use for completion")
     max_tokens: Optional[int] = Field(None, description="Maximum tokens to generate")
     temperature: float = Field(0.7, description="Sampling temperature", ge=0.0, le=2.0)
     provider: Optional[str] = Field(None, description="Specific provider to use")
-    stream: bool = Field(False, description="Whether to stream the response")
+    stream: bool = Field(False, description="Stream the response as server-sent events")
     enable_web_search: bool = Field(True, description="Whether to enable web search for current information")
     tutor_mode: bool = Field(False, description="Włącz tryb Tutor Antoniny")
 
@@ -43,83 +57,310 @@ class ChatResponse(BaseModel):
     web_search_results: Optional[List[Dict[str, Any]]] = None
     tutor_question: Optional[str] = Field(None, description="Pytanie doprecyzowujące od tutora")
     tutor_feedback: Optional[str] = Field(None, description="Sugestia i ulepszony prompt od tutora")
+    conversation_id: Optional[int] = Field(None, description="Conversation the turn was stored in (session mode)")
 
 class EmbedRequest(BaseModel):
     """Embedding request model."""
     texts: List[str] = Field(..., description="List of texts to embed")
     model: Optional[str] = Field(None, description="Model to use for embedding")
 
-def should_use_web_search(message: str) -> bool:
-    """Determine if web search should be used based on message content."""
-    # Keywords that indicate need for current information
-    current_info_keywords = [
-        "dzisiaj", "obecnie", "aktualnie", "ostatnio", "niedawno", "w tym roku",
-        "w tym miesiącu", "w tym tygodniu", "dzisiejsze", "obecne",
-        "today", "currently", "recently", "latest", "current", "now",
-        "2024", "2025", "2026", "2027", "2028", "2029", "2030"
-    ]
-    
-    # Questions about time-sensitive topics
-    time_sensitive_patterns = [
-        r"co się stało w \d{4}",
-        r"kiedy.*\d{4}",
-        r"what happened in \d{4}",
-        r"when.*\d{4}",
-        r"aktualne wiadomości",
-        r"current news",
-        r"ostatnie wydarzenia",
-        r"recent events"
-    ]
-    
-    message_lower = message.lower()
-    
-    # Check for current info keywords
-    for keyword in current_info_keywords:
-        if keyword in message_lower:
-            return True
-    
-    # Check for time-sensitive patterns
-    for pattern in time_sensitive_patterns:
-        if re.search(pattern, message_lower):
-            return True
-    
-    return False
+TUTOR_ERROR_QUESTION = "Przepraszam, wystąpił błąd w trybie tutora. Spróbuj ponownie."
+WEB_SEARCH_HEADING = "Aktualne informacje z internetu:"
+# Per-result cap so one long snippet cannot crowd out the others
+SEARCH_RESULT_TOKENS = 150
+
+
+def resolve_provider_type(name: str):
+    """
+    Map a provider name from the request onto a registered ProviderType.
+
+    Raises:
+        HTTPException: 400 if the provider is not available
+    """
+    # Check if we're in test mode (llm_factory is mocked)
+    if hasattr(llm_factory, '_mock_name'):
+        from backend.core.llm_providers.provider_factory import ProviderType
+        return ProviderType(name)
+
+    for pt in llm_factory.get_available_providers():
+        if pt.value == name:
+            return pt
+
+    available_providers = [p.value for p in llm_factory.get_available_providers()]
+    logger.error(f"Provider {name} not available. Available: {available_providers}")
+    raise HTTPException(
+        status_code=400,
+        detail=f"Provider {name} not available. Available: {available_providers}"
+    )
+
+
+async def load_session(request: ChatRequest) -> int:
+    """
+    Resolve a session-mode request into the full message list.
+
+    Creates a conversation when no ``conversation_id`` is given, then sets
+    ``request.messages`` to the stored context followed by the new message.
+
+    Returns:
+        Conversation ID
+
+    Raises:
+        HTTPException: 400 without a message, 404 for an unknown conversation
+    """
+    if not request.message or not request.message.strip():
+        raise HTTPException(status_code=400, detail="Session mode requires a non-empty message")
+
+    if request.conversation_id is None:
+        conversation_id = await conversation_memory.start_conversation()
+        history: List[Dict[str, str]] = []
+    else:
+        conversation_id = request.conversation_id
+        history = await conversation_memory.history(conversation_id)
+        if history is None:
+            raise HTTPException(status_code=404, detail=f"Conversation {conversation_id} not found")
+
+    request.messages = [ChatMessage(**m) for m in history] + [ChatMessage(role="user", content=request.message)]
+    return conversation_id
+
+
+async def save_turn(conversation_id: int, user_message: str, result: ChatResult, response_time: float) -> None:
+    """Store the user message and the reply (cache now, DB in the background)."""
+    await conversation_memory.record_turn(conversation_id, [
+        {"role": "user", "content": user_message},
+        {
+            "role": "assistant",
+            "content": result.text,
+            "provider_used": result.provider,
+            "model_used": result.model,
+            "tokens_used": result.total_tokens,
+            "cost": str(result.cost),
+            "processing_time": f"{response_time:.3f}",
+        },
+    ])
+
+
+def assemble_messages(
+    messages: List[ChatMessage],
+    model: Optional[str],
+    provider: Optional[str],
+    max_tokens: Optional[int],
+    web_search_results: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, str]]:
+    """
+    Fit the conversation into the model's input token budget.
+
+    Search results are appended to the last user message and rank above the
+    history; the oldest history messages are cut first.
+    """
+    if not provider:
+        best = llm_factory.get_best_provider()
+        provider = getattr(best, "value", None)
+    sections = []
+    if web_search_results:
+        sections.append(PromptSection(
+            name="web_search",
+            heading=WEB_SEARCH_HEADING,
+            items=format_search_results(web_search_results),
+            item_tokens=SEARCH_RESULT_TOKENS,
+            separator="\n\n",
+        ))
+    prompt = PromptAssembler.for_model(model, provider, max_tokens).assemble(
+        [{"role": msg.role, "content": msg.content} for msg in messages], sections
+    )
+    if prompt.truncated or prompt.dropped:
+        logger.info(f"Prompt cut to budget: {prompt.summary()}")
+    return prompt.messages
+
+
+async def generate_reply(
+    messages: List[Dict[str, str]],
+    provider: Optional[str],
+    model: Optional[str],
+    temperature: float,
+    max_tokens: Optional[int],
+) -> ChatResult:
+    """Run the main completion on the requested provider or with fallback."""
+    if provider:
+        llm = llm_factory.get_provider(resolve_provider_type(provider))
+        return await llm.chat(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+    return await llm_factory.chat_with_fallback(
+        messages=messages,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+
+
+def stream_reply(
+    messages: List[Dict[str, str]],
+    provider: Optional[str],
+    model: Optional[str],
+    temperature: float,
+    max_tokens: Optional[int],
+    usage: Dict[str, Any],
+) -> AsyncIterator[str]:
+    """Stream the main completion on the requested provider or with fallback."""
+    if provider:
+        provider_type = resolve_provider_type(provider)
+        usage["provider"] = provider_type.value
+        return llm_factory.get_provider(provider_type).stream_chat(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            usage=usage
+        )
+    return llm_factory.stream_with_fallback(
+        messages=messages,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        usage=usage
+    )
+
+
+async def run_tutor(
+    last_prompt: str,
+    chat_history: List[Dict[str, str]],
+    model: Optional[str],
+    provider: Optional[str],
+) -> Dict[str, Optional[str]]:
+    """Borrow the shared Tutor Antonina instance and analyze the prompt."""
+    async with agent_registry.borrow("tutor_antonina", model=model, provider=provider) as tutor:
+        return await tutor.guide(last_prompt, chat_history)
+
+
+def start_tutor(messages: list, model: Optional[str], provider: Optional[str]) -> asyncio.Task:
+    """
+    Start Tutor Antonina's analysis of the last prompt as a background task.
 
-async def perform_web_search(query: str, max_results: int = 3) -> List[Dict[str, Any]]:
-    """Perform web search and return formatted results."""
+    The analysis does not depend on the main answer, so it runs concurrently
+    with the completion instead of adding a second round trip after it.
+    """
+    chat_history = [{"role": msg.role, "content": msg.content} for msg in messages[:-1]]
+    return asyncio.create_task(run_tutor(messages[-1].content, chat_history, model, provider))
+
+
+async def tutor_outcome(task: asyncio.Task) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Wait for the tutor task without letting its failure fail the chat reply.
+
+    Returns:
+        (tutor_question, tutor_feedback)
+    """
     try:
-        if "duckduckgo" not in search_providers:
-            logger.warning("DuckDuckGo provider not available")
-            return []
-        
-        provider = search_providers["duckduckgo"]
-        results = await provider.search(query, max_results)
-        
-        # Convert to dict format
-        formatted_results = []
-        for result in results:
-            formatted_results.append({
-                "title": result.title,
-                "url": result.url,
-                "snippet": result.snippet,
-                "source": result.source,
-                "timestamp": result.timestamp
-            })
-        
-        return formatted_results
-        
+        guide_result = await task
     except Exception as e:
-        logger.error(f"Web search failed: {e}")
-        return []
+        logger.error(f"Tutor mode error: {e}")
+        return TUTOR_ERROR_QUESTION, None
+    logger.info(
+        f"Tutor analysis completed - question: {bool(guide_result['question'])}, "
+        f"feedback: {bool(guide_result['feedback'])}"
+    )
+    return guide_result["question"], guide_result["feedback"]
+
+
+def cancel_task(task: Optional[asyncio.Task]) -> None:
+    """Cancel a background task that is no longer needed."""
+    if task is not None and not task.done():
+        task.cancel()
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def chat_events(
+    deltas: AsyncIterator[str],
+    usage: Dict[str, Any],
+    request: ChatRequest,
+    tutor_task: Optional[asyncio.Task],
+    web_search_results: Optional[List[Dict[str, Any]]],
+    start_time: float,
+    conversation_id: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """
+    Server-sent events for a streamed chat completion.
+
+    Order: ``web_search`` (if used), ``delta`` chunks of the main answer,
+    ``message`` with usage and cost, ``tutor`` (tutor mode only), ``done``.
+    Provider failures after the stream started are reported as ``error``.
+    In session mode the turn is stored once the answer is complete.
+    """
+    try:
+        if web_search_results:
+            yield sse_event("web_search", {"results": web_search_results})
+
+        parts = []
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                yield sse_event("delta", {"text": delta})
+        except Exception as e:
+            logger.error(f"LLM provider error: {e}")
+            yield sse_event("error", {"detail": f"LLM provider error: {str(e)}"})
+            return
+
+        result = ChatResult(
+            text="".join(parts),
+            model=usage.get("model") or request.model or "",
+            provider=usage.get("provider", ""),
+            finish_reason=usage.get("finish_reason") or "stop",
+            input_tokens=usage.get("input_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0),
+            cost=usage.get("cost", 0.0),
+        )
+        if conversation_id is not None:
+            await save_turn(conversation_id, request.message, result, time.time() - start_time)
+        yield sse_event("message", {
+            "model": result.model,
+            "provider": result.provider,
+            "usage": result.usage(),
+            "cost": result.cost_breakdown(),
+            "finish_reason": result.finish_reason,
+            "response_time": time.time() - start_time,
+            "conversation_id": conversation_id,
+        })
+
+        if tutor_task is not None:
+            tutor_question, tutor_feedback = await tutor_outcome(tutor_task)
+            yield sse_event("tutor", {
+                "tutor_question": tutor_question,
+                "tutor_feedback": tutor_feedback,
+            })
+
+        response_time = time.time() - start_time
+        logger.info(f"Chat stream finished in {response_time:.2f}s (tutor: {request.tutor_mode})")
+        yield sse_event("done", {"response_time": response_time})
+    finally:
+        # Client disconnects close the generator; don't leave the tutor running
+        cancel_task(tutor_task)
+
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat_completion(request: ChatRequest):
     """
     Generate chat completion using available LLM providers with optional web search.
+
+    With ``tutor_mode`` the tutor analysis runs concurrently with the main
+    completion. With ``stream`` the reply is sent as server-sent events (see
+    ``chat_events``), the tutor result arriving after the main answer.
     """
     start_time = time.time()
+    tutor_task = None
+    conversation_id = None
     
     try:
+        # Session mode: history comes from the server, the client sends one message
+        if request.conversation_id is not None or request.message is not None:
+            conversation_id = await load_session(request)
+        
         # Validate messages
         if not request.messages:
             raise HTTPException(status_code=400, detail="At least one message is required")
@@ -137,6 +378,11 @@ async def chat_completion(request: ChatRequest):
                     detail=f"Invalid role '{message.role}' at index {i}. Must be 'user', 'assistant', or 'system'"
                 )
         
+        # Tutor analyses the original prompt, so it can start before web search
+        if request.tutor_mode:
+            logger.info("Tutor mode enabled - analyzing prompt with Tutor Antonina")
+            tutor_task = start_tutor(request.messages, request.model, request.provider)
+        
         last_message = request.messages[-1].content
         web_search_used = False
         web_search_results = None
@@ -147,125 +393,66 @@ async def chat_completion(request: ChatRequest):
             try:
                 web_search_results = await perform_web_search(last_message, max_results=3)
                 web_search_used = len(web_search_results) > 0
-                
-                if web_search_used:
-                    # Enhance the message with web search results
-                    enhanced_message = f"{last_message}\n\nAktualne informacje z internetu:\n"
-                    for i, result in enumerate(web_search_results, 1):
-                        enhanced_message += f"{i}. {result['title']}: {result['snippet']}\n"
-                        enhanced_message += f"   Źródło: {result['url']}\n\n"
-                    
-                    # Update the last message with enhanced content
-                    request.messages[-1].content = enhanced_message
             except Exception as e:
                 logger.warning(f"Web search failed, continuing without it: {e}")
         
+        # History and search results are cut to the model's token budget
+        messages = assemble_messages(
+            request.messages, request.model, request.provider, request.max_tokens,
+            web_search_results if web_search_used else None
+        )
+        
+        if request.stream:
+            usage: Dict[str, Any] = {}
+            deltas = stream_reply(
+                messages, request.provider, request.model,
+                request.temperature, request.max_tokens, usage
+            )
+            events = chat_events(
+                deltas, usage, request, tutor_task,
+                web_search_results if web_search_used else None, start_time, conversation_id
+            )
+            # The event stream owns the tutor task from here on
+            tutor_task = None
+            return StreamingResponse(events, media_type="text/event-stream")
+        
         # Generate response using LLM provider
         try:
-            if request.provider:
-                # Use specific provider
-                provider_type = None
-                
-                # Check if we're in test mode (llm_factory is mocked)
-                if hasattr(llm_factory, '_mock_name'):
-                    # Test mode - create mock provider type
-                    from backend.core.llm_providers.provider_factory import ProviderType
-                    provider_type = ProviderType(request.provider)
-                else:
-                    # Normal mode - check available providers
-                    for pt in llm_factory.get_available_providers():
-                        if pt.value == request.provider:
-                            provider_type = pt
-                            break
-                
-                if not provider_type:
-                    available_providers = [p.value for p in llm_factory.get_available_providers()]
-                    logger.error(f"Provider {request.provider} not available. Available: {available_providers}")
-                    raise HTTPException(
-                        status_code=400, 
-                        detail=f"Provider {request.provider} not available. Available: {available_providers}"
-                    )
-                
-                provider = llm_factory.get_provider(provider_type)
-                result = await provider.chat(
-                    messages=[{"role": msg.role, "content": msg.content} for msg in request.messages],
-                    model=request.model,
-                    temperature=request.temperature,
-                    max_tokens=request.max_tokens
-                )
-            else:
-                # Use fallback provider
-                result = await llm_factory.chat_with_fallback(
-                    messages=[{"role": msg.role, "content": msg.content} for msg in request.messages],
-                    model=request.model,
-                    temperature=request.temperature,
-                    max_tokens=request.max_tokens
-                )
+            result = await generate_reply(
+                messages, request.provider, request.model,
+                request.temperature, request.max_tokens
+            )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"LLM provider error: {e}")
             raise HTTPException(status_code=500, detail=f"LLM provider error: {str(e)}")
         
-        # Add response time and web search info
-        result["response_time"] = time.time() - start_time
-        result["web_search_used"] = web_search_used
-        result["web_search_results"] = web_search_results
-        
-        # Initialize tutor fields
-        result["tutor_question"] = None
-        result["tutor_feedback"] = None
-        
-        # Handle Tutor Antonina mode
-        if request.tutor_mode:
-            try:
-                logger.info("Tutor mode enabled - analyzing prompt with Tutor Antonina")
-                
-                # Create tutor agent
-                tutor = TutorAntonina(model=request.model, provider=request.provider)
-                
-                # Get chat history for context
-                chat_history = [{"role": msg.role, "content": msg.content} for msg in request.messages[:-1]]
-                
-                # Analyze the last prompt
-                guide_result = await tutor.guide(last_message, chat_history)
-                
-                # Add tutor results to response
-                result["tutor_question"] = guide_result["question"]
-                result["tutor_feedback"] = guide_result["feedback"]
-                
-                logger.info(f"Tutor analysis completed - question: {bool(guide_result['question'])}, feedback: {bool(guide_result['feedback'])}")
-                
-            except Exception as e:
-                logger.error(f"Tutor mode error: {e}")
-                # Don't fail the entire request if tutor mode fails
-                result["tutor_question"] = "Przepraszam, wystąpił błąd w trybie tutora. Spróbuj ponownie."
-        
-        # Ensure all required fields are present for ChatResponse
-        if isinstance(result, str):
-            # If result is just a string, convert to dict
-            result = {"text": result}
-        
-        # Ensure required fields are present
-        if "text" not in result:
-            result["text"] = str(result)
-        
-        if "model" not in result:
-            result["model"] = request.model or "gpt-4"
-        
-        if "provider" not in result:
-            result["provider"] = "unknown"
-        
-        if "usage" not in result:
-            result["usage"] = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
-        
-        if "cost" not in result:
-            result["cost"] = {"total": 0.0, "prompt": 0.0, "completion": 0.0}
-        
-        if "finish_reason" not in result:
-            result["finish_reason"] = "stop"
-        
-        logger.info(f"Chat completion successful in {result['response_time']:.2f}s (web search: {web_search_used}, tutor: {request.tutor_mode})")
-        
-        return ChatResponse(**result)
+        tutor_question = None
+        tutor_feedback = None
+        if tutor_task is not None:
+            tutor_question, tutor_feedback = await tutor_outcome(tutor_task)
+        
+        response_time = time.time() - start_time
+        logger.info(f"Chat completion successful in {response_time:.2f}s (web search: {web_search_used}, tutor: {request.tutor_mode})")
+        
+        if conversation_id is not None:
+            await save_turn(conversation_id, request.message, result, response_time)
+        
+        return ChatResponse(
+            text=result.text,
+            model=result.model,
+            provider=result.provider,
+            usage=result.usage(),
+            cost=result.cost_breakdown(),
+            finish_reason=result.finish_reason,
+            response_time=response_time,
+            web_search_used=web_search_used,
+            web_search_results=web_search_results,
+            tutor_question=tutor_question,
+            tutor_feedback=tutor_feedback,
+            conversation_id=conversation_id,
+        )
         
     except HTTPException:
         raise
@@ -275,12 +462,18 @@ async def chat_completion(request: ChatRequest):
             status_code=500,
             detail=f"Chat completion failed: {str(e)}"
         )
+    finally:
+        # Main call failed or was cancelled - the tutor result is not needed
+        cancel_task(tutor_task)
 
 @router.post("/tutor", response_model=TutorResponse)
 async def tutor_mode(request: TutorRequest):
     """
     Dedicated endpoint for Tutor Antonina mode.
     Analyzes prompts and provides educational feedback.
+
+    The analysis and the standard reply run concurrently; if either fails the
+    other is cancelled.
     """
     start_time = time.time()
     
@@ -289,66 +482,30 @@ async def tutor_mode(request: TutorRequest):
         if not request.messages:
             raise HTTPException(status_code=400, detail="At least one message is required")
         
-        last_message = request.messages[-1].content
-        
-        # Create tutor agent
-        tutor = TutorAntonina(model=request.model, provider=request.provider)
-        
-        # Get chat history for context
-        chat_history = [{"role": msg.role, "content": msg.content} for msg in request.messages[:-1]]
-        
-        # Analyze the prompt
-        guide_result = await tutor.guide(last_message, chat_history)
-        
-        # Generate standard AI response
         if request.provider:
-            provider_type = None
-            for pt in llm_factory.get_available_providers():
-                if pt.value == request.provider:
-                    provider_type = pt
-                    break
-            
-            if not provider_type:
-                raise HTTPException(status_code=400, detail=f"Provider {request.provider} not available")
-            
-            provider = llm_factory.get_provider(provider_type)
-            result = await provider.chat(
-                messages=[{"role": msg.role, "content": msg.content} for msg in request.messages],
-                model=request.model,
-                temperature=0.7,
-                max_tokens=1000
-            )
-        else:
-            result = await llm_factory.chat_with_fallback(
-                messages=[{"role": msg.role, "content": msg.content} for msg in request.messages],
-                model=request.model,
-                temperature=0.7,
-                max_tokens=1000
-            )
-        
-        # Prepare response
-        # Handle different response formats
-        if isinstance(result, str):
-            reply = result
-        elif isinstance(result, dict):
-            if "text" in result:
-                reply = result["text"]
-            elif "choices" in result and len(result["choices"]) > 0:
-                reply = result["choices"][0]["message"]["content"]
-            else:
-                reply = str(result)
-        else:
-            reply = str(result)
+            resolve_provider_type(request.provider)
+        
+        # Analyze the prompt and generate the standard AI response side by side
+        tutor_task = start_tutor(request.messages, request.model, request.provider)
+        reply_task = asyncio.create_task(generate_reply(
+            assemble_messages(request.messages, request.model, request.provider, 1000),
+            request.provider, request.model, 0.7, 1000
+        ))
+        try:
+            result, guide_result = await asyncio.gather(reply_task, tutor_task)
+        finally:
+            cancel_task(reply_task)
+            cancel_task(tutor_task)
         
         response_data = {
-            "reply": reply,
+            "reply": result.text,
             "tutor_question": guide_result["question"],
             "tutor_feedback": guide_result["feedback"],
-            "model": result.get("model", request.model or "gpt-4") if isinstance(result, dict) else (request.model or "gpt-4"),
-            "provider": result.get("provider", "openai") if isinstance(result, dict) else "openai",
-            "usage": result.get("usage", {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}) if isinstance(result, dict) else {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
-            "cost": result.get("cost", {"total": 0.0, "prompt": 0.0, "completion": 0.0}) if isinstance(result, dict) else {"total": 0.0, "prompt": 0.0, "completion": 0.0},
-            "finish_reason": result.get("finish_reason", "stop") if isinstance(result, dict) else "stop",
+            "model": result.model,
+            "provider": result.provider,
+            "usage": result.usage(),
+            "cost": result.cost_breakdown(),
+            "finish_reason": result.finish_reason,
             "response_time": time.time() - start_time
         }
         
@@ -365,6 +522,11 @@ async def tutor_mode(request: TutorRequest):
             detail=f"Tutor mode failed: {str(e)}"
         )
 
+@router.get("/tutor/stats")
+async def tutor_stats():
+    """How many tutor analyses were answered locally without an LLM call."""
+    return short_circuit_stats.as_dict()
+
 @router.post("/completion", response_model=ChatResponse)
 async def chat_completion_legacy(request: ChatRequest):
     """
@@ -386,7 +548,7 @@ async def chat_completion_batch(requests: List[ChatRequest]):
         
         for i, request in enumerate(requests):
             try:
-                result = await chat_completion(request)
+                result = await chat_completion(request.model_copy(update={"stream": False}))
                 results.append(result.dict())
             except Exception as e:
                 logger.error(f"Batch request {i} failed: {e}")
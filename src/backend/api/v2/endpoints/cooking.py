@@ -4,23 +4,26 @@ Zapewnia API dla funkcjonalności kulinarnych z pełną separacją.
 """
 
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 
 from backend.database import get_async_session
+from backend.database.pagination import NEXT_CURSOR_HEADER, Page
+from backend.exceptions.cooking import RecipeGenerationError
+from backend.exceptions.database import ValidationError
 from backend.services.cooking_service import (
     CookingProductService, CookingRecipeService, CookingShoppingListService
 )
 from backend.services.ocr_service import OCRService
 from backend.schemas.cooking import (
-    ProductCreate, ProductResponse, ProductUpdate, ProductSearchRequest,
-    RecipeCreate, RecipeResponse, RecipeUpdate, RecipeSearchRequest,
+    ProductCreate, ProductResponse, ProductUpdate, ProductSearchRequest, ProductSearchResult,
+    RecipeCreate, RecipeResponse, RecipeUpdate, RecipeSearchRequest, RecipeSearchResult, RecipeMatchResult,
     ShoppingListCreate, ShoppingListResponse, ShoppingListUpdate,
     RecipeGenerationRequest, ShoppingListOptimizationRequest,
     CookingStatsResponse, MealPlanRequest, MealPlanResponse,
-    RecipeNutritionRequest, RecipeNutritionResponse, BMICalculationRequest,
+    RecipeNutritionRequest, RecipeNutritionBatchRequest, RecipeNutritionResponse, BMICalculationRequest,
     BMICalculationResponse, CookingChallengeRequest, CookingChallengeResponse,
     WeeklyMealPlanRequest, WeeklyMealPlanResponse, ProductCategoryRequest,
     ProductCategoryResponse, CookingAchievementRequest, CookingAchievementResponse
@@ -31,6 +34,14 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Cooking"])
 
 
+def _set_page_headers(response: Response, page: Page, skip: int) -> None:
+    """Expose the next page cursor; flag the deprecated offset paging."""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if skip:
+        response.headers["Deprecation"] = "true"
+
+
 # --- Produkty ---
 @router.post("/products/add", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def add_product(
@@ -50,16 +61,21 @@ async def add_product(
 
 @router.get("/products/list", response_model=List[ProductResponse])
 async def list_products(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True, description="Number of records to skip (use cursor)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
     db: AsyncSession = Depends(get_async_session),
     user_id: int = Query(..., description="User ID")  # TODO: Replace with proper auth
 ):
     """List products for a user."""
     try:
         service = CookingProductService(db)
-        products = await service.list_products(user_id, skip=skip, limit=limit)
+        products = await service.list_products(user_id, skip=skip, limit=limit, cursor=cursor)
+        _set_page_headers(response, products, skip)
         return [ProductResponse.from_orm(product) for product in products]
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         logger.error(f"Failed to list products: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -194,19 +210,29 @@ async def scan_product(
         raise HTTPException(status_code=500, detail=f"Product scanning failed: {str(e)}")
 
 
-@router.get("/products/search", response_model=List[ProductResponse])
+@router.get("/products/search", response_model=List[ProductSearchResult])
 async def search_products(
+    response: Response,
     query: str = Query(..., description="Search query"),
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Number of records to skip (use cursor)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
     db: AsyncSession = Depends(get_async_session),
     user_id: int = Query(..., description="User ID")  # TODO: Replace with proper auth
 ):
-    """Search products by name or category."""
+    """Full-text search of products by name or category, best match first."""
     try:
         service = CookingProductService(db)
-        products = await service.search_products(query, user_id, skip=skip, limit=limit)
-        return [ProductResponse.from_orm(product) for product in products]
+        hits = await service.search_products(query, user_id, skip=skip, limit=limit, cursor=cursor)
+        _set_page_headers(response, hits, skip)
+        return [
+            ProductSearchResult(
+                **ProductResponse.from_orm(hit.item).model_dump(), score=hit.score, snippet=hit.snippet
+            )
+            for hit in hits
+        ]
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         logger.error(f"Failed to search products: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -238,7 +264,7 @@ async def save_recipe(
     """Save a new recipe."""
     try:
         service = CookingRecipeService(db)
-        result = await service.add_recipe(recipe, user_id)
+        result = await service.save_recipe(recipe, user_id)
         return RecipeResponse.from_orm(result)
     except Exception as e:
         logger.error(f"Failed to save recipe: {e}")
@@ -247,16 +273,21 @@ async def save_recipe(
 
 @router.get("/recipes/list", response_model=List[RecipeResponse])
 async def list_recipes(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True, description="Number of records to skip (use cursor)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
     db: AsyncSession = Depends(get_async_session),
     user_id: int = Query(..., description="User ID")  # TODO: Replace with proper auth
 ):
     """List recipes for a user."""
     try:
         service = CookingRecipeService(db)
-        recipes = await service.list_recipes(user_id, skip=skip, limit=limit)
+        recipes = await service.list_recipes(user_id, skip=skip, limit=limit, cursor=cursor)
+        _set_page_headers(response, recipes, skip)
         return [RecipeResponse.from_orm(recipe) for recipe in recipes]
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         logger.error(f"Failed to list recipes: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -282,19 +313,29 @@ async def get_recipe(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/recipes/search", response_model=List[RecipeResponse])
+@router.post("/recipes/search", response_model=List[RecipeSearchResult])
 async def search_recipes(
+    response: Response,
     query: str = Query(..., description="Search query"),
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Number of records to skip (use cursor)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
     db: AsyncSession = Depends(get_async_session),
     user_id: int = Query(..., description="User ID")  # TODO: Replace with proper auth
 ):
-    """Search recipes by name, ingredients, or tags."""
+    """Full-text search of recipes by name, ingredients, tags or text, best match first."""
     try:
         service = CookingRecipeService(db)
-        recipes = await service.search_recipes(query, user_id, skip=skip, limit=limit)
-        return [RecipeResponse.from_orm(recipe) for recipe in recipes]
+        hits = await service.search_recipes(query, user_id, skip=skip, limit=limit, cursor=cursor)
+        _set_page_headers(response, hits, skip)
+        return [
+            RecipeSearchResult(
+                **RecipeResponse.from_orm(hit.item).model_dump(), score=hit.score, snippet=hit.snippet
+            )
+            for hit in hits
+        ]
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         logger.error(f"Failed to search recipes: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -306,16 +347,45 @@ async def recipe_from_ingredients(
     db: AsyncSession = Depends(get_async_session),
     user_id: int = Query(..., description="User ID")  # TODO: Replace with proper auth
 ):
-    """Generate a recipe from available ingredients."""
+    """Recipe from available ingredients: a saved one that fits, otherwise a new AI recipe."""
     try:
         service = CookingRecipeService(db)
         result = await service.generate_recipe_from_ingredients(request, user_id)
         return RecipeResponse.from_orm(result)
+    except RecipeGenerationError as e:
+        raise HTTPException(status_code=502, detail=e.message)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         logger.error(f"Failed to generate recipe from ingredients: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/recipes/by-ingredients", response_model=List[RecipeMatchResult])
+async def recipes_by_ingredients(
+    ingredients: List[str] = Query(..., description="Available ingredients"),
+    max_missing: int = Query(2, ge=0, le=20, description="Most recipe ingredients that may be missing"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of recipes"),
+    db: AsyncSession = Depends(get_async_session),
+    user_id: int = Query(..., description="User ID")  # TODO: Replace with proper auth
+):
+    """Saved recipes that can be made from the given ingredients, best coverage first."""
+    try:
+        service = CookingRecipeService(db)
+        matches = await service.find_recipes_by_ingredients(ingredients, user_id, max_missing=max_missing, limit=limit)
+        return [
+            RecipeMatchResult(
+                **RecipeResponse.from_orm(match.recipe).model_dump(),
+                coverage=match.coverage,
+                missing_ingredients=match.missing,
+            )
+            for match in matches
+        ]
+    except Exception as e:
+        logger.error(f"Failed to match recipes by ingredients: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/recipes/optimize", response_model=RecipeResponse)
 async def optimize_recipe(
     recipe_id: int = Query(..., description="Recipe ID to optimize"),
@@ -406,16 +476,21 @@ async def optimize_shopping_list(
 
 @router.get("/shopping/list", response_model=List[ShoppingListResponse])
 async def list_shopping_lists(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True, description="Number of records to skip (use cursor)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
     db: AsyncSession = Depends(get_async_session),
     user_id: int = Query(..., description="User ID")  # TODO: Replace with proper auth
 ):
     """List shopping lists for a user."""
     try:
         service = CookingShoppingListService(db)
-        shopping_lists = await service.list_shopping_lists(user_id, skip=skip, limit=limit)
+        shopping_lists = await service.list_shopping_lists(user_id, skip=skip, limit=limit, cursor=cursor)
+        _set_page_headers(response, shopping_lists, skip)
         return [ShoppingListResponse.from_orm(shopping_list) for shopping_list in shopping_lists]
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         logger.error(f"Failed to list shopping lists: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -557,11 +632,28 @@ async def analyze_recipe_nutrition(
     try:
         from backend.plugins.diet_plugin import diet_plugin
         return await diet_plugin._analyze_recipe_nutrition(request, db, user_id)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to analyze recipe nutrition: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/recipe-nutrition/batch", response_model=List[RecipeNutritionResponse])
+async def analyze_recipes_nutrition(
+    request: RecipeNutritionBatchRequest,
+    db: AsyncSession = Depends(get_async_session),
+    user_id: int = Query(..., description="User ID")
+):
+    """Analyze nutrition of many recipes at once (up to 500; unknown IDs are skipped)."""
+    try:
+        from backend.plugins.diet_plugin import diet_plugin
+        return await diet_plugin._analyze_recipes_nutrition(request, db, user_id)
+    except Exception as e:
+        logger.error(f"Failed to analyze recipes nutrition: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/challenges", response_model=CookingChallengeResponse)
 async def create_cooking_challenge(
     request: CookingChallengeRequest,
@@ -52,6 +52,29 @@ class Settings(BaseSettings):
     # =============================================================================
 
     DATABASE_URL: str = "sqlite+aiosqlite:///./data/ageny_online.db"
+    DATABASE_SCHEMA_MODE: str = Field(
+        default="verify",
+        description="Startup schema handling: verify (fail unless migrated), migrate (alembic upgrade head), create (create_all), off",
+    )
+
+    # Connection pool (PostgreSQL/asyncpg; SQLite keeps the driver defaults)
+    DB_POOL_SIZE: int = Field(default=10, description="Connections kept open per worker process")
+    DB_MAX_OVERFLOW: int = Field(default=20, description="Extra connections allowed above the pool size under load")
+    DB_POOL_TIMEOUT: float = Field(default=10.0, description="Seconds to wait for a free connection before failing")
+    DB_POOL_RECYCLE: int = Field(default=1800, description="Seconds after which a connection is replaced")
+    DB_STATEMENT_CACHE_SIZE: int = Field(
+        default=256, description="asyncpg prepared statements cached per connection (0 behind PgBouncer transaction pooling)"
+    )
+    DB_COMMAND_TIMEOUT: float = Field(default=30.0, description="Server-side timeout of a single statement in seconds")
+
+    # SQLite tuning (file databases only): WAL, pragmas, one writer connection and a read pool
+    SQLITE_TUNING_ENABLED: bool = Field(default=True, description="Split SQLite into a writer connection and a read pool")
+    SQLITE_WAL_ENABLED: bool = Field(default=True, description="Use write-ahead logging so reads do not block writes")
+    SQLITE_SYNCHRONOUS: str = Field(default="NORMAL", description="PRAGMA synchronous (NORMAL is durable enough with WAL)")
+    SQLITE_CACHE_SIZE_KB: int = Field(default=65536, description="Page cache per connection in KiB")
+    SQLITE_MMAP_SIZE: int = Field(default=268435456, description="Bytes of the database file memory-mapped per connection")
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(default=5000, description="Wait for locks held by other processes before failing")
+    SQLITE_READ_POOL_SIZE: int = Field(default=4, description="Read-only connections")
 
     # =============================================================================
     # KONFIGURACJA REDIS
@@ -234,6 +257,80 @@ class Settings(BaseSettings):
     PROVIDER_PRIORITY_MISTRAL: int = 4
     PROVIDER_PRIORITY_PERPLEXITY: int = 5
 
+    # =============================================================================
+    # BULK JOBS (offline generation)
+    # =============================================================================
+
+    BULK_JOBS_ENABLED: bool = Field(default=True, description="Run the bulk job worker in the API process")
+    BULK_WORKER_POLL_INTERVAL: float = Field(default=30.0, description="Seconds between worker passes")
+    BULK_BATCH_MIN_ITEMS: int = Field(default=20, description="Smallest job sent to a provider batch API")
+    BULK_BATCH_MAX_ITEMS: int = Field(default=10000, description="Requests per provider batch")
+    BULK_MAX_ITEMS_PER_JOB: int = Field(default=50000, description="Largest accepted job")
+    BULK_QUEUE_CONCURRENCY: int = Field(default=4, description="Parallel requests in queue mode")
+    BULK_QUEUE_RPM: int = Field(default=60, description="Request rate limit in queue mode (per minute)")
+    BULK_OFF_PEAK_START_HOUR: int = Field(default=1, ge=0, le=23, description="Off-peak window start (UTC hour)")
+    BULK_OFF_PEAK_END_HOUR: int = Field(default=6, ge=0, le=23, description="Off-peak window end (UTC hour)")
+
+    # =============================================================================
+    # PROMPT ASSEMBLY (token budgets)
+    # =============================================================================
+
+    PROMPT_MAX_INPUT_TOKENS: int = Field(
+        default=8000, description="Upper bound on prompt tokens sent to any model, below its context window"
+    )
+    PROMPT_RESERVED_OUTPUT_TOKENS: int = Field(
+        default=1024, description="Tokens kept free for the answer when the request sets no max_tokens"
+    )
+
+    # =============================================================================
+    # CONVERSATION MEMORY (rolling summaries)
+    # =============================================================================
+
+    CONVERSATION_SUMMARY_ENABLED: bool = Field(default=True, description="Summarize older turns of long sessions")
+    CONVERSATION_SUMMARY_THRESHOLD_TOKENS: int = Field(
+        default=3000, description="Unsummarized history size that triggers a background summary"
+    )
+    CONVERSATION_RECENT_TOKENS: int = Field(default=1000, description="Recent turns always sent verbatim")
+    CONVERSATION_SUMMARY_MODEL: str = Field(default="gpt-4o-mini", description="Cheap model used for summaries")
+    CONVERSATION_SUMMARY_MAX_TOKENS: int = Field(default=400, description="Length limit of the running summary")
+    CONVERSATION_CACHE_BACKEND: str = Field(default="memory", description="Hot context cache: memory (LRU) or redis")
+    CONVERSATION_CACHE_SIZE: int = Field(default=1000, description="Conversations kept by the in-process LRU cache")
+    CONVERSATION_CACHE_TTL_SECONDS: int = Field(default=3600, description="Expiry of cached context in Redis")
+
+    # =============================================================================
+    # WRITE-BEHIND QUEUE (messages, OCR results, cost records)
+    # =============================================================================
+
+    WRITE_BEHIND_ENABLED: bool = Field(default=True, description="Buffer append-only records and insert them in batches")
+    WRITE_BEHIND_BATCH_SIZE: int = Field(default=100, description="Records per multi-row INSERT")
+    WRITE_BEHIND_FLUSH_INTERVAL: float = Field(default=0.5, description="Max seconds a record waits for its batch to fill")
+    WRITE_BEHIND_MAX_PENDING: int = Field(default=10000, description="Queue bound; producers wait when it is full")
+    WRITE_BEHIND_RETRIES: int = Field(default=3, description="Retries of a failed batch before its records are logged and dropped")
+
+    # =============================================================================
+    # AGENT TOOLS (web search, RAG, OCR)
+    # =============================================================================
+
+    AGENT_TOOL_DEADLINE_SECONDS: float = Field(
+        default=8.0, description="Shared deadline for tools run concurrently before an agent's LLM call"
+    )
+
+    # =============================================================================
+    # TUTOR ANTONINA
+    # =============================================================================
+
+    TUTOR_PREANALYSIS_ENABLED: bool = Field(
+        default=True, description="Answer clearly incomplete prompts with a local question instead of an LLM call"
+    )
+
+    # =============================================================================
+    # NUTRITION
+    # =============================================================================
+
+    NUTRITION_TABLE_PATH: str = Field(
+        default="", description="Extra nutrient table (CSV, bundled table's columns); its rows win over the bundled ones"
+    )
+
     # =============================================================================
     # RATE LIMITING
     # =============================================================================
@@ -250,6 +347,11 @@ class Settings(BaseSettings):
     LOAD_TEST_DATA: bool = False
     SEED_DATABASE: bool = False
 
+    # Provider traffic record/replay (backend/testing/cassette.py)
+    PROVIDER_CASSETTE_MODE: str = Field(default="off", description="off, record or replay")
+    PROVIDER_CASSETTE_PATH: str = Field(default="data/cassettes/provider-traffic.jsonl.gz", description="Cassette file")
+    PROVIDER_CASSETTE_SPEED: float = Field(default=1.0, description="Replay speed multiplier (0 = no delays)")
+
     # =============================================================================
     # EXTERNAL SERVICES (opcjonalne)
     # =============================================================================
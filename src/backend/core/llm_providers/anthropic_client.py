@@ -4,13 +4,15 @@ Zapewnia integrację z Anthropic API dla LLM operations.
 """
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import httpx
 from pydantic import BaseModel
 
 from backend.config import settings
 from .provider_factory import BaseLLMProvider
+from .result import ChatResult
+from .streaming import iter_sse_json, raise_for_stream_status
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +39,7 @@ class AnthropicProvider(BaseLLMProvider):
         """Initialize Anthropic provider"""
         super().__init__(api_key)
         
-        self.base_url = "https://api.anthropic.com"
+        self.base_url = settings.ANTHROPIC_BASE_URL.rstrip("/")
         self.http_client = httpx.AsyncClient(
             timeout=60.0,
             headers={
@@ -88,7 +90,7 @@ class AnthropicProvider(BaseLLMProvider):
         messages: List[Dict[str, Any]], 
         model: Optional[str] = None,
         **kwargs: Any
-    ) -> str:
+    ) -> ChatResult:
         """
         Generate chat completion using Anthropic.
         
@@ -98,42 +100,15 @@ class AnthropicProvider(BaseLLMProvider):
             **kwargs: Additional parameters
             
         Returns:
-            Generated response text
+            Chat result with usage and cost
             
         Raises:
             Exception: If API call fails
         """
         try:
-            model_name = model or self.default_model
-            model_config = self.models.get(model_name)
-            
-            if not model_config:
-                logger.warning(f"Model {model_name} not found, using default")
-                model_name = self.default_model
-                model_config = self.models.get(model_name)
-            
-            # Convert messages to Anthropic format
-            anthropic_messages = []
-            for msg in messages:
-                if msg["role"] == "user":
-                    anthropic_messages.append({"role": "user", "content": msg["content"]})
-                elif msg["role"] == "assistant":
-                    anthropic_messages.append({"role": "assistant", "content": msg["content"]})
-                elif msg["role"] == "system":
-                    # Anthropic doesn't support system messages in the same way
-                    # We'll prepend it to the first user message
-                    if anthropic_messages and anthropic_messages[0]["role"] == "user":
-                        anthropic_messages[0]["content"] = f"{msg['content']}\n\n{anthropic_messages[0]['content']}"
-            
-            # Prepare request payload
-            payload = {
-                "model": model_name,
-                "messages": anthropic_messages,
-                "max_tokens": kwargs.get("max_tokens", model_config.max_tokens if model_config else 4096),
-                "temperature": kwargs.get("temperature", model_config.temperature if model_config else 0.1),
-            }
+            model_name, payload = self._build_payload(messages, model, **kwargs)
             
-            logger.debug(f"Anthropic chat request: model={model_name}, messages_count={len(anthropic_messages)}")
+            logger.debug(f"Anthropic chat request: model={model_name}, messages_count={len(payload['messages'])}")
             
             # Make API request
             response = await self.http_client.post(
@@ -148,9 +123,6 @@ class AnthropicProvider(BaseLLMProvider):
             
             response_data = response.json()
             
-            # Extract response text
-            response_text = response_data["content"][0]["text"]
-            
             # Calculate usage and cost
             usage = response_data.get("usage", {})
             input_tokens = usage.get("input_tokens", 0)
@@ -162,12 +134,103 @@ class AnthropicProvider(BaseLLMProvider):
                 f"Anthropic chat completed: model={model_name}, tokens={input_tokens + output_tokens}, cost=${cost:.4f}"
             )
             
-            return response_text
+            return ChatResult(
+                text=response_data["content"][0]["text"],
+                model=model_name,
+                provider="anthropic",
+                finish_reason=response_data.get("stop_reason") or "stop",
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cached_tokens=usage.get("cache_read_input_tokens", 0),
+                cost=cost,
+            )
             
         except Exception as e:
             logger.error(f"Anthropic chat error: {e}")
             raise Exception(f"Anthropic chat failed: {e}")
 
+    def _build_payload(
+        self, messages: List[Dict[str, Any]], model: Optional[str], **kwargs: Any
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Resolve the model and build the Messages API payload"""
+        model_name = model or self.default_model
+        model_config = self.models.get(model_name)
+        
+        if not model_config:
+            logger.warning(f"Model {model_name} not found, using default")
+            model_name = self.default_model
+            model_config = self.models.get(model_name)
+        
+        # Convert messages to Anthropic format
+        anthropic_messages = []
+        for msg in messages:
+            if msg["role"] == "user":
+                anthropic_messages.append({"role": "user", "content": msg["content"]})
+            elif msg["role"] == "assistant":
+                anthropic_messages.append({"role": "assistant", "content": msg["content"]})
+            elif msg["role"] == "system":
+                # Anthropic doesn't support system messages in the same way
+                # We'll prepend it to the first user message
+                if anthropic_messages and anthropic_messages[0]["role"] == "user":
+                    anthropic_messages[0]["content"] = f"{msg['content']}\n\n{anthropic_messages[0]['content']}"
+        
+        payload = {
+            "model": model_name,
+            "messages": anthropic_messages,
+            "max_tokens": kwargs.get("max_tokens", model_config.max_tokens if model_config else 4096),
+            "temperature": kwargs.get("temperature", model_config.temperature if model_config else 0.1),
+        }
+        return model_name, payload
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """
+        Stream chat completion text from Anthropic.
+        
+        Args:
+            messages: List of message dictionaries
+            model: Model to use (defaults to configured model)
+            usage: Optional dict filled with token counts and cost when the stream ends
+            **kwargs: Additional parameters
+            
+        Yields:
+            Text deltas
+        """
+        model_name, payload = self._build_payload(messages, model, **kwargs)
+        payload["stream"] = True
+        input_tokens = output_tokens = 0
+        finish_reason = None
+        
+        async with self.http_client.stream("POST", f"{self.base_url}/v1/messages", json=payload) as response:
+            await raise_for_stream_status(response, "Anthropic")
+            async for event in iter_sse_json(response):
+                event_type = event.get("type")
+                if event_type == "content_block_delta":
+                    text = event.get("delta", {}).get("text")
+                    if text:
+                        yield text
+                elif event_type == "message_start":
+                    input_tokens = event["message"].get("usage", {}).get("input_tokens", 0)
+                elif event_type == "message_delta":
+                    output_tokens = event.get("usage", {}).get("output_tokens", output_tokens)
+                    finish_reason = event.get("delta", {}).get("stop_reason")
+                elif event_type == "error":
+                    raise Exception(f"Anthropic stream error: {event.get('error')}")
+        
+        if usage is not None:
+            usage.update({
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "finish_reason": finish_reason,
+                "model": model_name,
+                "cost": self.calculate_cost(model_name, input_tokens, output_tokens),
+            })
+
     async def embed(self, text: str, model: Optional[str] = None, **kwargs: Any) -> List[float]:
         """
         Generate embeddings using Anthropic.
@@ -235,7 +298,8 @@ class AnthropicProvider(BaseLLMProvider):
             Exception: If API call fails
         """
         messages = [{"role": "user", "content": prompt}]
-        return await self.chat(messages, model, **kwargs)
+        result = await self.chat(messages, model, **kwargs)
+        return result.text
 
     async def embed_text(self, text: str, model: Optional[str] = None) -> List[float]:
         """
@@ -0,0 +1,432 @@
+"""
+Provider batch APIs for offline bulk generation.
+Obsługa wsadowych API dostawców (OpenAI, Anthropic, Mistral) dla zadań masowych.
+
+Batch requests are billed at half the synchronous price and complete within
+24 hours. Each client packs requests into the provider's wire format,
+submits them, polls the batch and maps the results back to ``ChatResult``.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Type
+
+import httpx
+
+from backend.config import settings
+from .provider_factory import ProviderType
+from .result import ChatResult
+
+logger = logging.getLogger(__name__)
+
+# Share of the synchronous price charged for batch requests
+BATCH_PRICE_MULTIPLIER = 0.5
+
+
+@dataclass(slots=True)
+class BatchRequest:
+    """Single chat request inside a provider batch."""
+
+    custom_id: str
+    messages: List[Dict[str, Any]]
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+
+
+@dataclass(slots=True)
+class BatchStatus:
+    """Provider batch progress."""
+
+    batch_id: str
+    status: str  # in_progress, completed, failed, cancelled
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ended(self) -> bool:
+        """Whether the provider finished working on the batch"""
+        return self.status in ("completed", "failed", "cancelled")
+
+
+@dataclass(slots=True)
+class BatchItemResult:
+    """Outcome of one request of a finished batch."""
+
+    custom_id: str
+    result: Optional[ChatResult] = None
+    error: Optional[str] = None
+
+
+def _jsonl(rows: List[Dict[str, Any]]) -> bytes:
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+def _parse_jsonl(content: bytes) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in content.decode("utf-8").splitlines() if line.strip()]
+
+
+def _raise_for_status(response: httpx.Response, provider: str) -> None:
+    if response.status_code >= 400:
+        error_msg = f"{provider} batch API error: {response.status_code} - {response.text}"
+        logger.error(error_msg)
+        raise Exception(error_msg)
+
+
+class BaseBatchClient:
+    """
+    Base class for provider batch clients.
+
+    Args:
+        provider: Provider instance used for payload building and pricing
+        base_url: API root (defaults to the provider's base URL)
+        http_client: Client to use (defaults to one authenticated with the provider key)
+    """
+
+    provider_name: str = ""
+
+    def __init__(
+        self,
+        provider: Any,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        self.provider = provider
+        self.base_url = (base_url or self._default_base_url()).rstrip("/")
+        self.http_client = http_client or httpx.AsyncClient(
+            timeout=120.0,
+            headers={**self._auth_headers(), "User-Agent": settings.USER_AGENT},
+        )
+
+    def _default_base_url(self) -> str:
+        return self.provider.base_url
+
+    def _auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.provider.api_key}"}
+
+    def pack(self, requests: List[BatchRequest], model: str) -> Any:
+        """Encode requests in the provider's batch input format"""
+        raise NotImplementedError
+
+    async def submit(self, requests: List[BatchRequest], model: str) -> str:
+        """
+        Submit a batch.
+
+        Args:
+            requests: Requests sharing one model
+            model: Model name
+
+        Returns:
+            Provider batch id
+        """
+        raise NotImplementedError
+
+    async def poll(self, batch_id: str) -> BatchStatus:
+        """Fetch batch progress"""
+        raise NotImplementedError
+
+    async def results(self, status: BatchStatus, model: str) -> List[BatchItemResult]:
+        """
+        Download results of an ended batch.
+
+        Args:
+            status: Final batch status from :meth:`poll`
+            model: Model the batch was submitted with (used for pricing)
+        """
+        raise NotImplementedError
+
+    async def cancel(self, batch_id: str) -> None:
+        """Request cancellation of a batch"""
+        raise NotImplementedError
+
+    def batch_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        """Batch price for the given usage"""
+        return self.provider.calculate_cost(model, input_tokens, output_tokens) * BATCH_PRICE_MULTIPLIER
+
+    def _chat_result(self, model: str, body: Dict[str, Any]) -> ChatResult:
+        """Map an OpenAI-compatible completion body to a ChatResult"""
+        choice = body["choices"][0]
+        usage = body.get("usage") or {}
+        input_tokens = usage.get("prompt_tokens", 0)
+        output_tokens = usage.get("completion_tokens", 0)
+        return ChatResult(
+            text=choice["message"]["content"] or "",
+            model=body.get("model") or model,
+            provider=self.provider_name,
+            finish_reason=choice.get("finish_reason") or "stop",
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost=self.batch_cost(model, input_tokens, output_tokens),
+        )
+
+    async def _upload(self, content: bytes) -> str:
+        response = await self.http_client.post(
+            f"{self.base_url}/files",
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", content, "application/jsonl")},
+        )
+        _raise_for_status(response, self.provider_name)
+        return response.json()["id"]
+
+    async def _download(self, file_id: str) -> List[Dict[str, Any]]:
+        response = await self.http_client.get(f"{self.base_url}/files/{file_id}/content")
+        _raise_for_status(response, self.provider_name)
+        return _parse_jsonl(response.content)
+
+    def _file_results(self, model: str, rows: List[Dict[str, Any]]) -> List[BatchItemResult]:
+        """Parse OpenAI/Mistral style output or error file rows"""
+        results = []
+        for row in rows:
+            response = row.get("response") or {}
+            if row.get("error") or response.get("status_code") != 200:
+                error = row.get("error") or response.get("body", {}).get("error") or response
+                results.append(BatchItemResult(custom_id=row["custom_id"], error=json.dumps(error)[:500]))
+            else:
+                results.append(BatchItemResult(custom_id=row["custom_id"],
+                                               result=self._chat_result(model, response["body"])))
+        return results
+
+    async def close(self) -> None:
+        """Close HTTP client"""
+        await self.http_client.aclose()
+
+
+class OpenAIBatchClient(BaseBatchClient):
+    """OpenAI Batch API (JSONL file + ``/batches``)."""
+
+    provider_name = "openai"
+    _STATUS = {
+        "validating": "in_progress",
+        "in_progress": "in_progress",
+        "finalizing": "in_progress",
+        "cancelling": "in_progress",
+        "completed": "completed",
+        "failed": "failed",
+        "expired": "completed",
+        "cancelled": "cancelled",
+    }
+
+    def _default_base_url(self) -> str:
+        return settings.OPENAI_BASE_URL
+
+    def pack(self, requests: List[BatchRequest], model: str) -> bytes:
+        rows = []
+        for request in requests:
+            body: Dict[str, Any] = {"model": model, "messages": request.messages}
+            if request.max_tokens is not None:
+                body["max_tokens"] = request.max_tokens
+            if request.temperature is not None:
+                body["temperature"] = request.temperature
+            rows.append({"custom_id": request.custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body})
+        return _jsonl(rows)
+
+    async def submit(self, requests: List[BatchRequest], model: str) -> str:
+        file_id = await self._upload(self.pack(requests, model))
+        response = await self.http_client.post(f"{self.base_url}/batches", json={
+            "input_file_id": file_id,
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h",
+        })
+        _raise_for_status(response, self.provider_name)
+        return response.json()["id"]
+
+    async def poll(self, batch_id: str) -> BatchStatus:
+        response = await self.http_client.get(f"{self.base_url}/batches/{batch_id}")
+        _raise_for_status(response, self.provider_name)
+        data = response.json()
+        counts = data.get("request_counts") or {}
+        return BatchStatus(
+            batch_id=batch_id,
+            status=self._STATUS.get(data["status"], "in_progress"),
+            total=counts.get("total", 0),
+            succeeded=counts.get("completed", 0),
+            failed=counts.get("failed", 0),
+            details={"output_file": data.get("output_file_id"), "error_file": data.get("error_file_id")},
+        )
+
+    async def results(self, status: BatchStatus, model: str) -> List[BatchItemResult]:
+        rows = []
+        for key in ("output_file", "error_file"):
+            if status.details.get(key):
+                rows.extend(await self._download(status.details[key]))
+        return self._file_results(model, rows)
+
+    async def cancel(self, batch_id: str) -> None:
+        response = await self.http_client.post(f"{self.base_url}/batches/{batch_id}/cancel")
+        _raise_for_status(response, self.provider_name)
+
+    def batch_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        return self.provider.calculate_cost(model, input_tokens + output_tokens) * BATCH_PRICE_MULTIPLIER
+
+
+class MistralBatchClient(BaseBatchClient):
+    """Mistral Batch API (JSONL file + ``/batch/jobs``, one model per job)."""
+
+    provider_name = "mistral"
+    _STATUS = {
+        "QUEUED": "in_progress",
+        "RUNNING": "in_progress",
+        "CANCELLATION_REQUESTED": "in_progress",
+        "SUCCESS": "completed",
+        "TIMEOUT_EXCEEDED": "completed",
+        "FAILED": "failed",
+        "CANCELLED": "cancelled",
+    }
+
+    def pack(self, requests: List[BatchRequest], model: str) -> bytes:
+        rows = []
+        for request in requests:
+            _, payload = self.provider._build_payload(request.messages, model, **_generation_kwargs(request))
+            payload.pop("model", None)
+            payload.pop("stream", None)
+            rows.append({"custom_id": request.custom_id, "body": payload})
+        return _jsonl(rows)
+
+    async def submit(self, requests: List[BatchRequest], model: str) -> str:
+        file_id = await self._upload(self.pack(requests, model))
+        response = await self.http_client.post(f"{self.base_url}/batch/jobs", json={
+            "input_files": [file_id],
+            "model": model,
+            "endpoint": "/v1/chat/completions",
+        })
+        _raise_for_status(response, self.provider_name)
+        return response.json()["id"]
+
+    async def poll(self, batch_id: str) -> BatchStatus:
+        response = await self.http_client.get(f"{self.base_url}/batch/jobs/{batch_id}")
+        _raise_for_status(response, self.provider_name)
+        data = response.json()
+        return BatchStatus(
+            batch_id=batch_id,
+            status=self._STATUS.get(data["status"], "in_progress"),
+            total=data.get("total_requests", 0),
+            succeeded=data.get("succeeded_requests", 0),
+            failed=data.get("failed_requests", 0),
+            details={"output_file": data.get("output_file"), "error_file": data.get("error_file")},
+        )
+
+    async def results(self, status: BatchStatus, model: str) -> List[BatchItemResult]:
+        rows = []
+        for key in ("output_file", "error_file"):
+            if status.details.get(key):
+                rows.extend(await self._download(status.details[key]))
+        return self._file_results(model, rows)
+
+    async def cancel(self, batch_id: str) -> None:
+        response = await self.http_client.post(f"{self.base_url}/batch/jobs/{batch_id}/cancel")
+        _raise_for_status(response, self.provider_name)
+
+
+class AnthropicBatchClient(BaseBatchClient):
+    """Anthropic Message Batches API (inline requests, JSONL results)."""
+
+    provider_name = "anthropic"
+
+    def _auth_headers(self) -> Dict[str, str]:
+        return {"x-api-key": self.provider.api_key, "anthropic-version": "2023-06-01"}
+
+    def pack(self, requests: List[BatchRequest], model: str) -> Dict[str, Any]:
+        packed = []
+        for request in requests:
+            _, params = self.provider._build_payload(request.messages, model, **_generation_kwargs(request))
+            packed.append({"custom_id": request.custom_id, "params": params})
+        return {"requests": packed}
+
+    async def submit(self, requests: List[BatchRequest], model: str) -> str:
+        response = await self.http_client.post(
+            f"{self.base_url}/v1/messages/batches", json=self.pack(requests, model)
+        )
+        _raise_for_status(response, self.provider_name)
+        return response.json()["id"]
+
+    async def poll(self, batch_id: str) -> BatchStatus:
+        response = await self.http_client.get(f"{self.base_url}/v1/messages/batches/{batch_id}")
+        _raise_for_status(response, self.provider_name)
+        data = response.json()
+        counts = data.get("request_counts") or {}
+        failed = counts.get("errored", 0) + counts.get("expired", 0) + counts.get("canceled", 0)
+        status = "in_progress"
+        if data["processing_status"] == "ended":
+            status = "cancelled" if counts.get("canceled") and not counts.get("succeeded") else "completed"
+        return BatchStatus(
+            batch_id=batch_id,
+            status=status,
+            total=sum(counts.values()),
+            succeeded=counts.get("succeeded", 0),
+            failed=failed,
+            details={"results_url": data.get("results_url")},
+        )
+
+    async def results(self, status: BatchStatus, model: str) -> List[BatchItemResult]:
+        if not status.details.get("results_url"):
+            return []
+        response = await self.http_client.get(status.details["results_url"])
+        _raise_for_status(response, self.provider_name)
+        results = []
+        for row in _parse_jsonl(response.content):
+            outcome = row["result"]
+            if outcome["type"] != "succeeded":
+                error = outcome.get("error") or {"type": outcome["type"]}
+                results.append(BatchItemResult(custom_id=row["custom_id"], error=json.dumps(error)[:500]))
+                continue
+            message = outcome["message"]
+            usage = message.get("usage") or {}
+            input_tokens = usage.get("input_tokens", 0)
+            output_tokens = usage.get("output_tokens", 0)
+            results.append(BatchItemResult(custom_id=row["custom_id"], result=ChatResult(
+                text="".join(block.get("text", "") for block in message.get("content", [])),
+                model=message.get("model") or model,
+                provider=self.provider_name,
+                finish_reason=message.get("stop_reason") or "stop",
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cached_tokens=usage.get("cache_read_input_tokens", 0),
+                cost=self.batch_cost(model, input_tokens, output_tokens),
+            )))
+        return results
+
+    async def cancel(self, batch_id: str) -> None:
+        response = await self.http_client.post(f"{self.base_url}/v1/messages/batches/{batch_id}/cancel")
+        _raise_for_status(response, self.provider_name)
+
+
+def _generation_kwargs(request: BatchRequest) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {}
+    if request.max_tokens is not None:
+        kwargs["max_tokens"] = request.max_tokens
+    if request.temperature is not None:
+        kwargs["temperature"] = request.temperature
+    return kwargs
+
+
+BATCH_CLIENTS: Dict[ProviderType, Type[BaseBatchClient]] = {
+    ProviderType.OPENAI: OpenAIBatchClient,
+    ProviderType.ANTHROPIC: AnthropicBatchClient,
+    ProviderType.MISTRAL: MistralBatchClient,
+}
+
+
+def supports_batch(provider_type: ProviderType) -> bool:
+    """Whether the provider exposes a batch API"""
+    return provider_type in BATCH_CLIENTS
+
+
+def create_batch_client(provider_type: ProviderType, provider: Any) -> BaseBatchClient:
+    """
+    Create a batch client for a provider.
+
+    Args:
+        provider_type: Provider type
+        provider: Provider instance (pricing and payload building)
+
+    Returns:
+        Batch client
+
+    Raises:
+        ValueError: If the provider has no batch API
+    """
+    if provider_type not in BATCH_CLIENTS:
+        raise ValueError(f"Provider {provider_type.value} has no batch API")
+    return BATCH_CLIENTS[provider_type](provider)
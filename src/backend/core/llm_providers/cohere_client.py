@@ -4,13 +4,15 @@ Zapewnia integrację z Cohere API dla LLM operations.
 """
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import httpx
 from pydantic import BaseModel
 
 from backend.config import settings
 from .provider_factory import BaseLLMProvider
+from .result import ChatResult
+from .streaming import iter_ndjson, raise_for_stream_status
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +39,7 @@ class CohereProvider(BaseLLMProvider):
         """Initialize Cohere provider"""
         super().__init__(api_key)
         
-        self.base_url = "https://api.cohere.ai"
+        self.base_url = settings.COHERE_BASE_URL.rstrip("/")
         self.http_client = httpx.AsyncClient(
             timeout=60.0,
             headers={
@@ -88,7 +90,7 @@ class CohereProvider(BaseLLMProvider):
         messages: List[Dict[str, Any]], 
         model: Optional[str] = None,
         **kwargs: Any
-    ) -> str:
+    ) -> ChatResult:
         """
         Generate chat completion using Cohere.
         
@@ -98,51 +100,15 @@ class CohereProvider(BaseLLMProvider):
             **kwargs: Additional parameters
             
         Returns:
-            Generated response text
+            Chat result with usage and cost
             
         Raises:
             Exception: If API call fails
         """
         try:
-            model_name = model or self.default_model
-            model_config = self.models.get(model_name)
-            
-            if not model_config:
-                logger.warning(f"Model {model_name} not found, using default")
-                model_name = self.default_model
-                model_config = self.models.get(model_name)
-            
-            # Convert messages to Cohere format
-            # Cohere uses a different format - we'll combine all messages into a single prompt
-            prompt = ""
-            for msg in messages:
-                if msg["role"] == "user":
-                    prompt += f"User: {msg['content']}\n"
-                elif msg["role"] == "assistant":
-                    prompt += f"Assistant: {msg['content']}\n"
-                elif msg["role"] == "system":
-                    prompt += f"System: {msg['content']}\n"
-            
-            prompt += "Assistant:"
-            
-            # Prepare request payload
-            payload = {
-                "model": model_name,
-                "prompt": prompt,
-                "max_tokens": kwargs.get("max_tokens", model_config.max_tokens if model_config else 4096),
-                "temperature": kwargs.get("temperature", model_config.temperature if model_config else 0.1),
-                "stream": kwargs.get("stream", False),
-            }
-            
-            # Add optional parameters
-            if "top_p" in kwargs:
-                payload["p"] = kwargs["top_p"]
-            if "frequency_penalty" in kwargs:
-                payload["frequency_penalty"] = kwargs["frequency_penalty"]
-            if "presence_penalty" in kwargs:
-                payload["presence_penalty"] = kwargs["presence_penalty"]
+            model_name, payload = self._build_payload(messages, model, **kwargs)
             
-            logger.debug(f"Cohere chat request: model={model_name}, prompt_length={len(prompt)}")
+            logger.debug(f"Cohere chat request: model={model_name}, prompt_length={len(payload['prompt'])}")
             
             # Make API request
             response = await self.http_client.post(
@@ -156,9 +122,7 @@ class CohereProvider(BaseLLMProvider):
                 raise Exception(error_msg)
             
             response_data = response.json()
-            
-            # Extract response text
-            response_text = response_data["generations"][0]["text"]
+            generation = response_data["generations"][0]
             
             # Calculate usage and cost
             usage = response_data.get("meta", {}).get("billed_units", {})
@@ -171,12 +135,107 @@ class CohereProvider(BaseLLMProvider):
                 f"Cohere chat completed: model={model_name}, tokens={input_tokens + output_tokens}, cost=${cost:.4f}"
             )
             
-            return response_text
+            return ChatResult(
+                text=generation["text"],
+                model=model_name,
+                provider="cohere",
+                finish_reason=generation.get("finish_reason") or "stop",
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cost=cost,
+            )
             
         except Exception as e:
             logger.error(f"Cohere chat error: {e}")
             raise Exception(f"Cohere chat failed: {e}")
 
+    def _build_payload(
+        self, messages: List[Dict[str, Any]], model: Optional[str], **kwargs: Any
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Resolve the model and build the generate payload"""
+        model_name = model or self.default_model
+        model_config = self.models.get(model_name)
+        
+        if not model_config:
+            logger.warning(f"Model {model_name} not found, using default")
+            model_name = self.default_model
+            model_config = self.models.get(model_name)
+        
+        # Convert messages to Cohere format
+        # Cohere uses a different format - we'll combine all messages into a single prompt
+        prompt = ""
+        for msg in messages:
+            if msg["role"] == "user":
+                prompt += f"User: {msg['content']}\n"
+            elif msg["role"] == "assistant":
+                prompt += f"Assistant: {msg['content']}\n"
+            elif msg["role"] == "system":
+                prompt += f"System: {msg['content']}\n"
+        
+        prompt += "Assistant:"
+        
+        payload = {
+            "model": model_name,
+            "prompt": prompt,
+            "max_tokens": kwargs.get("max_tokens", model_config.max_tokens if model_config else 4096),
+            "temperature": kwargs.get("temperature", model_config.temperature if model_config else 0.1),
+            "stream": kwargs.get("stream", False),
+        }
+        
+        # Add optional parameters
+        if "top_p" in kwargs:
+            payload["p"] = kwargs["top_p"]
+        if "frequency_penalty" in kwargs:
+            payload["frequency_penalty"] = kwargs["frequency_penalty"]
+        if "presence_penalty" in kwargs:
+            payload["presence_penalty"] = kwargs["presence_penalty"]
+        
+        return model_name, payload
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """
+        Stream chat completion text from Cohere.
+        
+        Args:
+            messages: List of message dictionaries
+            model: Model to use (defaults to configured model)
+            usage: Optional dict filled with token counts and cost when the stream ends
+            **kwargs: Additional parameters
+            
+        Yields:
+            Text deltas
+        """
+        model_name, payload = self._build_payload(messages, model, **kwargs)
+        payload["stream"] = True
+        billed: Dict[str, Any] = {}
+        finish_reason = None
+        
+        async with self.http_client.stream("POST", f"{self.base_url}/v1/generate", json=payload) as response:
+            await raise_for_stream_status(response, "Cohere")
+            async for event in iter_ndjson(response):
+                if event.get("is_finished"):
+                    finish_reason = event.get("finish_reason")
+                    billed = event.get("response", {}).get("meta", {}).get("billed_units", {})
+                elif event.get("text"):
+                    yield event["text"]
+        
+        if usage is not None:
+            input_tokens = billed.get("input_tokens", 0)
+            output_tokens = billed.get("output_tokens", 0)
+            usage.update({
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "finish_reason": finish_reason,
+                "model": model_name,
+                "cost": self.calculate_cost(model_name, input_tokens, output_tokens),
+            })
+
     async def embed(self, text: str, model: Optional[str] = None, **kwargs: Any) -> List[float]:
         """
         Generate embeddings using Cohere.
@@ -244,7 +303,8 @@ class CohereProvider(BaseLLMProvider):
             Exception: If API call fails
         """
         messages = [{"role": "user", "content": prompt}]
-        return await self.chat(messages, model, **kwargs)
+        result = await self.chat(messages, model, **kwargs)
+        return result.text
 
     async def embed_text(self, text: str, model: Optional[str] = None) -> List[float]:
         """
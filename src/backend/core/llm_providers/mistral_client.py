@@ -4,13 +4,15 @@ Zapewnia integrację z Mistral AI API dla LLM operations.
 """
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import httpx
 from pydantic import BaseModel
 
 from backend.config import settings
 from .provider_factory import BaseLLMProvider
+from .result import ChatResult
+from .streaming import stream_openai_compatible
 
 logger = logging.getLogger(__name__)
 
@@ -88,7 +90,7 @@ class MistralProvider(BaseLLMProvider):
         messages: List[Dict[str, Any]], 
         model: Optional[str] = None,
         **kwargs: Any
-    ) -> str:
+    ) -> ChatResult:
         """
         Generate chat completion using Mistral AI.
         
@@ -98,36 +100,13 @@ class MistralProvider(BaseLLMProvider):
             **kwargs: Additional parameters
             
         Returns:
-            Generated response text
+            Chat result with usage and cost
             
         Raises:
             Exception: If API call fails
         """
         try:
-            model_name = model or self.default_model
-            model_config = self.models.get(model_name)
-            
-            if not model_config:
-                logger.warning(f"Model {model_name} not found, using default")
-                model_name = self.default_model
-                model_config = self.models.get(model_name)
-            
-            # Prepare request payload
-            payload = {
-                "model": model_name,
-                "messages": messages,
-                "max_tokens": kwargs.get("max_tokens", model_config.max_tokens if model_config else 4096),
-                "temperature": kwargs.get("temperature", model_config.temperature if model_config else 0.1),
-                "stream": kwargs.get("stream", False),
-            }
-            
-            # Add optional parameters
-            if "top_p" in kwargs:
-                payload["top_p"] = kwargs["top_p"]
-            if "frequency_penalty" in kwargs:
-                payload["frequency_penalty"] = kwargs["frequency_penalty"]
-            if "presence_penalty" in kwargs:
-                payload["presence_penalty"] = kwargs["presence_penalty"]
+            model_name, payload = self._build_payload(messages, model, **kwargs)
             
             logger.debug(f"Mistral chat request: model={model_name}, messages_count={len(messages)}")
             
@@ -143,28 +122,95 @@ class MistralProvider(BaseLLMProvider):
                 raise Exception(error_msg)
             
             response_data = response.json()
-            
-            # Extract response text
-            response_text = response_data["choices"][0]["message"]["content"]
+            choice = response_data["choices"][0]
             
             # Calculate usage and cost
             usage = response_data.get("usage", {})
             input_tokens = usage.get("prompt_tokens", 0)
             output_tokens = usage.get("completion_tokens", 0)
-            total_tokens = usage.get("total_tokens", 0)
             
             cost = self.calculate_cost(model_name, input_tokens, output_tokens)
             
             logger.info(
-                f"Mistral chat completed: model={model_name}, tokens={total_tokens}, cost=${cost:.4f}"
+                f"Mistral chat completed: model={model_name}, tokens={input_tokens + output_tokens}, cost=${cost:.4f}"
             )
             
-            return response_text
+            return ChatResult(
+                text=choice["message"]["content"],
+                model=model_name,
+                provider="mistral",
+                finish_reason=choice.get("finish_reason") or "stop",
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cost=cost,
+            )
             
         except Exception as e:
             logger.error(f"Mistral chat error: {e}")
             raise Exception(f"Mistral chat failed: {e}")
 
+    def _build_payload(
+        self, messages: List[Dict[str, Any]], model: Optional[str], **kwargs: Any
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Resolve the model and build the chat completions payload"""
+        model_name = model or self.default_model
+        model_config = self.models.get(model_name)
+        
+        if not model_config:
+            logger.warning(f"Model {model_name} not found, using default")
+            model_name = self.default_model
+            model_config = self.models.get(model_name)
+        
+        payload = {
+            "model": model_name,
+            "messages": messages,
+            "max_tokens": kwargs.get("max_tokens", model_config.max_tokens if model_config else 4096),
+            "temperature": kwargs.get("temperature", model_config.temperature if model_config else 0.1),
+            "stream": kwargs.get("stream", False),
+        }
+        
+        # Add optional parameters
+        if "top_p" in kwargs:
+            payload["top_p"] = kwargs["top_p"]
+        if "frequency_penalty" in kwargs:
+            payload["frequency_penalty"] = kwargs["frequency_penalty"]
+        if "presence_penalty" in kwargs:
+            payload["presence_penalty"] = kwargs["presence_penalty"]
+        
+        return model_name, payload
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """
+        Stream chat completion text from Mistral AI.
+        
+        Args:
+            messages: List of message dictionaries
+            model: Model to use (defaults to configured model)
+            usage: Optional dict filled with token counts and cost when the stream ends
+            **kwargs: Additional parameters
+            
+        Yields:
+            Text deltas
+        """
+        model_name, payload = self._build_payload(messages, model, **kwargs)
+        counts: Dict[str, Any] = {}
+        async for delta in stream_openai_compatible(
+            self.http_client, f"{self.base_url}/chat/completions", payload, "Mistral", counts
+        ):
+            yield delta
+        if usage is not None:
+            usage.update(counts)
+            usage["model"] = model_name
+            usage["cost"] = self.calculate_cost(
+                model_name, counts.get("input_tokens", 0), counts.get("output_tokens", 0)
+            )
+
     async def embed(self, text: str, model: Optional[str] = None, **kwargs: Any) -> List[float]:
         """
         Generate embeddings using Mistral AI.
@@ -236,7 +282,8 @@ class MistralProvider(BaseLLMProvider):
             Exception: If API call fails
         """
         messages = [{"role": "user", "content": prompt}]
-        return await self.chat(messages, model, **kwargs)
+        result = await self.chat(messages, model, **kwargs)
+        return result.text
 
     async def embed_text(self, text: str, model: Optional[str] = None) -> List[float]:
         """
@@ -5,12 +5,13 @@ Zapewnia integrację z OpenAI API dla chat i embedding operations.
 
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import openai
 from pydantic import BaseModel
 
 from backend.config import settings
+from .result import ChatResult
 
 logger = logging.getLogger(__name__)
 
@@ -86,7 +87,7 @@ class OpenAIProvider:
         temperature: Optional[float] = None,
         stream: bool = False,
         **kwargs: Any
-    ) -> str:
+    ) -> ChatResult:
         """
         Generate chat completion using OpenAI API.
         
@@ -99,7 +100,7 @@ class OpenAIProvider:
             **kwargs: Additional parameters for OpenAI API
             
         Returns:
-            Generated text response
+            Chat result with usage and cost (raw stream object when ``stream`` is set)
             
         Raises:
             Exception: If API call fails
@@ -130,13 +131,85 @@ class OpenAIProvider:
             
             if stream:
                 return response  # Return streaming response object
-            else:
-                return response.choices[0].message.content
+            
+            choice = response.choices[0]
+            usage = response.usage
+            input_tokens = usage.prompt_tokens if usage else 0
+            output_tokens = usage.completion_tokens if usage else 0
+            details = getattr(usage, "prompt_tokens_details", None)
+            
+            return ChatResult(
+                text=choice.message.content or "",
+                model=model_name,
+                provider="openai",
+                finish_reason=choice.finish_reason or "stop",
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cached_tokens=getattr(details, "cached_tokens", 0) or 0,
+                cost=self.calculate_cost(model_name, input_tokens + output_tokens),
+            )
                 
         except Exception as e:
             logger.error(f"OpenAI chat error: {e}")
             raise Exception(f"OpenAI chat failed: {e}")
 
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """
+        Stream chat completion text using OpenAI API.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            model: Model to use (defaults to configured model)
+            max_tokens: Maximum tokens to generate
+            temperature: Temperature for generation
+            usage: Optional dict filled with token counts and cost when the stream ends
+            **kwargs: Additional parameters for OpenAI API
+            
+        Yields:
+            Text deltas
+        """
+        model_name = model or self.default_chat_model
+        model_config = self.models.get(model_name)
+        max_tokens = max_tokens or model_config.max_tokens if model_config else settings.OPENAI_MAX_TOKENS
+        temperature = temperature or model_config.temperature if model_config else settings.OPENAI_TEMPERATURE
+        
+        stream = await self.client.chat.completions.create(
+            model=model_name,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs
+        )
+        input_tokens = output_tokens = 0
+        finish_reason = None
+        async for chunk in stream:
+            if chunk.usage:
+                input_tokens = chunk.usage.prompt_tokens
+                output_tokens = chunk.usage.completion_tokens
+            for choice in chunk.choices:
+                finish_reason = choice.finish_reason or finish_reason
+                if choice.delta and choice.delta.content:
+                    yield choice.delta.content
+        
+        if usage is not None:
+            usage.update({
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "finish_reason": finish_reason,
+                "model": model_name,
+                "cost": self.calculate_cost(model_name, input_tokens + output_tokens),
+            })
+
     async def embed(self, text: str, model: Optional[str] = None) -> List[float]:
         """
         Generate embeddings using OpenAI API.
@@ -213,7 +286,8 @@ class OpenAIProvider:
             Exception: If API call fails
         """
         messages = [{"role": "user", "content": prompt}]
-        return await self.chat(messages, model, **kwargs)
+        result = await self.chat(messages, model, **kwargs)
+        return result.text
 
     async def embed_text(self, text: str, model: Optional[str] = None) -> List[float]:
         """
@@ -5,11 +5,13 @@ Implementacja klienta Perplexity API zgodnie z dokumentacją.
 
 import logging
 import time
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 import httpx
 from pydantic import BaseModel
 
 from backend.config import settings
+from .result import ChatResult
+from .streaming import stream_openai_compatible
 
 logger = logging.getLogger(__name__)
 
@@ -85,7 +87,7 @@ class PerplexityProvider:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         **kwargs: Any
-    ) -> Dict[str, Any]:
+    ) -> ChatResult:
         """
         Send chat completion request to Perplexity API.
         
@@ -97,7 +99,7 @@ class PerplexityProvider:
             **kwargs: Additional parameters
             
         Returns:
-            Response dictionary with completion data
+            Chat result with usage and cost
         """
         try:
             model_name = model or self.default_model
@@ -140,28 +142,71 @@ class PerplexityProvider:
             
             # Calculate usage and cost
             usage = response_data.get("usage", {})
-            tokens_used = usage.get("total_tokens", 0)
-            cost = self.calculate_cost(model_name, tokens_used)
+            input_tokens = usage.get("prompt_tokens", 0)
+            output_tokens = usage.get("completion_tokens", 0)
             
-            return {
-                "text": content,
-                "model": model_name,
-                "provider": "perplexity",
-                "usage": usage,
-                "cost": cost,
-                "finish_reason": choice.get("finish_reason", "stop"),
-                "metadata": {
-                    "provider": "perplexity",
-                    "model": model_name,
-                    "tokens_used": tokens_used,
-                    "response_time": time.time()
-                }
-            }
+            return ChatResult(
+                text=content,
+                model=model_name,
+                provider="perplexity",
+                finish_reason=choice.get("finish_reason") or "stop",
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cost=self.calculate_cost(model_name, usage.get("total_tokens", input_tokens + output_tokens)),
+            )
             
         except Exception as e:
             logger.error(f"Perplexity chat error: {e}")
             raise Exception(f"Perplexity chat failed: {e}")
     
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """
+        Stream chat completion text from Perplexity API.
+        
+        Args:
+            messages: List of message dictionaries
+            model: Model to use (defaults to configured model)
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            usage: Optional dict filled with token counts and cost when the stream ends
+            **kwargs: Additional parameters
+            
+        Yields:
+            Text deltas
+        """
+        model_name = model or self.default_model
+        model_config = self.models.get(model_name)
+        
+        if not model_config:
+            raise ValueError(f"Unknown model: {model_name}")
+        
+        payload = {
+            "model": model_name,
+            "messages": messages,
+            "max_tokens": max_tokens or model_config.max_tokens,
+            "temperature": temperature or model_config.temperature,
+            **kwargs
+        }
+        counts: Dict[str, Any] = {}
+        async for delta in stream_openai_compatible(
+            self.http_client, f"{self.base_url}/chat/completions", payload, "Perplexity", counts
+        ):
+            yield delta
+        if usage is not None:
+            usage.update(counts)
+            usage["model"] = model_name
+            usage["cost"] = self.calculate_cost(
+                model_name, counts.get("input_tokens", 0) + counts.get("output_tokens", 0)
+            )
+    
     async def search(
         self,
         query: str,
@@ -169,7 +214,7 @@ class PerplexityProvider:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         **kwargs: Any
-    ) -> Dict[str, Any]:
+    ) -> ChatResult:
         """
         Send search request to Perplexity API.
         
@@ -181,7 +226,7 @@ class PerplexityProvider:
             **kwargs: Additional parameters
             
         Returns:
-            Response dictionary with search results
+            Chat result with the search answer
         """
         try:
             model_name = model or settings.PERPLEXITY_SEARCH_MODEL
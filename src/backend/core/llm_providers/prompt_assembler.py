@@ -0,0 +1,328 @@
+"""
+Context-window-aware prompt assembler.
+Składa wiadomości dla LLM w budżecie tokenów modelu: system prompt, kontekst, wyniki wyszukiwania, historia.
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Fallback tokenizer ratio when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+# Role markers and separators added by chat formats to every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    """Context window and output limit of a chat model (tokens)."""
+
+    context_window: int
+    max_output_tokens: int
+
+
+# Known chat models; lookups fall back to the longest matching prefix
+MODEL_LIMITS: Dict[str, ModelLimits] = {
+    "gpt-4": ModelLimits(8192, 4096),
+    "gpt-4-turbo": ModelLimits(128000, 4096),
+    "gpt-4-turbo-preview": ModelLimits(128000, 4096),
+    "gpt-4o": ModelLimits(128000, 16384),
+    "gpt-4o-mini": ModelLimits(128000, 16384),
+    "gpt-3.5-turbo": ModelLimits(16385, 4096),
+    "claude-3": ModelLimits(200000, 4096),
+    "claude": ModelLimits(200000, 8192),
+    "mistral-large": ModelLimits(128000, 4096),
+    "mistral-medium": ModelLimits(32000, 4096),
+    "mistral-small": ModelLimits(32000, 4096),
+    "mistral": ModelLimits(32000, 4096),
+    "sonar-pro": ModelLimits(200000, 8000),
+    "sonar": ModelLimits(127072, 4096),
+    "llama-3.1": ModelLimits(127072, 4096),
+    "command-r": ModelLimits(128000, 4000),
+    "command-nightly": ModelLimits(128000, 4000),
+    "command": ModelLimits(4096, 4000),
+}
+
+# Unknown models get a conservative window
+DEFAULT_LIMITS = ModelLimits(8192, 1024)
+
+
+def _provider_default_models() -> Dict[str, str]:
+    return {
+        "openai": settings.OPENAI_CHAT_MODEL,
+        "anthropic": settings.ANTHROPIC_CHAT_MODEL,
+        "cohere": settings.COHERE_CHAT_MODEL,
+        "mistral": settings.MISTRAL_CHAT_MODEL,
+        "perplexity": settings.PERPLEXITY_CHAT_MODEL,
+    }
+
+
+def get_model_limits(model: Optional[str] = None, provider: Optional[str] = None) -> ModelLimits:
+    """
+    Look up the limits of a model.
+
+    Args:
+        model: Model name; if empty, the provider's configured chat model is used
+        provider: Provider name (``openai``, ``anthropic``...)
+
+    Returns:
+        Limits of the model, the longest known prefix, or ``DEFAULT_LIMITS``
+    """
+    if not model and isinstance(provider, str):
+        model = _provider_default_models().get(provider)
+    if not model:
+        return DEFAULT_LIMITS
+    if model in MODEL_LIMITS:
+        return MODEL_LIMITS[model]
+    for name in sorted(MODEL_LIMITS, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_LIMITS[name]
+    return DEFAULT_LIMITS
+
+
+def input_budget(limits: ModelLimits, max_tokens: Optional[int] = None) -> int:
+    """Prompt tokens available once the answer's tokens are reserved"""
+    reserved = max_tokens or min(limits.max_output_tokens, settings.PROMPT_RESERVED_OUTPUT_TOKENS)
+    return max(0, min(limits.context_window - reserved, settings.PROMPT_MAX_INPUT_TOKENS))
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Any:
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # not installed, or the BPE file cannot be fetched
+        logger.info(f"tiktoken unavailable, estimating {CHARS_PER_TOKEN} characters per token: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Token count of a text (tiktoken ``cl100k_base`` or a character estimate)"""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Keep the first ``max_tokens`` tokens of a text"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max_tokens])
+    return text[:max_tokens * CHARS_PER_TOKEN]
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    """Tokens a chat message takes in the prompt"""
+    return count_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+
+@dataclass
+class PromptSection:
+    """
+    Supporting text appended to the current user message.
+
+    Items are kept in order (best first); the first item that does not fit
+    is cut at token granularity and the rest are dropped.
+    """
+
+    name: str
+    heading: str
+    items: List[str]
+    # Largest fraction of the input budget the section may take
+    share: float = 0.25
+    # Per-item cap applied before packing (None = no cap)
+    item_tokens: Optional[int] = None
+    separator: str = "\n"
+
+
+@dataclass
+class AssembledPrompt:
+    """Messages that fit the budget and what had to be cut."""
+
+    messages: List[Dict[str, str]]
+    tokens: int
+    budget: int
+    truncated: List[str] = field(default_factory=list)
+    dropped: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        """Short form for logs and response metadata"""
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "truncated": self.truncated,
+            "dropped": self.dropped,
+        }
+
+
+class PromptAssembler:
+    """
+    Fits a conversation into a model's input token budget.
+
+    Priority: system prompt (up to ``SYSTEM_SHARE`` of the budget), then the
+    current user message, then sections in the given order (each capped by
+    its share), then history from the newest message back. Whatever does not
+    fit is cut at token granularity or dropped.
+    """
+
+    SYSTEM_SHARE = 0.5
+    # Shorter leftovers are dropped rather than sent as a stub
+    MIN_ITEM_TOKENS = 32
+
+    def __init__(self, budget: int) -> None:
+        self.budget = budget
+
+    @classmethod
+    def for_model(
+        cls,
+        model: Optional[str] = None,
+        provider: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> "PromptAssembler":
+        """Assembler with the input budget of a model (see ``get_model_limits``)"""
+        return cls(input_budget(get_model_limits(model, provider), max_tokens))
+
+    def assemble(
+        self,
+        messages: Sequence[Dict[str, str]],
+        sections: Sequence[PromptSection] = (),
+    ) -> AssembledPrompt:
+        """
+        Build the messages to send.
+
+        Args:
+            messages: Conversation; the last message is the current turn
+            sections: Supporting text in priority order (retrieved context, search results...)
+
+        Returns:
+            Assembled prompt with system messages first and history in original order
+
+        Raises:
+            ValueError: If there are no messages
+        """
+        if not messages:
+            raise ValueError("At least one message is required")
+
+        system = [dict(m) for m in messages if m.get("role") == "system"]
+        turns = [dict(m) for m in messages if m.get("role") != "system"]
+        current = turns.pop() if turns else None
+        truncated: List[str] = []
+        dropped: Dict[str, int] = {}
+
+        remaining = self.budget
+        system_left = int(self.budget * self.SYSTEM_SHARE) if current else self.budget
+        for message in system:
+            cost = message_tokens(message)
+            if cost > system_left:
+                message["content"] = truncate_tokens(message["content"], system_left - MESSAGE_OVERHEAD_TOKENS)
+                truncated.append("system")
+                cost = message_tokens(message)
+            system_left -= cost
+            remaining -= cost
+
+        if current is not None:
+            cost = message_tokens(current)
+            if cost > remaining:
+                current["content"] = truncate_tokens(current["content"], remaining - MESSAGE_OVERHEAD_TOKENS)
+                truncated.append("current")
+                cost = message_tokens(current)
+            remaining -= cost
+
+            extra = []
+            for section in sections:
+                text, used = self._pack(section, min(int(self.budget * section.share), remaining), truncated, dropped)
+                if text:
+                    extra.append(text)
+                    remaining -= used
+            if extra:
+                current["content"] = "\n\n".join([current["content"], *extra])
+
+        history = self._fit_history(turns, remaining, truncated, dropped)
+        assembled = system + history + ([current] if current is not None else [])
+        tokens = sum(message_tokens(m) for m in assembled)
+        if truncated or dropped:
+            logger.debug(f"Prompt assembled: {tokens}/{self.budget} tokens, truncated={truncated}, dropped={dropped}")
+        return AssembledPrompt(assembled, tokens, self.budget, truncated, dropped)
+
+    def _pack(
+        self,
+        section: PromptSection,
+        limit: int,
+        truncated: List[str],
+        dropped: Dict[str, int],
+    ) -> Tuple[str, int]:
+        """Pack a section's items into ``limit`` tokens; returns (text, tokens)"""
+        items = [item for item in section.items if item]
+        heading_tokens = count_tokens(section.heading)
+        if not items or heading_tokens + self.MIN_ITEM_TOKENS > limit:
+            if items:
+                dropped[section.name] = len(items)
+            return "", 0
+
+        used = heading_tokens
+        kept: List[str] = []
+        for i, item in enumerate(items):
+            if section.item_tokens:
+                item = truncate_tokens(item, section.item_tokens)
+            cost = count_tokens(item + section.separator)
+            if used + cost <= limit:
+                kept.append(item)
+                used += cost
+                continue
+            room = limit - used - count_tokens(section.separator)
+            if room >= self.MIN_ITEM_TOKENS:
+                kept.append(truncate_tokens(item, room))
+                used = limit
+                truncated.append(section.name)
+                i += 1
+            dropped[section.name] = len(items) - i
+            break
+
+        if not kept:
+            return "", 0
+        text = section.heading + "\n" + section.separator.join(kept)
+        return text, count_tokens(text)
+
+    def _fit_history(
+        self,
+        turns: List[Dict[str, str]],
+        limit: int,
+        truncated: List[str],
+        dropped: Dict[str, int],
+    ) -> List[Dict[str, str]]:
+        """Keep the newest history messages that fit ``limit`` tokens"""
+        kept: List[Dict[str, str]] = []
+        for message in reversed(turns):
+            cost = message_tokens(message)
+            if cost <= limit:
+                kept.append(message)
+                limit -= cost
+                continue
+            room = limit - MESSAGE_OVERHEAD_TOKENS
+            if room >= self.MIN_ITEM_TOKENS:
+                message["content"] = truncate_tokens(message["content"], room)
+                kept.append(message)
+                truncated.append("history")
+            break
+        kept.reverse()
+
+        # Don't let the cut make the conversation open with an assistant turn
+        if kept and len(kept) < len(turns) and turns[0].get("role") == "user":
+            while kept and kept[0].get("role") != "user":
+                kept.pop(0)
+        if len(kept) < len(turns):
+            dropped["history"] = len(turns) - len(kept)
+        return kept
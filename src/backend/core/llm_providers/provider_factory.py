@@ -5,9 +5,10 @@ Zapewnia centralne zarządzanie różnymi providerami LLM.
 
 import logging
 from enum import Enum
-from typing import Dict, Type, Optional, Any
+from typing import AsyncIterator, Dict, Type, Optional, Any
 
 from backend.config import settings
+from .result import ChatResult
 
 logger = logging.getLogger(__name__)
 
@@ -27,10 +28,31 @@ class BaseLLMProvider:
     def __init__(self, api_key: str) -> None:
         self.api_key = api_key
     
-    async def chat(self, messages: list, **kwargs: Any) -> str:
+    async def chat(self, messages: list, **kwargs: Any) -> ChatResult:
         """Generate chat completion"""
         raise NotImplementedError
     
+    async def stream_chat(
+        self, messages: list, usage: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """
+        Stream chat completion text.
+        
+        Providers without native streaming yield the whole response at once.
+        ``usage``, when given, is filled with ``input_tokens``, ``output_tokens``,
+        ``cost``, ``finish_reason`` and ``model`` once the stream ends.
+        """
+        result = await self.chat(messages, **kwargs)
+        if usage is not None:
+            usage.update({
+                "input_tokens": result.input_tokens,
+                "output_tokens": result.output_tokens,
+                "finish_reason": result.finish_reason,
+                "model": result.model,
+                "cost": result.cost,
+            })
+        yield result.text
+    
     async def embed(self, text: str, **kwargs: Any) -> list[float]:
         """Generate embeddings"""
         raise NotImplementedError
@@ -198,7 +220,7 @@ class LLMProviderFactory:
         max_tokens: Optional[int] = None,
         temperature: float = 0.7,
         **kwargs
-    ) -> dict[str, Any]:
+    ) -> ChatResult:
         """
         Generate chat completion with automatic fallback to available providers.
         
@@ -210,7 +232,7 @@ class LLMProviderFactory:
             **kwargs: Additional parameters
             
         Returns:
-            Chat completion result
+            Chat result from the first provider that succeeded
             
         Raises:
             Exception: If no providers are available or all providers fail
@@ -244,10 +266,6 @@ class LLMProviderFactory:
                     **kwargs
                 )
                 
-                # Add provider info to result
-                result["provider"] = provider_type.value
-                result["model_used"] = adapted_model or "default"
-                
                 logger.info(f"Chat completion successful with provider: {provider_type.value}")
                 return result
                 
@@ -261,6 +279,85 @@ class LLMProviderFactory:
         logger.error(error_msg)
         raise Exception(error_msg)
 
+    @classmethod
+    async def stream_with_fallback(
+        cls,
+        messages: list,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        usage: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream chat completion with automatic fallback to available providers.
+
+        A provider is only abandoned before it yields its first delta; once
+        text has been sent, an error is raised to the caller instead.
+
+        Args:
+            messages: List of message dictionaries
+            model: Model to use (will be adapted per provider if needed)
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            usage: Optional dict filled with ``provider``, ``model``, token
+                counts and cost once the stream ends
+            **kwargs: Additional parameters
+
+        Yields:
+            Text deltas
+
+        Raises:
+            Exception: If no providers are available or all providers fail
+        """
+        configured_providers = cls.get_configured_providers()
+
+        if not configured_providers:
+            raise Exception("No LLM providers configured")
+
+        sorted_providers = sorted(
+            configured_providers,
+            key=lambda p: cls.get_provider_priority(p)
+        )
+
+        last_error = None
+
+        for provider_type in sorted_providers:
+            started = False
+            try:
+                provider = cls.create_provider(provider_type)
+                adapted_model = cls._adapt_model_for_provider(model, provider_type)
+
+                stream_usage: Dict[str, Any] = {}
+                async for delta in provider.stream_chat(
+                    messages=messages,
+                    model=adapted_model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    usage=stream_usage,
+                    **kwargs
+                ):
+                    started = True
+                    yield delta
+
+                if usage is not None:
+                    usage.update(stream_usage)
+                    usage.setdefault("provider", provider_type.value)
+                    usage.setdefault("model", adapted_model)
+                logger.info(f"Chat stream successful with provider: {provider_type.value}")
+                return
+
+            except Exception as e:
+                if started:
+                    raise
+                last_error = e
+                logger.warning(f"Provider {provider_type.value} failed: {e}")
+                continue
+
+        error_msg = f"All providers failed. Last error: {last_error}"
+        logger.error(error_msg)
+        raise Exception(error_msg)
+
     @classmethod
     def _adapt_model_for_provider(cls, model: Optional[str], provider_type: ProviderType) -> Optional[str]:
         """Adapt model name for specific provider."""
@@ -0,0 +1,44 @@
+"""
+Normalized chat completion result.
+Ujednolicony wynik wywołania LLM zwracany przez wszystkich providerów.
+"""
+
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass(slots=True)
+class ChatResult:
+    """
+    Chat completion returned by every LLM provider.
+
+    Token counts come from the provider's usage report; ``cost`` is computed
+    by the provider from its price table (USD).
+    """
+
+    text: str
+    model: str
+    provider: str
+    finish_reason: str = "stop"
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    cost: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        """Input plus output tokens"""
+        return self.input_tokens + self.output_tokens
+
+    def usage(self) -> Dict[str, int]:
+        """Usage in the OpenAI-style shape used by API responses"""
+        return {
+            "prompt_tokens": self.input_tokens,
+            "completion_tokens": self.output_tokens,
+            "cached_tokens": self.cached_tokens,
+            "total_tokens": self.total_tokens,
+        }
+
+    def cost_breakdown(self) -> Dict[str, float]:
+        """Cost in the shape used by API responses"""
+        return {"total_cost": self.cost}
@@ -0,0 +1,90 @@
+"""
+Streaming helpers shared by LLM providers.
+Wspólne narzędzia do strumieniowania odpowiedzi providerów LLM.
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+async def iter_sse_json(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Iterate JSON payloads of a server-sent events stream.
+
+    Args:
+        response: Streaming httpx response
+
+    Yields:
+        Decoded ``data:`` payloads (``[DONE]`` ends the stream)
+    """
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        if data:
+            yield json.loads(data)
+
+
+async def iter_ndjson(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Iterate a newline-delimited JSON stream.
+
+    Args:
+        response: Streaming httpx response
+
+    Yields:
+        Decoded JSON objects
+    """
+    async for line in response.aiter_lines():
+        if line.strip():
+            yield json.loads(line)
+
+
+async def raise_for_stream_status(response: httpx.Response, provider: str) -> None:
+    """Raise with the error body when a streaming request was rejected."""
+    if response.status_code != 200:
+        body = (await response.aread()).decode("utf-8", errors="replace")
+        error_msg = f"{provider} API error: {response.status_code} - {body}"
+        logger.error(error_msg)
+        raise Exception(error_msg)
+
+
+async def stream_openai_compatible(
+    http_client: httpx.AsyncClient,
+    url: str,
+    payload: Dict[str, Any],
+    provider: str,
+    usage: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream an OpenAI-compatible chat completion (Mistral, Perplexity).
+
+    Args:
+        http_client: Authenticated client
+        url: Full ``/chat/completions`` URL
+        payload: Request payload (``stream`` is forced on)
+        provider: Provider name for error messages
+        usage: Optional dict filled with ``input_tokens``/``output_tokens``/``finish_reason``
+
+    Yields:
+        Text deltas
+    """
+    async with http_client.stream("POST", url, json={**payload, "stream": True}) as response:
+        await raise_for_stream_status(response, provider)
+        async for event in iter_sse_json(response):
+            if usage is not None and event.get("usage"):
+                usage["input_tokens"] = event["usage"].get("prompt_tokens", 0)
+                usage["output_tokens"] = event["usage"].get("completion_tokens", 0)
+            for choice in event.get("choices", []):
+                if usage is not None and choice.get("finish_reason"):
+                    usage["finish_reason"] = choice["finish_reason"]
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    yield delta
@@ -0,0 +1,110 @@
+"""
+Typo- and inflection-tolerant matching of product names.
+Dopasowuje nazwy produktów mimo odmiany, braku polskich znaków i literówek (indeks trigramów w pamięci).
+
+Names are reduced to a key of folded, stemmed words (``Pomidory`` and
+``pomidorów`` both become ``pomidor``). Equal keys match outright; otherwise
+the candidate sharing the most trigrams wins, scored like ``pg_trgm``'s
+``similarity()``: shared / (query + candidate - shared).
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from backend.core.polish_text import document, fold
+
+# pg_trgm's default similarity threshold is 0.3; product names are short, so be stricter
+DEFAULT_MIN_SIMILARITY = 0.4
+
+
+def name_key(name: str) -> str:
+    """Normalized matching key of a name (folded, stemmed, stopwords dropped)."""
+    return document(name) or " ".join(fold(name).split())
+
+
+def trigrams(key: str) -> Set[str]:
+    """Trigrams of each word padded like ``pg_trgm`` (two spaces before, one after)."""
+    grams: Set[str] = set()
+    for word in key.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+@dataclass(frozen=True)
+class NameMatch:
+    """A matched candidate: its original name, attached value and similarity (1.0 = same key)."""
+
+    name: str
+    value: Any
+    similarity: float
+
+
+class NameMatcher:
+    """
+    In-memory trigram index over candidate names.
+
+    Candidates added first win ties, so add them in a stable order (e.g. by id).
+    """
+
+    def __init__(self, min_similarity: float = DEFAULT_MIN_SIMILARITY):
+        self.min_similarity = min_similarity
+        self._names: List[str] = []
+        self._values: List[Any] = []
+        self._sizes: List[int] = []
+        self._exact: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str, value: Any, key: Optional[str] = None) -> None:
+        """Index a candidate name with the value returned when it matches.
+
+        Args:
+            name: Candidate name
+            value: Returned with the match
+            key: Precomputed ``name_key`` (e.g. as stored in the database)
+        """
+        key = name_key(name) if key is None else key
+        index = len(self._names)
+        grams = trigrams(key)
+        self._names.append(name)
+        self._values.append(value)
+        self._sizes.append(len(grams))
+        self._exact.setdefault(key, index)
+        for gram in grams:
+            self._postings[gram].append(index)
+
+    def match(self, name: str) -> Optional[NameMatch]:
+        """Best candidate for ``name``, or None below ``min_similarity``."""
+        key = name_key(name)
+        if key in self._exact:
+            index = self._exact[key]
+            return NameMatch(self._names[index], self._values[index], 1.0)
+
+        grams = trigrams(key)
+        size, sizes = len(grams), self._sizes
+        shared = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in grams))
+        # similarity <= shared / size, so fewer shared trigrams than this can never pass
+        needed = self.min_similarity * size
+        best, best_similarity = -1, self.min_similarity
+        for index, count in shared.items():
+            if count < needed:
+                continue
+            similarity = count / (size + sizes[index] - count)
+            if similarity > best_similarity or (similarity == best_similarity and (best < 0 or index < best)):
+                best, best_similarity = index, similarity
+        if best < 0:
+            return None
+        return NameMatch(self._names[best], self._values[best], best_similarity)
+
+    def match_many(self, names: Iterable[str]) -> Dict[str, NameMatch]:
+        """Matches for many names (each looked up once); unmatched names are left out."""
+        matches: Dict[str, NameMatch] = {}
+        for name in dict.fromkeys(names):
+            if name and (found := self.match(name)) is not None:
+                matches[name] = found
+        return matches
@@ -0,0 +1,249 @@
+"""
+Recipe nutrition from a local nutrient table.
+Liczy makroskładniki przepisów: normalizacja ilości do gramów i wektorowe sumowanie w NumPy.
+
+Every ingredient is resolved to a row of the nutrient table by name
+(``NameMatcher``), its amount converted to grams, and the macros of a whole
+batch of recipes come out of one matrix product and one ``np.bincount``.
+Ingredients without a match or a usable amount are reported, not guessed.
+"""
+
+import csv
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from backend.core.name_matcher import DEFAULT_MIN_SIMILARITY, NameMatcher
+from backend.core.polish_text import fold
+
+# Columns of the nutrient table, per 100 g
+NUTRIENTS = ("calories", "proteins", "carbs", "fats", "fiber", "sugar")
+
+BUNDLED_TABLE = Path(__file__).parent / "data" / "nutrition.csv"
+
+# Grams per unit, keys folded (no diacritics, lowercase, no trailing dot)
+MASS_UNITS = {
+    "g": 1.0, "gr": 1.0, "gram": 1.0, "gramy": 1.0, "gramow": 1.0,
+    "dag": 10.0, "dkg": 10.0, "kg": 1000.0, "mg": 0.001,
+}
+
+# Millilitres per unit; converted to grams with the food's density
+VOLUME_UNITS = {
+    "ml": 1.0, "l": 1000.0, "litr": 1000.0, "litry": 1000.0, "litrow": 1000.0,
+    "szklanka": 250.0, "szklanki": 250.0, "szklanek": 250.0,
+    "lyzka": 15.0, "lyzki": 15.0, "lyzek": 15.0, "lyz": 15.0,
+    "lyzeczka": 5.0, "lyzeczki": 5.0, "lyzeczek": 5.0,
+    "szczypta": 0.5, "szczypty": 0.5, "szczypt": 0.5,
+    "cup": 240.0, "tbsp": 15.0, "tsp": 5.0,
+}
+
+# Counted units; converted with the food's ``piece_grams``
+PIECE_UNITS = {
+    "", "szt", "sztuka", "sztuki", "sztuk", "zabek", "zabki", "zabkow",
+    "kromka", "kromki", "kromek", "piece", "pcs",
+}
+
+DEFAULT_DENSITY = 1.0
+
+_WORD_AMOUNTS = {"pol": 0.5, "cwierc": 0.25, "jeden": 1.0, "jedna": 1.0, "dwa": 2.0, "dwie": 2.0, "trzy": 3.0}
+_NUMBER = r"\d+(?:[.,]\d+)?"
+_AMOUNT = re.compile(
+    rf"^(?:(?P<whole>\d+)\s+)?(?P<number>{_NUMBER})(?:\s*/\s*(?P<denominator>\d+))?"
+    rf"(?:\s*[-–]\s*(?P<upper>{_NUMBER}))?\s*(?P<rest>.*)$"
+)
+
+
+@dataclass(frozen=True)
+class Food:
+    """One row of the nutrient table."""
+
+    name: str
+    per_100g: Tuple[float, ...]  # in NUTRIENTS order
+    piece_grams: Optional[float] = None
+    density: Optional[float] = None  # g/ml
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    value = (value or "").strip().replace(",", ".")
+    return float(value) if value else None
+
+
+def load_foods(path: Union[str, Path]) -> List[Food]:
+    """
+    Foods from a CSV nutrient table.
+
+    Columns: ``name``, the NUTRIENTS per 100 g (empty = 0) and optionally
+    ``piece_grams`` (weight of one piece) and ``density`` (g/ml). Exports of
+    open food databases converted to these columns can be loaded as is.
+
+    Args:
+        path: CSV file (UTF-8)
+
+    Returns:
+        Foods in file order
+    """
+    with open(path, newline="", encoding="utf-8") as handle:
+        return [
+            Food(
+                name=row["name"].strip(),
+                per_100g=tuple(_number(row.get(nutrient)) or 0.0 for nutrient in NUTRIENTS),
+                piece_grams=_number(row.get("piece_grams")),
+                density=_number(row.get("density")),
+            )
+            for row in csv.DictReader(handle)
+            if (row.get("name") or "").strip()
+        ]
+
+
+def table_version(foods: Iterable[Food]) -> str:
+    """Short fingerprint of a nutrient table (changes with any value)."""
+    digest = hashlib.sha1()
+    for food in foods:
+        digest.update(repr((food.name, food.per_100g, food.piece_grams, food.density)).encode())
+    return digest.hexdigest()[:16]
+
+
+def parse_amount(value: Any) -> Tuple[Optional[float], str]:
+    """
+    Split an amount into a number and whatever follows it.
+
+    Understands ``2``, ``1,5``, ``1/2``, ``1 1/2``, ``2-3`` (the middle) and
+    ``pół``; a missing amount means one. ``"200 g"`` gives ``(200.0, "g")``.
+
+    Returns:
+        (number or None when unreadable, remaining text)
+    """
+    if value is None or value == "":
+        return 1.0, ""
+    if isinstance(value, (int, float)):
+        return float(value), ""
+    text = str(value).strip()
+    word, _, rest = fold(text).partition(" ")
+    if word in _WORD_AMOUNTS:
+        return _WORD_AMOUNTS[word], rest.strip()
+    match = _AMOUNT.match(text)
+    if match is None:
+        return None, text
+    number = float(match["number"].replace(",", "."))
+    if match["denominator"]:
+        if int(match["denominator"]) == 0:
+            return None, text
+        number /= int(match["denominator"])
+    if match["whole"]:
+        if not match["denominator"]:
+            return None, text
+        number += int(match["whole"])
+    if match["upper"]:
+        number = (number + float(match["upper"].replace(",", "."))) / 2
+    return number, match["rest"].strip()
+
+
+def to_grams(amount: Any, unit: Optional[str], food: Food) -> Optional[float]:
+    """
+    Weight in grams of ``amount`` ``unit`` of ``food``.
+
+    Returns:
+        Grams, or None when the amount or unit cannot be converted (unknown
+        unit, or pieces of a food without a piece weight)
+    """
+    number, rest = parse_amount(amount)
+    if number is None or number < 0:
+        return None
+    key = fold(unit or rest).strip().rstrip(".")
+    if key in MASS_UNITS:
+        return number * MASS_UNITS[key]
+    if key in VOLUME_UNITS:
+        return number * VOLUME_UNITS[key] * (food.density or DEFAULT_DENSITY)
+    if key in PIECE_UNITS and food.piece_grams:
+        return number * food.piece_grams
+    return None
+
+
+# (name, amount, unit) of one ingredient
+Ingredient = Tuple[str, Any, Optional[str]]
+
+
+class NutritionTable:
+    """
+    Nutrient matrix (foods x NUTRIENTS, per 100 g) with a name index over its rows.
+
+    Foods listed first win ties between equally good name matches, so put
+    the more specific source (e.g. the user's own products) first.
+    """
+
+    def __init__(self, foods: Iterable[Food], min_similarity: float = DEFAULT_MIN_SIMILARITY):
+        self.foods = list(foods)
+        self.matrix = np.array([food.per_100g for food in self.foods], dtype=np.float64).reshape(-1, len(NUTRIENTS))
+        self.matcher = NameMatcher(min_similarity)
+        for index, food in enumerate(self.foods):
+            self.matcher.add(food.name, index)
+
+    def __len__(self) -> int:
+        return len(self.foods)
+
+    def lookup(self, name: str) -> Optional[Food]:
+        """Best matching food for ``name``."""
+        index = self._resolve([name]).get(name)
+        return None if index is None else self.foods[index]
+
+    def _resolve(self, names: Iterable[str]) -> Dict[str, int]:
+        """Row of each name; a multi-word name matching nothing falls back to its
+        first word (``mąka pszenna typ 650`` -> ``mąka``)."""
+        names = list(dict.fromkeys(names))
+        found = {name: match.value for name, match in self.matcher.match_many(names).items()}
+        heads = {name: name.split()[0] for name in names if name not in found and len(name.split()) > 1}
+        head_matches = self.matcher.match_many(heads.values())
+        for name, head in heads.items():
+            if head in head_matches:
+                found[name] = head_matches[head].value
+        return found
+
+    def compute(self, recipes: Sequence[Sequence[Ingredient]]) -> Tuple[np.ndarray, List[List[str]]]:
+        """
+        Nutrient totals of many recipes at once.
+
+        Args:
+            recipes: Ingredients of each recipe
+
+        Returns:
+            (array of shape (len(recipes), len(NUTRIENTS)), names of the
+            ingredients left out of each recipe)
+        """
+        matches = self._resolve(name for ingredients in recipes for name, _, _ in ingredients)
+        rows: List[int] = []
+        foods: List[int] = []
+        grams: List[float] = []
+        unresolved: List[List[str]] = [[] for _ in recipes]
+        # Recipes repeat the same few quantities ("1 szt", "200 g"); convert each once
+        weights: Dict[Tuple[int, Any, Any], Optional[float]] = {}
+        for row, ingredients in enumerate(recipes):
+            for name, amount, unit in ingredients:
+                food = matches.get(name)
+                if food is None:
+                    weight = None
+                else:
+                    try:
+                        weight = weights[food, amount, unit]
+                    except KeyError:
+                        weight = weights[food, amount, unit] = to_grams(amount, unit, self.foods[food])
+                    except TypeError:  # unhashable amount
+                        weight = to_grams(amount, unit, self.foods[food])
+                if weight is None:
+                    unresolved[row].append(name)
+                    continue
+                rows.append(row)
+                foods.append(food)
+                grams.append(weight)
+
+        width = len(NUTRIENTS)
+        if not rows:
+            return np.zeros((len(recipes), width)), unresolved
+        # One nutrient row per ingredient, scaled by its weight, summed per recipe
+        contributions = self.matrix[np.asarray(foods)] * (np.asarray(grams) / 100.0)[:, None]
+        cells = (np.asarray(rows)[:, None] * width + np.arange(width)).ravel()
+        totals = np.bincount(cells, weights=contributions.ravel(), minlength=len(recipes) * width)
+        return totals.reshape(len(recipes), width), unresolved
@@ -38,7 +38,7 @@ class MistralVisionOCR:
         if not self.api_key:
             raise ValueError("Mistral API key is required")
         
-        self.base_url = "https://api.mistral.ai/v1"
+        self.base_url = settings.MISTRAL_BASE_URL.rstrip("/")
         self.http_client = httpx.AsyncClient(
             timeout=60.0,
             headers={
@@ -0,0 +1,116 @@
+"""
+Polish text normalization for search.
+Usuwa polskie znaki, dzieli na słowa i sprowadza je do tematu lekkim stemmerem.
+
+The stemmer only strips common inflectional endings (``pomidorów`` ->
+``pomidor``, ``zupie`` -> ``zup``). Queries match stems as prefixes, so an
+imperfect stem still finds its word forms. Neither SQLite nor PostgreSQL ships
+a Polish dictionary, which is why this runs in Python on both the write path
+and the query side.
+"""
+
+import html
+import re
+import unicodedata
+from typing import Iterable, List, Optional, Sequence, Set
+
+MIN_STEM = 3
+
+_WORD = re.compile(r"[^\W_]+")
+
+# Letters NFKD does not decompose
+_FOLD = str.maketrans({"ł": "l", "Ł": "l", "ß": "ss"})
+
+# Folded endings, longest first: adjectival (-owa, -owych), then noun cases
+_SUFFIXES = sorted((
+    "owego", "owemu", "owych", "owymi", "owym", "owej", "owa", "owe", "owy", "owi", "owie",
+    "ami", "ach", "iem", "ego", "emu", "ymi", "imi", "ych", "ich",
+    "om", "ow", "em", "ej", "ie", "ia", "iu", "ii", "ym", "im",
+    "a", "e", "i", "o", "u", "y",
+), key=len, reverse=True)
+
+STOPWORDS = frozenset({
+    "a", "albo", "ale", "bez", "dla", "do", "i", "lub", "na", "nad", "o", "od", "oraz",
+    "po", "pod", "przez", "w", "we", "z", "za", "ze",
+})
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip diacritics (``Żółć`` -> ``zolc``)."""
+    decomposed = unicodedata.normalize("NFKD", text.lower().translate(_FOLD))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def stem(word: str) -> str:
+    """Strip one inflectional ending from a folded word."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            return word[:-len(suffix)]
+    return word
+
+
+def terms(text: Optional[str]) -> List[str]:
+    """Stems of the words in ``text``, stopwords dropped, in order."""
+    if not text:
+        return []
+    return [stem(word) for word in _WORD.findall(fold(text)) if word not in STOPWORDS]
+
+
+def document(*parts: Optional[str]) -> str:
+    """Space-separated stems of all parts, as stored in the search index."""
+    return " ".join(term for part in parts for term in terms(part))
+
+
+def _matches(word: str, stems: Iterable[str]) -> bool:
+    # A stem is a prefix of its word, so the word itself need not be stemmed
+    folded = fold(word)
+    return any(folded.startswith(s) for s in stems)
+
+
+def snippet(
+    text: Optional[str],
+    stems: Sequence[str],
+    words: int = 16,
+    mark: Sequence[str] = ("<mark>", "</mark>"),
+) -> Optional[str]:
+    """
+    Excerpt of ``text`` around the first query match, matches highlighted.
+
+    The text is HTML-escaped; only the markers are markup.
+
+    Args:
+        text: Original (unnormalized) text
+        stems: Query stems, matched as prefixes
+        words: Excerpt length in words
+        mark: Opening and closing marker
+
+    Returns:
+        Excerpt, or None if nothing in ``text`` matches
+    """
+    if not text or not stems:
+        return None
+    folded = fold(text)
+    if not any(s in folded for s in stems):
+        return None
+    tokens = list(_WORD.finditer(text))
+    hits: Set[int] = {i for i, token in enumerate(tokens) if _matches(token.group(), stems)}
+    if not hits:
+        return None
+
+    start = max(0, min(hits) - words // 4)
+    end = min(len(tokens), start + words)
+    start = max(0, end - words)
+
+    out = ["…" if start > 0 else ""]
+    position = tokens[start].start()
+    for i in range(start, end):
+        token = tokens[i]
+        out.append(html.escape(text[position:token.start()]))
+        word = html.escape(token.group())
+        out.append(f"{mark[0]}{word}{mark[1]}" if i in hits else word)
+        position = token.end()
+    if end < len(tokens):
+        out.append(html.escape(text[position:tokens[end].start()]).rstrip() + " …")
+    else:
+        out.append(html.escape(text[position:]))
+    return "".join(out).strip()
@@ -3,13 +3,34 @@ Database configuration for Ageny Online.
 Zapewnia konfigurację bazy danych z pełną separacją od my_assistant.
 """
 
-from .database import get_db, create_tables, engine, async_session
+from .database import (
+    get_db, create_tables, async_engine, read_engine, async_session, get_sync_engine,
+    migrate, prepare_database, verify_schema,
+)
 from .session import get_async_session
+from .unit_of_work import insert_ignoring_conflicts, insert_returning, on_commit, unit_of_work
 
 __all__ = [
     "get_db",
-    "create_tables", 
+    "create_tables",
+    "migrate",
+    "prepare_database",
+    "verify_schema",
     "engine",
+    "async_engine",
+    "read_engine",
     "async_session",
-    "get_async_session"
-] 
\ No newline at end of file
+    "get_sync_engine",
+    "get_async_session",
+    "unit_of_work",
+    "on_commit",
+    "insert_returning",
+    "insert_ignoring_conflicts",
+]
+
+
+def __getattr__(name):
+    # The sync engine is created lazily (migrations and scripts only)
+    if name == "engine":
+        return get_sync_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,60 +4,203 @@ Zapewnia konfigurację SQLAlchemy z pełną separacją.
 """
 
 import logging
-from typing import AsyncGenerator, Generator
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 
-from sqlalchemy import create_engine
+from alembic import command
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
 
 from backend.config import settings
+from backend.database.sqlite import create_sqlite_engines, is_sqlite_file, routing_session_class
+from backend.exceptions.database import SchemaError
 from backend.models.base import Base
 
 logger = logging.getLogger(__name__)
 
-def get_sync_database_url() -> str:
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+
+def get_async_database_url(db_url: str = None) -> str:
+    """Get async database URL; plain ``postgresql://`` URLs get the asyncpg driver."""
+    db_url = db_url or settings.DATABASE_URL
+    for prefix in ("postgresql://", "postgres://"):
+        if db_url.startswith(prefix):
+            return "postgresql+asyncpg://" + db_url[len(prefix):]
+    return db_url
+
+
+def get_sync_database_url(db_url: str = None) -> str:
     """Get sync database URL for migrations and testing."""
-    db_url = settings.DATABASE_URL
+    db_url = get_async_database_url(db_url)
     if "sqlite+aiosqlite" in db_url:
         return db_url.replace("sqlite+aiosqlite", "sqlite")
     elif "postgresql+asyncpg" in db_url:
         return db_url.replace("postgresql+asyncpg", "postgresql")
     return db_url
 
-# Create async engine for SQLAlchemy 2.0
-async_engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.ENABLE_SQL_LOGGING,
-    future=True,
-    pool_pre_ping=True,
-    pool_recycle=300
-)
 
-# Create sync engine for migrations and testing
-engine = create_engine(
-    get_sync_database_url(),
-    echo=settings.ENABLE_SQL_LOGGING,
-    pool_pre_ping=True,
-    pool_recycle=300
-)
+def engine_options(db_url: str) -> Dict[str, Any]:
+    """Engine keyword arguments for a database URL.
+
+    PostgreSQL gets a sized QueuePool and asyncpg's prepared statement cache;
+    SQLite keeps the driver defaults (one file, writes are serialized anyway).
+    """
+    options: Dict[str, Any] = {"echo": settings.ENABLE_SQL_LOGGING}
+    if not db_url.startswith("postgresql"):
+        return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    if "+asyncpg" in db_url:
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT,
+            "server_settings": {"application_name": "ageny_online"},
+        }
+    return options
+
+
+# Create async engine for SQLAlchemy 2.0
+_async_url = get_async_database_url()
+if settings.SQLITE_TUNING_ENABLED and is_sqlite_file(_async_url):
+    # Writes (and DDL) go through one connection, reads through a pool
+    async_engine, read_engine = create_sqlite_engines(_async_url)
+    _session_options = {"sync_session_class": routing_session_class(read_engine)}
+else:
+    async_engine = create_async_engine(_async_url, **engine_options(_async_url))
+    read_engine = async_engine
+    _session_options = {}
 
 # Create async session factory
 async_session = async_sessionmaker(
     async_engine,
     class_=AsyncSession,
-    expire_on_commit=False
+    expire_on_commit=False,
+    **_session_options
 )
 
-# Create sync session factory
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine
-)
+
+@lru_cache(maxsize=1)
+def get_sync_engine() -> Engine:
+    """Sync engine for migrations and scripts, created on first use.
+
+    The app itself only uses the async engine, so importing this module
+    must not require a sync driver (e.g. psycopg2 next to asyncpg).
+    """
+    url = get_sync_database_url()
+    return create_engine(url, **engine_options(url))
+
+
+@lru_cache(maxsize=1)
+def get_session_local() -> sessionmaker:
+    """Sync session factory bound to ``get_sync_engine``."""
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_sync_engine())
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards compatibility for ``engine`` and ``SessionLocal`` imports
+    if name == "engine":
+        return get_sync_engine()
+    if name == "SessionLocal":
+        return get_session_local()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def alembic_config(connection: Any = None) -> Config:
+    """Alembic config for the bundled migrations (no alembic.ini needed at runtime).
+
+    Args:
+        connection: Sync connection to run on (``AsyncConnection.run_sync``)
+    """
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def _current_revision(connection: Any) -> Optional[str]:
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def _adopt_unversioned(connection: Any) -> None:
+    """Stamp a database created by ``create_all`` before migrations existed.
+
+    The revision is the newest one whose schema is already there, so the
+    upgrade only adds what is missing.
+    """
+    if _current_revision(connection) is not None:
+        return
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    if "users" not in tables:
+        return
+    revision = "0001"
+    if "bulk_jobs" in tables:
+        revision = "0002"
+        if "history_version" in {c["name"] for c in inspector.get_columns("conversations")}:
+            revision = "0003"
+    logger.warning(f"Unversioned database found, stamping migration {revision}")
+    command.stamp(alembic_config(connection), revision)
+
+
+def _upgrade(connection: Any) -> None:
+    _adopt_unversioned(connection)
+    command.upgrade(alembic_config(connection), "head")
+
+
+async def migrate() -> None:
+    """Upgrade the database to the latest migration."""
+    async with async_engine.begin() as conn:
+        await conn.run_sync(_upgrade)
+    logger.info("Database migrated to the latest revision")
+
+
+async def verify_schema() -> None:
+    """Check the database is at the latest migration without changing it.
+
+    Raises:
+        SchemaError: If migrations are missing or the database is ahead of this code
+    """
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+    async with async_engine.connect() as conn:
+        current = await conn.run_sync(_current_revision)
+    if current != head:
+        raise SchemaError(
+            f"Database schema is at revision {current or 'none'}, expected {head}; "
+            f"run 'alembic upgrade head' (or set DATABASE_SCHEMA_MODE=migrate)",
+            current=current,
+            expected=head,
+        )
+    logger.info(f"Database schema verified at revision {head}")
+
+
+async def prepare_database() -> None:
+    """Verify, migrate or create the schema according to ``DATABASE_SCHEMA_MODE``."""
+    mode = settings.DATABASE_SCHEMA_MODE
+    if mode == "migrate":
+        await migrate()
+    elif mode == "create":
+        await create_tables()
+    elif mode != "off":
+        await verify_schema()
 
 
 async def create_tables() -> None:
-    """Create all database tables."""
+    """Create all database tables (tests and throwaway databases; use migrations otherwise)."""
     try:
         async with async_engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
@@ -69,7 +212,7 @@ async def create_tables() -> None:
 
 def get_db() -> Generator[Session, None, None]:
     """Get database session for dependency injection."""
-    db = SessionLocal()
+    db = get_session_local()()
     try:
         yield db
     except Exception:
@@ -88,4 +231,4 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
         finally:
-            await session.close() 
\ No newline at end of file
+            await session.close()
@@ -0,0 +1,82 @@
+"""
+Alembic environment for Ageny Online.
+Uruchamia migracje na silniku asynchronicznym albo na połączeniu przekazanym przez aplikację.
+"""
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from backend.database.database import get_async_database_url
+from backend.models import Base
+from backend.models.search import is_search_table
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """Keep the raw-DDL search tables (FTS5, tsvector) out of autogenerate."""
+    return not (type_ == "table" and is_search_table(name))
+
+
+def _database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or get_async_database_url()
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL instead of running it (``alembic upgrade head --sql``)."""
+    context.configure(
+        url=_database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_name=include_name,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    # Batch mode lets ALTERs work on SQLite (table copy); no-op on PostgreSQL
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+        compare_type=True,
+        include_name=include_name,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    engine = create_async_engine(_database_url(), poolclass=NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+        await connection.commit()
+    await engine.dispose()
+
+
+def run_migrations_online() -> None:
+    """Run on the application's connection if one was passed, else on a new engine."""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+    else:
+        asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,219 @@
+"""Initial schema (tables as created by create_all before migrations)
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('users',
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('is_superuser', sa.Boolean(), nullable=False),
+    sa.Column('full_name', sa.String(length=100), nullable=True),
+    sa.Column('preferences', sa.Text(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_users_username'), ['username'], unique=True)
+
+    op.create_table('conversations',
+    sa.Column('title', sa.String(length=200), nullable=True),
+    sa.Column('session_id', sa.String(length=100), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('agent_type', sa.String(length=50), nullable=False),
+    sa.Column('provider_used', sa.String(length=50), nullable=True),
+    sa.Column('meta_data', sa.JSON(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_conversations_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_conversations_session_id'), ['session_id'], unique=True)
+
+    op.create_table('cost_records',
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('session_id', sa.String(length=100), nullable=False),
+    sa.Column('provider_type', sa.String(length=50), nullable=False),
+    sa.Column('provider_name', sa.String(length=50), nullable=False),
+    sa.Column('model_used', sa.String(length=100), nullable=True),
+    sa.Column('tokens_used', sa.Integer(), nullable=True),
+    sa.Column('cost_usd', sa.Float(), nullable=False),
+    sa.Column('request_type', sa.String(length=50), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('meta_data', sa.String(length=500), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('cost_records', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cost_records_id'), ['id'], unique=False)
+
+    op.create_table('ocr_results',
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('session_id', sa.String(length=100), nullable=False),
+    sa.Column('provider_used', sa.String(length=50), nullable=False),
+    sa.Column('model_used', sa.String(length=100), nullable=True),
+    sa.Column('extracted_text', sa.Text(), nullable=False),
+    sa.Column('confidence', sa.Float(), nullable=True),
+    sa.Column('tokens_used', sa.Integer(), nullable=True),
+    sa.Column('cost', sa.String(length=20), nullable=True),
+    sa.Column('image_size_bytes', sa.Integer(), nullable=True),
+    sa.Column('processing_time', sa.String(length=20), nullable=True),
+    sa.Column('prompt_used', sa.Text(), nullable=True),
+    sa.Column('meta_data', sa.JSON(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('ocr_results', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ocr_results_id'), ['id'], unique=False)
+
+    op.create_table('products',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('unit', sa.String(length=20), nullable=False),
+    sa.Column('price_per_unit', sa.Float(), nullable=True),
+    sa.Column('calories_per_100g', sa.Integer(), nullable=True),
+    sa.Column('proteins', sa.Float(), nullable=True),
+    sa.Column('carbs', sa.Float(), nullable=True),
+    sa.Column('fats', sa.Float(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_products_category'), ['category'], unique=False)
+        batch_op.create_index(batch_op.f('ix_products_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_products_name'), ['name'], unique=False)
+
+    op.create_table('recipes',
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('ingredients', sa.JSON(), nullable=False),
+    sa.Column('instructions', sa.Text(), nullable=False),
+    sa.Column('cooking_time', sa.Integer(), nullable=True),
+    sa.Column('difficulty', sa.String(length=20), nullable=True),
+    sa.Column('servings', sa.Integer(), nullable=True),
+    sa.Column('calories_per_serving', sa.Integer(), nullable=True),
+    sa.Column('tags', sa.JSON(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('is_ai_generated', sa.Boolean(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_recipes_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_recipes_name'), ['name'], unique=False)
+
+    op.create_table('shopping_lists',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('items', sa.JSON(), nullable=False),
+    sa.Column('total_estimated_cost', sa.Float(), nullable=True),
+    sa.Column('is_completed', sa.Boolean(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('shopping_lists', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_shopping_lists_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_shopping_lists_name'), ['name'], unique=False)
+
+    op.create_table('messages',
+    sa.Column('conversation_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('provider_used', sa.String(length=50), nullable=True),
+    sa.Column('model_used', sa.String(length=100), nullable=True),
+    sa.Column('tokens_used', sa.Integer(), nullable=True),
+    sa.Column('cost', sa.String(length=20), nullable=True),
+    sa.Column('processing_time', sa.String(length=20), nullable=True),
+    sa.Column('meta_data', sa.JSON(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_messages_id'), ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_messages_id'))
+
+    op.drop_table('messages')
+    with op.batch_alter_table('shopping_lists', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_shopping_lists_name'))
+        batch_op.drop_index(batch_op.f('ix_shopping_lists_id'))
+
+    op.drop_table('shopping_lists')
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_recipes_name'))
+        batch_op.drop_index(batch_op.f('ix_recipes_id'))
+
+    op.drop_table('recipes')
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_products_name'))
+        batch_op.drop_index(batch_op.f('ix_products_id'))
+        batch_op.drop_index(batch_op.f('ix_products_category'))
+
+    op.drop_table('products')
+    with op.batch_alter_table('ocr_results', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ocr_results_id'))
+
+    op.drop_table('ocr_results')
+    with op.batch_alter_table('cost_records', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cost_records_id'))
+
+    op.drop_table('cost_records')
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_conversations_session_id'))
+        batch_op.drop_index(batch_op.f('ix_conversations_id'))
+
+    op.drop_table('conversations')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_username'))
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
@@ -0,0 +1,94 @@
+"""Add bulk generation jobs
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('bulk_jobs',
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('mode', sa.String(length=10), nullable=False),
+    sa.Column('provider', sa.String(length=50), nullable=True),
+    sa.Column('model', sa.String(length=100), nullable=True),
+    sa.Column('max_tokens', sa.Integer(), nullable=True),
+    sa.Column('temperature', sa.Float(), nullable=True),
+    sa.Column('scheduled_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('next_poll_at', sa.DateTime(), nullable=True),
+    sa.Column('provider_batches', sa.JSON(), nullable=True),
+    sa.Column('total_items', sa.Integer(), nullable=False),
+    sa.Column('completed_items', sa.Integer(), nullable=False),
+    sa.Column('failed_items', sa.Integer(), nullable=False),
+    sa.Column('cost_usd', sa.Float(), nullable=False),
+    sa.Column('list_cost_usd', sa.Float(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('meta_data', sa.JSON(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('bulk_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_bulk_jobs_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_bulk_jobs_scheduled_at'), ['scheduled_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_bulk_jobs_status'), ['status'], unique=False)
+
+    op.create_table('bulk_job_items',
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('custom_id', sa.String(length=100), nullable=True),
+    sa.Column('messages', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('result_text', sa.Text(), nullable=True),
+    sa.Column('provider_used', sa.String(length=50), nullable=True),
+    sa.Column('model_used', sa.String(length=100), nullable=True),
+    sa.Column('input_tokens', sa.Integer(), nullable=True),
+    sa.Column('output_tokens', sa.Integer(), nullable=True),
+    sa.Column('cost_usd', sa.Float(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('target_table', sa.String(length=50), nullable=True),
+    sa.Column('target_id', sa.Integer(), nullable=True),
+    sa.Column('meta_data', sa.JSON(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['bulk_jobs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('bulk_job_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_bulk_job_items_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_bulk_job_items_job_id'), ['job_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('bulk_job_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_bulk_job_items_job_id'))
+        batch_op.drop_index(batch_op.f('ix_bulk_job_items_id'))
+
+    op.drop_table('bulk_job_items')
+    with op.batch_alter_table('bulk_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_bulk_jobs_status'))
+        batch_op.drop_index(batch_op.f('ix_bulk_jobs_scheduled_at'))
+        batch_op.drop_index(batch_op.f('ix_bulk_jobs_id'))
+
+    op.drop_table('bulk_jobs')
@@ -0,0 +1,44 @@
+"""Add composite and covering indexes for hot queries
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 09:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_products_user_id_name', 'products', ['user_id', 'name']),
+    ('ix_products_user_id_category', 'products', ['user_id', 'category']),
+    ('ix_recipes_user_id_name', 'recipes', ['user_id', 'name']),
+    ('ix_shopping_lists_user_id_name', 'shopping_lists', ['user_id', 'name']),
+    ('ix_shopping_lists_user_id_created_at', 'shopping_lists', ['user_id', 'created_at']),
+    ('ix_messages_conversation_id_created_at', 'messages', ['conversation_id', 'created_at']),
+    ('ix_ocr_results_user_id_created_at', 'ocr_results', ['user_id', 'created_at']),
+    ('ix_ocr_results_session_id_created_at', 'ocr_results', ['session_id', 'created_at']),
+    ('ix_cost_records_user_id_timestamp', 'cost_records', ['user_id', 'timestamp', 'cost_usd', 'tokens_used']),
+    ('ix_cost_records_timestamp', 'cost_records', ['timestamp', 'cost_usd', 'tokens_used']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # IF NOT EXISTS: databases adopted from create_all may already have some of them
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,46 @@
+"""Make product, recipe and shopping list names unique per user
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 23:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['products', 'recipes', 'shopping_lists']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    for table in TABLES:
+        # Services checked names before inserting, but renames could still collide
+        duplicates = conn.execute(sa.text(
+            f"SELECT user_id, name FROM {table} GROUP BY user_id, name HAVING COUNT(*) > 1 LIMIT 5"
+        )).fetchall()
+        if duplicates:
+            raise RuntimeError(
+                f"Cannot add uq_{table}_user_id_name: duplicate (user_id, name) rows in {table}, "
+                f"e.g. {[tuple(row) for row in duplicates]}; rename or remove them and rerun the migration"
+            )
+
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_user_id_name', table_name=table, if_exists=True)
+        op.create_index(f'uq_{table}_user_id_name', table, ['user_id', 'name'], unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(TABLES):
+        op.drop_index(f'uq_{table}_user_id_name', table_name=table, if_exists=True)
+        op.create_index(f'ix_{table}_user_id_name', table, ['user_id', 'name'], unique=False, if_not_exists=True)
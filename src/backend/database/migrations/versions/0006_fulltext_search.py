@@ -0,0 +1,36 @@
+"""Add full-text search tables for products and recipes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# DDL and documents come from the application: the stored text is produced by
+# its stemmer, so a rebuilt index must use the same code as the write path.
+from backend.models.search import SEARCH_TABLES, create_search_table, drop_search_table, reindex
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    for source in SEARCH_TABLES:
+        create_search_table(conn, source)
+        reindex(conn, source)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    for source in reversed(list(SEARCH_TABLES)):
+        drop_search_table(conn, source)
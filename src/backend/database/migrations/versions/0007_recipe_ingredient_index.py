@@ -0,0 +1,63 @@
+"""Add the inverted ingredient index for recipes
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Keys come from the application's normalizer, the same code the write path uses
+from backend.models.recipe import ingredient_keys
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('recipe_ingredients',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('ingredient', sa.String(length=100), nullable=False),
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('ingredient_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'ingredient', 'recipe_id'),
+    sqlite_with_rowid=False,
+    if_not_exists=True,
+    )
+    op.create_index('ix_recipe_ingredients_recipe_id', 'recipe_ingredients', ['recipe_id'], unique=False, if_not_exists=True)
+
+    conn = op.get_bind()
+    index = sa.table(
+        'recipe_ingredients', sa.column('user_id'), sa.column('ingredient'), sa.column('recipe_id'),
+        sa.column('ingredient_count'),
+    )
+    recipes = sa.table('recipes', sa.column('id'), sa.column('user_id'), sa.column('ingredients', sa.JSON))
+    conn.execute(sa.delete(index))
+    result = conn.execute(sa.select(recipes).execution_options(yield_per=BATCH_SIZE))
+    for rows in result.partitions():
+        postings = []
+        for row in rows:
+            keys = ingredient_keys(row.ingredients)
+            postings += [
+                dict(user_id=row.user_id, ingredient=key, recipe_id=row.id, ingredient_count=len(keys))
+                for key in keys
+            ]
+        if postings:
+            conn.execute(sa.insert(index), postings)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recipe_ingredients_recipe_id', table_name='recipe_ingredients', if_exists=True)
+    op.drop_table('recipe_ingredients', if_exists=True)
@@ -0,0 +1,52 @@
+"""Add materialized recipe nutrition
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 01:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows are computed on first read, nothing to backfill
+    op.create_table('recipe_nutrition',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('calories', sa.Float(), nullable=False),
+    sa.Column('proteins', sa.Float(), nullable=False),
+    sa.Column('carbs', sa.Float(), nullable=False),
+    sa.Column('fats', sa.Float(), nullable=False),
+    sa.Column('fiber', sa.Float(), nullable=False),
+    sa.Column('sugar', sa.Float(), nullable=False),
+    sa.Column('unresolved', sa.JSON(), nullable=False),
+    sa.Column('table_version', sa.String(length=16), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True,
+    )
+    op.create_index('ix_recipe_nutrition_id', 'recipe_nutrition', ['id'], unique=False, if_not_exists=True)
+    op.create_index('uq_recipe_nutrition_recipe_id', 'recipe_nutrition', ['recipe_id'], unique=True, if_not_exists=True)
+    op.create_index('ix_recipe_nutrition_user_id', 'recipe_nutrition', ['user_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recipe_nutrition_user_id', table_name='recipe_nutrition', if_exists=True)
+    op.drop_index('uq_recipe_nutrition_recipe_id', table_name='recipe_nutrition', if_exists=True)
+    op.drop_index('ix_recipe_nutrition_id', table_name='recipe_nutrition', if_exists=True)
+    op.drop_table('recipe_nutrition', if_exists=True)
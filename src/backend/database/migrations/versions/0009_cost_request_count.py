@@ -0,0 +1,46 @@
+"""Add request count to cost records
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 02:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Covering indexes of the daily cost rollups, before and after the new column
+INDEXES = [
+    ('ix_cost_records_user_id_timestamp', ['user_id', 'timestamp', 'cost_usd', 'tokens_used']),
+    ('ix_cost_records_timestamp', ['timestamp', 'cost_usd', 'tokens_used']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases adopted from create_all already have the column
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('cost_records')}
+    if 'request_count' not in columns:
+        # Existing records were one request each
+        with op.batch_alter_table('cost_records', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('request_count', sa.Integer(), server_default=sa.text('1'), nullable=False))
+    for name, columns in INDEXES:
+        op.drop_index(name, table_name='cost_records', if_exists=True)
+        op.create_index(name, 'cost_records', columns + ['request_count'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, columns in INDEXES:
+        op.drop_index(name, table_name='cost_records', if_exists=True)
+        op.create_index(name, 'cost_records', columns, unique=False)
+    with op.batch_alter_table('cost_records', schema=None) as batch_op:
+        batch_op.drop_column('request_count')
@@ -0,0 +1,120 @@
+"""
+Keyset (cursor) pagination.
+Stronicowanie po kolumnach sortowania zamiast OFFSET, ze stałym kosztem kolejnych stron.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, List, Optional, Sequence
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.exceptions.database import ValidationError
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Page(list):
+    """
+    One page of results: a plain list plus ``next_cursor``.
+
+    ``next_cursor`` is None on the last page. Being a list keeps callers that
+    predate cursors working unchanged.
+    """
+
+    def __init__(self, items: Iterable[Any] = (), next_cursor: Optional[str] = None) -> None:
+        super().__init__(items)
+        self.next_cursor = next_cursor
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key values of the last row on a page."""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Sort key values from a cursor.
+
+    Raises:
+        ValidationError: If the cursor is malformed or for a different sort key
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError("Invalid pagination cursor", field="cursor", value=cursor)
+    if not isinstance(values, list) or len(values) != size:
+        raise ValidationError("Invalid pagination cursor", field="cursor", value=cursor)
+    try:
+        return [_decode_value(v) for v in values]
+    except ValueError:
+        raise ValidationError("Invalid pagination cursor", field="cursor", value=cursor)
+
+
+async def paginate(
+    session: AsyncSession,
+    query: Select,
+    order_by: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    offset: int = 0,
+) -> Page:
+    """
+    Run ``query`` one page at a time, ordered by ``order_by``.
+
+    The last sort column must be unique (normally ``id``) so rows with equal
+    names or timestamps are neither skipped nor repeated. With a cursor the
+    page starts right after the row it encodes, which an index on the sort
+    columns finds without reading the earlier pages.
+
+    Args:
+        session: Database session
+        query: Select of one mapped entity with its filters applied
+        order_by: Sort columns, most significant first
+        limit: Maximum number of rows
+        cursor: ``next_cursor`` of the previous page
+        descending: Sort all columns descending
+        offset: Deprecated OFFSET paging, ignored when a cursor is given
+
+    Returns:
+        Page of entities with ``next_cursor`` set if more rows follow
+    """
+    if cursor:
+        key = tuple_(*order_by)
+        values = tuple_(*decode_cursor(cursor, len(order_by)))
+        query = query.where(key < values if descending else key > values)
+    elif offset:
+        query = query.offset(offset)
+
+    query = query.order_by(*(c.desc() if descending else c.asc() for c in order_by)).limit(limit + 1)
+    rows = (await session.execute(query)).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in order_by])
+    return Page(rows, next_cursor)
@@ -9,19 +9,16 @@ from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .database import async_session
+from .unit_of_work import unit_of_work
 
 logger = logging.getLogger(__name__)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    """Get async database session with proper lifecycle management."""
-    async with async_session() as session:
-        try:
+    """Get a request-scoped session: services flush, the request commits once."""
+    try:
+        async with unit_of_work(async_session) as session:
             yield session
-            await session.commit()
-        except Exception as e:
-            logger.error(f"Database session error: {e}")
-            await session.rollback()
-            raise
-        finally:
-            await session.close() 
\ No newline at end of file
+    except Exception as e:
+        logger.error(f"Database session error: {e}")
+        raise
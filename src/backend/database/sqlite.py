@@ -0,0 +1,121 @@
+"""
+SQLite tuning for single-node deployments.
+Tryb WAL, pragmy per połączenie, jedno połączenie zapisujące i pula połączeń do odczytu.
+"""
+
+import logging
+from typing import Any, Optional, Tuple, Type
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WROTE = "sqlite_wrote"
+
+
+def is_sqlite_file(db_url: str) -> bool:
+    """True for file-backed SQLite URLs (in-memory databases cannot share connections)."""
+    return db_url.startswith("sqlite") and ":memory:" not in db_url and not db_url.rstrip("/").endswith(":")
+
+
+def apply_pragmas(dbapi_connection: Any, readonly: bool = False) -> None:
+    """Apply the per-connection pragmas.
+
+    Args:
+        dbapi_connection: DBAPI connection (the aiosqlite adapter works synchronously here)
+        readonly: Reject writes on this connection (read pool)
+    """
+    pragmas = [
+        f"busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        f"mmap_size={settings.SQLITE_MMAP_SIZE}",
+        "temp_store=MEMORY",
+    ]
+    if settings.SQLITE_WAL_ENABLED:
+        # Persistent in the file; readers no longer block the writer (and vice versa)
+        pragmas.insert(0, "journal_mode=WAL")
+    if readonly:
+        pragmas.append("query_only=ON")
+
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}")
+    finally:
+        cursor.close()
+
+
+def create_sqlite_engines(db_url: str) -> Tuple[AsyncEngine, AsyncEngine]:
+    """Create the writer and reader engines for a SQLite file.
+
+    The writer has exactly one connection, so writes from this process queue
+    for it in the pool instead of failing with "database is locked"; its
+    transactions start with ``BEGIN IMMEDIATE`` to take the lock up front.
+    Readers get a small pool of ``query_only`` connections that, in WAL mode,
+    run alongside the writer.
+
+    Returns:
+        (writer, reader) async engines
+    """
+    common = {"echo": settings.ENABLE_SQL_LOGGING, "pool_timeout": settings.DB_POOL_TIMEOUT, "max_overflow": 0}
+    writer = create_async_engine(db_url, pool_size=1, **common)
+    reader = create_async_engine(db_url, pool_size=settings.SQLITE_READ_POOL_SIZE, **common)
+
+    @event.listens_for(writer.sync_engine, "connect")
+    def _connect_writer(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection)
+        # Let SQLAlchemy emit BEGIN itself (see _begin_writer)
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(writer.sync_engine, "begin")
+    def _begin_writer(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    @event.listens_for(reader.sync_engine, "connect")
+    def _connect_reader(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, readonly=True)
+
+    logger.info(
+        f"SQLite tuning active: WAL={settings.SQLITE_WAL_ENABLED}, "
+        f"synchronous={settings.SQLITE_SYNCHRONOUS}, readers={settings.SQLITE_READ_POOL_SIZE}"
+    )
+    return writer, reader
+
+
+class SQLiteRoutingSession(Session):
+    """
+    Session sending reads to the read pool and writes to the writer connection.
+
+    Once a transaction has written, the rest of it stays on the writer so it
+    sees its own uncommitted rows. ``reader`` is set on the subclass made by
+    ``routing_session_class``; without it everything uses the session's bind.
+    """
+
+    reader: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.reader is None:
+            return super().get_bind(mapper, clause=clause, **kw)
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info[_WROTE] = True
+        if self.info.get(_WROTE):
+            return super().get_bind(mapper, clause=clause, **kw)
+        return self.reader
+
+
+@event.listens_for(SQLiteRoutingSession, "after_transaction_end")
+def _reset_route(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_WROTE, None)
+
+
+def routing_session_class(reader: AsyncEngine) -> Type[SQLiteRoutingSession]:
+    """Sync session class for ``async_sessionmaker(sync_session_class=...)``."""
+    return type("SQLiteReadWriteSession", (SQLiteRoutingSession,), {"reader": reader.sync_engine})
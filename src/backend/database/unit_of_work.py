@@ -0,0 +1,105 @@
+"""
+Unit of work: one transaction and one commit per request or background task.
+Jedna transakcja i jeden commit na żądanie; serwisy wykonują tylko flush.
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Sequence, Type, TypeVar
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.models.base import Base
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=Base)
+
+_ACTIVE = "unit_of_work"
+_AFTER_COMMIT = "unit_of_work_after_commit"
+
+# Dialects with INSERT ... ON CONFLICT DO NOTHING
+_CONFLICT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+@asynccontextmanager
+async def unit_of_work(session_factory: async_sessionmaker) -> AsyncIterator[AsyncSession]:
+    """
+    Session committed once when the block exits, rolled back on error.
+
+    Services used inside only flush. Callbacks registered with
+    :func:`on_commit` run after the commit and are dropped on rollback.
+    """
+    async with session_factory() as session:
+        session.info[_ACTIVE] = True
+        try:
+            yield session
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            raise
+        callbacks = session.info.pop(_AFTER_COMMIT, [])
+
+    for callback in callbacks:
+        try:
+            await callback()
+        except Exception as e:
+            logger.error(f"After-commit callback failed: {e}")
+
+
+async def on_commit(session: AsyncSession, callback: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Run ``callback`` once the session's unit of work has committed.
+
+    Used for side effects other readers must not see early, e.g. cache
+    invalidation. Outside a unit of work the callback runs immediately.
+    """
+    if session.info.get(_ACTIVE):
+        session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+    else:
+        await callback()
+
+
+async def insert_returning(
+    session: AsyncSession,
+    model: Type[ModelT],
+    values: Dict[str, Any],
+    conflict_on: Optional[Sequence[str]] = None,
+) -> Optional[ModelT]:
+    """
+    Insert one row and load it from ``RETURNING`` in the same round trip.
+
+    Args:
+        session: Database session
+        model: Mapped class
+        values: Column values
+        conflict_on: Columns of a unique index whose conflicts are ignored
+            (empty for any unique constraint); None to let them raise
+
+    Returns:
+        The new instance, or None if the row conflicted
+    """
+    statement = insert(model) if conflict_on is None else insert_ignoring_conflicts(session, model, conflict_on)
+    result = await session.execute(statement.values(**values).returning(model))
+    return result.scalar_one_or_none()
+
+
+def insert_ignoring_conflicts(session: AsyncSession, model: Type[Base], conflict_on: Sequence[str] = ()) -> Any:
+    """
+    ``INSERT ... ON CONFLICT DO NOTHING`` for the session's dialect.
+
+    Args:
+        session: Database session
+        model: Mapped class
+        conflict_on: Columns of the unique index whose conflicts are ignored
+            (empty for any unique constraint)
+
+    Returns:
+        Insert statement; a plain INSERT on dialects without ON CONFLICT
+    """
+    dialect = session.bind.dialect.name
+    if dialect not in _CONFLICT_INSERTS:
+        return insert(model)
+    return _CONFLICT_INSERTS[dialect](model).on_conflict_do_nothing(index_elements=list(conflict_on) or None)
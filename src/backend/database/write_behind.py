@@ -0,0 +1,233 @@
+"""
+Write-behind queue for append-only records.
+Buforuje zapisy (wiadomości, wyniki OCR, koszty) i zapisuje je partiami poza ścieżką żądania.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.models.base import Base
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_DEPTH = Gauge("write_behind_queue_depth", "Records waiting to be flushed")
+WRITE_BEHIND_FLUSH_SECONDS = Histogram(
+    "write_behind_flush_duration_seconds",
+    "Time to insert and commit one batch",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+WRITE_BEHIND_ENQUEUE_WAIT_SECONDS = Histogram(
+    "write_behind_enqueue_wait_seconds",
+    "Time producers waited for queue space (backpressure)",
+    buckets=(0.0001, 0.001, 0.01, 0.1, 0.5, 1.0, 5.0),
+)
+WRITE_BEHIND_ROWS = Counter(
+    "write_behind_rows_total",
+    "Records flushed by table and outcome",
+    ["table", "outcome"],
+)
+
+_STOP = object()
+
+Entry = Tuple[Type[Base], Dict[str, Any], asyncio.Future]
+
+
+def _consume(future: asyncio.Future) -> None:
+    # Nobody has to await a write; don't warn about unretrieved failures
+    if not future.cancelled():
+        future.exception()
+
+
+class WriteBehindQueue:
+    """
+    Buffers inserts and flushes them as multi-row INSERTs.
+
+    A batch is flushed when ``batch_size`` records are waiting or
+    ``flush_interval`` seconds after its first record. The queue is bounded:
+    producers wait for space when the database falls behind. Failed batches
+    are retried with backoff; ``stop`` drains everything that was accepted.
+    Records are plain column dicts, so nothing needs the producer's session.
+    """
+
+    def __init__(
+        self,
+        session_factory: Any = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        retries: Optional[int] = None,
+        retry_backoff: float = 0.5,
+    ) -> None:
+        self._session_factory = session_factory
+        self.batch_size = batch_size or settings.WRITE_BEHIND_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else settings.WRITE_BEHIND_FLUSH_INTERVAL
+        self.max_pending = max_pending or settings.WRITE_BEHIND_MAX_PENDING
+        self.retries = retries if retries is not None else settings.WRITE_BEHIND_RETRIES
+        self.retry_backoff = retry_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def session_factory(self) -> Any:
+        """Session factory used for flushes"""
+        if self._session_factory is None:
+            from backend.database.database import async_session
+            self._session_factory = async_session
+        return self._session_factory
+
+    @property
+    def running(self) -> bool:
+        """Whether records are currently buffered instead of written inline"""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def depth(self) -> int:
+        """Records waiting to be flushed"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        """Start the flush loop on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Write-behind queue started (batch {self.batch_size}, interval {self.flush_interval}s)")
+
+    async def stop(self) -> None:
+        """Stop accepting records and flush everything already queued."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        await self._queue.put(_STOP)
+        await task
+        # Producers that were blocked on a full queue got their slot after the loop ended
+        await self._drain()
+        WRITE_BEHIND_DEPTH.set(0)
+        logger.info("Write-behind queue drained and stopped")
+
+    async def put(self, model: Type[Base], values: Dict[str, Any]) -> asyncio.Future:
+        """
+        Queue one record, waiting for space when the queue is full.
+
+        Args:
+            model: Mapped model class (the target table)
+            values: Column values
+
+        Returns:
+            Future resolved once the record is committed (or failed for good)
+
+        Raises:
+            RuntimeError: If the queue is not running
+        """
+        if not self.running:
+            raise RuntimeError("Write-behind queue is not running")
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume)
+        start = time.perf_counter()
+        await self._queue.put((model, values, future))
+        WRITE_BEHIND_ENQUEUE_WAIT_SECONDS.observe(time.perf_counter() - start)
+        WRITE_BEHIND_DEPTH.set(self._queue.qsize())
+        return future
+
+    async def submit(self, model: Type[Base], values: Dict[str, Any], session: AsyncSession) -> Base:
+        """
+        Queue a record, or flush it on ``session`` when the queue is not running.
+
+        Returns:
+            Model instance; when queued it is not persisted yet (no ``id``)
+        """
+        if self.running:
+            await self.put(model, values)
+            return model(**values)
+        record = model(**values)
+        session.add(record)
+        await session.flush()
+        return record
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch: List[Entry] = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    item = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            WRITE_BEHIND_DEPTH.set(self._queue.qsize())
+            await self._flush(batch)
+        await self._drain()
+
+    async def _drain(self) -> None:
+        batch: List[Entry] = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                batch.append(item)
+            if len(batch) >= self.batch_size:
+                await self._flush(batch)
+                batch = []
+        if batch:
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Entry]) -> None:
+        """Insert a batch in one transaction, one multi-row INSERT per table."""
+        groups: Dict[Type[Base], List[Dict[str, Any]]] = {}
+        for model, values, _ in batch:
+            groups.setdefault(model, []).append(values)
+
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            try:
+                async with self.session_factory() as session:
+                    for model, rows in groups.items():
+                        await session.execute(insert(model), rows)
+                    await session.commit()
+            except Exception as e:
+                if attempt < self.retries:
+                    logger.warning(f"Write-behind flush of {len(batch)} records failed, retrying: {e}")
+                    await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+                    continue
+                self._dead_letter(groups, e)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            WRITE_BEHIND_FLUSH_SECONDS.observe(time.perf_counter() - start)
+            for model, rows in groups.items():
+                WRITE_BEHIND_ROWS.labels(model.__tablename__, "flushed").inc(len(rows))
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+            return
+
+    @staticmethod
+    def _dead_letter(groups: Dict[Type[Base], List[Dict[str, Any]]], error: Exception) -> None:
+        """Log records that could not be written so they can be replayed by hand."""
+        for model, rows in groups.items():
+            WRITE_BEHIND_ROWS.labels(model.__tablename__, "failed").inc(len(rows))
+            for row in rows:
+                logger.error(
+                    f"Write-behind dropped {model.__tablename__} record after retries ({error}): "
+                    f"{json.dumps(row, default=str, ensure_ascii=False)}"
+                )
+
+
+write_behind_queue = WriteBehindQueue()
@@ -6,8 +6,9 @@ Zapewnia hierarchię wyjątków z pełną separacją od my_assistant.
 from .base import AgenyOnlineError
 from .agent import AgentError, UnsupportedAgentTypeError
 from .ocr import OCRError, OCRProviderError
-from .database import DatabaseError, ValidationError
+from .database import DatabaseError, SchemaError, ValidationError
 from .auth import AuthenticationError, AuthorizationError
+from .cooking import RecipeGenerationError
 
 __all__ = [
     "AgenyOnlineError",
@@ -16,7 +17,9 @@ __all__ = [
     "OCRError",
     "OCRProviderError",
     "DatabaseError",
+    "SchemaError",
     "ValidationError",
     "AuthenticationError",
-    "AuthorizationError"
+    "AuthorizationError",
+    "RecipeGenerationError"
 ] 
\ No newline at end of file
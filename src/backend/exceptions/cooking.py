@@ -0,0 +1,13 @@
+"""
+Cooking exceptions for Ageny Online.
+Zapewnia wyjątki funkcji kulinarnych.
+"""
+
+from .base import AgenyOnlineError
+
+
+class RecipeGenerationError(AgenyOnlineError):
+    """Raised when no LLM provider could generate a recipe."""
+    
+    def __init__(self, message: str, **kwargs):
+        super().__init__(message, error_code="RECIPE_GENERATION_ERROR", **kwargs)
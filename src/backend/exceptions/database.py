@@ -9,8 +9,8 @@ from .base import AgenyOnlineError
 class DatabaseError(AgenyOnlineError):
     """Base exception for database operations."""
     
-    def __init__(self, message: str, table: str = None, **kwargs):
-        super().__init__(message, error_code="DATABASE_ERROR", **kwargs)
+    def __init__(self, message: str, table: str = None, error_code: str = "DATABASE_ERROR", **kwargs):
+        super().__init__(message, error_code=error_code, **kwargs)
         self.table = table
 
 
@@ -24,4 +24,17 @@ class ValidationError(DatabaseError):
             details={"field": field, "value": value}
         )
         self.field = field
-        self.value = value 
\ No newline at end of file
+        self.value = value
+
+
+class SchemaError(DatabaseError):
+    """Raised when the database schema is not at the latest migration."""
+
+    def __init__(self, message: str, current: str = None, expected: str = None):
+        super().__init__(
+            message=message,
+            error_code="SCHEMA_ERROR",
+            details={"current": current, "expected": expected}
+        )
+        self.current = current
+        self.expected = expected
@@ -9,8 +9,11 @@ from .conversation import Conversation, Message
 from .ocr_result import OCRResult
 from .cost_tracking import CostRecord
 from .product import Product
-from .recipe import Recipe
+from .recipe import Recipe, recipe_ingredients
+from .nutrition import RecipeNutrition
 from .shopping_list import ShoppingList
+from .bulk_job import BulkJob, BulkJobItem
+from . import search  # noqa: F401  (attaches full-text search DDL to products and recipes)
 
 __all__ = [
     "Base",
@@ -21,5 +24,9 @@ __all__ = [
     "CostRecord",
     "Product",
     "Recipe",
-    "ShoppingList"
+    "recipe_ingredients",
+    "RecipeNutrition",
+    "ShoppingList",
+    "BulkJob",
+    "BulkJobItem"
 ] 
\ No newline at end of file
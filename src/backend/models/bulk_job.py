@@ -0,0 +1,79 @@
+"""
+Bulk generation job models for Ageny Online.
+Zapewnia modele zadań masowego generowania (batch API i kolejka w tle).
+"""
+
+from sqlalchemy import Column, String, Text, Integer, Float, ForeignKey, DateTime, JSON
+from sqlalchemy.orm import relationship
+
+from .base import Base
+
+
+class BulkJob(Base):
+    """Offline bulk generation job."""
+    
+    __tablename__ = "bulk_jobs"
+    
+    name = Column(String(200), nullable=False)
+    kind = Column(String(30), nullable=False, default="text")  # text, recipe
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending, submitted, running, completed, failed, cancelled
+    mode = Column(String(10), nullable=False, default="queue")  # batch, queue
+    provider = Column(String(50), nullable=True)  # None = fallback order (queue mode only)
+    model = Column(String(100), nullable=True)
+    max_tokens = Column(Integer, nullable=True)
+    temperature = Column(Float, nullable=True)
+    scheduled_at = Column(DateTime, nullable=True, index=True)  # off-peak start
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    next_poll_at = Column(DateTime, nullable=True)
+    provider_batches = Column(JSON, nullable=True)  # [{"id": ..., "status": ..., "items": n}]
+    total_items = Column(Integer, nullable=False, default=0)
+    completed_items = Column(Integer, nullable=False, default=0)
+    failed_items = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+    list_cost_usd = Column(Float, nullable=False, default=0.0)  # same usage at synchronous prices
+    error = Column(Text, nullable=True)
+    meta_data = Column(JSON, nullable=True)
+    
+    # Relationships - using class names only
+    items = relationship(
+        "BulkJobItem",
+        back_populates="job",
+        cascade="all, delete-orphan"
+    )
+    
+    def __repr__(self) -> str:
+        """String representation for debugging."""
+        return f"<BulkJob(id={self.id}, name='{self.name}', status='{self.status}', mode='{self.mode}')>"
+
+
+class BulkJobItem(Base):
+    """Single prompt of a bulk job."""
+    
+    __tablename__ = "bulk_job_items"
+    
+    job_id = Column(Integer, ForeignKey("bulk_jobs.id"), nullable=False, index=True)
+    custom_id = Column(String(100), nullable=True)  # caller supplied reference
+    messages = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, succeeded, failed, cancelled
+    result_text = Column(Text, nullable=True)
+    provider_used = Column(String(50), nullable=True)
+    model_used = Column(String(100), nullable=True)
+    input_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    cost_usd = Column(Float, nullable=True)
+    error = Column(Text, nullable=True)
+    target_table = Column(String(50), nullable=True)  # e.g. recipes
+    target_id = Column(Integer, nullable=True)
+    meta_data = Column(JSON, nullable=True)
+    
+    # Relationships - using class names only
+    job = relationship(
+        "BulkJob",
+        back_populates="items"
+    )
+    
+    def __repr__(self) -> str:
+        """String representation for debugging."""
+        return f"<BulkJobItem(id={self.id}, job_id={self.job_id}, status='{self.status}')>"
@@ -3,7 +3,7 @@ Conversation and Message models for Ageny Online.
 Zapewnia modele konwersacji z pełną separacją.
 """
 
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -21,6 +21,12 @@ class Conversation(Base):
     provider_used = Column(String(50), nullable=True)
     meta_data = Column(JSON, nullable=True)
     
+    # Rolling summary of messages up to summary_message_id (ConversationMemory)
+    summary = Column(Text, nullable=True)
+    summary_message_id = Column(Integer, nullable=True)
+    # Bumped on message edits/deletes so in-flight summaries of old history are discarded
+    history_version = Column(Integer, default=0, nullable=False)
+    
     # Relationships - using class names only
     user = relationship(
         "User",
@@ -42,6 +48,11 @@ class Message(Base):
     
     __tablename__ = "messages"
     
+    __table_args__ = (
+        # History of a conversation in order
+        Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at"),
+    )
+    
     conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
     role = Column(String(20), nullable=False)  # user, assistant, system
     content = Column(Text, nullable=False)
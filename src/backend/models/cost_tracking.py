@@ -3,7 +3,7 @@ Cost Tracking model for Ageny Online.
 Zapewnia model śledzenia kosztów z pełną separacją.
 """
 
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -15,6 +15,12 @@ class CostRecord(Base):
     
     __tablename__ = "cost_records"
     
+    __table_args__ = (
+        # Covering: daily cost rollups read only the index
+        Index("ix_cost_records_user_id_timestamp", "user_id", "timestamp", "cost_usd", "tokens_used", "request_count"),
+        Index("ix_cost_records_timestamp", "timestamp", "cost_usd", "tokens_used", "request_count"),
+    )
+    
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     session_id = Column(String(100), nullable=False)
     provider_type = Column(String(50), nullable=False)  # llm, ocr, vector_store
@@ -22,6 +28,7 @@ class CostRecord(Base):
     model_used = Column(String(100), nullable=True)
     tokens_used = Column(Integer, nullable=True)
     cost_usd = Column(Float, nullable=False, default=0.0)
+    request_count = Column(Integer, nullable=False, default=1, server_default="1")  # API calls covered by the record
     request_type = Column(String(50), nullable=False)  # chat, completion, embedding, etc.
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
     meta_data = Column(String(500), nullable=True)  # Additional info as JSON string
@@ -0,0 +1,40 @@
+"""
+Materialized recipe nutrition.
+Zapisane wartości odżywcze przepisów, unieważniane przy zmianie przepisu lub produktów.
+"""
+
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, JSON, String
+
+from .base import Base
+
+
+class RecipeNutrition(Base):
+    """Nutrient totals of a whole recipe, computed by NutritionService.
+
+    Rows are dropped when the recipe's ingredients or the user's products
+    change, and recomputed when ``table_version`` no longer matches the
+    bundled nutrient table.
+    """
+
+    __tablename__ = "recipe_nutrition"
+
+    __table_args__ = (
+        Index("uq_recipe_nutrition_recipe_id", "recipe_id", unique=True),
+        # Invalidation when a product changes
+        Index("ix_recipe_nutrition_user_id", "user_id"),
+    )
+
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, nullable=False)
+    calories = Column(Float, nullable=False)
+    proteins = Column(Float, nullable=False)  # g
+    carbs = Column(Float, nullable=False)  # g
+    fats = Column(Float, nullable=False)  # g
+    fiber = Column(Float, nullable=False)  # g
+    sugar = Column(Float, nullable=False)  # g
+    unresolved = Column(JSON, nullable=False)  # ingredients left out (unknown food or amount)
+    table_version = Column(String(16), nullable=False)
+
+    def __repr__(self) -> str:
+        """String representation for debugging."""
+        return f"<RecipeNutrition(recipe_id={self.recipe_id}, calories={self.calories})>"
@@ -3,7 +3,7 @@ OCR Result model for Ageny Online.
 Zapewnia model wyników OCR z pełną separacją.
 """
 
-from sqlalchemy import Column, String, Text, Integer, Float, JSON, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, Float, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -14,6 +14,11 @@ class OCRResult(Base):
     
     __tablename__ = "ocr_results"
     
+    __table_args__ = (
+        Index("ix_ocr_results_user_id_created_at", "user_id", "created_at"),
+        Index("ix_ocr_results_session_id_created_at", "session_id", "created_at"),
+    )
+    
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     session_id = Column(String(100), nullable=False)
     provider_used = Column(String(50), nullable=False)
@@ -3,7 +3,7 @@ Product model for cooking features.
 Zapewnia model produktów spożywczych z pełną separacją.
 """
 
-from sqlalchemy import Column, String, Float, Integer, ForeignKey
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -14,6 +14,12 @@ class Product(Base):
     
     __tablename__ = "products"
     
+    __table_args__ = (
+        # Names are unique per user; lookups by name and listings (get_product_by_name, list_products, list_categories)
+        Index("uq_products_user_id_name", "user_id", "name", unique=True),
+        Index("ix_products_user_id_category", "user_id", "category"),
+    )
+    
     name = Column(String(100), nullable=False, index=True)
     category = Column(String(50), nullable=False, index=True)  # warzywa, mięso, nabiał, etc.
     unit = Column(String(20), nullable=False)  # kg, szt, l, etc.
@@ -3,17 +3,28 @@ Recipe model for cooking features.
 Zapewnia model przepisów kulinarnych z pełną separacją.
 """
 
-from sqlalchemy import Column, String, Text, Integer, Boolean, ForeignKey, JSON
+from typing import Any, Iterable, List
+
+from sqlalchemy import Column, String, Text, Integer, Boolean, ForeignKey, JSON, Index, PrimaryKeyConstraint, Table
 from sqlalchemy.orm import relationship
 
+from backend.core.name_matcher import name_key
+
 from .base import Base
 
+INGREDIENT_KEY_LENGTH = 100
+
 
 class Recipe(Base):
     """Recipe model for cooking recipes."""
     
     __tablename__ = "recipes"
     
+    __table_args__ = (
+        # Names are unique per user (inserts use ON CONFLICT DO NOTHING)
+        Index("uq_recipes_user_id_name", "user_id", "name", unique=True),
+    )
+    
     name = Column(String(200), nullable=False, index=True)
     description = Column(Text, nullable=True)
     ingredients = Column(JSON, nullable=False)  # lista składników z ilościami
@@ -31,4 +42,33 @@ class Recipe(Base):
     
     def __repr__(self) -> str:
         """String representation for debugging."""
-        return f"<Recipe(id={self.id}, name='{self.name}', difficulty='{self.difficulty}')>" 
\ No newline at end of file
+        return f"<Recipe(id={self.id}, name='{self.name}', difficulty='{self.difficulty}')>"
+
+
+# Inverted ingredient index: normalized ingredient -> recipe IDs, per user.
+# The primary key keeps each (user, ingredient) posting list sorted by recipe
+# ID (clustered on SQLite via WITHOUT ROWID). Every posting repeats the
+# recipe's ingredient count, so coverage is computed from the matching
+# postings alone. Maintained by CookingRecipeService.
+recipe_ingredients = Table(
+    "recipe_ingredients",
+    Base.metadata,
+    Column("user_id", Integer, nullable=False),
+    Column("ingredient", String(INGREDIENT_KEY_LENGTH), nullable=False),
+    Column("recipe_id", Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False),
+    Column("ingredient_count", Integer, nullable=False),
+    PrimaryKeyConstraint("user_id", "ingredient", "recipe_id"),
+    Index("ix_recipe_ingredients_recipe_id", "recipe_id"),
+    sqlite_with_rowid=False,
+)
+
+
+def ingredient_name(item: Any) -> str:
+    """Name of a ``Recipe.ingredients`` entry (dict with ``name`` or plain string)."""
+    return (item.get("name") or "") if isinstance(item, dict) else str(item)
+
+
+def ingredient_keys(ingredients: Iterable[Any]) -> List[str]:
+    """Distinct index keys of a recipe's ingredients, in order."""
+    keys = (name_key(ingredient_name(item))[:INGREDIENT_KEY_LENGTH] for item in ingredients or [])
+    return [key for key in dict.fromkeys(keys) if key]
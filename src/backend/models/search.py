@@ -0,0 +1,144 @@
+"""
+Full-text search tables for products and recipes.
+Tabele wyszukiwania pełnotekstowego: FTS5 na SQLite, tsvector z indeksem GIN na PostgreSQL.
+
+Each searchable table has a companion ``<table>_fts`` holding its text
+already normalized by ``backend.core.polish_text`` in three weighted
+columns: title, keywords and body. The companions are not mapped. Their DDL
+hangs off the source tables, so ``create_all``/``drop_all`` and migration
+0006 build the same thing. Deletes are propagated by the database (trigger on
+SQLite, ``ON DELETE CASCADE`` on PostgreSQL); inserts and updates go through
+``SearchService`` on the write path, because stemming runs in Python.
+"""
+
+from typing import Any, Callable, Dict, List
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+
+from backend.core.polish_text import document
+
+from .product import Product
+from .recipe import Recipe
+
+# Source table -> search table
+SEARCH_TABLES = {"products": "products_fts", "recipes": "recipes_fts"}
+
+# Relative weight of title, keywords and body
+WEIGHTS = (10.0, 4.0, 1.0)
+
+
+def is_search_table(name: str) -> bool:
+    """True for search tables and FTS5 shadow tables (kept out of autogenerate)."""
+    return any(name == table or name.startswith(f"{table}_") for table in SEARCH_TABLES.values())
+
+
+# Queries are stem prefixes; FTS5 keeps an index per prefix length listed here
+PREFIX_LENGTHS = "3 4 5 6 7 8"
+
+
+def _sqlite_ddl(source: str, table: str) -> List[str]:
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+        f"USING fts5(title, keywords, body, tokenize='unicode61 remove_diacritics 2', prefix='{PREFIX_LENGTHS}')",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON {source} "
+        f"BEGIN DELETE FROM {table} WHERE rowid = old.id; END",
+    ]
+
+
+def _postgresql_ddl(source: str, table: str) -> List[str]:
+    return [
+        f"""CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY REFERENCES {source} (id) ON DELETE CASCADE,
+            title TEXT NOT NULL DEFAULT '',
+            keywords TEXT NOT NULL DEFAULT '',
+            body TEXT NOT NULL DEFAULT '',
+            document TSVECTOR GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', title), 'A')
+                || setweight(to_tsvector('simple', keywords), 'B')
+                || setweight(to_tsvector('simple', body), 'C')
+            ) STORED
+        )""",
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_document ON {table} USING GIN (document)",
+    ]
+
+
+_DDL: Dict[str, Callable[[str, str], List[str]]] = {"sqlite": _sqlite_ddl, "postgresql": _postgresql_ddl}
+
+
+def create_search_table(connection: Connection, source: str) -> None:
+    """Create the search table (and delete trigger) for ``source``."""
+    ddl = _DDL.get(connection.dialect.name)
+    if ddl is None:
+        return
+    for statement in ddl(source, SEARCH_TABLES[source]):
+        connection.exec_driver_sql(statement)
+
+
+def drop_search_table(connection: Connection, source: str) -> None:
+    """Drop the search table for ``source``."""
+    if connection.dialect.name not in _DDL:
+        return
+    table = SEARCH_TABLES[source]
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {table}_delete")
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {table}")
+
+
+def upsert_sql(dialect: str, source: str) -> str:
+    """Statement storing one document (``:id, :title, :keywords, :body``)."""
+    table = SEARCH_TABLES[source]
+    if dialect == "sqlite":
+        return f"INSERT OR REPLACE INTO {table} (rowid, title, keywords, body) VALUES (:id, :title, :keywords, :body)"
+    return (
+        f"INSERT INTO {table} (id, title, keywords, body) VALUES (:id, :title, :keywords, :body) "
+        f"ON CONFLICT (id) DO UPDATE SET title = excluded.title, keywords = excluded.keywords, body = excluded.body"
+    )
+
+
+def product_document(product: Any) -> Dict[str, Any]:
+    """Search document of a product (ORM instance or row)."""
+    return {"id": product.id, "title": document(product.name), "keywords": document(product.category), "body": ""}
+
+
+def recipe_document(recipe: Any) -> Dict[str, Any]:
+    """Search document of a recipe: tags and ingredient names are keywords."""
+    ingredients = [
+        item.get("name", "") if isinstance(item, dict) else str(item)
+        for item in recipe.ingredients or []
+    ]
+    return {
+        "id": recipe.id,
+        "title": document(recipe.name),
+        "keywords": document(*(recipe.tags or []), *ingredients),
+        "body": document(recipe.description, recipe.instructions),
+    }
+
+
+DOCUMENTS: Dict[str, Callable[[Any], Dict[str, Any]]] = {"products": product_document, "recipes": recipe_document}
+
+
+def reindex(connection: Connection, source: str, batch_size: int = 1000) -> int:
+    """
+    Rebuild the search documents of every row in ``source``.
+
+    Returns:
+        Number of rows indexed
+    """
+    if connection.dialect.name not in _DDL:
+        return 0
+    model = {"products": Product, "recipes": Recipe}[source]
+    statement = sa.text(upsert_sql(connection.dialect.name, source))
+    build = DOCUMENTS[source]
+    count = 0
+    result = connection.execute(sa.select(model.__table__).execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        connection.execute(statement, [build(row) for row in rows])
+        count += len(rows)
+    return count
+
+
+for _model in (Product, Recipe):
+    event.listen(_model.__table__, "after_create", lambda target, connection, **kw: create_search_table(connection, target.name))
+    event.listen(_model.__table__, "before_drop", lambda target, connection, **kw: drop_search_table(connection, target.name))
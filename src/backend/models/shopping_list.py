@@ -3,7 +3,7 @@ ShoppingList model for cooking features.
 Zapewnia model list zakupów z pełną separacją.
 """
 
-from sqlalchemy import Column, String, Float, Boolean, ForeignKey, JSON, Integer
+from sqlalchemy import Column, String, Float, Boolean, ForeignKey, JSON, Integer, Index
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -14,6 +14,12 @@ class ShoppingList(Base):
     
     __tablename__ = "shopping_lists"
     
+    __table_args__ = (
+        # Names are unique per user (inserts use ON CONFLICT DO NOTHING)
+        Index("uq_shopping_lists_user_id_name", "user_id", "name", unique=True),
+        Index("ix_shopping_lists_user_id_created_at", "user_id", "created_at"),
+    )
+    
     name = Column(String(100), nullable=False, index=True)
     items = Column(JSON, nullable=False)  # lista produktów z ilościami
     total_estimated_cost = Column(Float, nullable=True)
@@ -13,7 +13,7 @@ from pydantic import BaseModel, Field
 from backend.database import get_async_session
 from backend.plugins import PluginInterface
 from backend.core.llm_providers.provider_factory import provider_factory
-from backend.services.cooking_service import CookingProductService, CookingRecipeService
+from backend.services.nutrition_service import NutritionResult, NutritionService
 
 logger = logging.getLogger(__name__)
 
@@ -72,13 +72,22 @@ class RecipeNutritionRequest(BaseModel):
     recipe_id: int = Field(..., description="ID przepisu")
 
 
+class RecipeNutritionBatchRequest(BaseModel):
+    """Żądanie analizy wartości odżywczej wielu przepisów."""
+    recipe_ids: List[int] = Field(..., min_length=1, max_length=500, description="ID przepisów")
+
+
 class RecipeNutritionResponse(BaseModel):
     """Odpowiedź z analizą wartości odżywczej."""
+    recipe_id: int
     recipe_name: str
     total_nutrition: NutritionInfo
     per_serving_nutrition: NutritionInfo
     health_score: float
     recommendations: List[str]
+    unresolved_ingredients: List[str] = Field(
+        default_factory=list, description="Składniki pominięte (nieznany produkt lub ilość)"
+    )
 
 
 class DietPlugin(PluginInterface):
@@ -145,10 +154,25 @@ class DietPlugin(PluginInterface):
             """Analizuje wartość odżywczą przepisu."""
             try:
                 return await self._analyze_recipe_nutrition(request, db, user_id)
+            except HTTPException:
+                raise
             except Exception as e:
                 logger.error(f"Failed to analyze recipe nutrition: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
         
+        @self.router.post("/recipe-nutrition/batch", response_model=List[RecipeNutritionResponse])
+        async def analyze_recipes_nutrition(
+            request: RecipeNutritionBatchRequest,
+            db: AsyncSession = Depends(get_async_session),
+            user_id: int = Query(..., description="User ID")
+        ):
+            """Analizuje wartość odżywczą wielu przepisów naraz."""
+            try:
+                return await self._analyze_recipes_nutrition(request, db, user_id)
+            except Exception as e:
+                logger.error(f"Failed to analyze recipes nutrition: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+        
         @self.router.get("/nutrition-tips")
         async def get_nutrition_tips():
             """Zwraca porady żywieniowe dla nastolatków."""
@@ -341,78 +365,55 @@ class DietPlugin(PluginInterface):
     
     async def _analyze_recipe_nutrition(self, request: RecipeNutritionRequest, db: AsyncSession, user_id: int) -> RecipeNutritionResponse:
         """Analizuje wartość odżywczą przepisu."""
-        
-        # Pobierz przepis
-        recipe_service = CookingRecipeService(db)
-        recipe = await recipe_service.get_recipe(request.recipe_id, user_id)
-        
-        if not recipe:
+        result = await NutritionService(db).analyze_recipe(request.recipe_id, user_id)
+        if result is None:
             raise HTTPException(status_code=404, detail="Przepis nie znaleziony")
-        
-        # Pobierz produkty do obliczenia wartości odżywczej
-        product_service = CookingProductService(db)
-        
-        total_calories = 0
-        total_proteins = 0
-        total_carbs = 0
-        total_fats = 0
-        
-        # Oblicz wartości odżywcze na podstawie składników
-        for ingredient in recipe.ingredients:
-            # Uproszczone obliczenia - w rzeczywistości potrzebna byłaby baza produktów
-            if "mleko" in ingredient.get("name", "").lower():
-                total_calories += 42 * ingredient.get("amount", 1)
-                total_proteins += 3.4 * ingredient.get("amount", 1)
-                total_carbs += 5.0 * ingredient.get("amount", 1)
-                total_fats += 1.0 * ingredient.get("amount", 1)
-            elif "jajko" in ingredient.get("name", "").lower():
-                total_calories += 155 * ingredient.get("amount", 1)
-                total_proteins += 13 * ingredient.get("amount", 1)
-                total_carbs += 1.1 * ingredient.get("amount", 1)
-                total_fats += 11 * ingredient.get("amount", 1)
-            # Dodaj więcej produktów...
+        return self._nutrition_response(result)
+    
+    async def _analyze_recipes_nutrition(
+        self, request: RecipeNutritionBatchRequest, db: AsyncSession, user_id: int
+    ) -> List[RecipeNutritionResponse]:
+        """Analizuje wartość odżywczą wielu przepisów; nieznane ID są pomijane."""
+        results = await NutritionService(db).analyze_recipes(request.recipe_ids, user_id)
+        return [self._nutrition_response(result) for result in results.values()]
+    
+    def _nutrition_response(self, result: NutritionResult) -> RecipeNutritionResponse:
+        """Ocena i rekomendacje na podstawie wyliczonych wartości odżywczych."""
+        recipe = result.recipe
+        totals = {nutrient: round(value, 1) for nutrient, value in result.totals.items()}
         
         # Oblicz na porcję
         servings = recipe.servings or 1
-        per_serving_calories = total_calories / servings
-        per_serving_proteins = total_proteins / servings
-        per_serving_carbs = total_carbs / servings
-        per_serving_fats = total_fats / servings
+        per_serving = {nutrient: round(value / servings, 1) for nutrient, value in result.totals.items()}
         
         # Oblicz health score (0-100)
         health_score = 70  # Podstawowy score
         
-        if per_serving_calories < 500:
+        if per_serving["calories"] < 500:
             health_score += 10
-        if per_serving_proteins > 20:
+        if per_serving["proteins"] > 20:
             health_score += 10
-        if per_serving_fats < 20:
+        if per_serving["fats"] < 20:
             health_score += 10
         
         recommendations = []
-        if per_serving_calories > 800:
+        if per_serving["calories"] > 800:
             recommendations.append("Przepis jest wysokokaloryczny")
-        if per_serving_proteins < 15:
+        if per_serving["proteins"] < 15:
             recommendations.append("Dodaj więcej białka")
-        if per_serving_fats > 30:
+        if per_serving["fats"] > 30:
             recommendations.append("Ogranicz tłuszcze")
+        if result.unresolved:
+            recommendations.append("Nie uwzględniono: " + ", ".join(result.unresolved))
         
         return RecipeNutritionResponse(
+            recipe_id=recipe.id,
             recipe_name=recipe.name,
-            total_nutrition=NutritionInfo(
-                calories=total_calories,
-                proteins=total_proteins,
-                carbs=total_carbs,
-                fats=total_fats
-            ),
-            per_serving_nutrition=NutritionInfo(
-                calories=per_serving_calories,
-                proteins=per_serving_proteins,
-                carbs=per_serving_carbs,
-                fats=per_serving_fats
-            ),
+            total_nutrition=NutritionInfo(**totals),
+            per_serving_nutrition=NutritionInfo(**per_serving),
             health_score=health_score,
-            recommendations=recommendations
+            recommendations=recommendations,
+            unresolved_ingredients=result.unresolved
         )
 
 
@@ -0,0 +1,101 @@
+"""
+Bulk job schemas for Ageny Online.
+Zapewnia walidację danych zadań masowego generowania.
+"""
+
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+
+from backend.config import settings
+
+BULK_JOB_KINDS = ("text", "recipe")
+BULK_JOB_MODES = ("auto", "batch", "queue")
+
+
+class BulkJobItemCreate(BaseModel):
+    """Single prompt of a bulk job."""
+    
+    prompt: Optional[str] = Field(None, min_length=1, description="Treść promptu")
+    messages: Optional[List[Dict[str, Any]]] = Field(None, description="Wiadomości w formacie chat")
+    custom_id: Optional[str] = Field(None, max_length=100, description="Identyfikator nadany przez klienta")
+    metadata: Optional[Dict[str, Any]] = None
+    
+    @model_validator(mode="after")
+    def validate_input(self) -> "BulkJobItemCreate":
+        """Require exactly one of prompt or messages."""
+        if bool(self.prompt) == bool(self.messages):
+            raise ValueError("Provide either prompt or messages")
+        return self
+
+
+class BulkJobCreate(BaseModel):
+    """Schema for submitting a bulk job."""
+    
+    name: str = Field(..., min_length=1, max_length=200, description="Nazwa zadania")
+    kind: str = Field("text", description="text (wyniki w pozycjach) lub recipe (zapis do przepisów)")
+    items: List[BulkJobItemCreate] = Field(..., min_length=1)
+    system_prompt: Optional[str] = Field(None, description="Prompt systemowy dla wszystkich pozycji")
+    provider: Optional[str] = Field(None, description="Provider (wymagany dla trybu batch)")
+    model: Optional[str] = None
+    max_tokens: Optional[int] = Field(None, ge=1, le=32000)
+    temperature: Optional[float] = Field(None, ge=0.0, le=2.0)
+    mode: str = Field("auto", description="auto, batch lub queue")
+    off_peak: bool = Field(False, description="Uruchom w oknie poza szczytem")
+    
+    @model_validator(mode="after")
+    def validate_job(self) -> "BulkJobCreate":
+        """Validate kind, mode and job size."""
+        if self.kind not in BULK_JOB_KINDS:
+            raise ValueError(f"Kind must be one of: {list(BULK_JOB_KINDS)}")
+        if self.mode not in BULK_JOB_MODES:
+            raise ValueError(f"Mode must be one of: {list(BULK_JOB_MODES)}")
+        if len(self.items) > settings.BULK_MAX_ITEMS_PER_JOB:
+            raise ValueError(f"Job exceeds {settings.BULK_MAX_ITEMS_PER_JOB} items")
+        return self
+
+
+class BulkJobResponse(BaseModel):
+    """Schema for bulk job status."""
+    
+    id: int
+    name: str
+    kind: str
+    status: str
+    mode: str
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    user_id: Optional[int] = None
+    scheduled_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    total_items: int
+    completed_items: int
+    failed_items: int
+    cost_usd: float
+    list_cost_usd: float
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BulkJobItemResponse(BaseModel):
+    """Schema for bulk job item results."""
+    
+    id: int
+    custom_id: Optional[str] = None
+    status: str
+    result_text: Optional[str] = None
+    provider_used: Optional[str] = None
+    model_used: Optional[str] = None
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    cost_usd: Optional[float] = None
+    error: Optional[str] = None
+    target_table: Optional[str] = None
+    target_id: Optional[int] = None
+    
+    model_config = ConfigDict(from_attributes=True)
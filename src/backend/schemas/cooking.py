@@ -56,6 +56,13 @@ class ProductResponse(ProductBase):
     )
 
 
+class ProductSearchResult(ProductResponse):
+    """Schema for a ranked product search result."""
+    
+    score: float = Field(..., description="Trafność (większa = lepsza)")
+    snippet: Optional[str] = Field(None, description="Fragment z zaznaczonymi trafieniami (<mark>)")
+
+
 # Recipe Schemas
 class IngredientSchema(BaseModel):
     """Schema for recipe ingredient."""
@@ -115,6 +122,20 @@ class RecipeResponse(RecipeBase):
     )
 
 
+class RecipeMatchResult(RecipeResponse):
+    """Schema for a saved recipe matched against available ingredients."""
+    
+    coverage: float = Field(..., ge=0, le=1, description="Udział składników przepisu, które są dostępne")
+    missing_ingredients: List[str] = Field(default_factory=list, description="Brakujące składniki")
+
+
+class RecipeSearchResult(RecipeResponse):
+    """Schema for a ranked recipe search result."""
+    
+    score: float = Field(..., description="Trafność (większa = lepsza)")
+    snippet: Optional[str] = Field(None, description="Fragment z zaznaczonymi trafieniami (<mark>)")
+
+
 # Shopping List Schemas
 class ShoppingItemSchema(BaseModel):
     """Schema for shopping list item."""
@@ -173,6 +194,7 @@ class RecipeGenerationRequest(BaseModel):
     cuisine_type: Optional[str] = Field(None, description="Typ kuchni")
     difficulty: Optional[str] = Field(None, description="Poziom trudności")
     cooking_time: Optional[int] = Field(None, ge=0, description="Maksymalny czas gotowania")
+    max_missing: int = Field(2, ge=0, le=20, description="Ile składników zapisanego przepisu może brakować")
 
 
 class ShoppingListOptimizationRequest(BaseModel):
@@ -260,14 +282,24 @@ class RecipeNutritionRequest(BaseModel):
     recipe_id: int = Field(..., description="ID przepisu")
 
 
+class RecipeNutritionBatchRequest(BaseModel):
+    """Schema for analyzing the nutrition of many recipes at once."""
+    
+    recipe_ids: List[int] = Field(..., min_length=1, max_length=500, description="ID przepisów")
+
+
 class RecipeNutritionResponse(BaseModel):
     """Schema for recipe nutrition analysis response."""
     
+    recipe_id: int
     recipe_name: str
     total_nutrition: NutritionInfo
     per_serving_nutrition: NutritionInfo
     health_score: float
     recommendations: List[str]
+    unresolved_ingredients: List[str] = Field(
+        default_factory=list, description="Składniki pominięte (nieznany produkt lub ilość)"
+    )
 
 
 class BMICalculationRequest(BaseModel):
@@ -6,7 +6,7 @@ Zapewnia walidację danych kosztów z pełną separacją.
 from datetime import date, datetime
 from typing import Optional
 
-from pydantic import BaseModel, field_validator, constr, ConfigDict
+from pydantic import BaseModel, field_validator, constr, conint, ConfigDict
 
 
 class CostRecordBase(BaseModel):
@@ -18,7 +18,7 @@ class CostRecordBase(BaseModel):
     model_used: Optional[str] = None
     tokens_used: Optional[int] = None
     cost: constr(min_length=1, max_length=20)
-    request_count: int = 1
+    request_count: conint(ge=1) = 1
     metadata: Optional[dict] = None
     
     @field_validator('service_type')
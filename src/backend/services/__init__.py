@@ -5,6 +5,7 @@ Zapewnia logikę biznesową z pełną separacją od my_assistant.
 
 from .user_service import UserService
 from .conversation_service import ConversationService
+from .conversation_memory import ConversationMemory, conversation_memory
 from .ocr_service import OCRService
 from .cost_service import CostService
 from .cooking_service import (
@@ -12,13 +13,17 @@ from .cooking_service import (
     CookingRecipeService, 
     CookingShoppingListService
 )
+from .bulk_job_service import BulkJobService
 
 __all__ = [
     "UserService",
     "ConversationService", 
+    "ConversationMemory",
+    "conversation_memory",
     "OCRService",
     "CostService",
     "CookingProductService",
     "CookingRecipeService",
-    "CookingShoppingListService"
+    "CookingShoppingListService",
+    "BulkJobService"
 ] 
\ No newline at end of file
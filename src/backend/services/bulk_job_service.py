@@ -0,0 +1,569 @@
+"""
+Bulk generation job service for Ageny Online.
+Zapewnia logikę zadań masowego generowania (batch API dostawców lub kolejka w tle).
+
+Jobs with a batch-capable provider (OpenAI, Anthropic, Mistral) and at least
+``BULK_BATCH_MIN_ITEMS`` prompts are packed into provider batches, billed at
+the batch discount. Everything else runs through a throttled background
+queue. Jobs submitted with ``off_peak`` wait for the configured UTC window.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.core.llm_providers.batch import (
+    BATCH_PRICE_MULTIPLIER, BaseBatchClient, BatchItemResult, BatchRequest,
+    create_batch_client, supports_batch,
+)
+from backend.core.llm_providers.provider_factory import ProviderType, provider_factory
+from backend.core.llm_providers.result import ChatResult
+from backend.exceptions.database import ValidationError
+from backend.models import BulkJob, BulkJobItem, Recipe
+from backend.schemas.bulk import BulkJobCreate
+from backend.schemas.cooking import RecipeCreate
+from backend.services.cooking_service import CookingRecipeService
+
+logger = logging.getLogger(__name__)
+
+# Items processed between progress commits in queue mode
+QUEUE_CHUNK_SIZE = 50
+
+_DEFAULT_MODELS = {
+    ProviderType.OPENAI: lambda: settings.OPENAI_CHAT_MODEL,
+    ProviderType.ANTHROPIC: lambda: settings.ANTHROPIC_CHAT_MODEL,
+    ProviderType.MISTRAL: lambda: settings.MISTRAL_CHAT_MODEL,
+}
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def next_off_peak_start(now: datetime, start_hour: int, end_hour: int) -> datetime:
+    """
+    Earliest moment at or after ``now`` inside the off-peak window.
+
+    Args:
+        now: Current time (naive UTC)
+        start_hour: Window start hour
+        end_hour: Window end hour (may wrap past midnight; equal hours mean always)
+
+    Returns:
+        ``now`` when inside the window, otherwise the next window start
+    """
+    hour = now.hour
+    if start_hour == end_hour:
+        return now
+    if start_hour < end_hour:
+        inside = start_hour <= hour < end_hour
+    else:
+        inside = hour >= start_hour or hour < end_hour
+    if inside:
+        return now
+    start = now.replace(hour=start_hour, minute=0, second=0, microsecond=0)
+    return start if start > now else start + timedelta(days=1)
+
+
+def parse_recipe(text: str) -> Dict[str, Any]:
+    """
+    Parse a generated recipe in the JSON format used by recipe generation.
+
+    Raises:
+        ValueError: If the text is not a recipe object
+    """
+    data = json.loads(_CODE_FENCE.sub("", text.strip()))
+    if not isinstance(data, dict) or not data.get("name") or not data.get("instructions"):
+        raise ValueError("Recipe JSON must contain name and instructions")
+    return data
+
+
+class _RequestPacer:
+    """Spaces request starts to stay under a per-minute limit."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _default_batch_client(provider_type: ProviderType) -> BaseBatchClient:
+    return create_batch_client(provider_type, provider_factory.create_provider(provider_type))
+
+
+class BulkJobService:
+    """Service for bulk generation jobs."""
+
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        llm_factory: Any = None,
+        batch_client_factory: Optional[Callable[[ProviderType], BaseBatchClient]] = None,
+    ):
+        self.db_session = db_session
+        self.llm_factory = llm_factory or provider_factory
+        self.batch_client_factory = batch_client_factory or _default_batch_client
+
+    # ------------------------------------------------------------------ submit
+
+    async def submit_job(self, job_data: BulkJobCreate, user_id: Optional[int] = None) -> BulkJob:
+        """Create a bulk job.
+
+        Args:
+            job_data: Job definition with prompts
+            user_id: Owner (required for jobs landing in user tables)
+
+        Returns:
+            Created job
+
+        Raises:
+            ValidationError: If the job cannot run as requested
+        """
+        provider_type = self._resolve_provider(job_data)
+        item_count = len(job_data.items)
+
+        if job_data.kind == "recipe" and user_id is None:
+            raise ValidationError("Recipe jobs require a user", field="user_id")
+
+        if job_data.mode == "batch":
+            if provider_type is None or not supports_batch(provider_type):
+                raise ValidationError("Batch mode requires openai, anthropic or mistral", field="provider")
+            mode = "batch"
+        elif job_data.mode == "auto" and item_count >= settings.BULK_BATCH_MIN_ITEMS:
+            if provider_type is None:
+                provider_type = self._pick_batch_provider()
+            mode = "batch" if provider_type is not None and supports_batch(provider_type) else "queue"
+        else:
+            mode = "queue"
+
+        model = job_data.model
+        if mode == "batch":
+            model = self.llm_factory._adapt_model_for_provider(model, provider_type) or _DEFAULT_MODELS[provider_type]()
+
+        now = datetime.utcnow()
+        scheduled_at = now
+        if job_data.off_peak:
+            scheduled_at = next_off_peak_start(now, settings.BULK_OFF_PEAK_START_HOUR, settings.BULK_OFF_PEAK_END_HOUR)
+
+        try:
+            job = BulkJob(
+                name=job_data.name,
+                kind=job_data.kind,
+                user_id=user_id,
+                status="pending",
+                mode=mode,
+                provider=provider_type.value if provider_type else None,
+                model=model,
+                max_tokens=job_data.max_tokens,
+                temperature=job_data.temperature,
+                scheduled_at=scheduled_at,
+                total_items=item_count,
+                provider_batches=[],
+            )
+            job.items = [
+                BulkJobItem(
+                    custom_id=item.custom_id,
+                    messages=self._item_messages(item.prompt, item.messages, job_data.system_prompt),
+                    status="pending",
+                    meta_data=item.metadata,
+                )
+                for item in job_data.items
+            ]
+            self.db_session.add(job)
+            await self.db_session.flush()
+
+            logger.info(f"Bulk job {job.id} created: {item_count} items, mode={mode}, provider={job.provider}")
+            return job
+
+        except Exception as e:
+            logger.error(f"Failed to create bulk job: {e}")
+            raise ValidationError(f"Failed to create bulk job: {e}")
+
+    def _resolve_provider(self, job_data: BulkJobCreate) -> Optional[ProviderType]:
+        if not job_data.provider:
+            return None
+        try:
+            return ProviderType(job_data.provider)
+        except ValueError:
+            raise ValidationError(f"Unknown provider: {job_data.provider}", field="provider")
+
+    def _pick_batch_provider(self) -> Optional[ProviderType]:
+        """Highest priority configured provider with a batch API"""
+        candidates = [p for p in self.llm_factory.get_configured_providers() if supports_batch(p)]
+        if not candidates:
+            return None
+        return min(candidates, key=self.llm_factory.get_provider_priority)
+
+    @staticmethod
+    def _item_messages(
+        prompt: Optional[str], messages: Optional[List[Dict[str, Any]]], system_prompt: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        result = list(messages) if messages else [{"role": "user", "content": prompt}]
+        if system_prompt:
+            result.insert(0, {"role": "system", "content": system_prompt})
+        return result
+
+    # ------------------------------------------------------------------ queries
+
+    async def get_job(self, job_id: int, user_id: Optional[int] = None) -> Optional[BulkJob]:
+        """Get a job, optionally restricted to an owner."""
+        query = select(BulkJob).where(BulkJob.id == job_id)
+        if user_id is not None:
+            query = query.where(BulkJob.user_id == user_id)
+        result = await self.db_session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def list_jobs(self, user_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[BulkJob]:
+        """List jobs, newest first."""
+        query = select(BulkJob).order_by(BulkJob.id.desc()).offset(skip).limit(limit)
+        if user_id is not None:
+            query = query.where(BulkJob.user_id == user_id)
+        result = await self.db_session.execute(query)
+        return list(result.scalars().all())
+
+    async def list_items(
+        self, job_id: int, status: Optional[str] = None, skip: int = 0, limit: int = 100
+    ) -> List[BulkJobItem]:
+        """List items of a job in submission order."""
+        query = select(BulkJobItem).where(BulkJobItem.job_id == job_id)
+        if status:
+            query = query.where(BulkJobItem.status == status)
+        result = await self.db_session.execute(query.order_by(BulkJobItem.id).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    async def cancel_job(self, job_id: int, user_id: Optional[int] = None) -> Optional[BulkJob]:
+        """Cancel a job that has not finished yet.
+
+        Returns:
+            The job, or None if it does not exist
+        """
+        job = await self.get_job(job_id, user_id)
+        if job is None or job.status in ("completed", "failed", "cancelled"):
+            return job
+
+        if job.status == "submitted":
+            client = self.batch_client_factory(ProviderType(job.provider))
+            for batch in job.provider_batches or []:
+                if batch["status"] == "in_progress":
+                    try:
+                        await client.cancel(batch["id"])
+                    except Exception as e:
+                        logger.warning(f"Failed to cancel provider batch {batch['id']}: {e}")
+
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+        await self.db_session.execute(
+            update(BulkJobItem)
+            .where(BulkJobItem.job_id == job.id, BulkJobItem.status == "pending")
+            .values(status="cancelled")
+        )
+        await self.db_session.flush()
+        logger.info(f"Bulk job {job.id} cancelled")
+        return job
+
+    # ------------------------------------------------------------------ worker
+
+    async def process_due_jobs(self, now: Optional[datetime] = None) -> int:
+        """Start due jobs and poll submitted batches.
+
+        Jobs are claimed with a conditional update, so several workers can
+        share one database without processing a job twice.
+
+        Returns:
+            Number of jobs worked on
+        """
+        now = now or datetime.utcnow()
+        result = await self.db_session.execute(
+            select(BulkJob.id, BulkJob.status).where(
+                BulkJob.status.in_(("pending", "submitted", "running")),
+                BulkJob.scheduled_at <= now,
+                or_(BulkJob.next_poll_at.is_(None), BulkJob.next_poll_at <= now),
+            ).order_by(BulkJob.scheduled_at, BulkJob.id)
+        )
+        worked = 0
+        for job_id, status in result.all():
+            if not await self._claim(job_id, status, now):
+                continue
+            job = await self.get_job(job_id)
+            try:
+                if job.mode == "batch" and job.status == "pending":
+                    await self._start_batches(job)
+                elif job.mode == "batch":
+                    await self._poll_batches(job)
+                else:
+                    await self._run_queue(job)
+            except Exception as e:
+                logger.error(f"Bulk job {job_id} failed: {e}")
+                await self.db_session.rollback()
+                job = await self.get_job(job_id)
+                job.status = "failed"
+                job.error = str(e)[:2000]
+                job.finished_at = datetime.utcnow()
+                await self.db_session.commit()
+            worked += 1
+        return worked
+
+    async def _claim(self, job_id: int, status: str, now: datetime) -> bool:
+        """Take a lease on a job; fails if another worker got there first."""
+        lease = timedelta(seconds=settings.BULK_WORKER_POLL_INTERVAL)
+        result = await self.db_session.execute(
+            update(BulkJob)
+            .where(
+                BulkJob.id == job_id,
+                BulkJob.status == status,
+                or_(BulkJob.next_poll_at.is_(None), BulkJob.next_poll_at <= now),
+            )
+            .values(next_poll_at=now + lease)
+        )
+        await self.db_session.commit()
+        return result.rowcount == 1
+
+    async def _pending_items(self, job: BulkJob, limit: Optional[int] = None) -> List[BulkJobItem]:
+        query = select(BulkJobItem).where(BulkJobItem.job_id == job.id, BulkJobItem.status == "pending")
+        result = await self.db_session.execute(query.order_by(BulkJobItem.id).limit(limit))
+        return list(result.scalars().all())
+
+    async def _start_batches(self, job: BulkJob) -> None:
+        client = self.batch_client_factory(ProviderType(job.provider))
+        batches = list(job.provider_batches or [])
+        if not batches:
+            items = await self._pending_items(job)
+            try:
+                for start in range(0, len(items), settings.BULK_BATCH_MAX_ITEMS):
+                    chunk = items[start:start + settings.BULK_BATCH_MAX_ITEMS]
+                    requests = [
+                        BatchRequest(custom_id=str(item.id), messages=item.messages,
+                                     max_tokens=job.max_tokens, temperature=job.temperature)
+                        for item in chunk
+                    ]
+                    batch_id = await client.submit(requests, job.model)
+                    batches.append({"id": batch_id, "status": "in_progress", "items": len(chunk)})
+                    job.provider_batches = list(batches)
+                    await self.db_session.commit()
+            except Exception as e:
+                if not batches:
+                    raise
+                # Keep what was submitted; unsent items fail once those batches end
+                logger.error(f"Bulk job {job.id}: batch submission stopped after {len(batches)} batch(es): {e}")
+                job.error = str(e)[:2000]
+
+        job.status = "submitted"
+        job.started_at = datetime.utcnow()
+        await self.db_session.commit()
+        logger.info(f"Bulk job {job.id} submitted as {len(batches)} {job.provider} batch(es)")
+
+    async def _poll_batches(self, job: BulkJob) -> None:
+        client = self.batch_client_factory(ProviderType(job.provider))
+        batches = [dict(batch) for batch in job.provider_batches or []]
+        for batch in batches:
+            if batch["status"] != "in_progress":
+                continue
+            status = await client.poll(batch["id"])
+            if not status.ended:
+                continue
+            results = await client.results(status, job.model)
+            await self._apply_batch_results(job, results)
+            batch["status"] = status.status
+            job.provider_batches = list(batches)
+            await self.db_session.commit()
+
+        if all(batch["status"] != "in_progress" for batch in batches):
+            # Requests the provider never answered (expired, cancelled)
+            for item in await self._pending_items(job):
+                item.status = "failed"
+                item.error = "No result returned by provider batch"
+                job.failed_items += 1
+            self._finish(job)
+            await self.db_session.commit()
+            logger.info(
+                f"Bulk job {job.id} finished: {job.completed_items} ok, {job.failed_items} failed, "
+                f"cost=${job.cost_usd:.4f} (list ${job.list_cost_usd:.4f})"
+            )
+
+    async def _apply_batch_results(self, job: BulkJob, results: List[BatchItemResult]) -> None:
+        ids = [int(r.custom_id) for r in results if r.custom_id.isdigit()]
+        items = {}
+        for start in range(0, len(ids), 500):
+            query = select(BulkJobItem).where(
+                BulkJobItem.job_id == job.id, BulkJobItem.id.in_(ids[start:start + 500])
+            )
+            items.update({item.id: item for item in (await self.db_session.execute(query)).scalars()})
+
+        for outcome in results:
+            item = items.get(int(outcome.custom_id)) if outcome.custom_id.isdigit() else None
+            if item is None or item.status != "pending":
+                continue
+            if outcome.result is None:
+                self._record_failure(job, item, outcome.error or "Unknown batch error")
+            else:
+                await self._record_result(job, item, outcome.result, outcome.result.cost / BATCH_PRICE_MULTIPLIER)
+
+    async def _run_queue(self, job: BulkJob) -> None:
+        if job.status == "pending":
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            await self.db_session.commit()
+
+        pacer = _RequestPacer(settings.BULK_QUEUE_RPM)
+        semaphore = asyncio.Semaphore(settings.BULK_QUEUE_CONCURRENCY)
+
+        async def generate(item: BulkJobItem) -> Tuple[BulkJobItem, Optional[ChatResult], Optional[str]]:
+            async with semaphore:
+                await pacer.wait()
+                try:
+                    return item, await self._chat(job, item.messages), None
+                except Exception as e:
+                    return item, None, str(e)
+
+        while True:
+            await self.db_session.refresh(job, ["status"])
+            if job.status != "running":
+                return
+            items = await self._pending_items(job, QUEUE_CHUNK_SIZE)
+            if not items:
+                break
+            outcomes = await asyncio.gather(*(generate(item) for item in items))
+            for item, result, error in outcomes:
+                if result is None:
+                    self._record_failure(job, item, error)
+                else:
+                    await self._record_result(job, item, result, result.cost)
+            # Extend the lease so other workers leave the job alone
+            job.next_poll_at = datetime.utcnow() + timedelta(seconds=settings.BULK_WORKER_POLL_INTERVAL)
+            await self.db_session.commit()
+
+        self._finish(job)
+        await self.db_session.commit()
+        logger.info(f"Bulk job {job.id} finished: {job.completed_items} ok, {job.failed_items} failed")
+
+    async def _chat(self, job: BulkJob, messages: List[Dict[str, Any]]) -> ChatResult:
+        kwargs: Dict[str, Any] = {}
+        if job.max_tokens is not None:
+            kwargs["max_tokens"] = job.max_tokens
+        if job.temperature is not None:
+            kwargs["temperature"] = job.temperature
+        if job.provider:
+            provider_type = ProviderType(job.provider)
+            provider = self.llm_factory.create_provider(provider_type)
+            model = self.llm_factory._adapt_model_for_provider(job.model, provider_type)
+            return await provider.chat(messages=messages, model=model, **kwargs)
+        return await self.llm_factory.chat_with_fallback(messages=messages, model=job.model, **kwargs)
+
+    # ------------------------------------------------------------------ results
+
+    async def _record_result(self, job: BulkJob, item: BulkJobItem, result: ChatResult, list_cost: float) -> None:
+        """Store a result on the item and land it in its target table."""
+        item.result_text = result.text
+        item.provider_used = result.provider
+        item.model_used = result.model
+        item.input_tokens = result.input_tokens
+        item.output_tokens = result.output_tokens
+        item.cost_usd = result.cost
+        job.cost_usd += result.cost
+        job.list_cost_usd += list_cost
+        try:
+            await self._land(job, item, result.text)
+        except (ValueError, TypeError, ValidationError) as e:
+            # The text stays on the item; only this item fails
+            self._record_failure(job, item, f"Could not store result: {e}")
+            return
+        item.status = "succeeded"
+        job.completed_items += 1
+
+    def _record_failure(self, job: BulkJob, item: BulkJobItem, error: str) -> None:
+        item.status = "failed"
+        item.error = (error or "")[:2000]
+        job.failed_items += 1
+
+    async def _land(self, job: BulkJob, item: BulkJobItem, text: str) -> None:
+        """Write a result into its target table (text jobs keep it on the item).
+
+        Recipes are saved like any other recipe, so they get the full-text and
+        ingredient indexes; a name the user already has raises ValidationError.
+        """
+        if job.kind != "recipe":
+            return
+        data = parse_recipe(text)
+        instructions = data["instructions"]
+        if isinstance(instructions, list):
+            instructions = "\n".join(str(step) for step in instructions)
+        recipe_data = RecipeCreate(
+            name=str(data["name"])[:200],
+            description=data.get("description"),
+            ingredients=data.get("ingredients") or [],
+            instructions=instructions,
+            cooking_time=data.get("cooking_time"),
+            difficulty=data.get("difficulty"),
+            servings=data.get("servings"),
+            calories_per_serving=data.get("calories_per_serving"),
+            tags=data.get("tags"),
+        )
+        recipe = await CookingRecipeService(self.db_session).save_recipe(recipe_data, job.user_id, is_ai_generated=True)
+        item.target_table = Recipe.__tablename__
+        item.target_id = recipe.id
+
+    @staticmethod
+    def _finish(job: BulkJob) -> None:
+        job.status = "failed" if job.failed_items and not job.completed_items else "completed"
+        job.finished_at = datetime.utcnow()
+        job.next_poll_at = None
+
+
+class BulkJobWorker:
+    """
+    Background loop driving bulk jobs.
+    Pętla w tle uruchamiająca zadania i odpytująca batch API dostawców.
+    """
+
+    def __init__(self, session_factory: Any = None, interval: Optional[float] = None, **service_kwargs: Any):
+        if session_factory is None:
+            from backend.database import async_session as session_factory
+        self.session_factory = session_factory
+        self.interval = interval if interval is not None else settings.BULK_WORKER_POLL_INTERVAL
+        self.service_kwargs = service_kwargs
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """Single pass over due jobs."""
+        async with self.session_factory() as session:
+            return await BulkJobService(session, **self.service_kwargs).process_due_jobs()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Bulk job worker pass failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Bulk job worker started (interval {self.interval}s)")
+
+    async def stop(self) -> None:
+        """Stop the loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
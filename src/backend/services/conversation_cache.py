@@ -0,0 +1,140 @@
+"""
+Hot cache of conversation context for session-mode chat.
+Pamięć podręczna ostatnich tur rozmowy (Redis lub LRU w procesie) przed bazą danych.
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+History = List[Dict[str, str]]
+
+
+class ConversationCache:
+    """
+    Context (summary message plus unsummarized turns) keyed by conversation ID.
+
+    The database stays the source of truth: a miss means "load from the DB",
+    and anything that changes stored history invalidates the entry.
+    """
+
+    async def get(self, conversation_id: int) -> Optional[History]:
+        """Cached context, or None on a miss"""
+        raise NotImplementedError
+
+    async def set(self, conversation_id: int, history: History) -> None:
+        """Replace the cached context"""
+        raise NotImplementedError
+
+    async def append(self, conversation_id: int, messages: History) -> None:
+        """Append turns to a cached context; no-op on a miss"""
+        raise NotImplementedError
+
+    async def invalidate(self, conversation_id: int) -> None:
+        """Drop the cached context"""
+        raise NotImplementedError
+
+
+class LRUConversationCache(ConversationCache):
+    """In-process cache of the most recently used conversations."""
+
+    def __init__(self, max_conversations: Optional[int] = None) -> None:
+        self.max_conversations = max_conversations or settings.CONVERSATION_CACHE_SIZE
+        self._entries: "OrderedDict[int, History]" = OrderedDict()
+
+    async def get(self, conversation_id: int) -> Optional[History]:
+        history = self._entries.get(conversation_id)
+        if history is None:
+            return None
+        self._entries.move_to_end(conversation_id)
+        return list(history)
+
+    async def set(self, conversation_id: int, history: History) -> None:
+        self._entries[conversation_id] = list(history)
+        self._entries.move_to_end(conversation_id)
+        while len(self._entries) > self.max_conversations:
+            self._entries.popitem(last=False)
+
+    async def append(self, conversation_id: int, messages: History) -> None:
+        if conversation_id in self._entries:
+            self._entries[conversation_id].extend(messages)
+            self._entries.move_to_end(conversation_id)
+
+    async def invalidate(self, conversation_id: int) -> None:
+        self._entries.pop(conversation_id, None)
+
+
+class RedisConversationCache(ConversationCache):
+    """
+    Cache shared by all API workers, one Redis list per conversation.
+
+    Redis errors are logged and treated as misses, so an unavailable Redis
+    only costs the DB reads it would have saved.
+    """
+
+    def __init__(self, url: Optional[str] = None, ttl_seconds: Optional[int] = None, client=None) -> None:
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(url or settings.REDIS_URL, decode_responses=True)
+        self.client = client
+        self.ttl_seconds = ttl_seconds or settings.CONVERSATION_CACHE_TTL_SECONDS
+
+    @staticmethod
+    def _key(conversation_id: int) -> str:
+        return f"ageny:conversation:{conversation_id}:context"
+
+    async def get(self, conversation_id: int) -> Optional[History]:
+        try:
+            items = await self.client.lrange(self._key(conversation_id), 0, -1)
+        except Exception as e:
+            logger.warning(f"Conversation cache read failed: {e}")
+            return None
+        return [json.loads(item) for item in items] if items else None
+
+    async def set(self, conversation_id: int, history: History) -> None:
+        key = self._key(conversation_id)
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                if history:
+                    pipe.rpush(key, *(json.dumps(m, ensure_ascii=False) for m in history))
+                    pipe.expire(key, self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Conversation cache write failed: {e}")
+
+    async def append(self, conversation_id: int, messages: History) -> None:
+        if not messages:
+            return
+        key = self._key(conversation_id)
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                # RPUSHX only appends to an existing list - a miss stays a miss
+                pipe.rpushx(key, *(json.dumps(m, ensure_ascii=False) for m in messages))
+                pipe.expire(key, self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Conversation cache append failed: {e}")
+            await self.invalidate(conversation_id)
+
+    async def invalidate(self, conversation_id: int) -> None:
+        try:
+            await self.client.delete(self._key(conversation_id))
+        except Exception as e:
+            logger.warning(f"Conversation cache invalidation failed: {e}")
+
+
+def create_conversation_cache() -> ConversationCache:
+    """Cache for the configured backend (``memory`` or ``redis``)"""
+    if settings.CONVERSATION_CACHE_BACKEND == "redis":
+        return RedisConversationCache()
+    return LRUConversationCache()
+
+
+conversation_cache = create_conversation_cache()
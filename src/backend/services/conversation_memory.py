@@ -0,0 +1,304 @@
+"""
+Rolling summary memory for long conversations.
+Streszcza starsze tury rozmowy w tle, aby kolejne zapytania wysyłały streszczenie i ostatnie wiadomości.
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backend.config import settings
+from backend.core.llm_providers.prompt_assembler import message_tokens
+from backend.core.llm_providers.provider_factory import provider_factory as llm_factory
+from backend.database.unit_of_work import unit_of_work
+from backend.database.write_behind import WriteBehindQueue, write_behind_queue
+from backend.models.conversation import Conversation, Message
+from backend.schemas.conversation import ConversationCreate
+from backend.schemas.message import MessageCreate
+from backend.services.conversation_cache import ConversationCache, conversation_cache
+from backend.services.conversation_service import ConversationService
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_HEADING = "Streszczenie wcześniejszej części rozmowy:"
+
+SUMMARY_PROMPT = (
+    "Streszczasz rozmowę użytkownika z asystentem AI. Zaktualizuj dotychczasowe streszczenie "
+    "o nowe wiadomości. Zachowaj fakty, decyzje, preferencje użytkownika i otwarte pytania; "
+    "pomiń powitania i powtórzenia. Pisz zwięźle, w języku rozmowy, bez wstępu."
+)
+
+
+def _is_summary(message: Dict[str, str]) -> bool:
+    return message.get("role") == "system" and message.get("content", "").startswith(SUMMARY_HEADING)
+
+
+class ConversationMemory:
+    """
+    Keeps long sessions cheap with a running summary on the ``Conversation``.
+
+    ``build_context`` returns the summary (as a system message) plus the
+    messages it does not cover. When those exceed the token threshold, the
+    older ones are folded into the summary by a background task with a cheap
+    model, so the request that noticed it is not delayed. Edits and deletes
+    of messages bump ``Conversation.history_version``; a summary started
+    before an edit is discarded instead of stored.
+
+    Session-mode chat reads the context through ``history`` (hot cache, DB on
+    a miss) and records new turns with ``record_turn``: the cache is updated
+    at once and the DB write happens in the background, in order per
+    conversation (batched through the write-behind queue when it runs).
+    """
+
+    def __init__(
+        self,
+        session_factory: Any = None,
+        threshold_tokens: Optional[int] = None,
+        recent_tokens: Optional[int] = None,
+        model: Optional[str] = None,
+        enabled: Optional[bool] = None,
+        cache: Optional[ConversationCache] = None,
+        writer: Optional[WriteBehindQueue] = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self.threshold_tokens = threshold_tokens or settings.CONVERSATION_SUMMARY_THRESHOLD_TOKENS
+        self.recent_tokens = recent_tokens or settings.CONVERSATION_RECENT_TOKENS
+        self.model = model or settings.CONVERSATION_SUMMARY_MODEL
+        self.enabled = settings.CONVERSATION_SUMMARY_ENABLED if enabled is None else enabled
+        self.cache = cache if cache is not None else conversation_cache
+        self.writer = writer if writer is not None else write_behind_queue
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._writes: Dict[int, asyncio.Task] = {}
+
+    @property
+    def session_factory(self) -> Any:
+        """Session factory for background work (the request's session is closed by then)"""
+        if self._session_factory is None:
+            from backend.database import async_session
+            self._session_factory = async_session
+        return self._session_factory
+
+    async def build_context(self, service: ConversationService, conversation: Conversation) -> List[Dict[str, str]]:
+        """
+        History to send with the next turn.
+
+        Args:
+            service: Conversation service bound to the request's session
+            conversation: Conversation being continued
+
+        Returns:
+            Summary system message (if any) followed by the unsummarized messages
+        """
+        history = await self.cache.get(conversation.id)
+        if history is None:
+            # Turns still being written would be missing from the DB read
+            await self._wait_writes(conversation.id)
+            messages = await service.get_messages_after(conversation.id, conversation.summary_message_id)
+            history = [{"role": m.role, "content": m.content} for m in messages]
+            if conversation.summary:
+                history.insert(0, {"role": "system", "content": f"{SUMMARY_HEADING}\n{conversation.summary}"})
+            await self.cache.set(conversation.id, history)
+
+        self._check_threshold(conversation.id, history)
+        return history
+
+    async def history(self, conversation_id: int) -> Optional[List[Dict[str, str]]]:
+        """
+        Context of a stored conversation for session-mode chat.
+
+        Served from the hot cache; only a miss opens a DB session.
+
+        Returns:
+            Same as ``build_context``, or None if the conversation does not exist
+        """
+        history = await self.cache.get(conversation_id)
+        if history is not None:
+            self._check_threshold(conversation_id, history)
+            return history
+
+        async with self.session_factory() as session:
+            service = ConversationService(session, cache=self.cache)
+            conversation = await service.get_conversation_by_id(conversation_id)
+            if not conversation:
+                return None
+            return await self.build_context(service, conversation)
+
+    async def start_conversation(self, agent_type: str = "general_conversation", title: Optional[str] = None) -> int:
+        """
+        Create an empty conversation for session-mode chat.
+
+        Returns:
+            ID of the new conversation
+        """
+        async with unit_of_work(self.session_factory) as session:
+            service = ConversationService(session, cache=self.cache)
+            conversation = await service.create_conversation(ConversationCreate(
+                session_id=uuid.uuid4().hex, agent_type=agent_type, title=title
+            ))
+        await self.cache.set(conversation.id, [])
+        return conversation.id
+
+    async def record_turn(self, conversation_id: int, messages: List[Dict[str, Any]]) -> None:
+        """
+        Append a turn (user message and assistant reply) to a conversation.
+
+        The cache is updated immediately so the next turn sees it; the DB
+        write runs in the background after earlier writes of the conversation.
+
+        Args:
+            conversation_id: Conversation ID
+            messages: Dicts with ``role``, ``content`` and optional MessageCreate fields
+        """
+        messages = [m for m in messages if (m.get("content") or "").strip()]
+        if not messages:
+            return
+        await self.cache.append(conversation_id, [{"role": m["role"], "content": m["content"]} for m in messages])
+
+        previous = self._writes.get(conversation_id)
+        task = asyncio.create_task(self._write(conversation_id, messages, previous))
+        self._writes[conversation_id] = task
+
+        def forget(done: asyncio.Task) -> None:
+            if self._writes.get(conversation_id) is done:
+                del self._writes[conversation_id]
+
+        task.add_done_callback(forget)
+
+    async def _write(self, conversation_id: int, messages: List[Dict[str, Any]], previous: Optional[asyncio.Task]) -> None:
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            validated = [MessageCreate(conversation_id=conversation_id, **message) for message in messages]
+            if self.writer.running:
+                futures = [await self.writer.put(Message, self._message_row(message)) for message in validated]
+                await asyncio.gather(*futures)
+            else:
+                async with unit_of_work(self.session_factory) as session:
+                    service = ConversationService(session, cache=self.cache)
+                    for message in validated:
+                        await service.add_message(conversation_id, message)
+        except Exception as e:
+            logger.error(f"Saving turn of conversation {conversation_id} failed: {e}")
+            # The cache must not keep turns the DB does not have
+            await self.cache.invalidate(conversation_id)
+
+    @staticmethod
+    def _message_row(message: MessageCreate) -> Dict[str, Any]:
+        row = message.model_dump()
+        row["meta_data"] = row.pop("metadata")
+        return row
+
+    async def _wait_writes(self, conversation_id: int) -> None:
+        task = self._writes.get(conversation_id)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    def _check_threshold(self, conversation_id: int, history: List[Dict[str, str]]) -> None:
+        unsummarized = [m for m in history if not _is_summary(m)]
+        if self.enabled and sum(message_tokens(m) for m in unsummarized) > self.threshold_tokens:
+            self.schedule(conversation_id)
+
+    def schedule(self, conversation_id: int) -> bool:
+        """
+        Start a background summary unless one is already running for the conversation.
+
+        Returns:
+            True if a task was started
+        """
+        task = self._tasks.get(conversation_id)
+        if task is not None and not task.done():
+            return False
+        task = asyncio.create_task(self._run(conversation_id))
+        self._tasks[conversation_id] = task
+        return True
+
+    async def _run(self, conversation_id: int) -> None:
+        try:
+            await self.summarize(conversation_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Summarizing conversation {conversation_id} failed: {e}")
+        finally:
+            self._tasks.pop(conversation_id, None)
+
+    def split(self, messages: Sequence[Message]) -> Tuple[List[Message], List[Message]]:
+        """
+        Split messages into (older, recent); recent fit ``recent_tokens``.
+
+        At least the last message is always kept as recent.
+        """
+        used = 0
+        cut = len(messages)
+        for i in range(len(messages) - 1, -1, -1):
+            used += message_tokens({"content": messages[i].content})
+            if used > self.recent_tokens and i < len(messages) - 1:
+                break
+            cut = i
+        return list(messages[:cut]), list(messages[cut:])
+
+    async def summarize(self, conversation_id: int) -> bool:
+        """
+        Fold older unsummarized messages into the running summary.
+
+        Returns:
+            True if a new summary was stored
+        """
+        # Read, then release the connection: the LLM call holds no transaction,
+        # and history_version makes store_summary drop a summary gone stale meanwhile
+        async with unit_of_work(self.session_factory) as session:
+            service = ConversationService(session, cache=self.cache)
+            conversation = await service.get_conversation_by_id(conversation_id)
+            if not conversation:
+                return False
+            previous = conversation.summary
+            version = conversation.history_version or 0
+            messages = await service.get_messages_after(conversation_id, conversation.summary_message_id)
+            older, _ = self.split(messages)
+            if not older:
+                return False
+
+        summary = await self._summarize(previous, older)
+
+        async with unit_of_work(self.session_factory) as session:
+            service = ConversationService(session, cache=self.cache)
+            stored = await service.store_summary(conversation_id, summary, older[-1].id, version)
+        if stored:
+            logger.info(f"Conversation {conversation_id} summarized through message {older[-1].id}")
+        else:
+            logger.info(f"Conversation {conversation_id} changed while summarizing, summary discarded")
+        return stored
+
+    async def _summarize(self, previous: Optional[str], messages: Sequence[Message]) -> str:
+        transcript = "\n".join(f"{m.role}: {m.content}" for m in messages)
+        content = f"Dotychczasowe streszczenie:\n{previous or '(brak)'}\n\nNowe wiadomości:\n{transcript}"
+        result = await llm_factory.chat_with_fallback(
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": content},
+            ],
+            model=self.model,
+            max_tokens=settings.CONVERSATION_SUMMARY_MAX_TOKENS,
+            temperature=0.2,
+        )
+        return result.text.strip()
+
+    async def wait(self) -> None:
+        """Wait for pending writes and running summaries (tests, graceful shutdown)"""
+        tasks = [*self._writes.values(), *self._tasks.values()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stop(self) -> None:
+        """Finish pending writes and cancel running summaries"""
+        if self._writes:
+            await asyncio.gather(*list(self._writes.values()), return_exceptions=True)
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+
+conversation_memory = ConversationMemory()
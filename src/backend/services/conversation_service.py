@@ -4,16 +4,20 @@ Zapewnia logikę biznesową konwersacji z pełną separacją.
 """
 
 import logging
+from functools import partial
 from typing import Optional, List
 from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 
+from backend.database.pagination import Page, paginate
+from backend.database.unit_of_work import on_commit
 from backend.models.conversation import Conversation, Message
 from backend.schemas.conversation import ConversationCreate, ConversationUpdate
 from backend.schemas.message import MessageCreate
 from backend.exceptions.database import ValidationError
+from backend.services.conversation_cache import ConversationCache, conversation_cache
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +25,10 @@ logger = logging.getLogger(__name__)
 class ConversationService:
     """Service for conversation management operations."""
 
-    def __init__(self, db_session: AsyncSession):
+    def __init__(self, db_session: AsyncSession, cache: Optional[ConversationCache] = None):
         self.db_session = db_session
+        # Session-mode context cache; invalidated whenever stored history changes
+        self.cache = cache if cache is not None else conversation_cache
 
     async def create_conversation(self, conversation_data: ConversationCreate) -> Conversation:
         """Create a new conversation.
@@ -43,19 +49,17 @@ class ConversationService:
                 user_id=conversation_data.user_id,
                 agent_type=conversation_data.agent_type,
                 provider_used=conversation_data.provider_used,
-                metadata=conversation_data.metadata
+                meta_data=conversation_data.metadata
             )
 
             self.db_session.add(conversation)
-            await self.db_session.commit()
-            await self.db_session.refresh(conversation)
+            await self.db_session.flush()
 
             logger.info(f"Conversation created successfully: {conversation.session_id}")
             return conversation
 
         except Exception as e:
             logger.error(f"Failed to create conversation: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to create conversation: {e}")
 
     async def get_conversation_by_id(self, conversation_id: int) -> Optional[Conversation]:
@@ -106,18 +110,16 @@ class ConversationService:
 
             # Update fields
             for field, value in conversation_data.dict(exclude_unset=True).items():
-                setattr(conversation, field, value)
+                setattr(conversation, "meta_data" if field == "metadata" else field, value)
 
             conversation.updated_at = datetime.utcnow()
-            await self.db_session.commit()
-            await self.db_session.refresh(conversation)
+            await self.db_session.flush()
 
             logger.info(f"Conversation updated successfully: {conversation.session_id}")
             return conversation
 
         except Exception as e:
             logger.error(f"Failed to update conversation {conversation_id}: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to update conversation: {e}")
 
     async def delete_conversation(self, conversation_id: int) -> bool:
@@ -138,14 +140,14 @@ class ConversationService:
                 return False
 
             await self.db_session.delete(conversation)
-            await self.db_session.commit()
+            await self.db_session.flush()
+            await on_commit(self.db_session, partial(self.cache.invalidate, conversation_id))
 
             logger.info(f"Conversation deleted successfully: {conversation.session_id}")
             return True
 
         except Exception as e:
             logger.error(f"Failed to delete conversation {conversation_id}: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to delete conversation: {e}")
 
     async def list_conversations(self, user_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[Conversation]:
@@ -191,37 +193,149 @@ class ConversationService:
                 tokens_used=message_data.tokens_used,
                 cost=message_data.cost,
                 processing_time=message_data.processing_time,
-                metadata=message_data.metadata
+                meta_data=message_data.metadata
             )
 
             self.db_session.add(message)
-            await self.db_session.commit()
-            await self.db_session.refresh(message)
+            await self.db_session.flush()
 
             logger.info(f"Message added successfully to conversation {conversation_id}")
             return message
 
         except Exception as e:
             logger.error(f"Failed to add message to conversation {conversation_id}: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to add message: {e}")
 
-    async def get_messages(self, conversation_id: int, skip: int = 0, limit: int = 100) -> List[Message]:
-        """Get messages for conversation.
+    async def get_messages(
+        self, conversation_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Page:
+        """Get messages for conversation, oldest first.
 
         Args:
             conversation_id: Conversation ID
-            skip: Number of records to skip
+            skip: Number of records to skip (deprecated, use cursor)
             limit: Maximum number of records to return
+            cursor: ``next_cursor`` of the previous page
+
+        Returns:
+            Page of message instances
+        """
+        return await paginate(
+            self.db_session,
+            select(Message).where(Message.conversation_id == conversation_id),
+            order_by=(Message.created_at, Message.id),
+            limit=limit,
+            cursor=cursor,
+            offset=skip,
+        )
+
+    async def get_messages_after(self, conversation_id: int, after_message_id: Optional[int] = None) -> List[Message]:
+        """Get messages newer than a given message (all when None).
+
+        Args:
+            conversation_id: Conversation ID
+            after_message_id: Last message already covered (e.g. by the summary)
+
+        Returns:
+            List of message instances in order
+        """
+        query = select(Message).where(Message.conversation_id == conversation_id)
+        if after_message_id is not None:
+            query = query.where(Message.id > after_message_id)
+        result = await self.db_session.execute(query.order_by(Message.id))
+        return result.scalars().all()
+
+    async def update_message(self, message_id: int, content: str) -> Optional[Message]:
+        """Edit message content and invalidate the summary covering it.
+
+        Args:
+            message_id: Message ID
+            content: New content
+
+        Returns:
+            Updated message instance or None
+
+        Raises:
+            ValidationError: If update fails
+        """
+        try:
+            message = await self.db_session.get(Message, message_id)
+            if not message:
+                return None
+
+            message.content = content
+            message.updated_at = datetime.utcnow()
+            await self._invalidate_summary(message.conversation_id, message_id)
+            await self.db_session.flush()
+            await on_commit(self.db_session, partial(self.cache.invalidate, message.conversation_id))
+
+            logger.info(f"Message {message_id} updated in conversation {message.conversation_id}")
+            return message
+
+        except Exception as e:
+            logger.error(f"Failed to update message {message_id}: {e}")
+            raise ValidationError(f"Failed to update message: {e}")
+
+    async def delete_message(self, message_id: int) -> bool:
+        """Delete a message and invalidate the summary covering it.
+
+        Args:
+            message_id: Message ID
+
+        Returns:
+            True if deleted, False if not found
+
+        Raises:
+            ValidationError: If deletion fails
+        """
+        try:
+            message = await self.db_session.get(Message, message_id)
+            if not message:
+                return False
+
+            await self._invalidate_summary(message.conversation_id, message_id)
+            await self.db_session.delete(message)
+            await self.db_session.flush()
+            await on_commit(self.db_session, partial(self.cache.invalidate, message.conversation_id))
+
+            logger.info(f"Message {message_id} deleted from conversation {message.conversation_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to delete message {message_id}: {e}")
+            raise ValidationError(f"Failed to delete message: {e}")
+
+    async def store_summary(
+        self, conversation_id: int, summary: str, through_message_id: int, history_version: int
+    ) -> bool:
+        """Save a running summary unless history changed since it was started.
+
+        Args:
+            conversation_id: Conversation ID
+            summary: Summary text
+            through_message_id: Last message folded into the summary
+            history_version: ``Conversation.history_version`` read before summarizing
 
         Returns:
-            List of message instances
+            True if stored, False if an edit made the summary stale
         """
         result = await self.db_session.execute(
-            select(Message)
-            .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at)
-            .offset(skip)
-            .limit(limit)
+            update(Conversation)
+            .where(Conversation.id == conversation_id, Conversation.history_version == history_version)
+            .values(summary=summary, summary_message_id=through_message_id, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
         )
-        return result.scalars().all() 
\ No newline at end of file
+        if result.rowcount != 1:
+            return False
+        await on_commit(self.db_session, partial(self.cache.invalidate, conversation_id))
+        return True
+
+    async def _invalidate_summary(self, conversation_id: int, message_id: int) -> None:
+        """Bump the history version; drop the summary if it covers the message."""
+        conversation = await self.get_conversation_by_id(conversation_id)
+        if not conversation:
+            return
+        conversation.history_version = (conversation.history_version or 0) + 1
+        if conversation.summary_message_id is not None and message_id <= conversation.summary_message_id:
+            conversation.summary = None
+            conversation.summary_message_id = None
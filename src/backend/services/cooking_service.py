@@ -5,20 +5,47 @@ Zapewnia logikę biznesową dla funkcjonalności kulinarnych.
 
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
-from typing import List, Optional
+from dataclasses import dataclass
+from sqlalchemy import delete, func, insert, select, and_
+from typing import Dict, Iterable, List, Optional
 from datetime import datetime
 
-from backend.models import Product, Recipe, ShoppingList
+from backend.core.name_matcher import NameMatcher, name_key
+from backend.database.pagination import Page, paginate
+from backend.database.unit_of_work import insert_returning
+from backend.models import Product, Recipe, ShoppingList, recipe_ingredients
+from backend.models.recipe import INGREDIENT_KEY_LENGTH, ingredient_keys, ingredient_name
 from backend.schemas.cooking import (
     ProductCreate, ProductUpdate,
-    RecipeCreate, RecipeUpdate,
+    RecipeCreate, RecipeGenerationRequest, RecipeUpdate,
     ShoppingListCreate, ShoppingListUpdate
 )
+from backend.exceptions.cooking import RecipeGenerationError
 from backend.exceptions.database import ValidationError
+from backend.services.nutrition_service import NUTRITION_FIELDS, NutritionService
+from backend.services.search_service import SearchService
 
 logger = logging.getLogger(__name__)
 
+# Names per IN (...) query, below SQLite's default bound-parameter limit
+PRICE_LOOKUP_CHUNK = 500
+
+# Share of a saved recipe's ingredients the user must have before
+# /recipes/from-ingredients returns it instead of asking an LLM
+MIN_RECIPE_COVERAGE = 0.6
+
+# Attempts at a free name for a generated recipe ("Zupa", "Zupa (AI)", "Zupa (AI 2)", ...)
+GENERATED_NAME_ATTEMPTS = 5
+
+
+@dataclass
+class RecipeMatch:
+    """A saved recipe ranked against the ingredients at hand."""
+
+    recipe: Recipe
+    coverage: float
+    missing: List[str]
+
 
 class CookingProductService:
     """Service for product management operations."""
@@ -40,13 +67,8 @@ class CookingProductService:
             ValidationError: If product creation fails
         """
         try:
-            # Check if product already exists for this user
-            existing_product = await self.get_product_by_name(product_data.name, user_id)
-            if existing_product:
-                raise ValidationError(f"Product '{product_data.name}' already exists")
-
-            # Create product
-            product = Product(
+            # Names are unique per user (uq_products_user_id_name); a conflict inserts nothing
+            product = await insert_returning(self.db_session, Product, dict(
                 name=product_data.name,
                 category=product_data.category,
                 unit=product_data.unit,
@@ -56,39 +78,42 @@ class CookingProductService:
                 carbs=product_data.carbs,
                 fats=product_data.fats,
                 user_id=user_id
-            )
-
-            self.db_session.add(product)
-            await self.db_session.commit()
-            await self.db_session.refresh(product)
+            ), conflict_on=("user_id", "name"))
+            if product is None:
+                raise ValidationError(f"Product '{product_data.name}' already exists")
+            await SearchService(self.db_session).index_product(product)
+            if product.calories_per_100g is not None:
+                await NutritionService(self.db_session).invalidate_user(user_id)
 
             logger.info(f"Product created successfully: {product.name} for user {user_id}")
             return product
 
         except Exception as e:
             logger.error(f"Failed to create product: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to create product: {e}")
 
-    async def list_products(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Product]:
-        """List products for a user.
+    async def list_products(
+        self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Page:
+        """List products for a user, ordered by name.
 
         Args:
             user_id: User ID
-            skip: Number of records to skip
+            skip: Number of records to skip (deprecated, use cursor)
             limit: Maximum number of records to return
+            cursor: ``next_cursor`` of the previous page
 
         Returns:
-            List of product instances
+            Page of product instances
         """
-        result = await self.db_session.execute(
-            select(Product)
-            .where(Product.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Product.name)
+        return await paginate(
+            self.db_session,
+            select(Product).where(Product.user_id == user_id),
+            order_by=(Product.name, Product.id),
+            limit=limit,
+            cursor=cursor,
+            offset=skip,
         )
-        return result.scalars().all()
 
     async def get_product_by_id(self, product_id: int, user_id: int) -> Optional[Product]:
         """Get product by ID.
@@ -124,6 +149,80 @@ class CookingProductService:
         )
         return result.scalar_one_or_none()
 
+    async def get_prices_by_name(
+        self, names: Iterable[str], user_id: int, fuzzy: bool = True
+    ) -> Dict[str, float]:
+        """Get unit prices for many products in batched ``IN`` queries.
+
+        Names without an exact match are then matched against the user's
+        priced products ignoring case, diacritics, inflection and small typos
+        ("pomidory" -> "Pomidor"), in one more query.
+
+        Args:
+            names: Product names (duplicates are looked up once)
+            user_id: User ID
+            fuzzy: Match names that have no exact product
+
+        Returns:
+            Mapping of product name to price per unit; unknown and unpriced
+            products are left out
+        """
+        unique = list(dict.fromkeys(name for name in names if name))
+        prices: Dict[str, float] = {}
+        for start in range(0, len(unique), PRICE_LOOKUP_CHUNK):
+            chunk = unique[start:start + PRICE_LOOKUP_CHUNK]
+            result = await self.db_session.execute(
+                select(Product.name, Product.price_per_unit)
+                .where(
+                    and_(
+                        Product.user_id == user_id,
+                        Product.name.in_(chunk),
+                        Product.price_per_unit.is_not(None)
+                    )
+                )
+                .order_by(Product.id)
+            )
+            for name, price in result.all():
+                prices.setdefault(name, price)
+
+        missing = [name for name in unique if name not in prices]
+        if fuzzy and missing:
+            result = await self.db_session.execute(
+                select(Product.name, Product.price_per_unit)
+                .where(and_(Product.user_id == user_id, Product.price_per_unit.is_not(None)))
+                .order_by(Product.id)
+            )
+            matcher = NameMatcher()
+            for name, price in result.all():
+                matcher.add(name, price)
+            for name, match in matcher.match_many(missing).items():
+                prices[name] = match.value
+        return prices
+
+    async def match_products(self, names: Iterable[str], user_id: int) -> Dict[str, Product]:
+        """Resolve free-text names (ingredients, OCR lines) to the user's products.
+
+        Loads the user's products once and matches every name in memory, so
+        the cost per name stays in microseconds however many are resolved.
+
+        Args:
+            names: Names to resolve
+            user_id: User ID
+
+        Returns:
+            Mapping of name to the best matching product; unmatched names are left out
+        """
+        names = [name for name in dict.fromkeys(names) if name]
+        if not names:
+            return {}
+        result = await self.db_session.execute(
+            select(Product).where(Product.user_id == user_id).order_by(Product.id)
+        )
+        matcher = NameMatcher()
+        for product in result.scalars():
+            matcher.add(product.name, product)
+        return {name: match.value for name, match in matcher.match_many(names).items()}
+
     async def update_product(self, product_id: int, product_data: ProductUpdate, user_id: int) -> Optional[Product]:
         """Update product data.
 
@@ -144,19 +243,21 @@ class CookingProductService:
                 return None
 
             # Update fields
-            for field, value in product_data.dict(exclude_unset=True).items():
+            changes = product_data.dict(exclude_unset=True)
+            for field, value in changes.items():
                 setattr(product, field, value)
 
             product.updated_at = datetime.utcnow()
-            await self.db_session.commit()
-            await self.db_session.refresh(product)
+            await self.db_session.flush()
+            await SearchService(self.db_session).index_product(product)
+            if NUTRITION_FIELDS.intersection(changes):
+                await NutritionService(self.db_session).invalidate_user(user_id)
 
             logger.info(f"Product updated successfully: {product.name}")
             return product
 
         except Exception as e:
             logger.error(f"Failed to update product {product_id}: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to update product: {e}")
 
     async def delete_product(self, product_id: int, user_id: int) -> bool:
@@ -177,45 +278,34 @@ class CookingProductService:
             if not product:
                 return False
 
+            if product.calories_per_100g is not None:
+                await NutritionService(self.db_session).invalidate_user(user_id)
             await self.db_session.delete(product)
-            await self.db_session.commit()
+            await self.db_session.flush()
 
             logger.info(f"Product deleted successfully: {product.name}")
             return True
 
         except Exception as e:
             logger.error(f"Failed to delete product {product_id}: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to delete product: {e}")
 
-    async def search_products(self, query: str, user_id: int, skip: int = 0, limit: int = 100) -> List[Product]:
-        """Search products by name or category.
+    async def search_products(
+        self, query: str, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Page:
+        """Full-text search of products by name and category, best match first.
 
         Args:
             query: Search query
             user_id: User ID
-            skip: Number of records to skip
+            skip: Number of records to skip (deprecated, use cursor)
             limit: Maximum number of records to return
+            cursor: ``next_cursor`` of the previous page
 
         Returns:
-            List of matching product instances
+            Page of SearchHit (product, score, snippet)
         """
-        result = await self.db_session.execute(
-            select(Product)
-            .where(
-                and_(
-                    Product.user_id == user_id,
-                    or_(
-                        Product.name.ilike(f"%{query}%"),
-                        Product.category.ilike(f"%{query}%")
-                    )
-                )
-            )
-            .offset(skip)
-            .limit(limit)
-            .order_by(Product.name)
-        )
-        return result.scalars().all()
+        return await SearchService(self.db_session).search_products(query, user_id, skip, limit, cursor)
 
     async def list_categories(self, user_id: int) -> List[str]:
         """List unique product categories for a user.
@@ -241,16 +331,20 @@ class CookingRecipeService:
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
 
-    async def generate_recipe(self, ingredients: list, preferences: str, user_id: int):
+    async def generate_recipe(self, ingredients: list, preferences: str, user_id: int, fallback: bool = True):
         """Generate recipe using AI.
 
         Args:
             ingredients: List of available ingredients
             preferences: User preferences
             user_id: User ID
+            fallback: Return a placeholder recipe when generation fails
 
         Returns:
             Generated recipe data
+
+        Raises:
+            RecipeGenerationError: If generation fails and ``fallback`` is off
         """
         try:
             from backend.core.llm_providers.provider_factory import provider_factory
@@ -283,13 +377,15 @@ class CookingRecipeService:
             
             # Parse JSON response
             import json
-            recipe_data = json.loads(result["text"])
+            recipe_data = json.loads(result.text)
             
             logger.info(f"Recipe generated successfully for user {user_id}")
             return recipe_data
             
         except Exception as e:
             logger.error(f"Failed to generate recipe: {e}")
+            if not fallback:
+                raise RecipeGenerationError(f"Failed to generate recipe: {e}") from e
             # Return fallback recipe
             return {
                 "name": f"Przepis z {', '.join(ingredients[:3])}",
@@ -303,12 +399,13 @@ class CookingRecipeService:
                 "tags": ["szybki", "prosty"]
             }
 
-    async def save_recipe(self, recipe_data: RecipeCreate, user_id: int) -> Recipe:
+    async def save_recipe(self, recipe_data: RecipeCreate, user_id: int, is_ai_generated: bool = False) -> Recipe:
         """Save a new recipe.
 
         Args:
             recipe_data: Recipe creation data
             user_id: User ID
+            is_ai_generated: Whether an LLM wrote the recipe
 
         Returns:
             Created recipe instance
@@ -317,13 +414,8 @@ class CookingRecipeService:
             ValidationError: If recipe creation fails
         """
         try:
-            # Check if recipe already exists for this user
-            existing_recipe = await self.get_recipe_by_name(recipe_data.name, user_id)
-            if existing_recipe:
-                raise ValidationError(f"Recipe '{recipe_data.name}' already exists")
-
-            # Create recipe
-            recipe = Recipe(
+            # Names are unique per user (uq_recipes_user_id_name); a conflict inserts nothing
+            recipe = await insert_returning(self.db_session, Recipe, dict(
                 name=recipe_data.name,
                 description=recipe_data.description,
                 ingredients=recipe_data.ingredients,
@@ -334,40 +426,42 @@ class CookingRecipeService:
                 calories_per_serving=recipe_data.calories_per_serving,
                 tags=recipe_data.tags,
                 user_id=user_id,
-                is_ai_generated=False
-            )
-
-            self.db_session.add(recipe)
-            await self.db_session.commit()
-            await self.db_session.refresh(recipe)
+                is_ai_generated=is_ai_generated
+            ), conflict_on=("user_id", "name"))
+            if recipe is None:
+                raise ValidationError(f"Recipe '{recipe_data.name}' already exists")
+            await SearchService(self.db_session).index_recipe(recipe)
+            await self._index_ingredients(recipe, replace=False)
 
             logger.info(f"Recipe created successfully: {recipe.name} for user {user_id}")
             return recipe
 
         except Exception as e:
             logger.error(f"Failed to create recipe: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to create recipe: {e}")
 
-    async def list_recipes(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Recipe]:
-        """List recipes for a user.
+    async def list_recipes(
+        self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Page:
+        """List recipes for a user, ordered by name.
 
         Args:
             user_id: User ID
-            skip: Number of records to skip
+            skip: Number of records to skip (deprecated, use cursor)
             limit: Maximum number of records to return
+            cursor: ``next_cursor`` of the previous page
 
         Returns:
-            List of recipe instances
+            Page of recipe instances
         """
-        result = await self.db_session.execute(
-            select(Recipe)
-            .where(Recipe.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Recipe.name)
+        return await paginate(
+            self.db_session,
+            select(Recipe).where(Recipe.user_id == user_id),
+            order_by=(Recipe.name, Recipe.id),
+            limit=limit,
+            cursor=cursor,
+            offset=skip,
         )
-        return result.scalars().all()
 
     async def get_recipe(self, recipe_id: int, user_id: int) -> Optional[Recipe]:
         """Get recipe by ID.
@@ -423,19 +517,22 @@ class CookingRecipeService:
                 return None
 
             # Update fields
-            for field, value in recipe_data.dict(exclude_unset=True).items():
+            changes = recipe_data.dict(exclude_unset=True)
+            for field, value in changes.items():
                 setattr(recipe, field, value)
 
             recipe.updated_at = datetime.utcnow()
-            await self.db_session.commit()
-            await self.db_session.refresh(recipe)
+            await self.db_session.flush()
+            await SearchService(self.db_session).index_recipe(recipe)
+            if "ingredients" in changes:
+                await self._index_ingredients(recipe)
+                await NutritionService(self.db_session).invalidate_recipes([recipe.id])
 
             logger.info(f"Recipe updated successfully: {recipe.name}")
             return recipe
 
         except Exception as e:
             logger.error(f"Failed to update recipe {recipe_id}: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to update recipe: {e}")
 
     async def delete_recipe(self, recipe_id: int, user_id: int) -> bool:
@@ -456,45 +553,164 @@ class CookingRecipeService:
             if not recipe:
                 return False
 
+            # Explicit: SQLite does not enforce the ON DELETE CASCADE
+            await self.db_session.execute(
+                delete(recipe_ingredients).where(recipe_ingredients.c.recipe_id == recipe.id)
+            )
+            await NutritionService(self.db_session).invalidate_recipes([recipe.id])
             await self.db_session.delete(recipe)
-            await self.db_session.commit()
+            await self.db_session.flush()
 
             logger.info(f"Recipe deleted successfully: {recipe.name}")
             return True
 
         except Exception as e:
             logger.error(f"Failed to delete recipe {recipe_id}: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to delete recipe: {e}")
 
-    async def search_recipes(self, query: str, user_id: int, skip: int = 0, limit: int = 100) -> List[Recipe]:
-        """Search recipes by name, description, or tags.
+    async def _index_ingredients(self, recipe: Recipe, replace: bool = True) -> None:
+        """Write the recipe's postings to the inverted ingredient index."""
+        if replace:
+            await self.db_session.execute(
+                delete(recipe_ingredients).where(recipe_ingredients.c.recipe_id == recipe.id)
+            )
+        keys = ingredient_keys(recipe.ingredients)
+        if keys:
+            await self.db_session.execute(
+                insert(recipe_ingredients),
+                [
+                    dict(user_id=recipe.user_id, ingredient=key, recipe_id=recipe.id, ingredient_count=len(keys))
+                    for key in keys
+                ],
+            )
+
+    async def find_recipes_by_ingredients(
+        self, ingredients: Iterable[str], user_id: int, max_missing: int = 2, limit: int = 20
+    ) -> List[RecipeMatch]:
+        """Saved recipes the user can make from ``ingredients``, best coverage first.
+
+        Ingredient names are normalized like product names, so inflected,
+        unaccented or slightly misspelled names ("pomidorów", "ziemniaki")
+        match the recipe's ingredients.
 
         Args:
-            query: Search query
+            ingredients: Ingredients at hand
             user_id: User ID
-            skip: Number of records to skip
-            limit: Maximum number of records to return
+            max_missing: Most recipe ingredients the user may lack
+            limit: Maximum number of recipes
 
         Returns:
-            List of matching recipe instances
+            Matches ranked by the share of the recipe's ingredients at hand
         """
-        result = await self.db_session.execute(
-            select(Recipe)
-            .where(
-                and_(
-                    Recipe.user_id == user_id,
-                    or_(
-                        Recipe.name.ilike(f"%{query}%"),
-                        Recipe.description.ilike(f"%{query}%")
-                    )
-                )
-            )
-            .offset(skip)
+        names = [name for name in ingredients if name]
+        if not names:
+            return []
+
+        # Map names onto the keys this user's recipes actually use
+        ri = recipe_ingredients.c
+        known = (await self.db_session.execute(
+            select(ri.ingredient).where(ri.user_id == user_id).distinct()
+        )).scalars().all()
+        matcher = NameMatcher()
+        for key in known:
+            matcher.add(key, key, key=key)
+        pantry = {match.value for match in matcher.match_many(names).values()}
+        if not pantry:
+            return []
+
+        have = func.count()
+        total = func.max(ri.ingredient_count)
+        rows = (await self.db_session.execute(
+            select(ri.recipe_id, have.label("have"), total.label("total"))
+            .where(ri.user_id == user_id, ri.ingredient.in_(pantry))
+            .group_by(ri.recipe_id)
+            .having(total - have <= max_missing)
+            .order_by((have * 1.0 / total).desc(), (total - have).asc(), ri.recipe_id)
             .limit(limit)
-            .order_by(Recipe.name)
+        )).all()
+        if not rows:
+            return []
+
+        recipes = {
+            recipe.id: recipe
+            for recipe in (await self.db_session.execute(
+                select(Recipe).where(Recipe.id.in_([row.recipe_id for row in rows]))
+            )).scalars()
+        }
+        return [
+            RecipeMatch(
+                recipe=recipes[row.recipe_id],
+                coverage=row.have / row.total,
+                missing=[
+                    ingredient_name(item) for item in recipes[row.recipe_id].ingredients or []
+                    if name_key(ingredient_name(item))[:INGREDIENT_KEY_LENGTH] not in pantry
+                ],
+            )
+            for row in rows
+            if row.recipe_id in recipes
+        ]
+
+    async def generate_recipe_from_ingredients(self, request: RecipeGenerationRequest, user_id: int) -> Recipe:
+        """Recipe for the ingredients at hand: a saved one if it fits, else a new AI recipe.
+
+        A saved recipe is returned when at least ``MIN_RECIPE_COVERAGE`` of its
+        ingredients are at hand and at most ``request.max_missing`` are not.
+        Otherwise an LLM writes one, which is saved and returned.
+
+        Args:
+            request: Ingredients and preferences
+            user_id: User ID
+
+        Returns:
+            Saved or newly generated recipe
+
+        Raises:
+            RecipeGenerationError: If the LLM call fails (the placeholder recipe is never saved)
+            ValidationError: If the generated recipe is invalid
+        """
+        matches = await self.find_recipes_by_ingredients(
+            request.ingredients, user_id, max_missing=request.max_missing, limit=1
         )
-        return result.scalars().all()
+        if matches and matches[0].coverage >= MIN_RECIPE_COVERAGE:
+            logger.info(
+                f"Recipe '{matches[0].recipe.name}' covers {matches[0].coverage:.0%} of the ingredients, "
+                f"skipping generation for user {user_id}"
+            )
+            return matches[0].recipe
+
+        recipe_data = await self.generate_recipe(request.ingredients, request.preferences or "", user_id, fallback=False)
+        try:
+            recipe_create = RecipeCreate(**recipe_data)
+        except Exception as e:
+            raise ValidationError(f"Generated recipe is invalid: {e}")
+
+        base_name = recipe_create.name
+        for attempt in range(GENERATED_NAME_ATTEMPTS):
+            if attempt:
+                recipe_create.name = f"{base_name} (AI{'' if attempt == 1 else f' {attempt}'})"
+            try:
+                return await self.save_recipe(recipe_create, user_id, is_ai_generated=True)
+            except ValidationError as e:
+                if "already exists" not in e.message:
+                    raise
+        raise ValidationError(f"Recipe '{base_name}' already exists")
+
+    async def search_recipes(
+        self, query: str, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Page:
+        """Full-text search of recipes by name, tags, ingredients and text, best match first.
+
+        Args:
+            query: Search query
+            user_id: User ID
+            skip: Number of records to skip (deprecated, use cursor)
+            limit: Maximum number of records to return
+            cursor: ``next_cursor`` of the previous page
+
+        Returns:
+            Page of SearchHit (recipe, score, snippet)
+        """
+        return await SearchService(self.db_session).search_recipes(query, user_id, skip, limit, cursor)
 
 
 class CookingShoppingListService:
@@ -517,55 +733,51 @@ class CookingShoppingListService:
             ValidationError: If shopping list creation fails
         """
         try:
-            # Check if shopping list with same name already exists for this user
-            existing_list = await self.get_shopping_list_by_name(shopping_list_data.name, user_id)
-            if existing_list:
-                raise ValidationError(f"Shopping list '{shopping_list_data.name}' already exists")
-
             # Calculate estimated cost if budget is provided
             total_estimated_cost = None
             if shopping_list_data.budget:
                 total_estimated_cost = await self._calculate_list_cost(shopping_list_data.items, user_id)
 
-            # Create shopping list
-            shopping_list = ShoppingList(
+            # Names are unique per user (uq_shopping_lists_user_id_name); a conflict inserts nothing
+            shopping_list = await insert_returning(self.db_session, ShoppingList, dict(
                 name=shopping_list_data.name,
                 items=shopping_list_data.items,
                 total_estimated_cost=total_estimated_cost,
                 user_id=user_id
-            )
-
-            self.db_session.add(shopping_list)
-            await self.db_session.commit()
-            await self.db_session.refresh(shopping_list)
+            ), conflict_on=("user_id", "name"))
+            if shopping_list is None:
+                raise ValidationError(f"Shopping list '{shopping_list_data.name}' already exists")
 
             logger.info(f"Shopping list created successfully: {shopping_list.name} for user {user_id}")
             return shopping_list
 
         except Exception as e:
             logger.error(f"Failed to create shopping list: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to create shopping list: {e}")
 
-    async def list_shopping_lists(self, user_id: int, skip: int = 0, limit: int = 100) -> List[ShoppingList]:
-        """List shopping lists for a user.
+    async def list_shopping_lists(
+        self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Page:
+        """List shopping lists for a user, newest first.
 
         Args:
             user_id: User ID
-            skip: Number of records to skip
+            skip: Number of records to skip (deprecated, use cursor)
             limit: Maximum number of records to return
+            cursor: ``next_cursor`` of the previous page
 
         Returns:
-            List of shopping list instances
+            Page of shopping list instances
         """
-        result = await self.db_session.execute(
-            select(ShoppingList)
-            .where(ShoppingList.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-            .order_by(ShoppingList.created_at.desc())
+        return await paginate(
+            self.db_session,
+            select(ShoppingList).where(ShoppingList.user_id == user_id),
+            order_by=(ShoppingList.created_at, ShoppingList.id),
+            limit=limit,
+            cursor=cursor,
+            descending=True,
+            offset=skip,
         )
-        return result.scalars().all()
 
     async def get_shopping_list(self, list_id: int, user_id: int) -> Optional[ShoppingList]:
         """Get shopping list by ID.
@@ -621,15 +833,13 @@ class CookingShoppingListService:
 
             shopping_list.is_completed = True
             shopping_list.updated_at = datetime.utcnow()
-            await self.db_session.commit()
-            await self.db_session.refresh(shopping_list)
+            await self.db_session.flush()
 
             logger.info(f"Shopping list completed: {shopping_list.name}")
             return shopping_list
 
         except Exception as e:
             logger.error(f"Failed to complete shopping list {list_id}: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to complete shopping list: {e}")
 
     async def delete_shopping_list(self, list_id: int, user_id: int) -> bool:
@@ -651,14 +861,13 @@ class CookingShoppingListService:
                 return False
 
             await self.db_session.delete(shopping_list)
-            await self.db_session.commit()
+            await self.db_session.flush()
 
             logger.info(f"Shopping list deleted successfully: {shopping_list.name}")
             return True
 
         except Exception as e:
             logger.error(f"Failed to delete shopping list {list_id}: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to delete shopping list: {e}")
 
     async def estimate_cost(self, list_id: int, user_id: int) -> float:
@@ -723,7 +932,7 @@ class CookingShoppingListService:
             
             # Parse JSON response
             import json
-            optimization_data = json.loads(result["text"])
+            optimization_data = json.loads(result.text)
             
             logger.info(f"Shopping list optimized successfully for user {user_id}")
             return optimization_data
@@ -749,21 +958,18 @@ class CookingShoppingListService:
         Returns:
             Total estimated cost
         """
+        product_service = CookingProductService(self.db_session)
+        prices = await product_service.get_prices_by_name(
+            (item.get('product_name', '') for item in items), user_id
+        )
+
         total_cost = 0.0
-        
         for item in items:
-            product_name = item.get('product_name', '')
-            quantity = item.get('quantity', 0)
-            
-            # Try to find product in user's database
-            product_service = CookingProductService(self.db_session)
-            product = await product_service.get_product_by_name(product_name, user_id)
-            
-            if product and product.price_per_unit:
-                total_cost += product.price_per_unit * quantity
+            price = prices.get(item.get('product_name', ''))
+            if price:
+                total_cost += price * item.get('quantity', 0)
             else:
                 # Use estimated price from item if available
-                estimated_price = item.get('estimated_price', 0)
-                total_cost += estimated_price
+                total_cost += item.get('estimated_price', 0)
 
-        return total_cost 
\ No newline at end of file
+        return total_cost
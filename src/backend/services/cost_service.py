@@ -3,19 +3,40 @@ Cost tracking service for Ageny Online.
 Zapewnia logikę biznesową śledzenia kosztów z pełną separacją.
 """
 
+import json
 import logging
 from typing import Optional, List, Dict, Any
-from datetime import date, datetime
+from datetime import date, datetime, time, timedelta
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
+from backend.database.pagination import Page, paginate
+from backend.database.write_behind import write_behind_queue
 from backend.models.cost_tracking import CostRecord
 from backend.schemas.cost import CostRecordCreate
 from backend.exceptions.database import ValidationError
 
 logger = logging.getLogger(__name__)
 
+OCR_SERVICE_TYPES = ("ocr", "vision")
+
+
+def _day_start(day: date) -> datetime:
+    """Start of a calendar day as naive UTC datetime."""
+    return datetime.combine(day, time.min)
+
+
+def _apply_date_filters(query, user_id: Optional[int], start_date: Optional[date], end_date: Optional[date]):
+    """Apply common user/date filters to a CostRecord query."""
+    if user_id:
+        query = query.where(CostRecord.user_id == user_id)
+    if start_date:
+        query = query.where(CostRecord.timestamp >= _day_start(start_date))
+    if end_date:
+        query = query.where(CostRecord.timestamp < _day_start(end_date + timedelta(days=1)))
+    return query
+
 
 class CostService:
     """Service for cost tracking operations."""
@@ -36,21 +57,25 @@ class CostService:
             ValidationError: If cost recording fails
         """
         try:
-            cost_record = CostRecord(
+            metadata = cost_data.metadata or {}
+            timestamp = datetime.utcnow()
+            if cost_data.date != timestamp.date():
+                timestamp = _day_start(cost_data.date)
+
+            # Buffered by the write-behind queue when it runs (the record has no id yet)
+            cost_record = await write_behind_queue.submit(CostRecord, dict(
                 user_id=cost_data.user_id,
-                date=cost_data.date,
-                provider=cost_data.provider,
-                service_type=cost_data.service_type,
+                session_id=str(metadata.get("session_id", "system")),
+                provider_type="ocr" if cost_data.service_type in OCR_SERVICE_TYPES else "llm",
+                provider_name=cost_data.provider,
                 model_used=cost_data.model_used,
                 tokens_used=cost_data.tokens_used,
-                cost=cost_data.cost,
+                cost_usd=float(cost_data.cost),
                 request_count=cost_data.request_count,
-                metadata=cost_data.metadata
-            )
-
-            self.db_session.add(cost_record)
-            await self.db_session.commit()
-            await self.db_session.refresh(cost_record)
+                request_type=cost_data.service_type,
+                timestamp=timestamp,
+                meta_data=json.dumps(metadata)[:500] if metadata else None
+            ), self.db_session)
 
             logger.info(
                 f"Cost recorded: provider={cost_data.provider}, "
@@ -60,7 +85,6 @@ class CostService:
 
         except Exception as e:
             logger.error(f"Failed to record cost: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to record cost: {e}")
 
     async def get_cost_records(
@@ -71,8 +95,9 @@ class CostService:
         provider: Optional[str] = None,
         service_type: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[CostRecord]:
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Page:
         """Get cost records with filters.
 
         Args:
@@ -81,29 +106,28 @@ class CostService:
             end_date: Filter by end date (optional)
             provider: Filter by provider (optional)
             service_type: Filter by service type (optional)
-            skip: Number of records to skip
+            skip: Number of records to skip (deprecated, use cursor)
             limit: Maximum number of records to return
+            cursor: ``next_cursor`` of the previous page
 
         Returns:
-            List of cost record instances
+            Page of cost record instances, newest first
         """
-        query = select(CostRecord)
-        
-        if user_id:
-            query = query.where(CostRecord.user_id == user_id)
-        if start_date:
-            query = query.where(CostRecord.date >= start_date)
-        if end_date:
-            query = query.where(CostRecord.date <= end_date)
+        query = _apply_date_filters(select(CostRecord), user_id, start_date, end_date)
         if provider:
-            query = query.where(CostRecord.provider == provider)
+            query = query.where(CostRecord.provider_name == provider)
         if service_type:
-            query = query.where(CostRecord.service_type == service_type)
+            query = query.where(CostRecord.request_type == service_type)
         
-        result = await self.db_session.execute(
-            query.order_by(CostRecord.date.desc()).offset(skip).limit(limit)
+        return await paginate(
+            self.db_session,
+            query,
+            order_by=(CostRecord.timestamp, CostRecord.id),
+            limit=limit,
+            cursor=cursor,
+            descending=True,
+            offset=skip,
         )
-        return result.scalars().all()
 
     async def get_cost_summary(
         self,
@@ -121,14 +145,7 @@ class CostService:
         Returns:
             Dictionary with cost summary
         """
-        query = select(CostRecord)
-        
-        if user_id:
-            query = query.where(CostRecord.user_id == user_id)
-        if start_date:
-            query = query.where(CostRecord.date >= start_date)
-        if end_date:
-            query = query.where(CostRecord.date <= end_date)
+        query = _apply_date_filters(select(CostRecord), user_id, start_date, end_date)
         
         result = await self.db_session.execute(query)
         records = result.scalars().all()
@@ -142,35 +159,35 @@ class CostService:
                 "services": {}
             }
         
-        total_cost = sum(float(r.cost) for r in records)
+        total_cost = sum(float(r.cost_usd) for r in records)
         total_requests = sum(r.request_count for r in records)
         total_tokens = sum(r.tokens_used or 0 for r in records)
         
         # Group by provider
         providers = {}
         for record in records:
-            provider = record.provider
+            provider = record.provider_name
             if provider not in providers:
                 providers[provider] = {
                     "cost": 0.0,
                     "requests": 0,
                     "tokens": 0
                 }
-            providers[provider]["cost"] += float(record.cost)
+            providers[provider]["cost"] += float(record.cost_usd)
             providers[provider]["requests"] += record.request_count
             providers[provider]["tokens"] += record.tokens_used or 0
         
         # Group by service type
         services = {}
         for record in records:
-            service = record.service_type
+            service = record.request_type
             if service not in services:
                 services[service] = {
                     "cost": 0.0,
                     "requests": 0,
                     "tokens": 0
                 }
-            services[service]["cost"] += float(record.cost)
+            services[service]["cost"] += float(record.cost_usd)
             services[service]["requests"] += record.request_count
             services[service]["tokens"] += record.tokens_used or 0
         
@@ -198,27 +215,22 @@ class CostService:
         Returns:
             List of daily cost summaries
         """
+        day = func.date(CostRecord.timestamp).label("day")
         query = select(
-            CostRecord.date,
-            func.sum(func.cast(CostRecord.cost, func.Float)).label("total_cost"),
+            day,
+            func.sum(CostRecord.cost_usd).label("total_cost"),
             func.sum(CostRecord.request_count).label("total_requests"),
             func.sum(CostRecord.tokens_used).label("total_tokens")
-        ).group_by(CostRecord.date)
-        
-        if user_id:
-            query = query.where(CostRecord.user_id == user_id)
-        if start_date:
-            query = query.where(CostRecord.date >= start_date)
-        if end_date:
-            query = query.where(CostRecord.date <= end_date)
+        ).group_by(day)
+        query = _apply_date_filters(query, user_id, start_date, end_date)
         
         result = await self.db_session.execute(
-            query.order_by(CostRecord.date.desc())
+            query.order_by(day.desc())
         )
         
         return [
             {
-                "date": row.date.isoformat(),
+                "date": str(row.day),
                 "total_cost": float(row.total_cost or 0),
                 "total_requests": row.total_requests or 0,
                 "total_tokens": row.total_tokens or 0
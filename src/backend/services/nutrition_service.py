@@ -0,0 +1,176 @@
+"""
+Recipe nutrition: computed from the local nutrient table and the user's products, stored per recipe.
+Wartości odżywcze przepisów liczone lokalnie (tabela składników + produkty użytkownika) i zapisywane.
+"""
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.core.nutrition import (
+    BUNDLED_TABLE, NUTRIENTS, Food, Ingredient, NutritionTable, load_foods, table_version
+)
+from backend.database.unit_of_work import insert_ignoring_conflicts
+from backend.models import Product, Recipe, RecipeNutrition
+from backend.models.recipe import ingredient_name
+
+logger = logging.getLogger(__name__)
+
+# Product fields that change what a product contributes to nutrition
+NUTRITION_FIELDS = frozenset({"name", "calories_per_100g", "proteins", "carbs", "fats"})
+
+
+@dataclass
+class NutritionResult:
+    """Nutrient totals of a whole recipe and the ingredients left out of them."""
+
+    recipe: Recipe
+    totals: Dict[str, float]
+    unresolved: List[str]
+
+
+@lru_cache(maxsize=4)
+def reference_table(extra_path: str = "") -> NutritionTable:
+    """Bundled nutrient table, with the rows of ``extra_path`` (if any) taking precedence."""
+    foods: List[Food] = []
+    if extra_path:
+        try:
+            foods += load_foods(extra_path)
+        except (OSError, KeyError, ValueError) as e:
+            logger.error(f"Failed to load nutrient table {extra_path}: {e}")
+    foods += load_foods(BUNDLED_TABLE)
+    return NutritionTable(foods)
+
+
+@lru_cache(maxsize=4)
+def reference_version(extra_path: str = "") -> str:
+    """Fingerprint of ``reference_table(extra_path)``; stored with every computed row."""
+    return table_version(reference_table(extra_path).foods)
+
+
+def _ingredient(item: Any) -> Ingredient:
+    if isinstance(item, dict):
+        return ingredient_name(item), item.get("amount"), item.get("unit")
+    return ingredient_name(item), None, None
+
+
+class NutritionService:
+    """Computes recipe nutrition in batches and keeps the stored results current."""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def analyze_recipe(self, recipe_id: int, user_id: int) -> Optional[NutritionResult]:
+        """Nutrition of one recipe, or None if the user has no such recipe."""
+        return (await self.analyze_recipes([recipe_id], user_id)).get(recipe_id)
+
+    async def analyze_recipes(self, recipe_ids: Iterable[int], user_id: int) -> Dict[int, NutritionResult]:
+        """
+        Nutrition of many recipes.
+
+        Stored results are reused; recipes without a current one are computed
+        together in one vectorized pass and stored.
+
+        Args:
+            recipe_ids: Recipe IDs (duplicates are computed once)
+            user_id: User ID
+
+        Returns:
+            Mapping of recipe ID to result, in request order; unknown recipes are left out
+        """
+        ids = list(dict.fromkeys(recipe_ids))
+        if not ids:
+            return {}
+        result = await self.db_session.execute(
+            select(Recipe).where(Recipe.user_id == user_id, Recipe.id.in_(ids))
+        )
+        recipes = {recipe.id: recipe for recipe in result.scalars()}
+        if not recipes:
+            return {}
+
+        version = reference_version(settings.NUTRITION_TABLE_PATH)
+        result = await self.db_session.execute(
+            select(RecipeNutrition).where(
+                RecipeNutrition.recipe_id.in_(list(recipes)), RecipeNutrition.table_version == version
+            )
+        )
+        results = {
+            row.recipe_id: NutritionResult(
+                recipes[row.recipe_id], {n: getattr(row, n) for n in NUTRIENTS}, list(row.unresolved)
+            )
+            for row in result.scalars()
+        }
+
+        stale = [recipe_id for recipe_id in ids if recipe_id in recipes and recipe_id not in results]
+        if stale:
+            results.update(await self._compute([recipes[recipe_id] for recipe_id in stale], user_id, version))
+        return {recipe_id: results[recipe_id] for recipe_id in ids if recipe_id in results}
+
+    async def _compute(self, recipes: List[Recipe], user_id: int, version: str) -> Dict[int, NutritionResult]:
+        table = await self._table(user_id)
+        totals, unresolved = table.compute([
+            [_ingredient(item) for item in recipe.ingredients or [] if ingredient_name(item)] for recipe in recipes
+        ])
+
+        rows = [
+            dict(
+                recipe_id=recipe.id, user_id=user_id, unresolved=missing, table_version=version,
+                **{nutrient: float(value) for nutrient, value in zip(NUTRIENTS, row)},
+            )
+            for recipe, row, missing in zip(recipes, totals, unresolved)
+        ]
+        # Results of an older table version
+        await self.db_session.execute(
+            delete(RecipeNutrition).where(RecipeNutrition.recipe_id.in_([recipe.id for recipe in recipes]))
+        )
+        # A concurrent request may have stored the same recipe; either result is current
+        await self.db_session.execute(insert_ignoring_conflicts(self.db_session, RecipeNutrition, ("recipe_id",)), rows)
+        logger.debug(f"Computed nutrition of {len(recipes)} recipes for user {user_id}")
+        return {
+            recipe.id: NutritionResult(recipe, {n: row[n] for n in NUTRIENTS}, row["unresolved"])
+            for recipe, row in zip(recipes, rows)
+        }
+
+    async def _table(self, user_id: int) -> NutritionTable:
+        """Nutrient table for a user: their products with nutrition data first, then the reference table.
+
+        Products only carry calories and macros, so their fiber and sugar
+        count as zero; piece weight and density come from the reference food
+        of the same name.
+        """
+        reference = reference_table(settings.NUTRITION_TABLE_PATH)
+        result = await self.db_session.execute(
+            select(Product)
+            .where(Product.user_id == user_id, Product.calories_per_100g.is_not(None))
+            .order_by(Product.id)
+        )
+        foods = []
+        for product in result.scalars():
+            known = reference.lookup(product.name)
+            foods.append(Food(
+                name=product.name,
+                per_100g=(
+                    float(product.calories_per_100g), product.proteins or 0.0, product.carbs or 0.0,
+                    product.fats or 0.0, 0.0, 0.0,
+                ),
+                piece_grams=known.piece_grams if known else None,
+                density=known.density if known else None,
+            ))
+        if not foods:
+            return reference
+        return NutritionTable(foods + reference.foods)
+
+    async def invalidate_recipes(self, recipe_ids: Iterable[int]) -> None:
+        """Drop the stored nutrition of recipes (ingredients changed or recipe deleted)."""
+        ids = list(recipe_ids)
+        if ids:
+            await self.db_session.execute(delete(RecipeNutrition).where(RecipeNutrition.recipe_id.in_(ids)))
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Drop the stored nutrition of every recipe of a user (their products changed)."""
+        await self.db_session.execute(delete(RecipeNutrition).where(RecipeNutrition.user_id == user_id))
@@ -10,6 +10,8 @@ from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from backend.database.pagination import Page, paginate
+from backend.database.write_behind import write_behind_queue
 from backend.models.ocr_result import OCRResult
 from backend.core.ocr_providers import ocr_provider_factory
 from backend.exceptions.ocr import OCRError, OCRProviderError
@@ -66,8 +68,8 @@ class OCRService:
                 prompt=prompt
             )
 
-            # Store result in database
-            ocr_record = OCRResult(
+            # Store result in database (buffered by the write-behind queue when it runs)
+            await write_behind_queue.submit(OCRResult, dict(
                 user_id=user_id,
                 session_id=session_id or "unknown",
                 provider_used=provider,
@@ -79,12 +81,8 @@ class OCRService:
                 image_size_bytes=len(image_bytes),
                 processing_time=result.get("processing_time"),
                 prompt_used=prompt,
-                metadata=result.get("metadata", {})
-            )
-
-            self.db_session.add(ocr_record)
-            await self.db_session.commit()
-            await self.db_session.refresh(ocr_record)
+                meta_data=result.get("metadata", {})
+            ), self.db_session)
 
             logger.info(
                 f"OCR text extraction completed: provider={provider}, "
@@ -95,7 +93,6 @@ class OCRService:
 
         except Exception as e:
             logger.error(f"OCR text extraction failed: {e}")
-            await self.db_session.rollback()
             raise OCRError(f"OCR processing failed: {e}")
 
     async def extract_text_batch(
@@ -145,7 +142,7 @@ class OCRService:
             ocr_records = []
             for i, result in enumerate(results):
                 if "error" not in result:
-                    ocr_record = OCRResult(
+                    ocr_records.append(dict(
                         user_id=user_id,
                         session_id=session_id or "unknown",
                         provider_used=provider,
@@ -157,13 +154,15 @@ class OCRService:
                         image_size_bytes=len(images[i]),
                         processing_time=result.get("processing_time"),
                         prompt_used=prompt,
-                        metadata=result.get("metadata", {})
-                    )
-                    ocr_records.append(ocr_record)
+                        meta_data=result.get("metadata", {})
+                    ))
 
-            if ocr_records:
-                self.db_session.add_all(ocr_records)
-                await self.db_session.commit()
+            if write_behind_queue.running:
+                for values in ocr_records:
+                    await write_behind_queue.put(OCRResult, values)
+            elif ocr_records:
+                self.db_session.add_all([OCRResult(**values) for values in ocr_records])
+                await self.db_session.flush()
 
             logger.info(
                 f"OCR batch extraction completed: provider={provider}, "
@@ -174,7 +173,6 @@ class OCRService:
 
         except Exception as e:
             logger.error(f"OCR batch extraction failed: {e}")
-            await self.db_session.rollback()
             raise OCRError(f"OCR batch processing failed: {e}")
 
     async def get_ocr_history(
@@ -182,18 +180,20 @@ class OCRService:
         user_id: Optional[int] = None, 
         session_id: Optional[str] = None,
         skip: int = 0, 
-        limit: int = 100
-    ) -> List[OCRResult]:
-        """Get OCR processing history.
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Page:
+        """Get OCR processing history, newest first.
 
         Args:
             user_id: Filter by user ID (optional)
             session_id: Filter by session ID (optional)
-            skip: Number of records to skip
+            skip: Number of records to skip (deprecated, use cursor)
             limit: Maximum number of records to return
+            cursor: ``next_cursor`` of the previous page
 
         Returns:
-            List of OCR result instances
+            Page of OCR result instances
         """
         query = select(OCRResult)
         
@@ -202,10 +202,15 @@ class OCRService:
         if session_id:
             query = query.where(OCRResult.session_id == session_id)
         
-        result = await self.db_session.execute(
-            query.order_by(OCRResult.created_at.desc()).offset(skip).limit(limit)
+        return await paginate(
+            self.db_session,
+            query,
+            order_by=(OCRResult.created_at, OCRResult.id),
+            limit=limit,
+            cursor=cursor,
+            descending=True,
+            offset=skip,
         )
-        return result.scalars().all()
 
     async def get_ocr_statistics(self, user_id: Optional[int] = None) -> Dict[str, Any]:
         """Get OCR processing statistics.
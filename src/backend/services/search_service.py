@@ -0,0 +1,147 @@
+"""
+Full-text search over products and recipes.
+Wyszukiwanie pełnotekstowe z rankingiem i fragmentami (FTS5 na SQLite, tsvector na PostgreSQL).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence, Type
+
+from sqlalchemy import column, func, literal_column, select, table, text, tuple_
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.polish_text import snippet, terms
+from backend.database.pagination import Page, decode_cursor, encode_cursor
+from backend.models import Product, Recipe
+from backend.models.search import DOCUMENTS, SEARCH_TABLES, WEIGHTS, upsert_sql
+
+
+@dataclass
+class SearchHit:
+    """One search result: the entity, its relevance and a highlighted excerpt."""
+
+    item: Any
+    score: float
+    snippet: Optional[str] = None
+
+
+class SearchService:
+    """Keeps the search tables in step with the write path and runs ranked queries."""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    @property
+    def _dialect(self) -> str:
+        return self.db_session.bind.dialect.name
+
+    async def index_product(self, product: Product) -> None:
+        """Store or refresh the search document of a product."""
+        await self._index("products", product)
+
+    async def index_recipe(self, recipe: Recipe) -> None:
+        """Store or refresh the search document of a recipe."""
+        await self._index("recipes", recipe)
+
+    async def _index(self, source: str, item: Any) -> None:
+        if self._dialect not in ("sqlite", "postgresql"):
+            return
+        await self.db_session.execute(text(upsert_sql(self._dialect, source)), DOCUMENTS[source](item))
+
+    async def search_products(
+        self, query: str, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Page:
+        """
+        Products matching every word of ``query``, best first.
+
+        Name matches outrank category matches. Words match by stem prefix, so
+        ``pomidory`` finds ``Pomidor`` and ``mlek`` finds ``Mleko``.
+
+        Args:
+            query: Search query
+            user_id: User ID
+            skip: Number of records to skip (deprecated, use cursor)
+            limit: Maximum number of records to return
+            cursor: ``next_cursor`` of the previous page
+
+        Returns:
+            Page of SearchHit
+        """
+        return await self._search(Product, query, user_id, skip, limit, cursor, ("name", "category"))
+
+    async def search_recipes(
+        self, query: str, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Page:
+        """
+        Recipes matching every word of ``query``, best first.
+
+        Searches the name, tags, ingredient names, description and
+        instructions, weighted in that order.
+
+        Args:
+            query: Search query
+            user_id: User ID
+            skip: Number of records to skip (deprecated, use cursor)
+            limit: Maximum number of records to return
+            cursor: ``next_cursor`` of the previous page
+
+        Returns:
+            Page of SearchHit
+        """
+        return await self._search(
+            Recipe, query, user_id, skip, limit, cursor, ("description", "instructions", "name")
+        )
+
+    async def _search(
+        self,
+        model: Type[Any],
+        query: str,
+        user_id: int,
+        skip: int,
+        limit: int,
+        cursor: Optional[str],
+        snippet_fields: Sequence[str],
+    ) -> Page:
+        stems = list(dict.fromkeys(terms(query)))
+        if not stems:
+            return Page()
+
+        name = SEARCH_TABLES[model.__tablename__]
+        if self._dialect == "sqlite":
+            fts = table(name, column("rowid"))
+            key = fts.c.rowid
+            match = literal_column(name).op("MATCH")(" ".join(f'"{s}"*' for s in stems))
+            # bm25() is negative, lower is better
+            score = func.bm25(literal_column(name), *(literal_column(repr(w)) for w in WEIGHTS))
+        else:
+            fts = table(name, column("id"), column("document"))
+            key = fts.c.id
+            tsquery = func.to_tsquery("simple", " & ".join(f"{s}:*" for s in stems))
+            match = fts.c.document.op("@@")(tsquery)
+            # ts_rank takes {D, C, B, A} weights in [0, 1]
+            weights = array([0.0, *(w / WEIGHTS[0] for w in reversed(WEIGHTS))])
+            score = -func.ts_rank(weights, fts.c.document, tsquery)
+
+        statement = (
+            select(model, score.label("score"))
+            .join(fts, key == model.id)
+            .where(match, model.user_id == user_id)
+        )
+        if cursor:
+            statement = statement.where(tuple_(score, model.id) > tuple_(*decode_cursor(cursor, 2)))
+        elif skip:
+            statement = statement.offset(skip)
+        rows = (await self.db_session.execute(statement.order_by(score, model.id).limit(limit + 1))).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1].score, rows[-1][0].id])
+
+        hits = []
+        for item, raw in rows:
+            excerpt = next(
+                (s for s in (snippet(getattr(item, f), stems) for f in snippet_fields) if s), None
+            )
+            hits.append(SearchHit(item=item, score=-raw, snippet=excerpt))
+        return Page(hits, next_cursor)
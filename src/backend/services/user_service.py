@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from passlib.context import CryptContext
 
+from backend.database.unit_of_work import insert_returning
 from backend.models.user import User
 from backend.schemas.user import UserCreate, UserUpdate
 from backend.exceptions.database import ValidationError
@@ -40,33 +41,27 @@ class UserService:
             ValidationError: If user creation fails
         """
         try:
-            # Check if user already exists
-            existing_user = await self.get_user_by_email(user_data.email)
-            if existing_user:
-                raise ValidationError(f"User with email {user_data.email} already exists")
-
             # Hash password
             hashed_password = pwd_context.hash(user_data.password)
 
-            # Create user
-            user = User(
+            # Email and username are unique; a conflict on either inserts nothing
+            user = await insert_returning(self.db_session, User, dict(
                 username=user_data.username,
                 email=user_data.email,
                 hashed_password=hashed_password,
                 full_name=user_data.full_name,
                 is_active=user_data.is_active
-            )
-
-            self.db_session.add(user)
-            await self.db_session.commit()
-            await self.db_session.refresh(user)
+            ), conflict_on=())
+            if user is None:
+                raise ValidationError(
+                    f"User with email {user_data.email} or username {user_data.username} already exists"
+                )
 
             logger.info(f"User created successfully: {user.username}")
             return user
 
         except Exception as e:
             logger.error(f"Failed to create user: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to create user: {e}")
 
     async def get_user_by_id(self, user_id: int) -> Optional[User]:
@@ -134,15 +129,13 @@ class UserService:
                 setattr(user, field, value)
 
             user.updated_at = datetime.utcnow()
-            await self.db_session.commit()
-            await self.db_session.refresh(user)
+            await self.db_session.flush()
 
             logger.info(f"User updated successfully: {user.username}")
             return user
 
         except Exception as e:
             logger.error(f"Failed to update user {user_id}: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to update user: {e}")
 
     async def delete_user(self, user_id: int) -> bool:
@@ -163,14 +156,13 @@ class UserService:
                 return False
 
             await self.db_session.delete(user)
-            await self.db_session.commit()
+            await self.db_session.flush()
 
             logger.info(f"User deleted successfully: {user.username}")
             return True
 
         except Exception as e:
             logger.error(f"Failed to delete user {user_id}: {e}")
-            await self.db_session.rollback()
             raise ValidationError(f"Failed to delete user: {e}")
 
     async def list_users(self, skip: int = 0, limit: int = 100) -> List[User]:
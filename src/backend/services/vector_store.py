@@ -0,0 +1,52 @@
+"""
+Vector store client shared by the API and the agents.
+Klient wektorowej bazy danych używany przez API i agentów (RAG).
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+# Mock vector store client
+class MockVectorStoreClient:
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.documents = {}
+    
+    async def upsert_vectors(self, vectors: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Mock upsert vectors operation."""
+        for vector in vectors:
+            doc_id = vector.get("id", f"doc_{len(self.documents)}")
+            self.documents[doc_id] = {
+                "id": doc_id,
+                "text": vector.get("text", ""),
+                "metadata": vector.get("metadata", {}),
+                "vector": vector.get("vector", [0.1] * 1536)
+            }
+        
+        return {
+            "upserted_count": len(vectors),
+            "provider": self.provider,
+            "cost": 0.001 * len(vectors)
+        }
+    
+    async def query_vectors(self, query_vector: List[float], top_k: int = 10, filter: Optional[Dict] = None) -> Dict[str, Any]:
+        """Mock query vectors operation."""
+        # Simple mock search - return first few documents
+        results = []
+        for i, (doc_id, doc) in enumerate(list(self.documents.items())[:top_k]):
+            results.append({
+                "id": doc_id,
+                "text": doc["text"],
+                "metadata": doc["metadata"],
+                "score": 0.9 - (i * 0.1)  # Mock decreasing scores
+            })
+        
+        return {
+            "matches": results,
+            "provider": self.provider,
+            "cost": 0.0001
+        }
+
+def get_vector_store_client(provider: str = "pinecone") -> MockVectorStoreClient:
+    """Get vector store client for the specified provider."""
+    return MockVectorStoreClient(provider)
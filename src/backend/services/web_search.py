@@ -0,0 +1,252 @@
+"""
+Web search providers and helpers shared by the API and the agents.
+Dostawcy wyszukiwania w sieci i funkcje pomocnicze używane przez API i agentów.
+"""
+
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, List
+
+import aiohttp
+from pydantic import BaseModel
+
+from backend.core.llm_providers.provider_factory import LLMProviderFactory, ProviderType
+
+logger = logging.getLogger(__name__)
+
+
+class WebSearchResult(BaseModel):
+    """Web search result model."""
+    title: str
+    url: str
+    snippet: str
+    source: str
+    timestamp: str
+
+class WebSearchProvider:
+    """Base class for web search providers."""
+    
+    async def search(self, query: str, max_results: int) -> List[WebSearchResult]:
+        """Perform web search and return results."""
+        raise NotImplementedError
+
+class DuckDuckGoProvider(WebSearchProvider):
+    """DuckDuckGo search provider using their Instant Answer API."""
+    
+    async def search(self, query: str, max_results: int) -> List[WebSearchResult]:
+        """Search using DuckDuckGo Instant Answer API."""
+        try:
+            async with aiohttp.ClientSession() as session:
+                # DuckDuckGo Instant Answer API
+                url = "https://api.duckduckgo.com/"
+                params = {
+                    "q": query,
+                    "format": "json",
+                    "no_html": "1",
+                    "skip_disambig": "1"
+                }
+                
+                async with session.get(url, params=params) as response:
+                    if response.status != 200:
+                        logger.error(f"DuckDuckGo API error: {response.status}")
+                        return []
+                    
+                    data = await response.json()
+                    
+                    results = []
+                    
+                    # Add instant answer if available
+                    if data.get("Abstract"):
+                        results.append(WebSearchResult(
+                            title=data.get("AbstractSource", "DuckDuckGo"),
+                            url=data.get("AbstractURL", ""),
+                            snippet=data.get("Abstract", ""),
+                            source="duckduckgo_instant",
+                            timestamp=datetime.now().isoformat()
+                        ))
+                    
+                    # Add related topics
+                    for topic in data.get("RelatedTopics", [])[:max_results-1]:
+                        if isinstance(topic, dict) and topic.get("Text"):
+                            results.append(WebSearchResult(
+                                title=topic.get("FirstURL", "").split("/")[-1] if topic.get("FirstURL") else "Related Topic",
+                                url=topic.get("FirstURL", ""),
+                                snippet=topic.get("Text", ""),
+                                source="duckduckgo_related",
+                                timestamp=datetime.now().isoformat()
+                            ))
+                    
+                    return results[:max_results]
+                    
+        except Exception as e:
+            logger.error(f"DuckDuckGo search failed: {e}")
+            return []
+
+class SerperProvider(WebSearchProvider):
+    """Serper.dev search provider (requires API key)."""
+    
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.base_url = "https://google.serper.dev/search"
+    
+    async def search(self, query: str, max_results: int) -> List[WebSearchResult]:
+        """Search using Serper.dev API."""
+        try:
+            headers = {
+                "X-API-KEY": self.api_key,
+                "Content-Type": "application/json"
+            }
+            
+            payload = {
+                "q": query,
+                "num": max_results
+            }
+            
+            async with aiohttp.ClientSession() as session:
+                async with session.post(self.base_url, headers=headers, json=payload) as response:
+                    if response.status != 200:
+                        logger.error(f"Serper API error: {response.status}")
+                        return []
+                    
+                    data = await response.json()
+                    
+                    results = []
+                    for item in data.get("organic", []):
+                        results.append(WebSearchResult(
+                            title=item.get("title", ""),
+                            url=item.get("link", ""),
+                            snippet=item.get("snippet", ""),
+                            source="serper",
+                            timestamp=datetime.now().isoformat()
+                        ))
+                    
+                    return results[:max_results]
+                    
+        except Exception as e:
+            logger.error(f"Serper search failed: {e}")
+            return []
+
+class PerplexityProvider(WebSearchProvider):
+    """Perplexity search provider using their AI-powered search."""
+    
+    def __init__(self):
+        self.provider_factory = LLMProviderFactory()
+    
+    async def search(self, query: str, max_results: int) -> List[WebSearchResult]:
+        """Search using Perplexity API."""
+        try:
+            # Check if Perplexity is configured
+            if ProviderType.PERPLEXITY not in self.provider_factory.get_configured_providers():
+                logger.warning("Perplexity not configured, falling back to DuckDuckGo")
+                return await DuckDuckGoProvider().search(query, max_results)
+            
+            # Use Perplexity for search
+            provider = self.provider_factory.create_provider(ProviderType.PERPLEXITY)
+            
+            # Perform search with Perplexity
+            search_result = await provider.search(
+                query=query,
+                model="sonar-pro-online",  # Use online model for search
+                max_tokens=1000
+            )
+            
+            # Create result from Perplexity response
+            results = []
+            if search_result.text:
+                results.append(WebSearchResult(
+                    title="Perplexity AI Search",
+                    url="https://perplexity.ai",
+                    snippet=search_result.text[:500] + "..." if len(search_result.text) > 500 else search_result.text,
+                    source="perplexity_ai",
+                    timestamp=datetime.now().isoformat()
+                ))
+            
+            # If we don't have enough results, fall back to DuckDuckGo
+            if len(results) < max_results:
+                duckduckgo_results = await DuckDuckGoProvider().search(query, max_results - len(results))
+                results.extend(duckduckgo_results)
+            
+            return results[:max_results]
+            
+        except Exception as e:
+            logger.error(f"Perplexity search failed: {e}")
+            # Fall back to DuckDuckGo
+            return await DuckDuckGoProvider().search(query, max_results)
+
+# Initialize search providers
+search_providers = {
+    "duckduckgo": DuckDuckGoProvider(),
+    "perplexity": PerplexityProvider(),
+    # "serper": SerperProvider(api_key="your_api_key_here")  # Uncomment and add API key
+}
+
+def should_use_web_search(message: str) -> bool:
+    """Determine if web search should be used based on message content."""
+    # Keywords that indicate need for current information
+    current_info_keywords = [
+        "dzisiaj", "obecnie", "aktualnie", "ostatnio", "niedawno", "w tym roku",
+        "w tym miesiącu", "w tym tygodniu", "dzisiejsze", "obecne",
+        "today", "currently", "recently", "latest", "current", "now",
+        "2024", "2025", "2026", "2027", "2028", "2029", "2030"
+    ]
+    
+    # Questions about time-sensitive topics
+    time_sensitive_patterns = [
+        r"co się stało w \d{4}",
+        r"kiedy.*\d{4}",
+        r"what happened in \d{4}",
+        r"when.*\d{4}",
+        r"aktualne wiadomości",
+        r"current news",
+        r"ostatnie wydarzenia",
+        r"recent events"
+    ]
+    
+    message_lower = message.lower()
+    
+    # Check for current info keywords
+    for keyword in current_info_keywords:
+        if keyword in message_lower:
+            return True
+    
+    # Check for time-sensitive patterns
+    for pattern in time_sensitive_patterns:
+        if re.search(pattern, message_lower):
+            return True
+    
+    return False
+
+async def perform_web_search(query: str, max_results: int = 3) -> List[Dict[str, Any]]:
+    """Perform web search and return formatted results."""
+    try:
+        if "duckduckgo" not in search_providers:
+            logger.warning("DuckDuckGo provider not available")
+            return []
+        
+        provider = search_providers["duckduckgo"]
+        results = await provider.search(query, max_results)
+        
+        # Convert to dict format
+        formatted_results = []
+        for result in results:
+            formatted_results.append({
+                "title": result.title,
+                "url": result.url,
+                "snippet": result.snippet,
+                "source": result.source,
+                "timestamp": result.timestamp
+            })
+        
+        return formatted_results
+        
+    except Exception as e:
+        logger.error(f"Web search failed: {e}")
+        return []
+
+def format_search_results(results: List[Dict[str, Any]]) -> List[str]:
+    """Search results as numbered prompt entries with their source."""
+    return [
+        f"{i}. {r['title']}: {r['snippet']}\n   Źródło: {r['url']}"
+        for i, r in enumerate(results, 1)
+    ]
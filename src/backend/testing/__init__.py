@@ -0,0 +1,4 @@
+"""
+Performance and test tooling for Ageny Online.
+Narzędzia do testów wydajnościowych i lokalnej symulacji dostawców AI.
+"""
@@ -0,0 +1,153 @@
+"""
+Compare pytest-benchmark results against a stored baseline.
+Porównuje wyniki mikrobenchmarków z zapisanym baseline i wykrywa regresje.
+
+Typical flow::
+
+    pytest tests/benchmarks --benchmark-only --benchmark-json=.benchmarks/current.json
+    python -m backend.testing.bench_compare compare .benchmarks/current.json --threshold 0.25
+    python -m backend.testing.bench_compare save .benchmarks/current.json   # refresh baseline
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_BASELINE = Path("tests/benchmarks/baseline.json")
+DEFAULT_THRESHOLD = 0.25
+METRICS = ("median", "mean", "min")
+
+
+def load_results(path: Path) -> Dict[str, Dict[str, float]]:
+    """
+    Load benchmark statistics keyed by benchmark name.
+
+    Accepts both raw ``--benchmark-json`` output and the compact baseline
+    format written by :func:`save_baseline`.
+
+    Args:
+        path: JSON file path
+
+    Returns:
+        Mapping of benchmark full name to its statistics
+    """
+    data = json.loads(Path(path).read_text())
+    if "baseline" in data:
+        return data["baseline"]
+    return {
+        bench["fullname"]: {metric: bench["stats"][metric] for metric in (*METRICS, "stddev", "rounds")}
+        for bench in data.get("benchmarks", [])
+    }
+
+
+def save_baseline(results_path: Path, baseline_path: Path = DEFAULT_BASELINE) -> int:
+    """
+    Store a compact baseline from a pytest-benchmark JSON report.
+
+    Args:
+        results_path: Output of ``--benchmark-json``
+        baseline_path: Destination of the compact baseline
+
+    Returns:
+        Number of benchmarks stored
+    """
+    raw = json.loads(Path(results_path).read_text())
+    machine = raw.get("machine_info", {})
+    machine_keys = ("processor", "machine", "python_implementation", "python_version")
+    baseline = {
+        "machine": {key: machine.get(key) for key in machine_keys},
+        "commit": (raw.get("commit_info") or {}).get("id"),
+        "baseline": load_results(results_path),
+    }
+    baseline_path.parent.mkdir(parents=True, exist_ok=True)
+    baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+    return len(baseline["baseline"])
+
+
+def compare(
+    current: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+    metric: str = "median",
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Compare current results with the baseline.
+
+    Args:
+        current: Current benchmark statistics
+        baseline: Baseline benchmark statistics
+        threshold: Allowed relative slowdown (0.25 = 25%)
+        metric: Statistic to compare
+
+    Returns:
+        Tuple of (per-benchmark rows, names missing from current run)
+    """
+    rows = []
+    for name in sorted(current):
+        if name not in baseline:
+            continue
+        before = baseline[name][metric]
+        after = current[name][metric]
+        change = (after - before) / before if before else 0.0
+        rows.append({
+            "name": name,
+            "baseline": before,
+            "current": after,
+            "change": change,
+            "regression": change > threshold,
+        })
+    missing = sorted(set(baseline) - set(current))
+    return rows, missing
+
+
+def _format_time(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.3f} us"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point; returns process exit code."""
+    parser = argparse.ArgumentParser(description="Benchmark baseline management")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    save_parser = sub.add_parser("save", help="Store a new baseline from --benchmark-json output")
+    save_parser.add_argument("results", type=Path)
+    save_parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+
+    compare_parser = sub.add_parser("compare", help="Flag regressions against the baseline")
+    compare_parser.add_argument("results", type=Path)
+    compare_parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="Allowed relative slowdown, e.g. 0.25 for 25%%")
+    compare_parser.add_argument("--metric", choices=METRICS, default="median")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "save":
+        count = save_baseline(args.results, args.baseline)
+        print(f"Stored {count} benchmarks in {args.baseline}")
+        return 0
+
+    rows, missing = compare(load_results(args.results), load_results(args.baseline), args.threshold, args.metric)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(
+            f"{flag:<10} {row['change']:+7.1%}  {_format_time(row['baseline']):>12} -> "
+            f"{_format_time(row['current']):>12}  {row['name']}"
+        )
+    for name in missing:
+        print(f"{'missing':<10} {'':>7}  {name}")
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%} ({args.metric})")
+        return 1
+    print(f"No regressions above {args.threshold:.0%} ({args.metric})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
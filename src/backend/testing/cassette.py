@@ -0,0 +1,566 @@
+"""
+Transport-level record/replay of provider HTTP traffic.
+Nagrywanie i odtwarzanie ruchu HTTP do dostawców (httpx i aiohttp).
+
+Record mode wraps ``httpx.AsyncHTTPTransport`` and ``aiohttp.ClientSession``
+so every outgoing request is stored with its response headers, body chunks
+and timing. Replay mode serves the stored responses without touching the
+network, either at the recorded pace or accelerated (``speed=10`` is ten
+times faster, ``speed=0`` is instant)::
+
+    with Cassette("traffic.jsonl.gz", mode="record"):
+        await provider.chat(messages)
+
+    with Cassette("traffic.jsonl.gz", mode="replay", speed=0):
+        await provider.chat(messages)   # served from the cassette
+
+Cassettes are gzip-compressed JSON lines (one interaction per line). API keys
+and cookies are never written.
+"""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+MODES = ("record", "replay")
+SENSITIVE_HEADERS = frozenset({
+    "authorization", "x-api-key", "api-key", "cookie", "set-cookie", "openai-organization",
+})
+# aiohttp hands back decoded bodies, so framing headers would no longer be true
+_DECODED_BODY_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+_active: Optional["Cassette"] = None
+_original_httpx_handle = None
+_original_aiohttp_request = None
+
+
+class CassetteMissError(httpx.TransportError):
+    """Raised in replay mode when no recorded interaction matches a request."""
+
+
+def _canonical_body(body: bytes) -> bytes:
+    """Canonical form of a request body so key order does not affect matching."""
+    if not body:
+        return b""
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except (ValueError, UnicodeDecodeError):
+        return body
+
+
+def request_key(method: str, url: str, body: bytes, match_host: bool = True) -> str:
+    """
+    Stable key identifying a request.
+
+    Args:
+        method: HTTP method
+        url: Full request URL
+        body: Raw request body
+        match_host: Include scheme/host/port in the key
+
+    Returns:
+        Hex digest
+    """
+    if not match_host:
+        parts = urlsplit(url)
+        url = parts.path + (f"?{parts.query}" if parts.query else "")
+    digest = hashlib.sha256(f"{method.upper()} {url}\n".encode())
+    digest.update(_canonical_body(body))
+    return digest.hexdigest()[:32]
+
+
+def _encode_chunk(data: bytes) -> Tuple[str, str]:
+    try:
+        return "t", data.decode("utf-8")
+    except UnicodeDecodeError:
+        return "b", base64.b64encode(data).decode("ascii")
+
+
+def _decode_chunk(kind: str, payload: str) -> bytes:
+    return payload.encode("utf-8") if kind == "t" else base64.b64decode(payload)
+
+
+@dataclass
+class Interaction:
+    """One recorded request/response exchange."""
+
+    key: str
+    method: str
+    url: str
+    status: int
+    headers: List[Tuple[str, str]]
+    ttfb: float
+    chunks: List[Tuple[float, bytes]] = field(default_factory=list)
+    request_size: int = 0
+
+    @property
+    def duration(self) -> float:
+        """Total time from request start to last body chunk."""
+        return self.ttfb + (self.chunks[-1][0] if self.chunks else 0.0)
+
+    @property
+    def body(self) -> bytes:
+        """Full response body."""
+        return b"".join(data for _, data in self.chunks)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Compact JSON form; chunk offsets are relative to the response headers."""
+        return {
+            "k": self.key,
+            "m": self.method,
+            "u": self.url,
+            "s": self.status,
+            "h": self.headers,
+            "t": round(self.ttfb, 6),
+            "c": [[round(offset, 6), *_encode_chunk(data)] for offset, data in self.chunks],
+            "r": self.request_size,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Interaction":
+        """Inverse of :meth:`to_json`."""
+        return cls(
+            key=data["k"],
+            method=data["m"],
+            url=data["u"],
+            status=data["s"],
+            headers=[tuple(h) for h in data["h"]],
+            ttfb=data["t"],
+            chunks=[(offset, _decode_chunk(kind, payload)) for offset, kind, payload in data["c"]],
+            request_size=data.get("r", 0),
+        )
+
+
+class Cassette:
+    """
+    Record/replay store for provider HTTP traffic.
+
+    Identical requests recorded several times are replayed in recording
+    order; once exhausted, the last response is repeated.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        mode: str = "replay",
+        speed: float = 1.0,
+        match_host: bool = True,
+        passthrough: bool = False,
+    ) -> None:
+        """
+        Args:
+            path: Cassette file (``.gz`` suffix enables compression)
+            mode: ``record`` or ``replay``
+            speed: Replay speed multiplier, 0 disables delays
+            match_host: Include the host in request matching
+            passthrough: In replay mode, send unmatched requests to the network
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}. Available: {MODES}")
+        self.path = Path(path)
+        self.mode = mode
+        self.speed = speed
+        self.match_host = match_host
+        self.passthrough = passthrough
+        self.interactions: Dict[str, List[Interaction]] = {}
+        self.meta: Dict[str, Any] = {}
+        self.stats: Counter = Counter()
+        self._cursor: Counter = Counter()
+        if mode == "replay" or self.path.exists():
+            self.load()
+
+    # ---------------------------------------------------------------- storage
+
+    def _open(self, mode: str):
+        if self.path.suffix == ".gz":
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def load(self) -> None:
+        """Load interactions from disk."""
+        self.interactions.clear()
+        with self._open("r") as fh:
+            header = json.loads(fh.readline() or "{}")
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version in {self.path}: {header.get('version')}")
+            self.meta = header.get("meta", {})
+            for line in fh:
+                if line.strip():
+                    self.add(Interaction.from_json(json.loads(line)))
+        logger.info(f"Cassette loaded: {self.path} ({len(self)} interactions)")
+
+    def save(self) -> None:
+        """Write all interactions to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._open("w") as fh:
+            header = {"version": CASSETTE_VERSION, "created": time.time(), "meta": self.meta}
+            fh.write(json.dumps(header) + "\n")
+            for recorded in self.interactions.values():
+                for interaction in recorded:
+                    fh.write(json.dumps(interaction.to_json(), ensure_ascii=False, separators=(",", ":")) + "\n")
+        logger.info(f"Cassette saved: {self.path} ({len(self)} interactions)")
+
+    def __len__(self) -> int:
+        return sum(len(recorded) for recorded in self.interactions.values())
+
+    def add(self, interaction: Interaction) -> None:
+        """Store an interaction."""
+        self.interactions.setdefault(interaction.key, []).append(interaction)
+
+    def key(self, method: str, url: str, body: bytes) -> str:
+        """Request key using this cassette's matching rules."""
+        return request_key(method, url, body, self.match_host)
+
+    def match(self, key: str) -> Optional[Interaction]:
+        """Next recorded interaction for a key, or None."""
+        recorded = self.interactions.get(key)
+        if not recorded:
+            self.stats["misses"] += 1
+            return None
+        index = min(self._cursor[key], len(recorded) - 1)
+        self._cursor[key] += 1
+        self.stats["hits"] += 1
+        return recorded[index]
+
+    async def delay(self, seconds: float) -> None:
+        """Sleep for a recorded interval scaled by replay speed."""
+        if self.speed > 0 and seconds > 0:
+            await asyncio.sleep(seconds / self.speed)
+
+    # -------------------------------------------------------------- patching
+
+    def install(self) -> "Cassette":
+        """Start intercepting httpx and aiohttp traffic."""
+        global _active
+        if _active is not None and _active is not self:
+            raise RuntimeError("Another cassette is already active")
+        _active = self
+        _patch_httpx()
+        _patch_aiohttp()
+        return self
+
+    def uninstall(self) -> None:
+        """Stop intercepting and persist recordings."""
+        global _active
+        if _active is self:
+            _unpatch_httpx()
+            _unpatch_aiohttp()
+            _active = None
+        if self.mode == "record":
+            self.save()
+
+    def __enter__(self) -> "Cassette":
+        return self.install()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.uninstall()
+
+
+def active_cassette() -> Optional[Cassette]:
+    """Currently installed cassette, if any."""
+    return _active
+
+
+def _safe_headers(headers: Any, drop: frozenset = frozenset()) -> List[Tuple[str, str]]:
+    return [
+        (name, value) for name, value in headers.items()
+        if name.lower() not in SENSITIVE_HEADERS and name.lower() not in drop
+    ]
+
+
+# ---------------------------------------------------------------------- httpx
+
+class _ReplayStream(httpx.AsyncByteStream):
+    """Serves recorded chunks at recorded (scaled) offsets."""
+
+    def __init__(self, interaction: Interaction, cassette: Cassette) -> None:
+        self._interaction = interaction
+        self._cassette = cassette
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        previous = 0.0
+        for offset, data in self._interaction.chunks:
+            await self._cassette.delay(offset - previous)
+            previous = offset
+            yield data
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """Passes chunks through while recording their arrival times."""
+
+    def __init__(self, inner: httpx.AsyncByteStream, interaction: Interaction, cassette: Cassette) -> None:
+        self._inner = inner
+        self._interaction = interaction
+        self._cassette = cassette
+        self._started = time.perf_counter()
+        self._stored = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._inner:
+            self._interaction.chunks.append((time.perf_counter() - self._started, chunk))
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+        if not self._stored:
+            self._stored = True
+            self._cassette.add(self._interaction)
+            self._cassette.stats["recorded"] += 1
+
+
+async def _httpx_handle_async_request(transport: httpx.AsyncHTTPTransport, request: httpx.Request) -> httpx.Response:
+    cassette = _active
+    if cassette is None:
+        return await _original_httpx_handle(transport, request)
+
+    body = await request.aread()
+    key = cassette.key(request.method, str(request.url), body)
+
+    if cassette.mode == "replay":
+        interaction = cassette.match(key)
+        if interaction is not None:
+            await cassette.delay(interaction.ttfb)
+            return httpx.Response(
+                interaction.status,
+                headers=interaction.headers,
+                stream=_ReplayStream(interaction, cassette),
+                request=request,
+            )
+        if not cassette.passthrough:
+            raise CassetteMissError(f"No recorded response for {request.method} {request.url}", request=request)
+        cassette.stats["passthrough"] += 1
+        return await _original_httpx_handle(transport, request)
+
+    start = time.perf_counter()
+    response = await _original_httpx_handle(transport, request)
+    interaction = Interaction(
+        key=key,
+        method=request.method,
+        url=str(request.url),
+        status=response.status_code,
+        headers=_safe_headers(response.headers),
+        ttfb=time.perf_counter() - start,
+        request_size=len(body),
+    )
+    return httpx.Response(
+        response.status_code,
+        headers=response.headers,
+        stream=_RecordingStream(response.stream, interaction, cassette),
+        request=request,
+        extensions=response.extensions,
+    )
+
+
+def _patch_httpx() -> None:
+    global _original_httpx_handle
+    if _original_httpx_handle is None:
+        _original_httpx_handle = httpx.AsyncHTTPTransport.handle_async_request
+        httpx.AsyncHTTPTransport.handle_async_request = _httpx_handle_async_request
+
+
+def _unpatch_httpx() -> None:
+    global _original_httpx_handle
+    if _original_httpx_handle is not None:
+        httpx.AsyncHTTPTransport.handle_async_request = _original_httpx_handle
+        _original_httpx_handle = None
+
+
+# -------------------------------------------------------------------- aiohttp
+
+class _ReplayContent:
+    """Minimal ``StreamReader`` stand-in for replayed aiohttp bodies."""
+
+    def __init__(self, response: "_ReplayClientResponse") -> None:
+        self._response = response
+
+    async def read(self, n: int = -1) -> bytes:
+        return await self._response.read()
+
+    async def iter_any(self) -> AsyncIterator[bytes]:
+        async for chunk in self._response._iter_chunks():
+            yield chunk
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        async for chunk in self._response._iter_chunks():
+            for i in range(0, len(chunk), n):
+                yield chunk[i:i + n]
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._iter_lines()
+
+    async def _iter_lines(self) -> AsyncIterator[bytes]:
+        body = await self._response.read()
+        for line in body.splitlines(keepends=True):
+            yield line
+
+
+class _ReplayClientResponse:
+    """Replayed response exposing the parts of ``aiohttp.ClientResponse`` we use."""
+
+    def __init__(self, interaction: Interaction, cassette: Cassette) -> None:
+        from multidict import CIMultiDict, CIMultiDictProxy
+        from yarl import URL
+
+        self._interaction = interaction
+        self._cassette = cassette
+        self._body: Optional[bytes] = None
+        self.status = interaction.status
+        self.reason = "Replayed"
+        self.method = interaction.method
+        self.url = URL(interaction.url)
+        self.headers = CIMultiDictProxy(CIMultiDict(interaction.headers))
+        self.content = _ReplayContent(self)
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    async def _iter_chunks(self) -> AsyncIterator[bytes]:
+        previous = 0.0
+        for offset, data in self._interaction.chunks:
+            await self._cassette.delay(offset - previous)
+            previous = offset
+            yield data
+
+    async def read(self) -> bytes:
+        if self._body is None:
+            self._body = b"".join([chunk async for chunk in self._iter_chunks()])
+        return self._body
+
+    async def text(self, encoding: Optional[str] = None, errors: str = "strict") -> str:
+        return (await self.read()).decode(encoding or "utf-8", errors)
+
+    async def json(self, *, encoding: Optional[str] = None, loads=json.loads, content_type: Optional[str] = None) -> Any:
+        return loads(await self.text(encoding))
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            import aiohttp
+            from multidict import CIMultiDict, CIMultiDictProxy
+
+            info = aiohttp.RequestInfo(self.url, self.method, CIMultiDictProxy(CIMultiDict()), self.url)
+            raise aiohttp.ClientResponseError(info, (), status=self.status, message=self.reason)
+
+    def release(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+    async def wait_for_close(self) -> None:
+        return None
+
+    async def __aenter__(self) -> "_ReplayClientResponse":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+
+def _aiohttp_request_body(kwargs: Dict[str, Any]) -> bytes:
+    if kwargs.get("json") is not None:
+        return json.dumps(kwargs["json"]).encode()
+    data = kwargs.get("data")
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode()
+    if isinstance(data, dict):
+        return json.dumps(data, sort_keys=True).encode()
+    return b""
+
+
+async def _aiohttp_request(session: Any, method: str, str_or_url: Any, **kwargs: Any) -> Any:
+    cassette = _active
+    if cassette is None:
+        return await _original_aiohttp_request(session, method, str_or_url, **kwargs)
+
+    from yarl import URL
+
+    url = URL(str(str_or_url))
+    if kwargs.get("params"):
+        url = url.update_query(kwargs["params"])
+    body = _aiohttp_request_body(kwargs)
+    key = cassette.key(method, str(url), body)
+
+    if cassette.mode == "replay":
+        interaction = cassette.match(key)
+        if interaction is not None:
+            await cassette.delay(interaction.ttfb)
+            return _ReplayClientResponse(interaction, cassette)
+        if not cassette.passthrough:
+            import aiohttp
+
+            raise aiohttp.ClientConnectionError(f"No recorded response for {method} {url}")
+        cassette.stats["passthrough"] += 1
+        return await _original_aiohttp_request(session, method, str_or_url, **kwargs)
+
+    start = time.perf_counter()
+    response = await _original_aiohttp_request(session, method, str_or_url, **kwargs)
+    ttfb = time.perf_counter() - start
+    data = await response.read()
+    cassette.add(Interaction(
+        key=key,
+        method=method.upper(),
+        url=str(url),
+        status=response.status,
+        headers=_safe_headers(response.headers, drop=_DECODED_BODY_HEADERS),
+        ttfb=ttfb,
+        chunks=[(time.perf_counter() - start - ttfb, data)],
+        request_size=len(body),
+    ))
+    cassette.stats["recorded"] += 1
+    return response
+
+
+def _patch_aiohttp() -> None:
+    global _original_aiohttp_request
+    try:
+        import aiohttp
+    except ImportError:
+        return
+    if _original_aiohttp_request is None:
+        _original_aiohttp_request = aiohttp.ClientSession._request
+        aiohttp.ClientSession._request = _aiohttp_request
+
+
+def _unpatch_aiohttp() -> None:
+    global _original_aiohttp_request
+    if _original_aiohttp_request is not None:
+        import aiohttp
+
+        aiohttp.ClientSession._request = _original_aiohttp_request
+        _original_aiohttp_request = None
+
+
+def cassette_from_settings() -> Optional[Cassette]:
+    """
+    Build a cassette from ``PROVIDER_CASSETTE_*`` settings.
+
+    Returns:
+        Configured cassette, or None when record/replay is disabled
+    """
+    from backend.config import settings
+
+    mode = (settings.PROVIDER_CASSETTE_MODE or "").lower()
+    if mode in ("", "off"):
+        return None
+    return Cassette(
+        settings.PROVIDER_CASSETTE_PATH,
+        mode=mode,
+        speed=settings.PROVIDER_CASSETTE_SPEED,
+    )
@@ -0,0 +1,934 @@
+"""
+Local fake upstream server for LLM and OCR providers.
+Lokalny serwer imitujący API OpenAI, Anthropic, Mistral, Cohere i Perplexity.
+
+Each provider is mounted under its own prefix, so pointing the ``*_BASE_URL``
+settings at the server is enough to route all provider traffic locally::
+
+    python -m backend.testing.fake_upstream --port 9100 --latency lognormal:0.3,0.5 --tps 80
+
+    OPENAI_BASE_URL=http://127.0.0.1:9100/openai/v1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:9100/anthropic
+    MISTRAL_BASE_URL=http://127.0.0.1:9100/mistral/v1
+    COHERE_BASE_URL=http://127.0.0.1:9100/cohere
+    PERPLEXITY_BASE_URL=http://127.0.0.1:9100/perplexity
+
+The OpenAI, Anthropic and Mistral batch APIs are emulated as well (file
+upload, batch creation, polling, results); a batch completes once
+``batch_delay`` seconds have passed since it was created.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_PREFIXES: Dict[str, str] = {
+    "openai": "/openai/v1",
+    "anthropic": "/anthropic",
+    "mistral": "/mistral/v1",
+    "cohere": "/cohere",
+    "perplexity": "/perplexity",
+}
+
+# Vocabulary used to build deterministic responses
+_WORDS = (
+    "przepis makaron pomidory cebula czosnek ser jajka mleko mąka masło "
+    "sól pieprz bazylia oregano kurczak ryż marchew ziemniaki śmietana "
+    "gotuj smaż piecz mieszaj dodaj minut porcje kalorie białko zdrowy "
+    "the recipe needs fresh ingredients and simple steps for a tasty meal"
+).split()
+
+_RECEIPT_LINES = (
+    "MLEKO 3,2% 1L", "CHLEB PSZENNY", "JAJKA M 10SZT", "MASŁO 200G",
+    "POMIDORY LUZ", "SER GOUDA", "MAKARON PENNE", "JOGURT NATURALNY",
+)
+
+
+@dataclass
+class LatencyModel:
+    """Latency distribution sampled per request (seconds)."""
+
+    kind: str = "fixed"
+    params: Tuple[float, ...] = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """
+        Parse latency spec such as ``fixed:0.2``, ``uniform:0.1,0.5``,
+        ``normal:0.3,0.05`` or ``lognormal:0.3,0.5`` (median, sigma).
+
+        Raises:
+            ValueError: If the spec is malformed
+        """
+        kind, _, raw = spec.partition(":")
+        kind = kind.strip().lower()
+        params = tuple(float(p) for p in raw.split(",") if p.strip()) if raw else ()
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        return cls(kind=kind, params=params)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw a non-negative latency sample."""
+        if self.kind == "fixed":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(self.params[0], self.params[1])
+        elif self.kind == "normal":
+            value = rng.gauss(self.params[0], self.params[1])
+        else:
+            median, sigma = self.params
+            value = rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return max(0.0, value)
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{','.join(str(p) for p in self.params)}"
+
+
+@dataclass
+class FakeUpstreamConfig:
+    """Runtime behaviour of the fake upstream."""
+
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    tokens_per_second: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    response_tokens: int = 48
+    seed: int = 0
+    require_auth: bool = True
+    batch_delay: float = 0.0
+
+    @classmethod
+    def from_env(cls, prefix: str = "FAKE_UPSTREAM_") -> "FakeUpstreamConfig":
+        """Build configuration from ``FAKE_UPSTREAM_*`` environment variables."""
+        env = os.environ
+        return cls(
+            latency=LatencyModel.parse(env.get(f"{prefix}LATENCY", "fixed:0")),
+            tokens_per_second=float(env.get(f"{prefix}TOKENS_PER_SECOND", "0")),
+            error_rate=float(env.get(f"{prefix}ERROR_RATE", "0")),
+            rate_limit_rate=float(env.get(f"{prefix}RATE_LIMIT_RATE", "0")),
+            retry_after=float(env.get(f"{prefix}RETRY_AFTER", "1")),
+            response_tokens=int(env.get(f"{prefix}RESPONSE_TOKENS", "48")),
+            seed=int(env.get(f"{prefix}SEED", "0")),
+            require_auth=env.get(f"{prefix}REQUIRE_AUTH", "true").lower() == "true",
+            batch_delay=float(env.get(f"{prefix}BATCH_DELAY", "0")),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize configuration for the control endpoint."""
+        data = asdict(self)
+        data["latency"] = str(self.latency)
+        return data
+
+    def update(self, values: Dict[str, Any]) -> None:
+        """Apply a partial update coming from the control endpoint."""
+        for key, value in values.items():
+            if key == "latency":
+                self.latency = LatencyModel.parse(value)
+            elif hasattr(self, key):
+                setattr(self, key, type(getattr(self, key))(value))
+            else:
+                raise ValueError(f"Unknown config key: {key}")
+
+
+def base_url_settings(base: str) -> Dict[str, str]:
+    """
+    Return ``*_BASE_URL`` settings that route every provider to the fake server.
+
+    Args:
+        base: Server root, e.g. ``http://127.0.0.1:9100``
+
+    Returns:
+        Mapping of setting name to URL
+    """
+    base = base.rstrip("/")
+    return {f"{name.upper()}_BASE_URL": f"{base}{prefix}" for name, prefix in PROVIDER_PREFIXES.items()}
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count (≈4 characters per token)."""
+    return max(1, math.ceil(len(text) / 4)) if text else 0
+
+
+def _content_text(content: Any) -> str:
+    """Flatten OpenAI/Anthropic style content (str or list of parts) to text."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for part in content:
+            if isinstance(part, dict):
+                parts.append(part.get("text") or "")
+        return " ".join(parts)
+    return ""
+
+
+def _image_digests(messages: List[Dict[str, Any]]) -> List[str]:
+    """Return digests of inline images found in chat messages."""
+    digests = []
+    for message in messages:
+        content = message.get("content")
+        if not isinstance(content, list):
+            continue
+        for part in content:
+            if isinstance(part, dict) and part.get("type") == "image_url":
+                image = part.get("image_url")
+                url = image.get("url", "") if isinstance(image, dict) else str(image)
+                digests.append(hashlib.sha256(url.encode()).hexdigest())
+    return digests
+
+
+class FakeUpstream:
+    """
+    Deterministic simulator of provider HTTP APIs.
+
+    Response text depends only on the seed, model and prompt, so repeated runs
+    produce identical payloads. Fault injection and latency draw from a single
+    seeded RNG, so a given request sequence yields the same timing profile.
+    """
+
+    def __init__(self, config: Optional[FakeUpstreamConfig] = None) -> None:
+        self.config = config or FakeUpstreamConfig()
+        self.rng = random.Random(self.config.seed)
+        self.stats: Counter = Counter()
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------------ helpers
+
+    def generate_text(self, model: str, prompt: str, max_tokens: Optional[int], images: List[str]) -> str:
+        """Build a deterministic response for a prompt."""
+        digest = hashlib.sha256(f"{self.config.seed}|{model}|{prompt}|{'|'.join(images)}".encode()).hexdigest()
+        rng = random.Random(int(digest[:16], 16))
+        if images:
+            lines = [rng.choice(_RECEIPT_LINES) + f" {rng.randint(1, 40)},{rng.randint(0, 99):02d}" for _ in range(5)]
+            return "\n".join(lines)
+        limit = self.config.response_tokens
+        if max_tokens:
+            limit = min(limit, int(max_tokens))
+        words: List[str] = []
+        while count_tokens(" ".join(words)) < limit - 1:
+            words.append(rng.choice(_WORDS))
+        return " ".join(words) or rng.choice(_WORDS)
+
+    def embedding(self, text: str, dimensions: int) -> List[float]:
+        """Deterministic unit-length embedding for a text."""
+        rng = random.Random(hashlib.sha256(f"{self.config.seed}|{text}".encode()).digest())
+        vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def split_tokens(self, text: str) -> List[str]:
+        """Split text into streaming deltas (one word per chunk)."""
+        words = text.split(" ")
+        return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+
+    def _token_delay(self) -> float:
+        tps = self.config.tokens_per_second
+        return 1.0 / tps if tps > 0 else 0.0
+
+    def check_auth(self, request: Request) -> bool:
+        """Accept any non-empty key in the header the provider uses."""
+        if not self.config.require_auth:
+            return True
+        return bool(request.headers.get("authorization") or request.headers.get("x-api-key"))
+
+    def inject_fault(self, provider: str) -> Optional[JSONResponse]:
+        """Return an injected 429/500 response, or None to proceed."""
+        roll = self.rng.random()
+        if roll < self.config.rate_limit_rate:
+            self.stats[f"{provider}.429"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"Retry-After": str(self.config.retry_after)},
+                content=_error_body(provider, "rate_limit_error", "Rate limit exceeded (fake upstream)"),
+            )
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self.stats[f"{provider}.500"] += 1
+            return JSONResponse(
+                status_code=500,
+                content=_error_body(provider, "api_error", "Internal server error (fake upstream)"),
+            )
+        return None
+
+    async def preflight(self, request: Request, provider: str) -> Optional[JSONResponse]:
+        """Auth check, fault injection and time-to-first-token delay."""
+        self.stats[f"{provider}.requests"] += 1
+        if not self.check_auth(request):
+            self.stats[f"{provider}.401"] += 1
+            return JSONResponse(
+                status_code=401,
+                content=_error_body(provider, "authentication_error", "Missing API key"),
+            )
+        fault = self.inject_fault(provider)
+        latency = self.config.latency.sample(self.rng)
+        if latency:
+            await asyncio.sleep(latency)
+        return fault
+
+    async def pace(self, output_tokens: int) -> None:
+        """Sleep for the generation time of a non-streamed response."""
+        delay = self._token_delay() * output_tokens
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def paced(self, chunks: List[str]) -> AsyncIterator[str]:
+        """Yield streaming chunks at the configured token rate."""
+        delay = self._token_delay()
+        for chunk in chunks:
+            if delay:
+                await asyncio.sleep(delay)
+            yield chunk
+
+    # ------------------------------------------------------------------ batches
+
+    def store_file(self, content: bytes) -> str:
+        """Keep an uploaded or generated file and return its id."""
+        file_id = f"file-{hashlib.sha1(content).hexdigest()[:24]}"
+        self.files[file_id] = content
+        return file_id
+
+    def create_batch(self, provider: str, requests: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Register a batch of ``(custom_id, body)`` requests."""
+        batch_id = f"batch_{len(self.batches) + 1:06d}_{provider}"
+        batch = {
+            "id": batch_id,
+            "provider": provider,
+            "requests": requests,
+            "created_at": time.time(),
+            "results": None,
+            "cancelled": False,
+        }
+        self.batches[batch_id] = batch
+        self.stats[f"{provider}.batches"] += 1
+        return batch
+
+    def advance_batch(self, batch: Dict[str, Any], generate) -> None:
+        """
+        Process a batch once its delay elapsed.
+
+        ``generate`` maps a request body to a provider response body.
+        Results become a list of ``(custom_id, body or None, error or None)``;
+        requests fail at the configured error rate.
+        """
+        if batch["results"] is not None or batch["cancelled"]:
+            return
+        if time.time() - batch["created_at"] < self.config.batch_delay:
+            return
+        results = []
+        for custom_id, body in batch["requests"]:
+            if self.rng.random() < self.config.error_rate:
+                self.stats[f"{batch['provider']}.batch_errors"] += 1
+                results.append((custom_id, None, "Internal server error (fake upstream)"))
+            else:
+                results.append((custom_id, generate(body), None))
+        batch["results"] = results
+        batch["completed_at"] = time.time()
+
+
+def _error_body(provider: str, error_type: str, message: str) -> Dict[str, Any]:
+    """Provider-shaped error payload."""
+    if provider == "anthropic":
+        return {"type": "error", "error": {"type": error_type, "message": message}}
+    if provider == "cohere":
+        return {"message": message}
+    return {"error": {"message": message, "type": error_type, "code": error_type}}
+
+
+def _sse(data: Any, event: Optional[str] = None) -> str:
+    payload = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {payload}\n\n"
+
+
+def _completion_id(prefix: str, text: str) -> str:
+    return f"{prefix}-{hashlib.sha1(text.encode()).hexdigest()[:24]}"
+
+
+def _openai_completion(fake: FakeUpstream, provider: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Non-streamed chat completion body for an OpenAI-compatible request."""
+    model = body.get("model", f"{provider}-fake")
+    messages = body.get("messages", [])
+    prompt = "\n".join(_content_text(m.get("content")) for m in messages)
+    images = _image_digests(messages)
+    text = fake.generate_text(model, prompt, body.get("max_tokens"), images)
+    prompt_tokens = count_tokens(prompt) + 85 * len(images)
+    completion_tokens = count_tokens(text)
+    payload: Dict[str, Any] = {
+        "id": _completion_id("chatcmpl", prompt + model),
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+    if provider == "perplexity":
+        payload["citations"] = []
+    return payload
+
+
+def _anthropic_message(fake: FakeUpstream, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Non-streamed Messages API body for a request."""
+    model = body.get("model", "claude-fake")
+    system = _content_text(body.get("system", ""))
+    msgs = body.get("messages", [])
+    prompt = "\n".join([system] + [_content_text(m.get("content")) for m in msgs]).strip()
+    text = fake.generate_text(model, prompt, body.get("max_tokens"), _image_digests(msgs))
+    return {
+        "id": _completion_id("msg", prompt + model),
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": count_tokens(prompt), "output_tokens": count_tokens(text)},
+    }
+
+
+def _jsonl(rows: List[Dict[str, Any]]) -> bytes:
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+def _parse_jsonl(content: bytes) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in content.decode("utf-8").splitlines() if line.strip()]
+
+
+# ---------------------------------------------------------------------- routers
+
+def _openai_compatible_router(fake: FakeUpstream, provider: str, embedding_dim: int) -> APIRouter:
+    """Chat completions API shared by OpenAI, Mistral (incl. vision) and Perplexity."""
+    router = APIRouter()
+
+    @router.post("/chat/completions")
+    async def chat_completions(request: Request):
+        fault = await fake.preflight(request, provider)
+        if fault is not None:
+            return fault
+        body = await request.json()
+        payload = _openai_completion(fake, provider, body)
+        model, completion_id, created = payload["model"], payload["id"], payload["created"]
+        text = payload["choices"][0]["message"]["content"]
+        usage = payload["usage"]
+
+        if body.get("stream"):
+            async def events() -> AsyncIterator[str]:
+                base = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model}
+                yield _sse({**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]})
+                async for delta in fake.paced(fake.split_tokens(text)):
+                    yield _sse({**base, "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]})
+                final = {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+                if provider != "openai" or (body.get("stream_options") or {}).get("include_usage"):
+                    final["usage"] = usage
+                yield _sse(final)
+                yield _sse("[DONE]")
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await fake.pace(usage["completion_tokens"])
+        return payload
+
+    @router.post("/embeddings")
+    async def embeddings(request: Request):
+        fault = await fake.preflight(request, provider)
+        if fault is not None:
+            return fault
+        body = await request.json()
+        inputs = body.get("input", [])
+        inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+        tokens = sum(count_tokens(text) for text in inputs)
+        return {
+            "object": "list",
+            "model": body.get("model", f"{provider}-embed"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": fake.embedding(text, embedding_dim)}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @router.get("/models")
+    async def models(request: Request):
+        fault = await fake.preflight(request, provider)
+        if fault is not None:
+            return fault
+        return {"object": "list", "data": [{"id": f"{provider}-fake", "object": "model", "owned_by": "fake-upstream"}]}
+
+    return router
+
+
+def _files_batch_router(fake: FakeUpstream, provider: str) -> APIRouter:
+    """File upload and batch APIs of OpenAI (``/batches``) and Mistral (``/batch/jobs``)."""
+    router = APIRouter()
+
+    def generate(body: Dict[str, Any]) -> Dict[str, Any]:
+        return _openai_completion(fake, provider, body)
+
+    def openai_view(batch: Dict[str, Any]) -> Dict[str, Any]:
+        results = batch["results"]
+        failed = sum(1 for _, _, error in results or [] if error)
+        status = "cancelled" if batch["cancelled"] else "in_progress" if results is None else "completed"
+        return {
+            "id": batch["id"],
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "input_file_id": batch["input_file_id"],
+            "completion_window": "24h",
+            "status": status,
+            "output_file_id": batch.get("output_file_id"),
+            "error_file_id": batch.get("error_file_id"),
+            "created_at": int(batch["created_at"]),
+            "completed_at": int(batch["completed_at"]) if batch.get("completed_at") else None,
+            "request_counts": {
+                "total": len(batch["requests"]),
+                "completed": len(results) - failed if results is not None else 0,
+                "failed": failed,
+            },
+        }
+
+    def mistral_view(batch: Dict[str, Any]) -> Dict[str, Any]:
+        results = batch["results"]
+        failed = sum(1 for _, _, error in results or [] if error)
+        status = "CANCELLED" if batch["cancelled"] else "RUNNING" if results is None else "SUCCESS"
+        return {
+            "id": batch["id"],
+            "object": "batch",
+            "input_files": [batch["input_file_id"]],
+            "endpoint": "/v1/chat/completions",
+            "model": batch["model"],
+            "status": status,
+            "output_file": batch.get("output_file_id"),
+            "error_file": batch.get("error_file_id"),
+            "total_requests": len(batch["requests"]),
+            "succeeded_requests": len(results) - failed if results is not None else 0,
+            "failed_requests": failed,
+            "created_at": int(batch["created_at"]),
+            "completed_at": int(batch["completed_at"]) if batch.get("completed_at") else None,
+        }
+
+    view = openai_view if provider == "openai" else mistral_view
+
+    def advance(batch: Dict[str, Any]) -> None:
+        if batch["results"] is not None or batch["cancelled"]:
+            return
+        fake.advance_batch(batch, generate)
+        if batch["results"] is None:
+            return
+        outputs, errors = [], []
+        for index, (custom_id, body, error) in enumerate(batch["results"]):
+            row = {"id": f"batch_req_{index}", "custom_id": custom_id}
+            if error:
+                errors.append({**row, "response": {"status_code": 500, "body": _error_body(provider, "api_error", error)},
+                               "error": None})
+            else:
+                outputs.append({**row, "response": {"status_code": 200, "body": body}, "error": None})
+        batch["output_file_id"] = fake.store_file(_jsonl(outputs)) if outputs else None
+        batch["error_file_id"] = fake.store_file(_jsonl(errors)) if errors else None
+
+    def lookup(batch_id: str) -> Optional[Dict[str, Any]]:
+        batch = fake.batches.get(batch_id)
+        return batch if batch and batch["provider"] == provider else None
+
+    @router.post("/files")
+    async def upload_file(request: Request):
+        fault = await fake.preflight(request, provider)
+        if fault is not None:
+            return fault
+        form = await request.form()
+        upload = form["file"]
+        content = await upload.read()
+        file_id = fake.store_file(content)
+        return {"id": file_id, "object": "file", "bytes": len(content), "filename": upload.filename,
+                "purpose": form.get("purpose", "batch"), "created_at": int(time.time())}
+
+    @router.get("/files/{file_id}/content")
+    async def file_content(file_id: str, request: Request):
+        fault = await fake.preflight(request, provider)
+        if fault is not None:
+            return fault
+        if file_id not in fake.files:
+            return JSONResponse(status_code=404, content=_error_body(provider, "not_found", "File not found"))
+        return Response(content=fake.files[file_id], media_type="application/jsonl")
+
+    async def create(request: Request):
+        fault = await fake.preflight(request, provider)
+        if fault is not None:
+            return fault
+        body = await request.json()
+        file_id = body["input_file_id"] if provider == "openai" else body["input_files"][0]
+        if file_id not in fake.files:
+            return JSONResponse(status_code=400, content=_error_body(provider, "invalid_request", "Unknown input file"))
+        requests = []
+        for row in _parse_jsonl(fake.files[file_id]):
+            request_body = dict(row["body"])
+            if provider == "mistral":
+                request_body.setdefault("model", body.get("model"))
+            requests.append((row["custom_id"], request_body))
+        batch = fake.create_batch(provider, requests)
+        batch["input_file_id"] = file_id
+        batch["model"] = body.get("model")
+        return view(batch)
+
+    async def retrieve(batch_id: str, request: Request):
+        fault = await fake.preflight(request, provider)
+        if fault is not None:
+            return fault
+        batch = lookup(batch_id)
+        if batch is None:
+            return JSONResponse(status_code=404, content=_error_body(provider, "not_found", "Batch not found"))
+        advance(batch)
+        return view(batch)
+
+    async def cancel(batch_id: str, request: Request):
+        fault = await fake.preflight(request, provider)
+        if fault is not None:
+            return fault
+        batch = lookup(batch_id)
+        if batch is None:
+            return JSONResponse(status_code=404, content=_error_body(provider, "not_found", "Batch not found"))
+        if batch["results"] is None:
+            batch["cancelled"] = True
+        return view(batch)
+
+    path = "/batches" if provider == "openai" else "/batch/jobs"
+    router.add_api_route(path, create, methods=["POST"])
+    router.add_api_route(f"{path}/{{batch_id}}", retrieve, methods=["GET"])
+    router.add_api_route(f"{path}/{{batch_id}}/cancel", cancel, methods=["POST"])
+    return router
+
+
+def _anthropic_router(fake: FakeUpstream) -> APIRouter:
+    """Anthropic Messages API."""
+    router = APIRouter()
+
+    @router.post("/v1/messages")
+    async def messages(request: Request):
+        fault = await fake.preflight(request, "anthropic")
+        if fault is not None:
+            return fault
+        body = await request.json()
+        message = _anthropic_message(fake, body)
+        model, message_id = message["model"], message["id"]
+        text = message["content"][0]["text"]
+        input_tokens = message["usage"]["input_tokens"]
+        output_tokens = message["usage"]["output_tokens"]
+
+        if body.get("stream"):
+            async def events() -> AsyncIterator[str]:
+                yield _sse({"type": "message_start", "message": {
+                    "id": message_id, "type": "message", "role": "assistant", "model": model, "content": [],
+                    "stop_reason": None, "usage": {"input_tokens": input_tokens, "output_tokens": 1},
+                }}, event="message_start")
+                yield _sse({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+                           event="content_block_start")
+                yield _sse({"type": "ping"}, event="ping")
+                async for delta in fake.paced(fake.split_tokens(text)):
+                    yield _sse({"type": "content_block_delta", "index": 0,
+                                "delta": {"type": "text_delta", "text": delta}}, event="content_block_delta")
+                yield _sse({"type": "content_block_stop", "index": 0}, event="content_block_stop")
+                yield _sse({"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                            "usage": {"output_tokens": output_tokens}}, event="message_delta")
+                yield _sse({"type": "message_stop"}, event="message_stop")
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await fake.pace(output_tokens)
+        return message
+
+    def batch_view(batch: Dict[str, Any], request: Request) -> Dict[str, Any]:
+        results = batch["results"]
+        counts = {"processing": 0, "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0}
+        if batch["cancelled"]:
+            counts["canceled"] = len(batch["requests"])
+        elif results is None:
+            counts["processing"] = len(batch["requests"])
+        else:
+            counts["errored"] = sum(1 for _, _, error in results if error)
+            counts["succeeded"] = len(results) - counts["errored"]
+        ended = batch["cancelled"] or results is not None
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": counts,
+            "created_at": datetime.fromtimestamp(batch["created_at"], timezone.utc).isoformat(),
+            "ended_at": datetime.now(timezone.utc).isoformat() if ended else None,
+            "results_url": f"{str(request.base_url).rstrip('/')}{PROVIDER_PREFIXES['anthropic']}"
+                           f"/v1/messages/batches/{batch['id']}/results" if results is not None else None,
+        }
+
+    def lookup(batch_id: str) -> Optional[Dict[str, Any]]:
+        batch = fake.batches.get(batch_id)
+        return batch if batch and batch["provider"] == "anthropic" else None
+
+    def advance(batch: Dict[str, Any]) -> None:
+        fake.advance_batch(batch, lambda body: _anthropic_message(fake, body))
+
+    @router.post("/v1/messages/batches")
+    async def create_batch(request: Request):
+        fault = await fake.preflight(request, "anthropic")
+        if fault is not None:
+            return fault
+        body = await request.json()
+        batch = fake.create_batch("anthropic", [(r["custom_id"], r["params"]) for r in body.get("requests", [])])
+        return batch_view(batch, request)
+
+    @router.get("/v1/messages/batches/{batch_id}")
+    async def retrieve_batch(batch_id: str, request: Request):
+        fault = await fake.preflight(request, "anthropic")
+        if fault is not None:
+            return fault
+        batch = lookup(batch_id)
+        if batch is None:
+            return JSONResponse(status_code=404, content=_error_body("anthropic", "not_found_error", "Batch not found"))
+        advance(batch)
+        return batch_view(batch, request)
+
+    @router.post("/v1/messages/batches/{batch_id}/cancel")
+    async def cancel_batch(batch_id: str, request: Request):
+        fault = await fake.preflight(request, "anthropic")
+        if fault is not None:
+            return fault
+        batch = lookup(batch_id)
+        if batch is None:
+            return JSONResponse(status_code=404, content=_error_body("anthropic", "not_found_error", "Batch not found"))
+        if batch["results"] is None:
+            batch["cancelled"] = True
+        return batch_view(batch, request)
+
+    @router.get("/v1/messages/batches/{batch_id}/results")
+    async def batch_results(batch_id: str, request: Request):
+        fault = await fake.preflight(request, "anthropic")
+        if fault is not None:
+            return fault
+        batch = lookup(batch_id)
+        if batch is None or batch["results"] is None:
+            return JSONResponse(status_code=404, content=_error_body("anthropic", "not_found_error", "Results not ready"))
+        rows = []
+        for custom_id, message, error in batch["results"]:
+            if error:
+                result = {"type": "errored", "error": _error_body("anthropic", "api_error", error)}
+            else:
+                result = {"type": "succeeded", "message": message}
+            rows.append({"custom_id": custom_id, "result": result})
+        return Response(content=_jsonl(rows), media_type="application/x-jsonl")
+
+    @router.get("/v1/models")
+    async def models(request: Request):
+        fault = await fake.preflight(request, "anthropic")
+        if fault is not None:
+            return fault
+        return {"data": [{"id": "claude-fake", "type": "model"}], "has_more": False}
+
+    return router
+
+
+def _cohere_router(fake: FakeUpstream) -> APIRouter:
+    """Cohere generate/embed API (newline-delimited JSON streaming)."""
+    router = APIRouter()
+
+    @router.post("/v1/generate")
+    async def generate(request: Request):
+        fault = await fake.preflight(request, "cohere")
+        if fault is not None:
+            return fault
+        body = await request.json()
+        model = body.get("model", "command")
+        prompt = body.get("prompt", "")
+        text = fake.generate_text(model, prompt, body.get("max_tokens"), [])
+        generation_id = _completion_id("gen", prompt + model)
+        meta = {"billed_units": {"input_tokens": count_tokens(prompt), "output_tokens": count_tokens(text)}}
+        result = {
+            "id": generation_id,
+            "generations": [{"id": generation_id, "text": text, "finish_reason": "COMPLETE"}],
+            "prompt": prompt,
+            "meta": meta,
+        }
+
+        if body.get("stream"):
+            async def events() -> AsyncIterator[str]:
+                async for delta in fake.paced(fake.split_tokens(text)):
+                    yield json.dumps({"text": delta, "is_finished": False}, ensure_ascii=False) + "\n"
+                yield json.dumps({"is_finished": True, "finish_reason": "COMPLETE", "response": result},
+                                 ensure_ascii=False) + "\n"
+
+            return StreamingResponse(events(), media_type="application/stream+json")
+
+        await fake.pace(meta["billed_units"]["output_tokens"])
+        return result
+
+    @router.post("/v1/embed")
+    async def embed(request: Request):
+        fault = await fake.preflight(request, "cohere")
+        if fault is not None:
+            return fault
+        body = await request.json()
+        texts = body.get("texts", [])
+        return {
+            "id": _completion_id("emb", "|".join(texts)),
+            "texts": texts,
+            "embeddings": [fake.embedding(text, 1024) for text in texts],
+            "meta": {"billed_units": {"input_tokens": sum(count_tokens(t) for t in texts)}},
+        }
+
+    @router.get("/v1/models")
+    async def models(request: Request):
+        fault = await fake.preflight(request, "cohere")
+        if fault is not None:
+            return fault
+        return {"models": [{"name": "command", "endpoints": ["generate"]}]}
+
+    return router
+
+
+def create_app(config: Optional[FakeUpstreamConfig] = None) -> FastAPI:
+    """
+    Create the fake upstream ASGI application.
+
+    Args:
+        config: Behaviour configuration (defaults to no latency and no faults)
+
+    Returns:
+        FastAPI application; the simulator is available as ``app.state.fake``
+    """
+    fake = FakeUpstream(config)
+    app = FastAPI(title="Ageny Online fake upstream", docs_url=None, redoc_url=None)
+    app.state.fake = fake
+
+    app.include_router(_openai_compatible_router(fake, "openai", 1536), prefix=PROVIDER_PREFIXES["openai"])
+    app.include_router(_openai_compatible_router(fake, "mistral", 1024), prefix=PROVIDER_PREFIXES["mistral"])
+    app.include_router(_openai_compatible_router(fake, "perplexity", 1024), prefix=PROVIDER_PREFIXES["perplexity"])
+    app.include_router(_files_batch_router(fake, "openai"), prefix=PROVIDER_PREFIXES["openai"])
+    app.include_router(_files_batch_router(fake, "mistral"), prefix=PROVIDER_PREFIXES["mistral"])
+    app.include_router(_anthropic_router(fake), prefix=PROVIDER_PREFIXES["anthropic"])
+    app.include_router(_cohere_router(fake), prefix=PROVIDER_PREFIXES["cohere"])
+
+    @app.get("/_fake/config")
+    async def get_config():
+        return fake.config.to_dict()
+
+    @app.put("/_fake/config")
+    async def put_config(request: Request):
+        values = await request.json()
+        try:
+            fake.config.update(values)
+        except (ValueError, TypeError) as e:
+            return JSONResponse(status_code=400, content={"detail": str(e)})
+        if "seed" in values:
+            fake.rng.seed(fake.config.seed)
+        return fake.config.to_dict()
+
+    @app.get("/_fake/stats")
+    async def get_stats():
+        return dict(fake.stats)
+
+    @app.post("/_fake/reset")
+    async def reset():
+        fake.stats.clear()
+        fake.files.clear()
+        fake.batches.clear()
+        fake.rng.seed(fake.config.seed)
+        return {"status": "reset"}
+
+    return app
+
+
+@asynccontextmanager
+async def running_fake_upstream(
+    config: Optional[FakeUpstreamConfig] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> AsyncIterator[str]:
+    """
+    Serve the fake upstream on a real socket for the duration of the block.
+
+    Args:
+        config: Behaviour configuration
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+
+    Yields:
+        Root URL of the running server
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(config), host=host, port=port, log_level="warning", lifespan="off",
+    ))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+            raise RuntimeError("Fake upstream failed to start")
+        await asyncio.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{bound_port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the fake upstream from the command line."""
+    import uvicorn
+
+    env_config = FakeUpstreamConfig.from_env()
+    parser = argparse.ArgumentParser(description="Fake LLM/OCR upstream for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", default=str(env_config.latency),
+                        help="fixed:S | uniform:A,B | normal:MU,SD | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--tps", type=float, default=env_config.tokens_per_second,
+                        help="Output tokens per second (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=env_config.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=env_config.rate_limit_rate)
+    parser.add_argument("--response-tokens", type=int, default=env_config.response_tokens)
+    parser.add_argument("--batch-delay", type=float, default=env_config.batch_delay,
+                        help="Seconds until an emulated provider batch completes")
+    parser.add_argument("--seed", type=int, default=env_config.seed)
+    args = parser.parse_args(argv)
+
+    config = FakeUpstreamConfig(
+        latency=LatencyModel.parse(args.latency),
+        tokens_per_second=args.tps,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=env_config.retry_after,
+        response_tokens=args.response_tokens,
+        seed=args.seed,
+        require_auth=env_config.require_auth,
+        batch_delay=args.batch_delay,
+    )
+    for key, value in base_url_settings(f"http://{args.host}:{args.port}").items():
+        print(f"{key}={value}")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+"""
+Async load-test harness for the Ageny Online API.
+Harness obciążeniowy uruchamiany offline na lokalnym fake upstream.
+
+By default the harness starts the fake upstream on a local socket, points every
+``*_BASE_URL`` at it, uses a throwaway SQLite database and drives the FastAPI
+app in-process. Use ``--target`` to load a separately running server instead
+(which must itself be configured against a fake upstream)::
+
+    python -m backend.testing.loadtest --concurrency 1,4,16,64 --iterations 200
+    python -m backend.testing.loadtest --scenarios chat,cooking --compare loadtest-results/prev.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from .fake_upstream import FakeUpstreamConfig, LatencyModel, base_url_settings, running_fake_upstream
+from .stats import summarize_latencies
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = (1, 4, 16, 64)
+DEFAULT_OUTPUT_DIR = "loadtest-results"
+PROVIDER_NAMES = ("OPENAI", "ANTHROPIC", "MISTRAL", "COHERE", "PERPLEXITY")
+
+# Tiny JPEG header; the fake vision endpoint only hashes the payload
+_FAKE_IMAGE = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00" + bytes(range(256)) * 4
+
+
+@dataclass
+class Sample:
+    """Single timed request."""
+
+    route: str
+    latency: float
+    ok: bool
+    status: int
+
+
+@dataclass
+class Recorder:
+    """Collects timed samples for one stage."""
+
+    client: httpx.AsyncClient
+    samples: List[Sample] = field(default_factory=list)
+
+    async def request(
+        self,
+        route: str,
+        method: str,
+        url: str,
+        check: Optional[Callable[[httpx.Response], bool]] = None,
+        **kwargs: Any,
+    ) -> Optional[httpx.Response]:
+        """
+        Issue a timed request and record the outcome.
+
+        Args:
+            route: Label used to aggregate samples (route template)
+            method: HTTP method
+            url: Request URL relative to the client base URL
+            check: Extra success predicate for 2xx responses
+            **kwargs: Passed to ``httpx.AsyncClient.request``
+
+        Returns:
+            Response, or None on transport error
+        """
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            logger.debug(f"{route} transport error: {e}")
+            self.samples.append(Sample(route, time.perf_counter() - start, False, 0))
+            return None
+        latency = time.perf_counter() - start
+        ok = response.status_code < 400
+        if ok and check is not None:
+            try:
+                ok = check(response)
+            except ValueError:
+                ok = False
+        self.samples.append(Sample(route, latency, ok, response.status_code))
+        return response
+
+
+ScenarioFn = Callable[[Recorder, int], Awaitable[None]]
+
+
+def _user_id(iteration: int) -> int:
+    return 1000 + iteration % 50
+
+
+def _chat_payload(iteration: int) -> Dict[str, Any]:
+    return {
+        "messages": [{"role": "user", "content": f"Podaj pomysł na obiad z makaronem numer {iteration}"}],
+        "enable_web_search": False,
+        "max_tokens": 200,
+    }
+
+
+async def scenario_chat(recorder: Recorder, iteration: int) -> None:
+    """POST /api/v2/chat/chat"""
+    await recorder.request("POST /api/v2/chat/chat", "POST", "/api/v2/chat/chat", json=_chat_payload(iteration))
+
+
+async def scenario_chat_batch(recorder: Recorder, iteration: int) -> None:
+    """POST /api/v2/chat/batch with five requests"""
+    payload = [_chat_payload(iteration * 5 + i) for i in range(5)]
+    await recorder.request(
+        "POST /api/v2/chat/batch", "POST", "/api/v2/chat/batch", json=payload,
+        check=lambda r: r.json()["batch_info"]["failed_requests"] == 0,
+    )
+
+
+async def scenario_ocr_batch(recorder: Recorder, iteration: int) -> None:
+    """POST /api/v2/ocr/extract-text-batch with three images"""
+    files = [
+        ("files", (f"receipt-{iteration}-{i}.jpg", _FAKE_IMAGE + bytes([iteration % 256, i]), "image/jpeg"))
+        for i in range(3)
+    ]
+    await recorder.request(
+        "POST /api/v2/ocr/extract-text-batch", "POST", "/api/v2/ocr/extract-text-batch",
+        files=files, params={"provider": "mistral_vision"},
+    )
+
+
+async def scenario_vector_search(recorder: Recorder, iteration: int) -> None:
+    """POST /api/v2/vector-store/search"""
+    await recorder.request(
+        "POST /api/v2/vector-store/search", "POST", "/api/v2/vector-store/search",
+        json={"query": f"przepisy z pomidorami {iteration}", "top_k": 5},
+    )
+
+
+async def scenario_cooking(recorder: Recorder, iteration: int) -> None:
+    """Product, recipe and shopping list CRUD round trip"""
+    params = {"user_id": _user_id(iteration)}
+    base = "/api/v2/cooking"
+    response = await recorder.request(
+        "POST /cooking/products/add", "POST", f"{base}/products/add", params=params,
+        json={"name": f"Produkt {iteration}", "category": "warzywa", "unit": "kg", "price_per_unit": 4.5},
+    )
+    await recorder.request("GET /cooking/products/list", "GET", f"{base}/products/list",
+                           params={**params, "limit": 50})
+    await recorder.request("GET /cooking/products/search", "GET", f"{base}/products/search",
+                           params={**params, "query": "Produkt", "limit": 20})
+    if response is not None and response.status_code == 201:
+        product_id = response.json()["id"]
+        await recorder.request("PUT /cooking/products/{id}", "PUT", f"{base}/products/{product_id}",
+                               params=params, json={"price_per_unit": 5.0})
+        await recorder.request("DELETE /cooking/products/{id}", "DELETE", f"{base}/products/{product_id}",
+                               params=params)
+    await recorder.request(
+        "POST /cooking/recipes/save", "POST", f"{base}/recipes/save", params=params,
+        json={
+            "name": f"Przepis {iteration}",
+            "ingredients": [{"name": "makaron", "amount": "200", "unit": "g"}],
+            "instructions": "Ugotuj makaron al dente.",
+            "servings": 2,
+        },
+    )
+    await recorder.request("GET /cooking/recipes/list", "GET", f"{base}/recipes/list",
+                           params={**params, "limit": 50})
+    await recorder.request(
+        "POST /cooking/shopping/create", "POST", f"{base}/shopping/create", params=params,
+        json={"name": f"Zakupy {iteration}", "items": [{"product_name": "mleko", "quantity": 1, "unit": "l"}]},
+    )
+    await recorder.request("GET /cooking/shopping/list", "GET", f"{base}/shopping/list",
+                           params={**params, "limit": 50})
+
+
+SCENARIOS: Dict[str, ScenarioFn] = {
+    "chat": scenario_chat,
+    "chat_batch": scenario_chat_batch,
+    "ocr_batch": scenario_ocr_batch,
+    "vector_search": scenario_vector_search,
+    "cooking": scenario_cooking,
+}
+
+
+async def run_stage(
+    client: httpx.AsyncClient,
+    scenario: ScenarioFn,
+    concurrency: int,
+    iterations: int,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """
+    Run one scenario with a fixed number of concurrent workers.
+
+    Args:
+        client: HTTP client bound to the service under test
+        scenario: Scenario coroutine function
+        concurrency: Number of concurrent workers
+        iterations: Total scenario iterations across all workers
+        offset: First iteration number, keeps generated names unique across stages
+
+    Returns:
+        Stage result with per-route latency percentiles, throughput and error rate
+    """
+    recorder = Recorder(client)
+    counter = iter(range(offset, offset + iterations))
+
+    async def worker() -> None:
+        for iteration in counter:
+            try:
+                await scenario(recorder, iteration)
+            except Exception as e:
+                logger.warning(f"Scenario iteration {iteration} crashed: {e}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    routes: Dict[str, List[Sample]] = {}
+    for sample in recorder.samples:
+        routes.setdefault(sample.route, []).append(sample)
+
+    route_results = []
+    for route, samples in routes.items():
+        errors = sum(1 for s in samples if not s.ok)
+        statuses: Dict[str, int] = {}
+        for s in samples:
+            statuses[str(s.status)] = statuses.get(str(s.status), 0) + 1
+        route_results.append({
+            "route": route,
+            "requests": len(samples),
+            "errors": errors,
+            "error_rate": round(errors / len(samples), 4),
+            "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": summarize_latencies(s.latency for s in samples),
+            "status_codes": statuses,
+        })
+
+    total = len(recorder.samples)
+    total_errors = sum(1 for s in recorder.samples if not s.ok)
+    return {
+        "concurrency": concurrency,
+        "iterations": iterations,
+        "elapsed_s": round(elapsed, 3),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(total_errors / total, 4) if total else 0.0,
+        "latency_ms": summarize_latencies(s.latency for s in recorder.samples),
+        "routes": route_results,
+    }
+
+
+def configure_environment(fake_base_url: str, database_url: str) -> Dict[str, str]:
+    """
+    Point settings at the fake upstream and a scratch database.
+
+    Must run before ``backend.api.main`` is imported, because the database
+    engine and provider clients read settings at import/creation time.
+
+    Args:
+        fake_base_url: Root URL of the fake upstream
+        database_url: Async SQLAlchemy URL for the scratch database
+
+    Returns:
+        Environment overrides that were applied
+    """
+    overrides = base_url_settings(fake_base_url)
+    overrides.update({f"{name}_API_KEY": "loadtest-key" for name in PROVIDER_NAMES})
+    overrides["DATABASE_URL"] = database_url
+    # Scratch databases start empty; build them with the real migrations
+    overrides["DATABASE_SCHEMA_MODE"] = "migrate"
+    overrides.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.update(overrides)
+
+    if "backend.config" in sys.modules:
+        from backend.config import settings
+
+        for key, value in overrides.items():
+            setattr(settings, key, value)
+    return overrides
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+async def run_loadtest(
+    scenarios: List[str],
+    concurrency_levels: List[int],
+    iterations: int,
+    fake_config: FakeUpstreamConfig,
+    target: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run all scenarios at increasing concurrency.
+
+    Args:
+        scenarios: Scenario names from ``SCENARIOS``
+        concurrency_levels: Concurrency levels, run in ascending order
+        iterations: Scenario iterations per stage
+        fake_config: Fake upstream behaviour (ignored with ``target``)
+        target: Base URL of an already running server
+
+    Returns:
+        Report dictionary ready for JSON serialization
+    """
+    results: List[Dict[str, Any]] = []
+    async with AsyncExitStack() as stack:
+        if target:
+            client = await stack.enter_async_context(httpx.AsyncClient(base_url=target, timeout=120.0))
+        else:
+            fake_url = await stack.enter_async_context(running_fake_upstream(fake_config))
+            scratch = stack.enter_context(tempfile.TemporaryDirectory(prefix="ageny-loadtest-"))
+            configure_environment(fake_url, f"sqlite+aiosqlite:///{scratch}/loadtest.db")
+
+            from backend.api.main import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = await stack.enter_async_context(httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=120.0,
+            ))
+
+        offset = 0
+        for name in scenarios:
+            for concurrency in sorted(concurrency_levels):
+                stage = await run_stage(client, SCENARIOS[name], concurrency, iterations, offset)
+                offset += iterations
+                stage["scenario"] = name
+                results.append(stage)
+                print(
+                    f"{name:<14} c={concurrency:<4} rps={stage['throughput_rps']:<9} "
+                    f"p50={stage['latency_ms']['p50']:<9} p95={stage['latency_ms']['p95']:<9} "
+                    f"p99={stage['latency_ms']['p99']:<9} err={stage['error_rate']:.2%}"
+                )
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "target": target or "in-process",
+            "iterations": iterations,
+            "concurrency_levels": sorted(concurrency_levels),
+            "fake_upstream": None if target else fake_config.to_dict(),
+        },
+        "results": results,
+    }
+
+
+def compare_reports(current: Dict[str, Any], previous: Dict[str, Any]) -> List[str]:
+    """
+    Describe p95 latency and throughput changes between two reports.
+
+    Args:
+        current: Newly produced report
+        previous: Earlier report loaded from JSON
+
+    Returns:
+        Human readable lines, one per matching scenario/concurrency stage
+    """
+    earlier = {(r["scenario"], r["concurrency"]): r for r in previous.get("results", [])}
+    lines = []
+    for stage in current["results"]:
+        before = earlier.get((stage["scenario"], stage["concurrency"]))
+        if not before:
+            continue
+        p95_before = before["latency_ms"]["p95"] or 1e-9
+        rps_before = before["throughput_rps"] or 1e-9
+        p95_delta = (stage["latency_ms"]["p95"] - p95_before) / p95_before
+        rps_delta = (stage["throughput_rps"] - rps_before) / rps_before
+        lines.append(
+            f"{stage['scenario']:<14} c={stage['concurrency']:<4} p95 {p95_delta:+.1%}  rps {rps_delta:+.1%}"
+        )
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Ageny Online load-test harness")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", default=",".join(str(c) for c in DEFAULT_CONCURRENCY))
+    parser.add_argument("--iterations", type=int, default=100, help="Scenario iterations per stage")
+    parser.add_argument("--target", default=None, help="Base URL of a running server (skips in-process mode)")
+    parser.add_argument("--latency", default="lognormal:0.2,0.4", help="Fake upstream latency spec")
+    parser.add_argument("--tps", type=float, default=0.0, help="Fake upstream tokens per second")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="JSON report path")
+    parser.add_argument("--compare", default=None, help="Previous JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+
+    logging.basicConfig(level=logging.WARNING)
+    fake_config = FakeUpstreamConfig(
+        latency=LatencyModel.parse(args.latency),
+        tokens_per_second=args.tps,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    report = asyncio.run(run_loadtest(
+        scenarios,
+        [int(c) for c in args.concurrency.split(",")],
+        args.iterations,
+        fake_config,
+        target=args.target,
+    ))
+
+    output = Path(args.output or Path(DEFAULT_OUTPUT_DIR) / f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"Report written to {output}")
+
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())
+        for line in compare_reports(report, previous):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
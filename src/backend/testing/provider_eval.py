@@ -0,0 +1,454 @@
+"""
+Provider evaluation harness.
+Porównanie dostawców LLM: TTFT, opóźnienie, przepustowość, koszt i awaryjność.
+
+Runs a prompt corpus against every configured provider/model combination via
+``LLMProviderFactory`` and ranks them. Providers can be reached live, through
+the local fake upstream (default) or through a record/replay cassette::
+
+    python -m backend.testing.provider_eval --repeats 5
+    python -m backend.testing.provider_eval --upstream live --cassette-mode record --cassette eval.jsonl.gz
+    python -m backend.testing.provider_eval --upstream live --cassette-mode replay --cassette eval.jsonl.gz
+    python -m backend.testing.provider_eval --upstream live --write-config .env
+
+``--write-config`` stores the suggested ``PROVIDER_PRIORITY_*`` values (and
+routing weights as a comment) in an env file.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import re
+import time
+from contextlib import ExitStack, AsyncExitStack
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cassette import Cassette
+from .fake_upstream import FakeUpstreamConfig, LatencyModel, count_tokens, running_fake_upstream
+from .loadtest import configure_environment
+from .stats import summarize_latencies
+from .traffic_replay import load_log
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = "eval-results"
+ENV_COMMENT_PREFIX = "# provider_eval: "
+DEFAULT_WEIGHTS = {"latency": 0.3, "ttft": 0.2, "tokens_per_second": 0.1, "cost": 0.4}
+DEFAULT_CORPUS = [
+    "Podaj przepis na szybki obiad z kurczakiem i ryżem.",
+    "Wyjaśnij w trzech zdaniach, czym jest fotosynteza.",
+    "Summarize the benefits of meal planning for a family of four.",
+    "Napisz listę zakupów na tydzień dla osoby na diecie wegetariańskiej.",
+    "What is the difference between baking soda and baking powder?",
+    "Zaproponuj trzy pomysły na wykorzystanie resztek chleba.",
+]
+
+
+@dataclass
+class Measurement:
+    """Single request against one provider/model."""
+
+    ok: bool
+    ttft: float
+    latency: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Generation rate after the first token."""
+        generation = self.latency - self.ttft
+        if self.output_tokens > 1 and generation > 0:
+            return (self.output_tokens - 1) / generation
+        return self.output_tokens / self.latency if self.latency else 0.0
+
+
+def _default_model(provider: Any) -> Optional[str]:
+    return getattr(provider, "default_chat_model", None) or getattr(provider, "default_model", None)
+
+
+def discover_targets(
+    providers: Optional[List[str]] = None,
+    models: Optional[Dict[str, List[str]]] = None,
+) -> List[Tuple[str, str]]:
+    """
+    List provider/model combinations to evaluate.
+
+    Args:
+        providers: Restrict to these provider names
+        models: Explicit model lists per provider (default: every model the provider knows)
+
+    Returns:
+        (provider, model) pairs
+    """
+    from backend.core.llm_providers.provider_factory import LLMProviderFactory
+
+    targets = []
+    for provider_type in LLMProviderFactory.get_configured_providers():
+        name = provider_type.value
+        if providers and name not in providers:
+            continue
+        if models and name in models:
+            candidates = models[name]
+        else:
+            provider = LLMProviderFactory.create_provider(provider_type)
+            candidates = [_default_model(provider), *getattr(provider, "models", {})]
+        for model in dict.fromkeys(m for m in candidates if m):
+            targets.append((name, model))
+    return targets
+
+
+async def measure(provider: Any, model: str, prompt: str, max_tokens: int) -> Measurement:
+    """
+    Stream one completion and time it.
+
+    Args:
+        provider: Provider instance
+        model: Model name
+        prompt: User prompt
+        max_tokens: Completion token limit
+
+    Returns:
+        Timing, token and cost measurement
+    """
+    usage: Dict[str, Any] = {}
+    chunks: List[str] = []
+    ttft = 0.0
+    start = time.perf_counter()
+    try:
+        async for delta in provider.stream_chat(
+            [{"role": "user", "content": prompt}], model=model, max_tokens=max_tokens, usage=usage,
+        ):
+            if not chunks:
+                ttft = time.perf_counter() - start
+            chunks.append(delta)
+    except Exception as e:
+        return Measurement(ok=False, ttft=ttft, latency=time.perf_counter() - start, error=str(e)[:200])
+
+    latency = time.perf_counter() - start
+    text = "".join(chunks)
+    return Measurement(
+        ok=bool(text),
+        ttft=ttft or latency,
+        latency=latency,
+        input_tokens=usage.get("input_tokens") or count_tokens(prompt),
+        output_tokens=usage.get("output_tokens") or count_tokens(text),
+        cost=usage.get("cost", 0.0),
+        error=None if text else "empty response",
+    )
+
+
+def summarize(measurements: List[Measurement]) -> Dict[str, Any]:
+    """Aggregate measurements of one provider/model."""
+    succeeded = [m for m in measurements if m.ok]
+    total = len(measurements)
+    tps = sorted(m.tokens_per_second for m in succeeded)
+    errors = sorted({m.error for m in measurements if m.error})
+    return {
+        "requests": total,
+        "failures": total - len(succeeded),
+        "failure_rate": round((total - len(succeeded)) / total, 4) if total else 0.0,
+        "ttft_ms": summarize_latencies(m.ttft for m in succeeded),
+        "latency_ms": summarize_latencies(m.latency for m in succeeded),
+        "tokens_per_second": round(tps[len(tps) // 2], 2) if tps else 0.0,
+        "cost_per_request": round(sum(m.cost for m in succeeded) / len(succeeded), 8) if succeeded else 0.0,
+        "output_tokens_mean": round(sum(m.output_tokens for m in succeeded) / len(succeeded), 1) if succeeded else 0.0,
+        "errors": errors[:5],
+    }
+
+
+async def evaluate(
+    targets: List[Tuple[str, str]],
+    corpus: List[str],
+    repeats: int = 3,
+    concurrency: int = 4,
+    max_tokens: int = 256,
+) -> List[Dict[str, Any]]:
+    """
+    Run the corpus against every target.
+
+    Args:
+        targets: (provider, model) pairs
+        corpus: Prompts
+        repeats: Passes over the corpus per target
+        concurrency: Requests in flight per target
+        max_tokens: Completion token limit
+
+    Returns:
+        One summary per target
+    """
+    from backend.core.llm_providers.provider_factory import LLMProviderFactory, ProviderType
+
+    results = []
+    for provider_name, model in targets:
+        provider = LLMProviderFactory.create_provider(ProviderType(provider_name))
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(prompt: str) -> Measurement:
+            async with semaphore:
+                return await measure(provider, model, prompt, max_tokens)
+
+        measurements = await asyncio.gather(*(run(p) for _ in range(repeats) for p in corpus))
+        summary = {"provider": provider_name, "model": model, **summarize(list(measurements))}
+        results.append(summary)
+        print(
+            f"{provider_name:<11} {model:<28} ttft_p50={summary['ttft_ms']['p50']:<9} "
+            f"p50={summary['latency_ms']['p50']:<9} tok/s={summary['tokens_per_second']:<8} "
+            f"cost={summary['cost_per_request']:.6f} fail={summary['failure_rate']:.1%}"
+        )
+    return results
+
+
+def _metric_values(result: Dict[str, Any]) -> Dict[str, float]:
+    return {
+        "latency": result["latency_ms"]["p50"],
+        "ttft": result["ttft_ms"]["p50"],
+        "tokens_per_second": result["tokens_per_second"],
+        "cost": result["cost_per_request"],
+    }
+
+
+def rank(
+    results: List[Dict[str, Any]],
+    weights: Optional[Dict[str, float]] = None,
+    max_failure_rate: float = 0.2,
+) -> List[Dict[str, Any]]:
+    """
+    Score and order evaluated targets (lower score is better).
+
+    Every metric is min-max normalized across targets to 0..1 (tokens per
+    second inverted), combined with ``weights`` and increased by the failure
+    rate. Targets failing more often than ``max_failure_rate`` rank last.
+
+    Args:
+        results: Output of :func:`evaluate`
+        weights: Metric weights, defaults to ``DEFAULT_WEIGHTS``
+        max_failure_rate: Failure rate above which a target is excluded
+
+    Returns:
+        Results ordered best first, with ``score`` (None when every request
+        failed), ``rank`` and ``eligible``
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    total_weight = sum(weights.values()) or 1.0
+    eligible = [r for r in results if r["failures"] < r["requests"]]
+    values = [_metric_values(r) for r in eligible]
+    bounds = {
+        metric: (min(v[metric] for v in values), max(v[metric] for v in values)) if values else (0.0, 0.0)
+        for metric in weights
+    }
+
+    ranked = []
+    for result in results:
+        entry = dict(result)
+        if result in eligible:
+            metrics = _metric_values(result)
+            score = 0.0
+            for metric, weight in weights.items():
+                low, high = bounds[metric]
+                spread = high - low
+                if spread <= 0:
+                    continue
+                norm = (metrics[metric] - low) / spread
+                if metric == "tokens_per_second":
+                    norm = 1.0 - norm
+                score += weight * norm
+            entry["score"] = round(score / total_weight + result["failure_rate"], 4)
+        else:
+            entry["score"] = None
+        entry["eligible"] = result in eligible and result["failure_rate"] <= max_failure_rate
+        ranked.append(entry)
+
+    ranked.sort(key=lambda r: (not r["eligible"], float("inf") if r["score"] is None else r["score"]))
+    for position, entry in enumerate(ranked, start=1):
+        entry["rank"] = position
+    return ranked
+
+
+def suggest_routing(ranked: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Derive provider priorities and routing weights from a ranking.
+
+    Each provider is represented by its best model. Providers that were not
+    evaluated keep their current relative order after the evaluated ones.
+
+    Args:
+        ranked: Output of :func:`rank`
+
+    Returns:
+        ``priorities`` (provider -> 1..n), ``weights`` (provider -> share)
+        and ``models`` (provider -> best model)
+    """
+    from backend.core.llm_providers.provider_factory import LLMProviderFactory
+
+    best: Dict[str, Dict[str, Any]] = {}
+    for entry in ranked:
+        best.setdefault(entry["provider"], entry)
+
+    order = [name for name, entry in best.items() if entry["eligible"]]
+    order += [name for name, entry in best.items() if not entry["eligible"]]
+    current = LLMProviderFactory.get_provider_priorities()
+    order += [name for name in sorted(current, key=current.get) if name not in order]
+
+    eligible = {name: entry for name, entry in best.items() if entry["eligible"]}
+    raw = {name: max(1.0 - entry["score"], 0.05) for name, entry in eligible.items()}
+    total = sum(raw.values()) or 1.0
+    return {
+        "priorities": {name: position for position, name in enumerate(order, start=1)},
+        "weights": {name: round(value / total, 3) for name, value in raw.items()},
+        "models": {name: entry["model"] for name, entry in best.items()},
+    }
+
+
+def write_env_settings(path: Path, values: Dict[str, Any], comment: Optional[str] = None) -> None:
+    """
+    Update ``KEY=value`` lines in an env file, appending missing keys.
+
+    Comment lines from a previous run (``# provider_eval: ...``) are replaced.
+
+    Args:
+        path: Env file (created when missing)
+        values: Settings to write
+        comment: Optional note written above appended keys
+    """
+    lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+    lines = [line for line in lines if not line.startswith(ENV_COMMENT_PREFIX)]
+    pending = dict(values)
+    for index, line in enumerate(lines):
+        match = re.match(r"\s*([A-Z0-9_]+)\s*=", line)
+        if match and match.group(1) in pending:
+            lines[index] = f"{match.group(1)}={pending.pop(match.group(1))}"
+    if comment:
+        lines.extend(f"{ENV_COMMENT_PREFIX}{part}" for part in comment.splitlines())
+    lines.extend(f"{key}={value}" for key, value in pending.items())
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _parse_weights(spec: Optional[str]) -> Dict[str, float]:
+    if not spec:
+        return dict(DEFAULT_WEIGHTS)
+    weights = {}
+    for part in spec.split(","):
+        key, _, value = part.partition("=")
+        if key.strip() not in DEFAULT_WEIGHTS:
+            raise ValueError(f"Unknown metric: {key}. Available: {', '.join(DEFAULT_WEIGHTS)}")
+        weights[key.strip()] = float(value)
+    return weights
+
+
+def _parse_models(spec: Optional[str]) -> Optional[Dict[str, List[str]]]:
+    if not spec:
+        return None
+    models: Dict[str, List[str]] = {}
+    for part in spec.split(","):
+        provider, _, model = part.partition(":")
+        models.setdefault(provider.strip(), []).append(model.strip())
+    return models
+
+
+async def run_eval(args: argparse.Namespace) -> Dict[str, Any]:
+    """Set up the upstream/cassette, evaluate and rank."""
+    if args.corpus:
+        corpus = [e["request"]["messages"][-1]["content"] for e in load_log(args.corpus, args.limit)]
+    else:
+        corpus = DEFAULT_CORPUS[:args.limit] if args.limit else DEFAULT_CORPUS
+
+    async with AsyncExitStack() as stack:
+        if args.upstream == "fake":
+            fake_config = FakeUpstreamConfig(
+                latency=LatencyModel.parse(args.latency),
+                tokens_per_second=args.tps,
+                error_rate=args.error_rate,
+                seed=args.seed,
+            )
+            fake_url = await stack.enter_async_context(running_fake_upstream(fake_config))
+            configure_environment(fake_url, "sqlite+aiosqlite:///:memory:")
+
+        cassette_stack = stack.enter_context(ExitStack())
+        cassette = None
+        if args.cassette_mode != "off":
+            cassette = cassette_stack.enter_context(Cassette(args.cassette, mode=args.cassette_mode, speed=args.speed))
+
+        targets = discover_targets(args.providers.split(",") if args.providers else None, _parse_models(args.models))
+        if not targets:
+            raise SystemExit("No configured providers to evaluate")
+        results = await evaluate(targets, corpus, args.repeats, args.concurrency, args.max_tokens)
+
+    ranked = rank(results, _parse_weights(args.weights), args.max_failure_rate)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "upstream": args.upstream,
+            "cassette": None if cassette is None else {"mode": cassette.mode, "path": str(cassette.path),
+                                                       **dict(cassette.stats)},
+            "corpus_size": len(corpus),
+            "repeats": args.repeats,
+            "concurrency": args.concurrency,
+            "weights": _parse_weights(args.weights),
+        },
+        "ranking": ranked,
+        "suggested": suggest_routing(ranked),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Evaluate LLM providers and suggest priorities")
+    parser.add_argument("--upstream", choices=("fake", "live"), default="fake",
+                        help="Fake upstream server or the endpoints configured in the environment")
+    parser.add_argument("--cassette", type=Path, default=Path(f"{DEFAULT_OUTPUT_DIR}/eval.jsonl.gz"))
+    parser.add_argument("--cassette-mode", choices=("off", "record", "replay"), default="off")
+    parser.add_argument("--speed", type=float, default=1.0, help="Cassette replay speed (0 = instant)")
+    parser.add_argument("--corpus", type=Path, default=None, help="JSONL prompt log (default: built-in prompts)")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum prompts from the corpus")
+    parser.add_argument("--providers", default=None, help="Comma separated provider names")
+    parser.add_argument("--models", default=None, help="Comma separated provider:model pairs")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--weights", default=None,
+                        help="Metric weights, e.g. latency=0.3,ttft=0.2,tokens_per_second=0.1,cost=0.4")
+    parser.add_argument("--max-failure-rate", type=float, default=0.2)
+    parser.add_argument("--latency", default="lognormal:0.3,0.4", help="Fake upstream latency spec")
+    parser.add_argument("--tps", type=float, default=60.0, help="Fake upstream tokens per second")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None, help="JSON report path")
+    parser.add_argument("--write-config", type=Path, default=None,
+                        help="Env file to update with suggested PROVIDER_PRIORITY_* values")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(run_eval(args))
+
+    print("\nRanking (lower score is better):")
+    for entry in report["ranking"]:
+        flag = "" if entry["eligible"] else "  [excluded]"
+        print(f"{entry['rank']:>3}. {entry['provider']:<11} {entry['model']:<28} score={entry['score']}{flag}")
+
+    output = args.output or Path(DEFAULT_OUTPUT_DIR) / f"provider-eval-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+    print(f"Report written to {output}")
+
+    if args.write_config:
+        suggested = report["suggested"]
+        values = {f"PROVIDER_PRIORITY_{name.upper()}": value for name, value in suggested["priorities"].items()}
+        weights = ", ".join(f"{name}={share}" for name, share in suggested["weights"].items())
+        models = ", ".join(f"{name}={model}" for name, model in suggested["models"].items())
+        write_env_settings(
+            args.write_config,
+            values,
+            comment=f"generated {report['meta']['timestamp']}\nrouting weights: {weights}\nbest models: {models}",
+        )
+        print(f"Suggested priorities written to {args.write_config}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Latency statistics helpers shared by the perf harnesses.
+Funkcje pomocnicze do liczenia percentyli i podsumowań opóźnień.
+"""
+
+import math
+from typing import Dict, Iterable, List
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values: Samples (need not be sorted)
+        q: Percentile in range 0-100
+
+    Returns:
+        Percentile value, or 0.0 for an empty sample
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize_latencies(samples: Iterable[float], scale: float = 1000.0) -> Dict[str, float]:
+    """
+    Summarize latency samples given in seconds.
+
+    Args:
+        samples: Latencies in seconds
+        scale: Multiplier applied to the output (default: milliseconds)
+
+    Returns:
+        Dictionary with p50/p95/p99/mean/min/max
+    """
+    values = [s * scale for s in samples]
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "min": 0.0, "max": 0.0}
+    return {
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "mean": round(sum(values) / len(values), 3),
+        "min": round(min(values), 3),
+        "max": round(max(values), 3),
+    }
@@ -0,0 +1,330 @@
+"""
+Replay a log of chat prompts through the service with recorded provider traffic.
+Odtwarzanie logu promptów przez API z nagranym ruchem do dostawców.
+
+Step one records provider traffic for a prompt log (against the fake upstream
+or, with ``--upstream real``, against the providers configured in the
+environment). Step two replays the same log any number of times with the
+cassette serving provider responses, so changes to caching, routing or
+batching can be measured without network noise or API spend::
+
+    python -m backend.testing.traffic_replay record prompts.jsonl --cassette day.jsonl.gz
+    python -m backend.testing.traffic_replay replay prompts.jsonl --cassette day.jsonl.gz --speed 10
+
+Each log line is a JSON object holding either ``messages`` (ChatRequest
+style), ``title``/``body`` (backlog style) or ``prompt``/``content``.
+Optional ``timestamp`` (epoch seconds or ISO 8601) keeps the original
+arrival pattern, compressed by ``--time-scale``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .cassette import Cassette
+from .fake_upstream import FakeUpstreamConfig, LatencyModel, running_fake_upstream
+from .loadtest import PROVIDER_NAMES, configure_environment
+from .stats import summarize_latencies
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CASSETTE = "replay-results/cassette.jsonl.gz"
+_REQUEST_FIELDS = ("model", "max_tokens", "temperature", "provider", "tutor_mode")
+
+
+def _parse_timestamp(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_log_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Turn one log line into a chat request payload.
+
+    Args:
+        line: JSON encoded log entry
+
+    Returns:
+        Payload with ``request`` (ChatRequest body) and ``timestamp``,
+        or None for lines without a usable prompt
+    """
+    if not line.strip():
+        return None
+    entry = json.loads(line)
+    if entry.get("messages"):
+        messages = entry["messages"]
+    elif entry.get("title") or entry.get("body"):
+        text = "\n\n".join(part for part in (entry.get("title"), entry.get("body")) if part)
+        messages = [{"role": "user", "content": text}]
+    else:
+        text = entry.get("prompt") or entry.get("content") or entry.get("message")
+        if not text:
+            return None
+        messages = [{"role": "user", "content": text}]
+
+    request: Dict[str, Any] = {"messages": messages, "enable_web_search": False}
+    request.update({key: entry[key] for key in _REQUEST_FIELDS if entry.get(key) is not None})
+    return {"request": request, "timestamp": _parse_timestamp(entry.get("timestamp"))}
+
+
+def load_log(path: Path, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Load and order prompts from a JSONL log.
+
+    Args:
+        path: Log file path
+        limit: Maximum number of prompts
+
+    Returns:
+        Parsed entries ordered by timestamp (file order when absent)
+    """
+    entries = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            parsed = parse_log_line(line)
+            if parsed:
+                entries.append(parsed)
+            if limit and len(entries) >= limit:
+                break
+    if all(e["timestamp"] is not None for e in entries):
+        entries.sort(key=lambda e: e["timestamp"])
+    return entries
+
+
+def _schedule(entries: List[Dict[str, Any]], time_scale: float) -> List[float]:
+    """Start offsets in seconds; zero everywhere when timing is disabled."""
+    if time_scale <= 0 or any(e["timestamp"] is None for e in entries) or not entries:
+        return [0.0] * len(entries)
+    first = entries[0]["timestamp"]
+    return [(e["timestamp"] - first) / time_scale for e in entries]
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    entries: List[Dict[str, Any]],
+    concurrency: int,
+    time_scale: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Send every logged prompt to ``/api/v2/chat/chat``.
+
+    Args:
+        client: Client bound to the API
+        entries: Output of :func:`load_log`
+        concurrency: Maximum requests in flight
+        time_scale: Arrival time compression (0 sends as fast as possible)
+
+    Returns:
+        Aggregated latency, error, token, cost and provider statistics
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    offsets = _schedule(entries, time_scale)
+    latencies: List[float] = []
+    status_codes: Counter = Counter()
+    providers: Counter = Counter()
+    totals: Counter = Counter()
+    started = time.perf_counter()
+
+    async def send(entry: Dict[str, Any], offset: float) -> None:
+        delay = offset - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with semaphore:
+            t0 = time.perf_counter()
+            try:
+                response = await client.post("/api/v2/chat/chat", json=entry["request"])
+                status = response.status_code
+            except httpx.HTTPError as e:
+                logger.warning(f"Replay request failed: {e}")
+                response, status = None, 0
+            latencies.append(time.perf_counter() - t0)
+            status_codes[str(status)] += 1
+            if response is None or status != 200:
+                totals["errors"] += 1
+                return
+            data = response.json()
+            providers[data.get("provider", "unknown")] += 1
+            for key, value in (data.get("usage") or {}).items():
+                totals[key] += value
+            totals["cost_usd"] += (data.get("cost") or {}).get("total_cost", 0.0)
+
+    await asyncio.gather(*(send(entry, offset) for entry, offset in zip(entries, offsets)))
+    elapsed = time.perf_counter() - started
+    count = len(entries)
+    return {
+        "requests": count,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(totals.pop("errors", 0) / count, 4) if count else 0.0,
+        "latency_ms": summarize_latencies(latencies),
+        "status_codes": dict(status_codes),
+        "providers": dict(providers),
+        "usage": {k: v for k, v in totals.items() if k != "cost_usd"},
+        "cost_usd": round(totals["cost_usd"], 6),
+    }
+
+
+def _apply_overrides(overrides: Dict[str, str]) -> None:
+    os.environ.update(overrides)
+    if "backend.config" in sys.modules:
+        from backend.config import settings
+
+        for key, value in overrides.items():
+            setattr(settings, key, value)
+
+
+def _configured_providers() -> List[str]:
+    from backend.config import settings
+
+    return [name for name in PROVIDER_NAMES if getattr(settings, f"{name}_API_KEY", "")]
+
+
+async def run_replay(
+    log_path: Path,
+    cassette_path: Path,
+    mode: str,
+    concurrency: int = 8,
+    speed: float = 1.0,
+    time_scale: float = 0.0,
+    upstream: str = "fake",
+    fake_config: Optional[FakeUpstreamConfig] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Record or replay a prompt log through the in-process API.
+
+    Args:
+        log_path: JSONL prompt log
+        cassette_path: Cassette file to write (record) or read (replay)
+        mode: ``record`` or ``replay``
+        concurrency: Maximum requests in flight
+        speed: Replay speed multiplier for provider responses (0 = instant)
+        time_scale: Arrival time compression for timestamped logs
+        upstream: ``fake`` or ``real`` provider endpoints while recording
+        fake_config: Fake upstream behaviour while recording
+        limit: Maximum number of prompts
+
+    Returns:
+        Report dictionary ready for JSON serialization
+    """
+    entries = load_log(log_path, limit)
+    cassette = Cassette(cassette_path, mode=mode, speed=speed)
+    if mode == "record":
+        cassette.interactions.clear()
+
+    async with AsyncExitStack() as stack:
+        scratch = stack.enter_context(tempfile.TemporaryDirectory(prefix="ageny-replay-"))
+        database_url = f"sqlite+aiosqlite:///{scratch}/replay.db"
+
+        if mode == "replay":
+            # Restore the provider endpoints and key set seen while recording
+            overrides = dict(cassette.meta.get("settings", {}))
+            recorded = cassette.meta.get("providers", [])
+            overrides.update({f"{n}_API_KEY": "replay-key" if n in recorded else "" for n in PROVIDER_NAMES})
+            overrides["DATABASE_URL"] = database_url
+            overrides["DATABASE_SCHEMA_MODE"] = "migrate"
+            _apply_overrides(overrides)
+        elif upstream == "fake":
+            fake_url = await stack.enter_async_context(running_fake_upstream(fake_config or FakeUpstreamConfig()))
+            configure_environment(fake_url, database_url)
+        else:
+            _apply_overrides({"DATABASE_URL": database_url, "DATABASE_SCHEMA_MODE": "migrate"})
+
+        if mode == "record":
+            from backend.config import settings
+
+            cassette.meta = {
+                "settings": {f"{n}_BASE_URL": getattr(settings, f"{n}_BASE_URL") for n in PROVIDER_NAMES},
+                "providers": _configured_providers(),
+                "upstream": upstream,
+                "log": str(log_path),
+            }
+
+        from backend.api.main import app
+
+        stack.enter_context(cassette)
+        await stack.enter_async_context(app.router.lifespan_context(app))
+        client = await stack.enter_async_context(httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://replay", timeout=300.0,
+        ))
+        result = await drive(client, entries, concurrency, time_scale)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "mode": mode,
+            "log": str(log_path),
+            "cassette": str(cassette_path),
+            "speed": speed,
+            "time_scale": time_scale,
+            "concurrency": concurrency,
+        },
+        "cassette": {"interactions": len(cassette), **dict(cassette.stats)},
+        "result": result,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Record/replay a prompt log through the chat API")
+    parser.add_argument("mode", choices=("record", "replay"))
+    parser.add_argument("log", type=Path, help="JSONL prompt log")
+    parser.add_argument("--cassette", type=Path, default=Path(DEFAULT_CASSETTE))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Provider response speed multiplier on replay (0 = instant)")
+    parser.add_argument("--time-scale", type=float, default=0.0,
+                        help="Compress logged arrival times by this factor (0 = send immediately)")
+    parser.add_argument("--upstream", choices=("fake", "real"), default="fake",
+                        help="Provider endpoints used while recording")
+    parser.add_argument("--latency", default="lognormal:0.2,0.4", help="Fake upstream latency spec")
+    parser.add_argument("--tps", type=float, default=40.0, help="Fake upstream tokens per second")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--output", type=Path, default=None, help="JSON report path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    fake_config = FakeUpstreamConfig(latency=LatencyModel.parse(args.latency), tokens_per_second=args.tps)
+    report = asyncio.run(run_replay(
+        args.log, args.cassette, args.mode,
+        concurrency=args.concurrency,
+        speed=args.speed,
+        time_scale=args.time_scale,
+        upstream=args.upstream,
+        fake_config=fake_config,
+        limit=args.limit,
+    ))
+
+    output = args.output or args.cassette.parent / f"replay-{args.mode}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    result = report["result"]
+    print(
+        f"{args.mode}: {result['requests']} requests in {result['duration_s']}s "
+        f"p50={result['latency_ms']['p50']} p95={result['latency_ms']['p95']} "
+        f"err={result['error_rate']:.2%} cassette={report['cassette']}"
+    )
+    print(f"Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Shared fixtures for microbenchmarks.
+Zapewnia pętlę zdarzeń i bazę w pamięci dla benchmarków kodu asynchronicznego.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from backend.models.base import Base
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion on a dedicated event loop (benchmarks are sync)."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture
+def bench_session(run):
+    """In-memory SQLite session bound to the benchmark event loop."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+
+    async def setup() -> AsyncSession:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)()
+
+    session = run(setup())
+    yield session
+    run(session.close())
+    run(engine.dispose())
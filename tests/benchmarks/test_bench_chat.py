@@ -0,0 +1,89 @@
+"""
+Microbenchmarks for CPU work in the chat request path.
+"""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from backend.api.main import make_teen_friendly_response
+from backend.api.v2.endpoints.chat import ChatRequest, ChatResponse, chat_completion, should_use_web_search
+from backend.core.llm_providers.result import ChatResult
+
+MESSAGES = [
+    "Jak zrobić szybki obiad z makaronu i pomidorów?",
+    "Podaj przepis na naleśniki bez jajek dla 4 osób, najlepiej wegański i tani",
+    "What are the latest food trends in 2025?",
+    "Ile kalorii ma 100g ugotowanego ryżu basmati? " * 5,
+]
+
+
+def _history(turns: int) -> list:
+    messages = [{"role": "system", "content": "Jesteś pomocnym asystentem kulinarnym."}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"Pytanie numer {i} o przepis na zupę pomidorową"})
+        messages.append({"role": "assistant", "content": f"Odpowiedź {i}: pokrój pomidory, podsmaż cebulę. " * 4})
+    messages.append({"role": "user", "content": "A teraz coś na deser?"})
+    return messages
+
+
+def _provider_result(**_):
+    return ChatResult(
+        text="Spróbuj szarlotki z cynamonem. " * 10,
+        model="gpt-4o-mini",
+        provider="openai",
+        input_tokens=420,
+        output_tokens=80,
+        cost=0.0003,
+    )
+
+
+class TestChatBenchmarks:
+    """Chat endpoint helpers"""
+
+    def test_should_use_web_search(self, benchmark):
+        """Keyword and regex scan over typical messages"""
+        result = benchmark(lambda: [should_use_web_search(m) for m in MESSAGES])
+        assert result == [False, False, True, False]
+
+    def test_make_teen_friendly_response(self, benchmark):
+        """Response text rewriting done by the middleware"""
+        payload = {
+            "response": "Wystąpił błąd podczas przetwarzania. Proszę spróbować ponownie później. " * 20,
+            "message": "Operacja zakończona pomyślnie",
+            "error": "Nieprawidłowe dane wejściowe",
+        }
+        result = benchmark(lambda: make_teen_friendly_response(dict(payload)))
+        assert "response" in result
+
+    @pytest.mark.parametrize("turns", [1, 20])
+    def test_chat_completion_overhead(self, benchmark, run, turns):
+        """Message validation and result munging in chat_completion (provider mocked)"""
+        payload = {"messages": _history(turns), "enable_web_search": False}
+        factory = Mock()
+        factory.chat_with_fallback = AsyncMock(side_effect=_provider_result)
+
+        with patch("backend.api.v2.endpoints.chat.llm_factory", factory):
+            response = benchmark(lambda: run(chat_completion(ChatRequest(**payload))))
+
+        assert response.provider == "openai"
+
+    def test_chat_response_serialization(self, benchmark):
+        """ChatResponse JSON serialization"""
+        result = _provider_result()
+        response = ChatResponse(
+            text=result.text,
+            model=result.model,
+            provider=result.provider,
+            usage=result.usage(),
+            cost=result.cost_breakdown(),
+            finish_reason=result.finish_reason,
+            response_time=0.42,
+            web_search_used=True,
+            web_search_results=[
+                {"title": f"Wynik {i}", "url": f"https://example.com/{i}", "snippet": "Lorem ipsum " * 10}
+                for i in range(3)
+            ],
+        )
+        data = benchmark(response.model_dump_json)
+        assert data.startswith("{")
@@ -0,0 +1,36 @@
+"""
+Microbenchmarks for OCR request preparation.
+"""
+
+import os
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from backend.core.ocr_providers.mistral_vision import MistralVisionOCR
+
+
+def _ocr_response():
+    response = Mock()
+    response.status_code = 200
+    response.json.return_value = {
+        "choices": [{"message": {"content": "MLEKO 3,2% 1L 3,49"}}],
+        "usage": {"total_tokens": 120},
+    }
+    return response
+
+
+class TestOCRBenchmarks:
+    """Mistral Vision request building"""
+
+    @pytest.mark.parametrize("size_kb", [100, 2048])
+    def test_extract_text_encoding(self, benchmark, run, size_kb):
+        """Base64 data-URL encoding and payload build in extract_text (HTTP mocked)"""
+        ocr = MistralVisionOCR(api_key="bench")
+        ocr.http_client = Mock()
+        ocr.http_client.post = AsyncMock(return_value=_ocr_response())
+        image = os.urandom(size_kb * 1024)
+
+        result = benchmark(lambda: run(ocr.extract_text(image)))
+
+        assert result["tokens_used"] == 120
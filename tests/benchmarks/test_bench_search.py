@@ -0,0 +1,83 @@
+"""
+Recipe search benchmarks: full-text index vs the old ILIKE scan.
+
+The 100k-recipe cookbook runs only with ``BENCH_SEARCH_LARGE=1``:
+
+    BENCH_SEARCH_LARGE=1 pytest tests/benchmarks/test_bench_search.py --benchmark-group-by=param:size
+"""
+
+import os
+import random
+
+import pytest
+from sqlalchemy import or_, select
+
+from backend.models.recipe import Recipe
+from backend.models.search import reindex
+from backend.services.cooking_service import CookingRecipeService
+
+DISHES = ("zupa", "sałatka", "placki", "gulasz", "risotto", "zapiekanka", "pierogi", "curry", "tarta", "kotlety")
+INGREDIENTS = (
+    "pomidory", "ziemniaki", "cebula", "czosnek", "marchew", "kurczak", "wołowina", "ryż", "makaron", "ser",
+    "jajka", "mąka", "śmietana", "papryka", "cukinia", "pieczarki", "szpinak", "fasola", "soczewica", "dynia",
+)
+TAGS = ("obiad", "kolacja", "śniadanie", "wegetariańskie", "wegańskie", "szybkie", "ostre", "zupa")
+
+# name -> (full-text query, ILIKE pattern); "absent" makes ILIKE read every row
+QUERIES = {"common": ("zupa pomidorowa", "pomidor"), "absent": ("kalafior", "kalafior")}
+
+
+def _sizes():
+    yield pytest.param(1_000, id="1k")
+    yield pytest.param(
+        100_000,
+        id="100k",
+        marks=pytest.mark.skipif(not os.environ.get("BENCH_SEARCH_LARGE"), reason="BENCH_SEARCH_LARGE not set"),
+    )
+
+
+@pytest.fixture(params=list(_sizes()))
+def cookbook(request, run, bench_session):
+    """Generated recipes for one user, indexed for full-text search."""
+    rng = random.Random(47)
+    rows = []
+    for i in range(request.param):
+        ingredients = rng.sample(INGREDIENTS, 5)
+        rows.append(dict(
+            name=f"{rng.choice(DISHES)} {ingredients[0]} {i}",
+            description=f"Domowe danie z {ingredients[1]} i {ingredients[2]}.",
+            ingredients=[{"name": name, "amount": "1", "unit": "szt"} for name in ingredients],
+            instructions=" ".join(f"Dodaj {name} i gotuj kilka minut." for name in ingredients),
+            cooking_time=30, difficulty="łatwy", servings=2, tags=rng.sample(TAGS, 2), user_id=1,
+        ))
+
+    async def load():
+        await bench_session.execute(Recipe.__table__.insert(), rows)
+        connection = await bench_session.connection()
+        await connection.run_sync(reindex, "recipes")
+        await bench_session.commit()
+
+    run(load())
+    return bench_session
+
+
+class TestSearchBenchmarks:
+    """First page of a recipe search"""
+
+    @pytest.mark.parametrize("query", list(QUERIES))
+    def test_fulltext(self, benchmark, run, cookbook, query):
+        """search_recipes: FTS5 MATCH ranked by bm25, first 20 hits with snippets"""
+        service = CookingRecipeService(cookbook)
+        hits = benchmark(lambda: run(service.search_recipes(QUERIES[query][0], 1, limit=20)))
+        assert len(hits) == (20 if query == "common" else 0)
+
+    @pytest.mark.parametrize("query", list(QUERIES))
+    def test_ilike(self, benchmark, run, cookbook, query):
+        """The replaced query: unranked ILIKE on name and description"""
+        pattern = f"%{QUERIES[query][1]}%"
+        statement = select(Recipe).where(
+            Recipe.user_id == 1,
+            or_(Recipe.name.ilike(pattern), Recipe.description.ilike(pattern)),
+        ).order_by(Recipe.name, Recipe.id).limit(20)
+        rows = benchmark(lambda: run(cookbook.execute(statement)).scalars().all())
+        assert len(rows) == (20 if query == "common" else 0)
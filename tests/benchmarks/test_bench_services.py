@@ -0,0 +1,187 @@
+"""
+Microbenchmarks for service-layer CPU work.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from backend.core.name_matcher import NameMatcher
+from backend.core.nutrition import BUNDLED_TABLE, NutritionTable, load_foods
+from backend.models.cost_tracking import CostRecord
+from backend.models.product import Product
+from backend.models.recipe import Recipe, ingredient_keys, recipe_ingredients
+from backend.schemas.cooking import ProductResponse
+from backend.services.cooking_service import CookingProductService, CookingRecipeService, CookingShoppingListService
+from backend.services.cost_service import CostService
+from backend.services.nutrition_service import NutritionService
+
+PROVIDERS = ("openai", "mistral", "anthropic", "perplexity")
+FOODS = ("pomidor", "ogórek", "papryka", "ser żółty", "mleko", "jogurt", "łosoś", "kurczak", "ryż", "makaron")
+REQUEST_TYPES = ("chat", "ocr", "embedding")
+
+
+@pytest.fixture
+def cost_records(run, bench_session):
+    """Two thousand cost records spread over providers and request types."""
+    now = datetime.utcnow()
+    bench_session.add_all([
+        CostRecord(
+            user_id=None,
+            session_id=f"s{i % 40}",
+            provider_type="llm",
+            provider_name=PROVIDERS[i % len(PROVIDERS)],
+            model_used="model",
+            tokens_used=100 + i % 500,
+            cost_usd=0.0001 * (i % 50),
+            request_type=REQUEST_TYPES[i % len(REQUEST_TYPES)],
+            timestamp=now - timedelta(hours=i % 240),
+        )
+        for i in range(2000)
+    ])
+    run(bench_session.commit())
+    return bench_session
+
+
+@pytest.fixture
+def products(run, bench_session):
+    """Priced products for one user."""
+    items = [
+        Product(name=f"produkt {i}", category="spożywcze", unit="szt", price_per_unit=1.0 + i, user_id=1)
+        for i in range(100)
+    ]
+    bench_session.add_all(items)
+    run(bench_session.commit())
+    return items
+
+
+@pytest.fixture
+def pantry(run, bench_session):
+    """Twenty thousand products for one user, indexed on (user_id, name)."""
+    bench_session.add_all([
+        Product(name=f"produkt {i:05d}", category="spożywcze", unit="szt", user_id=1)
+        for i in range(20000)
+    ])
+    run(bench_session.commit())
+    return bench_session
+
+
+@pytest.fixture
+def recipe_book(run, bench_session):
+    """Ten thousand recipes of 4-8 ingredients from a 60-ingredient pantry, indexed."""
+    rng = random.Random(49)
+    pantry = [f"{food} {variant}" for food in FOODS for variant in ("świeży", "mrożony", "suszony", "wędzony", "bio", "lokalny")]
+    recipes = [
+        dict(id=i + 1, name=f"przepis {i}", instructions="-", user_id=1,
+             ingredients=[{"name": name} for name in rng.sample(pantry, rng.randint(4, 8))])
+        for i in range(10000)
+    ]
+
+    async def load():
+        await bench_session.execute(Recipe.__table__.insert(), recipes)
+        postings = []
+        for recipe in recipes:
+            keys = ingredient_keys(recipe["ingredients"])
+            postings += [
+                dict(user_id=1, ingredient=key, recipe_id=recipe["id"], ingredient_count=len(keys)) for key in keys
+            ]
+        await bench_session.execute(recipe_ingredients.insert(), postings)
+        await bench_session.commit()
+
+    run(load())
+    return bench_session, pantry
+
+
+class TestServiceBenchmarks:
+    """Service aggregation and lookups"""
+
+    def test_cost_summary_aggregation(self, benchmark, run, cost_records):
+        """CostService.get_cost_summary over 2000 records"""
+        service = CostService(cost_records)
+        summary = benchmark(lambda: run(service.get_cost_summary(start_date=date.today() - timedelta(days=30))))
+        assert summary["total_requests"] == 2000
+        assert set(summary["providers"]) == set(PROVIDERS)
+
+    def test_calculate_list_cost(self, benchmark, run, bench_session, products):
+        """_calculate_list_cost for a 50-item shopping list"""
+        service = CookingShoppingListService(bench_session)
+        items = [{"product_name": f"produkt {i}", "quantity": 2} for i in range(50)]
+        total = benchmark(lambda: run(service._calculate_list_cost(items, user_id=1)))
+        assert total == pytest.approx(sum((1.0 + i) * 2 for i in range(50)))
+
+    @pytest.mark.parametrize("size", [10, 100, 1000])
+    def test_calculate_list_cost_scaling(self, benchmark, run, bench_session, size):
+        """_calculate_list_cost against list size, one IN query per 500 names"""
+        bench_session.add_all([
+            Product(name=f"produkt {i}", category="spożywcze", unit="szt", price_per_unit=1.0, user_id=1)
+            for i in range(size)
+        ])
+        run(bench_session.commit())
+        service = CookingShoppingListService(bench_session)
+        items = [{"product_name": f"produkt {i}", "quantity": 1} for i in range(size)]
+        total = benchmark(lambda: run(service._calculate_list_cost(items, user_id=1)))
+        assert total == pytest.approx(size)
+
+    def test_product_response_serialization(self, benchmark, products):
+        """ProductResponse validation and JSON dump for a 100-product listing"""
+        result = benchmark(lambda: [ProductResponse.model_validate(p).model_dump_json() for p in products])
+        assert len(result) == 100
+
+    @pytest.mark.parametrize("mode", ["offset", "cursor"])
+    def test_deep_page(self, benchmark, run, pantry, mode):
+        """list_products page 190 of 200 by OFFSET vs keyset cursor"""
+        service = CookingProductService(pantry)
+        cursor = None
+        if mode == "cursor":
+            previous = run(service.list_products(1, skip=18900, limit=100))
+            cursor = previous.next_cursor
+        page = benchmark(lambda: run(service.list_products(
+            1, skip=19000 if mode == "offset" else 0, limit=100, cursor=cursor
+        )))
+        assert page[0].name == "produkt 19000"
+
+    def test_match_ingredients(self, benchmark):
+        """NameMatcher: 1000 inflected or misspelled ingredients against 2000 products"""
+        matcher = NameMatcher()
+        for i in range(2000):
+            matcher.add(f"{FOODS[i % len(FOODS)]} {i}", i)
+        queries = [f"{FOODS[i % len(FOODS)].upper()}ami {i * 2}" for i in range(1000)]
+        matches = benchmark(lambda: matcher.match_many(queries))
+        assert len(matches) == 1000
+
+    def test_find_recipes_by_ingredients(self, benchmark, run, recipe_book):
+        """find_recipes_by_ingredients: 15 ingredients at hand, at most 2 missing, 10k recipes"""
+        session, pantry = recipe_book
+        service = CookingRecipeService(session)
+        at_hand = pantry[::4]
+        matches = benchmark(lambda: run(service.find_recipes_by_ingredients(at_hand, 1, max_missing=2)))
+        assert matches and all(len(m.missing) <= 2 for m in matches)
+
+    def test_nutrition_table_compute(self, benchmark):
+        """NutritionTable.compute: 10k recipes of 4-8 ingredients in grams, spoons and pieces, one pass"""
+        rng = random.Random(50)
+        table = NutritionTable(load_foods(BUNDLED_TABLE))
+        units = (("200", "g"), ("2", "łyżki"), ("1", "szklanka"), ("0,5", "kg"), ("2", "szt"))
+        recipes = [
+            [(food.name, *rng.choice(units)) for food in rng.sample(table.foods, rng.randint(4, 8))]
+            for _ in range(10000)
+        ]
+        totals, unresolved = benchmark(lambda: table.compute(recipes))
+        assert totals.shape[0] == 10000 and (totals[:, 0] > 0).all()
+
+    @pytest.mark.parametrize("stored", [False, True], ids=["computed", "stored"])
+    def test_recipe_nutrition_batch(self, benchmark, run, recipe_book, stored):
+        """NutritionService.analyze_recipes for 500 recipes: computed and written, or read back"""
+        session, _ = recipe_book
+        service = NutritionService(session)
+        ids = list(range(1, 501))
+
+        async def analyze():
+            if not stored:
+                await service.invalidate_user(1)
+            return await service.analyze_recipes(ids, 1)
+
+        run(service.analyze_recipes(ids, 1))
+        results = benchmark(lambda: run(analyze()))
+        assert list(results) == ids
@@ -14,6 +14,7 @@ from sqlalchemy.pool import StaticPool
 from backend.models.base import Base
 from backend.database import get_async_session
 from backend.core.llm_providers.provider_factory import provider_factory
+from backend.core.llm_providers.result import ChatResult
 from backend.core.ocr_providers.ocr_factory import ocr_provider_factory
 
 
@@ -56,7 +57,7 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
 def mock_llm_provider():
     """Mock LLM provider for testing."""
     mock_provider = Mock()
-    mock_provider.chat.return_value = "Mock response"
+    mock_provider.chat.return_value = ChatResult(text="Mock response", model="gpt-4o-mini", provider="openai")
     mock_provider.embed.return_value = [0.1, 0.2, 0.3]
     mock_provider.health_check.return_value = {"status": "healthy"}
     return mock_provider
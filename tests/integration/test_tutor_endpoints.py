@@ -2,9 +2,12 @@
 Integration tests for Tutor Antonina endpoints.
 """
 
+import asyncio
+import json
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 import sys
 import os
 
@@ -12,6 +15,11 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 
 from backend.api.main import app
+from backend.api.v2.endpoints.chat import ChatRequest, chat_completion, tutor_mode
+from backend.agents.registry import agent_registry
+from backend.agents.tutor_agent import TutorAntonina
+from backend.schemas.tutor import TutorRequest
+from backend.core.llm_providers.result import ChatResult
 
 
 @pytest.fixture
@@ -26,41 +34,45 @@ def mock_llm_factory():
     with patch('backend.api.v2.endpoints.chat.llm_factory') as mock:
         # Mock provider
         mock_provider = AsyncMock()
-        mock_provider.chat.return_value = {
-            "text": "Test AI response",
-            "model": "gpt-4",
-            "provider": "openai",
-            "usage": {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30},
-            "cost": {"total_cost": 0.001},
-            "finish_reason": "stop"
-        }
+        mock_provider.chat.return_value = ChatResult(
+            text="Test AI response",
+            model="gpt-4",
+            provider="openai",
+            input_tokens=10,
+            output_tokens=20,
+            cost=0.001,
+        )
         
         # Mock provider factory methods
         mock.get_available_providers.return_value = [type('ProviderType', (), {'value': 'openai'})()]
         mock.get_provider.return_value = mock_provider
-        mock.chat_with_fallback = AsyncMock(return_value={
-            "text": "Test AI response",
-            "model": "gpt-4",
-            "provider": "openai",
-            "usage": {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30},
-            "cost": {"total_cost": 0.001},
-            "finish_reason": "stop"
-        })
+        mock.chat_with_fallback = AsyncMock(return_value=ChatResult(
+            text="Test AI response",
+            model="gpt-4",
+            provider="openai",
+            input_tokens=10,
+            output_tokens=20,
+            cost=0.001,
+        ))
         
         yield mock
 
 
 @pytest.fixture
 def mock_tutor_agent():
-    """Mock Tutor Antonina agent."""
-    with patch('backend.api.v2.endpoints.chat.TutorAntonina') as mock:
-        mock_instance = AsyncMock()
-        mock_instance.guide = AsyncMock(return_value={
-            "question": "W jakim kontekście chcesz użyć tego prompta?",
-            "feedback": None
-        })
-        mock.return_value = mock_instance
+    """Mock Tutor Antonina agent lent out by the agent registry."""
+    mock = MagicMock()
+    mock_instance = AsyncMock()
+    mock_instance.config = TutorAntonina().config
+    mock_instance.guide = AsyncMock(return_value={
+        "question": "W jakim kontekście chcesz użyć tego prompta?",
+        "feedback": None
+    })
+    mock.return_value = mock_instance
+    agent_registry.clear()
+    with patch.dict(agent_registry.factories, {"tutor_antonina": mock}):
         yield mock
+    agent_registry.clear()
 
 
 class TestTutorEndpoints:
@@ -198,4 +210,150 @@ class TestTutorEndpoints:
         data = response.json()
         
         assert data["provider"] == "openai"
-        assert data["model"] == "gpt-4" 
\ No newline at end of file
+        assert data["model"] == "gpt-4"
+
+    def test_tutor_stats(self, client):
+        """Test the short-circuit rate report"""
+        response = client.get("/api/v2/chat/tutor/stats")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data) == {"analyzed", "short_circuited", "llm_calls", "short_circuit_rate", "by_element"}
+        assert 0.0 <= data["short_circuit_rate"] <= 1.0
+
+
+def parse_sse(body: str):
+    """Split a server-sent event stream into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestTutorConcurrency:
+    """Test that the tutor analysis overlaps the main completion."""
+
+    @pytest.mark.asyncio
+    async def test_tutor_runs_alongside_main_call(self, mock_llm_factory, mock_tutor_agent):
+        """Test the main call can finish only if the tutor already started"""
+        tutor_started = asyncio.Event()
+
+        async def guide(last_prompt, chat_history):
+            tutor_started.set()
+            return {"question": "Dla kogo?", "feedback": None}
+
+        async def chat(**kwargs):
+            await asyncio.wait_for(tutor_started.wait(), timeout=1)
+            return ChatResult(text="Odpowiedź", model="gpt-4", provider="openai")
+
+        mock_tutor_agent.return_value.guide = guide
+        mock_llm_factory.chat_with_fallback = chat
+
+        response = await chat_completion(ChatRequest(
+            messages=[{"role": "user", "content": "Napisz esej"}],
+            tutor_mode=True,
+        ))
+
+        assert response.text == "Odpowiedź"
+        assert response.tutor_question == "Dla kogo?"
+
+    @pytest.mark.asyncio
+    async def test_main_failure_cancels_tutor(self, mock_llm_factory, mock_tutor_agent):
+        """Test a failed main call does not leave the tutor running"""
+        cancelled = asyncio.Event()
+
+        async def guide(last_prompt, chat_history):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def chat(**kwargs):
+            await asyncio.sleep(0)
+            raise Exception("upstream down")
+
+        mock_tutor_agent.return_value.guide = guide
+        mock_llm_factory.chat_with_fallback = chat
+
+        with pytest.raises(HTTPException) as exc_info:
+            await chat_completion(ChatRequest(
+                messages=[{"role": "user", "content": "Napisz esej"}],
+                tutor_mode=True,
+            ))
+
+        assert exc_info.value.status_code == 500
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_tutor_endpoint_failure_cancels_reply(self, mock_llm_factory, mock_tutor_agent):
+        """Test the dedicated endpoint stops the reply once the tutor fails"""
+        cancelled = asyncio.Event()
+
+        async def chat(**kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        mock_tutor_agent.return_value.guide = AsyncMock(side_effect=Exception("Test error"))
+        mock_llm_factory.chat_with_fallback = chat
+
+        with pytest.raises(HTTPException) as exc_info:
+            await asyncio.wait_for(tutor_mode(TutorRequest(
+                messages=[{"role": "user", "content": "Napisz esej"}],
+            )), timeout=1)
+
+        assert "Tutor mode failed" in exc_info.value.detail
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+class TestChatStreaming:
+    """Test the server-sent events mode of the chat endpoint."""
+
+    def test_stream_sends_answer_before_tutor(self, client, mock_llm_factory, mock_tutor_agent):
+        """Test event order: deltas, message, tutor, done"""
+        async def stream(messages, usage=None, **kwargs):
+            for delta in ["Ala ", "ma ", "kota"]:
+                yield delta
+            usage.update({
+                "provider": "openai", "model": "gpt-4",
+                "input_tokens": 5, "output_tokens": 3, "cost": 0.002,
+            })
+
+        mock_llm_factory.stream_with_fallback = stream
+
+        response = client.post("/api/v2/chat/chat", json={
+            "messages": [{"role": "user", "content": "Napisz esej"}],
+            "tutor_mode": True,
+            "stream": True,
+        })
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(response.text)
+        names = [name for name, _ in events]
+        assert names == ["delta", "delta", "delta", "message", "tutor", "done"]
+        assert "".join(data["text"] for name, data in events if name == "delta") == "Ala ma kota"
+        assert events[3][1]["usage"]["total_tokens"] == 8
+        assert events[3][1]["cost"]["total_cost"] == 0.002
+        assert events[4][1]["tutor_question"] == "W jakim kontekście chcesz użyć tego prompta?"
+
+    def test_stream_reports_provider_error(self, client, mock_llm_factory):
+        """Test a failing stream ends with an error event"""
+        async def stream(messages, usage=None, **kwargs):
+            yield "Ala "
+            raise Exception("connection reset")
+
+        mock_llm_factory.stream_with_fallback = stream
+
+        response = client.post("/api/v2/chat/chat", json={
+            "messages": [{"role": "user", "content": "Napisz esej"}],
+            "stream": True,
+        })
+
+        events = parse_sse(response.text)
+        assert [name for name, _ in events] == ["delta", "error"]
+        assert "connection reset" in events[1][1]["detail"]
@@ -0,0 +1,135 @@
+"""
+Unit tests for the agent registry.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from backend.agents.base_agent import AgentConfig, AgentResponse, BaseAgent, GeneralConversationAgent
+from prometheus_client import REGISTRY
+
+from backend.agents.orchestrator import ToolOrchestrator
+from backend.agents.registry import AgentRegistry
+
+
+class EchoAgent(BaseAgent):
+    """Minimal agent with a small concurrency limit."""
+
+    def __init__(self, model=None):
+        super().__init__(AgentConfig(
+            agent_type="echo",
+            name="Echo",
+            description="Echoes the query",
+            max_concurrent_requests=2,
+        ))
+        self.model = model
+
+    async def process_query(self, query, context=None, **kwargs):
+        if query == "fail":
+            return AgentResponse(success=False, content="Sorry", agent_type="echo", metadata={"error": "upstream down"})
+        return AgentResponse(success=True, content=query, agent_type="echo")
+
+
+@pytest.fixture
+def registry():
+    """Registry with the echo agent registered."""
+    registry = AgentRegistry()
+    registry.register("echo", EchoAgent)
+    return registry
+
+
+class TestAgentRegistry:
+    """Test agent pooling, shared limits and stats."""
+
+    def test_instances_are_reused_per_config(self, registry):
+        """Test one instance per type and config"""
+        assert registry.get("echo") is registry.get("echo")
+        assert registry.get("echo", model="a") is registry.get("echo", model="a")
+        assert registry.get("echo", model="a") is not registry.get("echo", model="b")
+
+    def test_unknown_type(self, registry):
+        """Test unregistered agent types are rejected"""
+        with pytest.raises(KeyError):
+            registry.get("missing")
+
+    def test_cache_is_bounded(self, registry):
+        """Test least recently used configs are dropped"""
+        registry.MAX_INSTANCES = 3
+        for i in range(5):
+            registry.get("echo", model=str(i))
+
+        assert len(registry.agents()) == 3
+
+    @pytest.mark.asyncio
+    async def test_limit_is_shared_across_configs(self, registry):
+        """Test max_concurrent_requests holds across requests and configs"""
+        peak = 0
+        running = 0
+
+        async def request(model):
+            nonlocal peak, running
+            async with registry.borrow("echo", model=model):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(request(str(i % 3)) for i in range(8)))
+
+        assert peak == 2
+        assert sum(entry["stats"]["request_count"] for entry in registry.stats()) == 8
+
+    @pytest.mark.asyncio
+    async def test_errors_are_counted(self, registry):
+        """Test failures land in agent stats and the error histogram"""
+        labels = {"agent_type": "echo", "outcome": "error"}
+        before = REGISTRY.get_sample_value("agent_request_duration_seconds_count", labels) or 0
+
+        with pytest.raises(ValueError):
+            async with registry.borrow("echo"):
+                raise ValueError("boom")
+
+        stats = registry.stats()[0]["stats"]
+        assert stats["request_count"] == 1
+        assert stats["error_count"] == 1
+        assert stats["last_error"] == "boom"
+        assert stats["in_flight"] == 0
+        assert REGISTRY.get_sample_value("agent_request_duration_seconds_count", labels) == before + 1
+
+    @pytest.mark.asyncio
+    async def test_failed_response_is_an_error(self, registry):
+        """Test a success=False response is returned and recorded as an error outcome"""
+        labels = {"agent_type": "echo", "outcome": "error"}
+        before = REGISTRY.get_sample_value("agent_request_duration_seconds_count", labels) or 0
+
+        assert (await registry.process_query("echo", "hello")).success is True
+        response = await registry.process_query("echo", "fail")
+
+        assert response.content == "Sorry"
+        stats = registry.stats()[0]["stats"]
+        assert (stats["request_count"], stats["error_count"]) == (2, 1)
+        assert stats["last_error"] == "upstream down"
+        assert REGISTRY.get_sample_value("agent_request_duration_seconds_count", labels) == before + 1
+
+    @pytest.mark.asyncio
+    async def test_general_agent_counted_once(self, registry):
+        """Test the registry alone keeps the general agent's stats"""
+        registry.register("general", lambda: GeneralConversationAgent(orchestrator=ToolOrchestrator(tools={})))
+
+        with patch("backend.agents.base_agent.provider_factory") as factory:
+            factory.get_configured_providers.return_value = []
+            factory.get_best_provider.side_effect = RuntimeError("no providers")
+            response = await registry.process_query("general", "Cześć")
+
+        assert response.success is False
+        stats = registry.stats()[0]["stats"]
+        assert (stats["request_count"], stats["error_count"]) == (1, 1)
+
+    def test_warm_up(self, registry):
+        """Test startup creates one default instance per type"""
+        registry.warm_up()
+
+        assert [entry["type"] for entry in registry.stats()] == ["echo"]
+        assert registry.stats()[0]["stats"]["instances"] == 1
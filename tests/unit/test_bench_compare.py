@@ -0,0 +1,53 @@
+"""
+Unit tests for benchmark baseline comparison.
+"""
+
+import json
+
+from backend.testing.bench_compare import compare, load_results, main, save_baseline
+
+
+def _raw_report(path, medians):
+    path.write_text(json.dumps({
+        "machine_info": {"machine": "x86_64", "python_version": "3.11.7"},
+        "commit_info": {"id": "abc123"},
+        "benchmarks": [
+            {"fullname": name, "stats": {"median": m, "mean": m, "min": m, "stddev": 0.0, "rounds": 10}}
+            for name, m in medians.items()
+        ],
+    }))
+    return path
+
+
+class TestBenchCompare:
+    """Test baseline save/compare"""
+
+    def test_save_and_load_baseline(self, tmp_path):
+        """Test compact baseline round trip"""
+        raw = _raw_report(tmp_path / "raw.json", {"a": 1.0, "b": 2.0})
+        baseline = tmp_path / "baseline.json"
+
+        assert save_baseline(raw, baseline) == 2
+        assert load_results(baseline) == load_results(raw)
+
+    def test_compare_flags_regression(self):
+        """Test regressions above threshold are flagged"""
+        baseline = {"fast": {"median": 1.0}, "slow": {"median": 1.0}, "gone": {"median": 1.0}}
+        current = {"fast": {"median": 1.1}, "slow": {"median": 1.5}, "new": {"median": 1.0}}
+
+        rows, missing = compare(current, baseline, threshold=0.25)
+
+        flagged = {row["name"]: row["regression"] for row in rows}
+        assert flagged == {"fast": False, "slow": True}
+        assert missing == ["gone"]
+
+    def test_main_exit_code(self, tmp_path):
+        """Test CLI returns non-zero on regression"""
+        baseline = tmp_path / "baseline.json"
+        save_baseline(_raw_report(tmp_path / "base.json", {"a": 1.0}), baseline)
+
+        ok = _raw_report(tmp_path / "ok.json", {"a": 1.1})
+        slow = _raw_report(tmp_path / "slow.json", {"a": 2.0})
+
+        assert main(["compare", str(ok), "--baseline", str(baseline)]) == 0
+        assert main(["compare", str(slow), "--baseline", str(baseline)]) == 1
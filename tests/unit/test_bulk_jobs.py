@@ -0,0 +1,327 @@
+"""
+Unit tests for bulk generation jobs.
+"""
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, select
+
+from backend.core.llm_providers.anthropic_client import AnthropicProvider
+from backend.core.llm_providers.batch import (
+    BATCH_CLIENTS, AnthropicBatchClient, BatchRequest, MistralBatchClient, OpenAIBatchClient,
+)
+from backend.core.llm_providers.mistral_client import MistralProvider
+from backend.core.llm_providers.openai_client import OpenAIProvider
+from backend.core.llm_providers.provider_factory import ProviderType
+from backend.core.llm_providers.result import ChatResult
+from backend.exceptions.database import ValidationError
+from backend.models import BulkJob, BulkJobItem, Recipe
+from backend.schemas.bulk import BulkJobCreate
+from backend.services.bulk_job_service import BulkJobService, next_off_peak_start
+from backend.services.cooking_service import CookingRecipeService
+from backend.testing.fake_upstream import PROVIDER_PREFIXES, FakeUpstreamConfig, create_app
+
+FAKE_ROOT = "http://fake-upstream"
+PROVIDERS = {
+    ProviderType.OPENAI: (OpenAIProvider, {"Authorization": "Bearer k"}),
+    ProviderType.ANTHROPIC: (AnthropicProvider, {"x-api-key": "k"}),
+    ProviderType.MISTRAL: (MistralProvider, {"Authorization": "Bearer k"}),
+}
+LATER = timedelta(minutes=10)
+
+
+def _batch_factory(app):
+    """Build batch clients talking to the in-process fake upstream."""
+    def factory(provider_type: ProviderType):
+        provider_class, headers = PROVIDERS[provider_type]
+        return BATCH_CLIENTS[provider_type](
+            provider_class(api_key="k"),
+            base_url=f"{FAKE_ROOT}{PROVIDER_PREFIXES[provider_type.value]}",
+            http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=app), headers=headers),
+        )
+    return factory
+
+
+def _job(count: int = 3, **kwargs) -> BulkJobCreate:
+    return BulkJobCreate(
+        name="Porady żywieniowe",
+        items=[{"prompt": f"Porada numer {i}", "custom_id": f"tip-{i}"} for i in range(count)],
+        **kwargs,
+    )
+
+
+@pytest_asyncio.fixture
+async def bulk_db(db_session):
+    """Session with no bulk jobs left over from other tests."""
+    await db_session.execute(delete(BulkJobItem))
+    await db_session.execute(delete(BulkJob))
+    await db_session.commit()
+    return db_session
+
+
+class TestOffPeak:
+    """Test off-peak scheduling"""
+
+    def test_inside_window_runs_now(self):
+        """Test time inside the window is kept"""
+        now = datetime(2025, 3, 1, 2, 30)
+        assert next_off_peak_start(now, 1, 6) == now
+
+    def test_waits_for_next_window(self):
+        """Test daytime submissions wait for the next night"""
+        assert next_off_peak_start(datetime(2025, 3, 1, 14, 0), 1, 6) == datetime(2025, 3, 2, 1, 0)
+        assert next_off_peak_start(datetime(2025, 3, 1, 0, 15), 1, 6) == datetime(2025, 3, 1, 1, 0)
+
+    def test_window_across_midnight(self):
+        """Test windows wrapping past midnight"""
+        assert next_off_peak_start(datetime(2025, 3, 1, 23, 0), 22, 5) == datetime(2025, 3, 1, 23, 0)
+        assert next_off_peak_start(datetime(2025, 3, 1, 12, 0), 22, 5) == datetime(2025, 3, 1, 22, 0)
+
+
+class TestBatchPacking:
+    """Test provider batch input formats"""
+
+    REQUESTS = [BatchRequest(custom_id="7", messages=[{"role": "user", "content": "Hej"}], max_tokens=50)]
+
+    def test_openai_jsonl(self):
+        """Test OpenAI rows carry method, url and full body"""
+        client = OpenAIBatchClient(OpenAIProvider(api_key="k"), base_url=FAKE_ROOT)
+        row = json.loads(client.pack(self.REQUESTS, "gpt-4o-mini"))
+        assert row == {
+            "custom_id": "7", "method": "POST", "url": "/v1/chat/completions",
+            "body": {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "Hej"}], "max_tokens": 50},
+        }
+
+    def test_anthropic_requests(self):
+        """Test Anthropic requests embed Messages API params"""
+        client = AnthropicBatchClient(AnthropicProvider(api_key="k"), base_url=FAKE_ROOT)
+        packed = client.pack(self.REQUESTS, "claude-3-haiku-20240307")
+        params = packed["requests"][0]["params"]
+        assert packed["requests"][0]["custom_id"] == "7"
+        assert params["model"] == "claude-3-haiku-20240307"
+        assert params["max_tokens"] == 50
+
+    def test_mistral_jsonl_without_model(self):
+        """Test Mistral rows leave the model to the job"""
+        client = MistralBatchClient(MistralProvider(api_key="k"), base_url=FAKE_ROOT)
+        row = json.loads(client.pack(self.REQUESTS, "mistral-small-latest"))
+        assert row["custom_id"] == "7"
+        assert "model" not in row["body"] and "stream" not in row["body"]
+        assert row["body"]["max_tokens"] == 50
+
+
+class TestBatchJobs:
+    """Test batch mode against the fake upstream emulator"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("provider_type,model", [
+        (ProviderType.OPENAI, "gpt-3.5-turbo"),
+        (ProviderType.ANTHROPIC, "claude-3-haiku-20240307"),
+        (ProviderType.MISTRAL, "mistral-small-latest"),
+    ])
+    async def test_batch_round_trip(self, bulk_db, provider_type, model):
+        """Test submit, poll and result landing at batch prices"""
+        service = BulkJobService(bulk_db, batch_client_factory=_batch_factory(create_app()))
+        job = await service.submit_job(_job(provider=provider_type.value, model=model, mode="batch", max_tokens=16))
+
+        assert job.mode == "batch"
+        assert await service.process_due_jobs() == 1
+        assert job.status == "submitted"
+        assert len(job.provider_batches) == 1
+
+        await service.process_due_jobs(datetime.utcnow() + LATER)
+
+        items = await service.list_items(job.id)
+        assert job.status == "completed"
+        assert job.completed_items == 3
+        assert all(item.status == "succeeded" and item.result_text for item in items)
+        assert [item.custom_id for item in items] == ["tip-0", "tip-1", "tip-2"]
+        assert job.cost_usd > 0
+        assert job.cost_usd == pytest.approx(job.list_cost_usd * 0.5)
+
+    @pytest.mark.asyncio
+    async def test_batch_waits_for_provider(self, bulk_db):
+        """Test unfinished provider batches keep the job submitted"""
+        app = create_app(FakeUpstreamConfig(batch_delay=3600))
+        service = BulkJobService(bulk_db, batch_client_factory=_batch_factory(app))
+        job = await service.submit_job(_job(provider="mistral", mode="batch"))
+
+        await service.process_due_jobs()
+        await service.process_due_jobs(datetime.utcnow() + LATER)
+
+        assert job.status == "submitted"
+        assert job.completed_items == 0
+
+    @pytest.mark.asyncio
+    async def test_auto_mode_picks_batch_provider(self, bulk_db):
+        """Test large jobs without a provider go to the best batch-capable one"""
+        factory = Mock()
+        factory.get_configured_providers.return_value = [ProviderType.COHERE, ProviderType.MISTRAL]
+        factory.get_provider_priority.side_effect = lambda p: {ProviderType.COHERE: 1, ProviderType.MISTRAL: 2}[p]
+        factory._adapt_model_for_provider.side_effect = lambda model, provider: model
+        service = BulkJobService(bulk_db, llm_factory=factory)
+
+        large = await service.submit_job(_job(count=25))
+        small = await service.submit_job(_job(count=2))
+
+        assert (large.mode, large.provider) == ("batch", "mistral")
+        assert (small.mode, small.provider) == ("queue", None)
+
+    @pytest.mark.asyncio
+    async def test_batch_mode_requires_batch_provider(self, bulk_db):
+        """Test providers without a batch API are rejected"""
+        with pytest.raises(ValidationError):
+            await BulkJobService(bulk_db).submit_job(_job(provider="cohere", mode="batch"))
+
+
+class TestQueueJobs:
+    """Test throttled queue mode"""
+
+    @pytest.mark.asyncio
+    async def test_queue_records_results_and_failures(self, bulk_db):
+        """Test queue mode stores results and failures per item"""
+        factory = Mock()
+        factory.chat_with_fallback = AsyncMock(side_effect=[
+            ChatResult(text="Pij wodę", model="gpt-4o-mini", provider="openai", input_tokens=5, output_tokens=3, cost=0.01),
+            Exception("All providers failed"),
+            ChatResult(text="Jedz warzywa", model="gpt-4o-mini", provider="openai", cost=0.02),
+        ])
+        service = BulkJobService(bulk_db, llm_factory=factory)
+        job = await service.submit_job(_job(system_prompt="Jesteś dietetykiem"))
+
+        await service.process_due_jobs()
+
+        items = await service.list_items(job.id)
+        assert job.status == "completed"
+        assert (job.completed_items, job.failed_items) == (2, 1)
+        assert job.cost_usd == pytest.approx(0.03)
+        assert job.list_cost_usd == pytest.approx(0.03)
+        assert items[1].status == "failed" and "All providers failed" in items[1].error
+        assert items[0].messages[0] == {"role": "system", "content": "Jesteś dietetykiem"}
+
+    @pytest.mark.asyncio
+    async def test_recipe_results_land_in_recipes(self, bulk_db):
+        """Test recipe jobs create AI generated recipes"""
+        recipe = {"name": "Placki ziemniaczane", "instructions": "Zetrzyj i usmaż", "ingredients": [{"name": "ziemniaki"}]}
+        factory = Mock()
+        factory.chat_with_fallback = AsyncMock(side_effect=[
+            ChatResult(text=f"```json\n{json.dumps(recipe)}\n```", model="m", provider="openai"),
+            ChatResult(text="to nie jest JSON", model="m", provider="openai"),
+        ])
+        service = BulkJobService(bulk_db, llm_factory=factory)
+        job = await service.submit_job(_job(count=2, kind="recipe"), user_id=1)
+
+        await service.process_due_jobs()
+
+        ok, bad = await service.list_items(job.id)
+        stored = (await bulk_db.execute(select(Recipe).where(Recipe.id == ok.target_id))).scalar_one()
+        assert (ok.status, ok.target_table) == ("succeeded", "recipes")
+        assert stored.name == "Placki ziemniaczane" and stored.is_ai_generated
+        assert bad.status == "failed" and bad.result_text == "to nie jest JSON"
+
+    @pytest.mark.asyncio
+    async def test_duplicate_recipe_names_fail_one_item(self, bulk_db):
+        """Test a recipe name landed twice fails only the second item, not the job"""
+        recipe = {"name": "Placki ziemniaczane", "instructions": "Zetrzyj i usmaż", "ingredients": [{"name": "ziemniaki"}]}
+        factory = Mock()
+        factory.chat_with_fallback = AsyncMock(return_value=ChatResult(text=json.dumps(recipe), model="m", provider="openai"))
+        service = BulkJobService(bulk_db, llm_factory=factory)
+        job = await service.submit_job(_job(count=2, kind="recipe"), user_id=1)
+
+        await service.process_due_jobs()
+
+        first, second = await service.list_items(job.id)
+        stored = (await bulk_db.execute(select(Recipe).where(Recipe.user_id == 1))).scalars().all()
+        assert job.status == "completed"
+        assert (job.completed_items, job.failed_items) == (1, 1)
+        assert [r.id for r in stored] == [first.target_id]
+        assert second.status == "failed" and "already exists" in second.error
+        assert second.result_text == json.dumps(recipe)
+
+    @pytest.mark.asyncio
+    async def test_landed_recipes_match_ingredients(self, bulk_db):
+        """Test bulk recipes get ingredient postings like recipes saved by hand"""
+        recipe = {"name": "Placki ziemniaczane", "instructions": "Zetrzyj i usmaż", "ingredients": [{"name": "ziemniaki"}]}
+        factory = Mock()
+        factory.chat_with_fallback = AsyncMock(return_value=ChatResult(text=json.dumps(recipe), model="m", provider="openai"))
+        service = BulkJobService(bulk_db, llm_factory=factory)
+        job = await service.submit_job(_job(count=1, kind="recipe"), user_id=1)
+
+        await service.process_due_jobs()
+
+        (item,) = await service.list_items(job.id)
+        matches = await CookingRecipeService(bulk_db).find_recipes_by_ingredients(["ziemniaki"], 1)
+        assert [match.recipe.id for match in matches] == [item.target_id]
+
+    @pytest.mark.asyncio
+    async def test_landed_recipes_are_searchable(self, bulk_db):
+        """Test bulk recipes are written to the full-text index"""
+        factory = Mock()
+        factory.chat_with_fallback = AsyncMock(side_effect=[
+            ChatResult(text=json.dumps({"name": name, "instructions": "Usmaż"}), model="m", provider="openai")
+            for name in ("Placki ziemniaczane", "Placki z cukinii")
+        ])
+        service = BulkJobService(bulk_db, llm_factory=factory)
+        job = await service.submit_job(_job(count=2, kind="recipe"), user_id=1)
+
+        await service.process_due_jobs()
+
+        items = await service.list_items(job.id)
+        hits = await CookingRecipeService(bulk_db).search_recipes("placki", 1)
+        assert sorted(hit.item.id for hit in hits) == sorted(item.target_id for item in items)
+
+    @pytest.mark.asyncio
+    async def test_recipe_jobs_need_user(self, bulk_db):
+        """Test recipe jobs cannot be anonymous"""
+        with pytest.raises(ValidationError):
+            await BulkJobService(bulk_db).submit_job(_job(kind="recipe"))
+
+
+class TestScheduling:
+    """Test off-peak jobs, leases and cancellation"""
+
+    @pytest.mark.asyncio
+    async def test_off_peak_job_waits(self, bulk_db, monkeypatch):
+        """Test off-peak jobs are not started before their window"""
+        from backend.config import settings
+
+        hour = datetime.utcnow().hour
+        monkeypatch.setattr(settings, "BULK_OFF_PEAK_START_HOUR", (hour + 2) % 24)
+        monkeypatch.setattr(settings, "BULK_OFF_PEAK_END_HOUR", (hour + 3) % 24)
+        factory = Mock()
+        factory.chat_with_fallback = AsyncMock(return_value=ChatResult(text="ok", model="m", provider="openai"))
+        service = BulkJobService(bulk_db, llm_factory=factory)
+        job = await service.submit_job(_job(off_peak=True))
+
+        assert job.scheduled_at > datetime.utcnow()
+        assert await service.process_due_jobs() == 0
+        assert await service.process_due_jobs(job.scheduled_at) == 1
+        assert job.status == "completed"
+
+    @pytest.mark.asyncio
+    async def test_claim_is_exclusive(self, bulk_db):
+        """Test a leased job is not picked up twice"""
+        service = BulkJobService(bulk_db)
+        job = await service.submit_job(_job())
+        now = datetime.utcnow()
+
+        assert await service._claim(job.id, "pending", now)
+        assert not await service._claim(job.id, "pending", now)
+        assert await service._claim(job.id, "pending", now + LATER)
+
+    @pytest.mark.asyncio
+    async def test_cancel_pending_job(self, bulk_db):
+        """Test cancelling marks open items cancelled"""
+        service = BulkJobService(bulk_db)
+        job = await service.submit_job(_job())
+
+        await service.cancel_job(job.id)
+
+        assert job.status == "cancelled"
+        assert {item.status for item in await service.list_items(job.id)} == {"cancelled"}
+        assert await service.process_due_jobs() == 0
@@ -0,0 +1,144 @@
+"""
+Unit tests for provider traffic record/replay.
+"""
+
+import time
+
+import aiohttp
+import httpx
+import pytest
+
+from backend.testing.cassette import Cassette, CassetteMissError, request_key
+from backend.testing.fake_upstream import FakeUpstreamConfig, LatencyModel, running_fake_upstream
+from backend.testing.traffic_replay import parse_log_line
+
+CHAT_BODY = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "Cześć"}], "stream": True}
+
+
+def _fake_config() -> FakeUpstreamConfig:
+    return FakeUpstreamConfig(latency=LatencyModel.parse("fixed:0.05"), tokens_per_second=200.0, seed=1)
+
+
+async def _stream_chunks(base_url: str) -> list:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        async with client.stream("POST", "/openai/v1/chat/completions", json=CHAT_BODY,
+                                 headers={"Authorization": "Bearer secret"}) as response:
+            return [chunk async for chunk in response.aiter_bytes()]
+
+
+class TestRequestKey:
+    """Test request matching"""
+
+    def test_json_key_order_ignored(self):
+        """Test equivalent JSON bodies share a key"""
+        assert request_key("post", "http://a/x", b'{"a":1,"b":2}') == request_key("POST", "http://a/x", b'{"b": 2, "a": 1}')
+
+    def test_host_optional(self):
+        """Test host can be excluded from matching"""
+        assert request_key("GET", "http://a:1/x?q=1", b"") != request_key("GET", "http://b:2/x?q=1", b"")
+        assert request_key("GET", "http://a:1/x?q=1", b"", match_host=False) == \
+            request_key("GET", "http://b:2/x?q=1", b"", match_host=False)
+
+
+class TestHttpxCassette:
+    """Test httpx interception"""
+
+    @pytest.mark.asyncio
+    async def test_record_and_replay_stream(self, tmp_path):
+        """Test streamed chunks and timing survive a round trip"""
+        path = tmp_path / "traffic.jsonl.gz"
+        async with running_fake_upstream(_fake_config()) as url:
+            with Cassette(path, mode="record") as cassette:
+                recorded = await _stream_chunks(url)
+            assert cassette.stats["recorded"] == 1
+
+        assert b"".join(recorded).count(b"data:") > 2
+        assert b"secret" not in path.read_bytes()
+
+        with Cassette(path, mode="replay", speed=0) as cassette:
+            replayed = await _stream_chunks(url)
+            interaction = next(iter(cassette.interactions.values()))[0]
+
+        assert b"".join(replayed) == b"".join(recorded)
+        assert cassette.stats["hits"] == 1
+        assert interaction.ttfb >= 0.05
+        assert not any(name.lower() == "authorization" for name, _ in interaction.headers)
+
+    @pytest.mark.asyncio
+    async def test_replay_speed(self, tmp_path):
+        """Test recorded timing is reproduced and can be accelerated"""
+        path = tmp_path / "traffic.jsonl"
+        async with running_fake_upstream(_fake_config()) as url:
+            with Cassette(path, mode="record"):
+                await _stream_chunks(url)
+
+        cassette = Cassette(path, mode="replay", speed=1.0)
+        duration = next(iter(cassette.interactions.values()))[0].duration
+        with cassette:
+            start = time.perf_counter()
+            await _stream_chunks(url)
+            realtime = time.perf_counter() - start
+        with Cassette(path, mode="replay", speed=0):
+            start = time.perf_counter()
+            await _stream_chunks(url)
+            instant = time.perf_counter() - start
+
+        assert realtime >= duration * 0.9
+        assert instant < realtime
+
+    @pytest.mark.asyncio
+    async def test_replay_miss(self, tmp_path):
+        """Test unrecorded request fails instead of reaching the network"""
+        path = tmp_path / "empty.jsonl"
+        Cassette(path, mode="record").save()
+
+        with Cassette(path, mode="replay") as cassette:
+            async with httpx.AsyncClient() as client:
+                with pytest.raises(CassetteMissError):
+                    await client.get("http://127.0.0.1:9/never")
+
+        assert cassette.stats["misses"] == 1
+
+    def test_invalid_mode(self, tmp_path):
+        """Test unknown mode is rejected"""
+        with pytest.raises(ValueError):
+            Cassette(tmp_path / "x.jsonl", mode="live")
+
+
+class TestAiohttpCassette:
+    """Test aiohttp interception"""
+
+    @pytest.mark.asyncio
+    async def test_record_and_replay(self, tmp_path):
+        """Test aiohttp responses replay without the server"""
+        path = tmp_path / "aiohttp.jsonl.gz"
+        async with running_fake_upstream(_fake_config()) as url:
+            with Cassette(path, mode="record"):
+                async with aiohttp.ClientSession(headers={"Authorization": "Bearer key"}) as session:
+                    async with session.get(f"{url}/openai/v1/models") as response:
+                        recorded = await response.json()
+
+        with Cassette(path, mode="replay", speed=0) as cassette:
+            async with aiohttp.ClientSession(headers={"Authorization": "Bearer key"}) as session:
+                async with session.get(f"{url}/openai/v1/models") as response:
+                    response.raise_for_status()
+                    replayed = await response.json()
+
+        assert replayed == recorded
+        assert cassette.stats["hits"] == 1
+
+
+class TestParseLogLine:
+    """Test prompt log formats"""
+
+    def test_formats(self):
+        """Test messages, backlog and plain prompt lines"""
+        messages = parse_log_line('{"messages": [{"role": "user", "content": "hej"}], "provider": "openai"}')
+        backlog = parse_log_line('{"request_id": "r1", "title": "Tytuł", "body": "Treść"}')
+        plain = parse_log_line('{"prompt": "hej", "timestamp": "2025-01-01T10:00:00Z"}')
+
+        assert messages["request"]["provider"] == "openai"
+        assert backlog["request"]["messages"][0]["content"] == "Tytuł\n\nTreść"
+        assert plain["timestamp"] == 1735725600.0
+        assert parse_log_line('{"other": 1}') is None
+        assert parse_log_line("   ") is None
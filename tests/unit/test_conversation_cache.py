@@ -0,0 +1,148 @@
+"""
+Unit tests for session-mode chat and the conversation context cache.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.api.v2.endpoints.chat import ChatRequest, chat_completion
+from backend.core.llm_providers.result import ChatResult
+from backend.services.conversation_cache import LRUConversationCache, RedisConversationCache
+from backend.services.conversation_memory import ConversationMemory
+from backend.services.conversation_service import ConversationService
+
+
+@pytest.fixture
+def memory(db_session):
+    """Memory with its own LRU cache on the test database."""
+    factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    memory = ConversationMemory(session_factory=factory, cache=LRUConversationCache(10), enabled=False)
+    with patch("backend.api.v2.endpoints.chat.conversation_memory", memory):
+        yield memory
+
+
+@pytest.fixture
+def llm():
+    """Chat provider factory returning a fixed answer."""
+    with patch("backend.api.v2.endpoints.chat.llm_factory") as factory:
+        factory.chat_with_fallback = AsyncMock(return_value=ChatResult(
+            text="Odpowiedź", model="gpt-4o-mini", provider="openai", input_tokens=10, output_tokens=5
+        ))
+        yield factory
+
+
+class TestLRUConversationCache:
+    """Test the in-process cache."""
+
+    @pytest.mark.asyncio
+    async def test_append_evict_invalidate(self):
+        """Test appends reach cached entries only and the oldest entry is evicted"""
+        cache = LRUConversationCache(max_conversations=2)
+        await cache.set(1, [{"role": "user", "content": "a"}])
+        await cache.set(2, [])
+        await cache.append(1, [{"role": "assistant", "content": "b"}])
+        await cache.append(3, [{"role": "user", "content": "miss"}])
+
+        assert await cache.get(1) == [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}]
+        assert await cache.get(3) is None
+
+        await cache.set(3, [])  # 2 is least recently used
+        assert await cache.get(2) is None
+        await cache.invalidate(1)
+        assert await cache.get(1) is None
+
+
+class TestRedisConversationCache:
+    """Test Redis failures degrade to misses."""
+
+    @pytest.mark.asyncio
+    async def test_errors_are_misses(self):
+        """Test an unreachable Redis does not fail the request"""
+        client = MagicMock()
+        client.lrange = AsyncMock(side_effect=ConnectionError("redis down"))
+        client.delete = AsyncMock(side_effect=ConnectionError("redis down"))
+        cache = RedisConversationCache(client=client, ttl_seconds=60)
+
+        assert await cache.get(1) is None
+        await cache.invalidate(1)
+
+    @pytest.mark.asyncio
+    async def test_get_decodes_list(self):
+        """Test cached messages are stored as a JSON list per conversation"""
+        client = MagicMock()
+        client.lrange = AsyncMock(return_value=['{"role": "user", "content": "Cześć"}'])
+        cache = RedisConversationCache(client=client, ttl_seconds=60)
+
+        assert await cache.get(7) == [{"role": "user", "content": "Cześć"}]
+        client.lrange.assert_awaited_once_with("ageny:conversation:7:context", 0, -1)
+
+
+class TestSessionModeChat:
+    """Test clients can send only the new message."""
+
+    @pytest.mark.asyncio
+    async def test_session_turns_use_server_history(self, db_session, memory, llm):
+        """Test the second turn sends stored history and both turns are persisted"""
+        first = await chat_completion(ChatRequest(message="Mam na imię Ola", enable_web_search=False))
+        assert first.conversation_id is not None
+
+        second = await chat_completion(ChatRequest(
+            conversation_id=first.conversation_id, message="Jak mam na imię?", enable_web_search=False
+        ))
+        assert second.conversation_id == first.conversation_id
+
+        sent = llm.chat_with_fallback.call_args.kwargs["messages"]
+        assert [m["content"] for m in sent] == ["Mam na imię Ola", "Odpowiedź", "Jak mam na imię?"]
+
+        await memory.wait()
+        stored = await ConversationService(db_session, cache=memory.cache).get_messages(first.conversation_id)
+        assert [m.role for m in stored] == ["user", "assistant", "user", "assistant"]
+        assert stored[1].model_used == "gpt-4o-mini"
+        assert stored[1].tokens_used == 15
+
+    @pytest.mark.asyncio
+    async def test_cache_miss_loads_from_database(self, db_session, memory, llm):
+        """Test history survives a cold cache (e.g. another worker or a restart)"""
+        first = await chat_completion(ChatRequest(message="Lubię pierogi", enable_web_search=False))
+        await memory.wait()
+        await memory.cache.invalidate(first.conversation_id)
+
+        await chat_completion(ChatRequest(
+            conversation_id=first.conversation_id, message="Co lubię?", enable_web_search=False
+        ))
+
+        sent = llm.chat_with_fallback.call_args.kwargs["messages"]
+        assert [m["content"] for m in sent] == ["Lubię pierogi", "Odpowiedź", "Co lubię?"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_conversation(self, memory, llm):
+        """Test continuing a missing conversation is a 404"""
+        with pytest.raises(HTTPException) as exc:
+            await chat_completion(ChatRequest(conversation_id=999, message="Halo"))
+        assert exc.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_session_requires_message(self, memory, llm):
+        """Test a conversation id without a message is rejected"""
+        with pytest.raises(HTTPException) as exc:
+            await chat_completion(ChatRequest(conversation_id=1))
+        assert exc.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_failed_write_invalidates_cache(self, db_session, memory, llm):
+        """Test the cache never keeps a turn the database rejected"""
+        first = await chat_completion(ChatRequest(message="Pierwsza", enable_web_search=False))
+        await memory.wait()
+
+        with patch.object(ConversationService, "add_message", AsyncMock(side_effect=Exception("db down"))):
+            await chat_completion(ChatRequest(
+                conversation_id=first.conversation_id, message="Druga", enable_web_search=False
+            ))
+            await memory.wait()
+
+        assert await memory.cache.get(first.conversation_id) is None
+        history = await memory.history(first.conversation_id)
+        assert [m["content"] for m in history] == ["Pierwsza", "Odpowiedź"]
@@ -0,0 +1,192 @@
+"""
+Unit tests for rolling conversation summaries.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.core.llm_providers.result import ChatResult
+from backend.models.conversation import Conversation
+from backend.schemas.conversation import ConversationCreate
+from backend.schemas.message import MessageCreate
+from backend.services.conversation_cache import LRUConversationCache
+from backend.services.conversation_memory import SUMMARY_HEADING, ConversationMemory
+from backend.services.conversation_service import ConversationService
+
+
+async def _conversation(service, turns):
+    """Conversation with ``turns`` user/assistant pairs of ~100 tokens each message."""
+    conversation = await service.create_conversation(
+        ConversationCreate(session_id=f"memory-{turns}", agent_type="general_conversation")
+    )
+    for i in range(turns):
+        for role in ("user", "assistant"):
+            await service.add_message(conversation.id, MessageCreate(
+                conversation_id=conversation.id, role=role, content=f"{role} {i} " + "słowo " * 60
+            ))
+    # Services only flush; commit like the request boundary would
+    await service.db_session.commit()
+    return conversation
+
+
+@pytest.fixture
+def memory(db_session):
+    """Memory with small thresholds sharing the test database."""
+    factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    return ConversationMemory(
+        session_factory=factory, threshold_tokens=500, recent_tokens=300, enabled=True, cache=LRUConversationCache()
+    )
+
+
+@pytest.fixture
+def summarizer():
+    """Cheap-model call returning a fixed summary."""
+    with patch("backend.services.conversation_memory.llm_factory") as factory:
+        factory.chat_with_fallback = AsyncMock(
+            return_value=ChatResult(text="Użytkownik planuje dietę.", model="gpt-4o-mini", provider="openai")
+        )
+        yield factory.chat_with_fallback
+
+
+class TestConversationMemory:
+    """Test summaries are built off the request path and invalidated on edits."""
+
+    @pytest.mark.asyncio
+    async def test_short_history_is_sent_verbatim(self, db_session, memory, summarizer):
+        """Test no summary is scheduled below the threshold"""
+        service = ConversationService(db_session, cache=memory.cache)
+        conversation = await _conversation(service, 1)
+
+        history = await memory.build_context(service, conversation)
+
+        assert [m["role"] for m in history] == ["user", "assistant"]
+        await memory.wait()
+        summarizer.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_long_history_is_summarized_in_background(self, db_session, memory, summarizer):
+        """Test older turns are folded into the summary and later turns send summary plus recent"""
+        service = ConversationService(db_session, cache=memory.cache)
+        conversation = await _conversation(service, 5)
+
+        first = await memory.build_context(service, conversation)
+        assert len(first) == 10  # this request is not delayed by the summary
+        await memory.wait()
+
+        summarizer.assert_awaited_once()
+        assert summarizer.call_args.kwargs["model"] == memory.model
+        await db_session.refresh(conversation)
+        assert conversation.summary == "Użytkownik planuje dietę."
+
+        history = await memory.build_context(service, conversation)
+        assert history[0] == {"role": "system", "content": f"{SUMMARY_HEADING}\nUżytkownik planuje dietę."}
+        assert 1 < len(history) < 10
+        assert history[-1]["content"].startswith("assistant 4")
+
+    @pytest.mark.asyncio
+    async def test_summary_is_scheduled_once(self, db_session, memory, summarizer):
+        """Test concurrent turns do not start a second summary for the same conversation"""
+        service = ConversationService(db_session, cache=memory.cache)
+        conversation = await _conversation(service, 5)
+
+        assert memory.schedule(conversation.id) is True
+        assert memory.schedule(conversation.id) is False
+        await memory.wait()
+        summarizer.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_editing_summarized_message_drops_summary(self, db_session, memory, summarizer):
+        """Test an edit inside the summarized range clears the summary"""
+        service = ConversationService(db_session, cache=memory.cache)
+        conversation = await _conversation(service, 5)
+        assert await memory.summarize(conversation.id) is True
+        await db_session.refresh(conversation)
+        covered = conversation.summary_message_id
+
+        await service.update_message(covered, "Poprawiona treść")
+        await db_session.refresh(conversation)
+
+        assert conversation.summary is None
+        assert conversation.summary_message_id is None
+        history = await memory.build_context(service, conversation)
+        assert len(history) == 10
+
+    @pytest.mark.asyncio
+    async def test_editing_recent_message_keeps_summary(self, db_session, memory, summarizer):
+        """Test an edit after the summarized range keeps the summary"""
+        service = ConversationService(db_session, cache=memory.cache)
+        conversation = await _conversation(service, 5)
+        await memory.summarize(conversation.id)
+        messages = await service.get_messages(conversation.id)
+
+        assert await service.delete_message(messages[-1].id) is True
+        await db_session.refresh(conversation)
+
+        assert conversation.summary == "Użytkownik planuje dietę."
+        assert conversation.history_version == 1
+
+    @pytest.mark.asyncio
+    async def test_edit_during_summary_discards_it(self, db_session, memory, summarizer):
+        """Test a summary started before an edit is not stored"""
+        service = ConversationService(db_session, cache=memory.cache)
+        conversation = await _conversation(service, 5)
+        first_id = (await service.get_messages(conversation.id))[0].id
+
+        async def edit_while_summarizing(**kwargs):
+            await service.update_message(first_id, "Zmieniona treść")
+            return ChatResult(text="Nieaktualne streszczenie", model="gpt-4o-mini", provider="openai")
+
+        summarizer.side_effect = edit_while_summarizing
+        assert await memory.summarize(conversation.id) is False
+
+        stored = await db_session.get(Conversation, conversation.id)
+        await db_session.refresh(stored)
+        assert stored.summary is None
+
+    @pytest.mark.asyncio
+    async def test_summary_failure_is_contained(self, db_session, memory, summarizer):
+        """Test a failing cheap-model call leaves the conversation untouched"""
+        service = ConversationService(db_session, cache=memory.cache)
+        conversation = await _conversation(service, 5)
+        summarizer.side_effect = Exception("provider down")
+
+        memory.schedule(conversation.id)
+        await memory.wait()
+        await db_session.refresh(conversation)
+
+        assert conversation.summary is None
+        assert not memory._tasks
+
+    @pytest.mark.asyncio
+    async def test_llm_call_holds_no_session(self, db_session, memory, summarizer):
+        """Test the summary is read and stored in separate units of work around the LLM call"""
+        service = ConversationService(db_session, cache=memory.cache)
+        conversation = await _conversation(service, 5)
+        factory, open_sessions = memory.session_factory, []
+
+        def counting_factory():
+            session = factory()
+            open_sessions.append(session)
+            close = session.close
+
+            async def closed():
+                open_sessions.remove(session)
+                await close()
+
+            session.close = closed
+            return session
+
+        sessions_during_call = []
+
+        async def record(**kwargs):
+            sessions_during_call.append(len(open_sessions))
+            return ChatResult(text="Użytkownik planuje dietę.", model="gpt-4o-mini", provider="openai")
+
+        memory._session_factory = counting_factory
+        summarizer.side_effect = record
+
+        assert await memory.summarize(conversation.id) is True
+        assert sessions_during_call == [0]
+        assert open_sessions == []
@@ -0,0 +1,103 @@
+"""
+Unit tests for cooking services.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from backend.models import Product
+from backend.services import cooking_service
+from backend.services.cooking_service import CookingProductService, CookingShoppingListService
+
+
+@contextmanager
+def _count_queries(db_session):
+    """Count SQL statements executed on the session's engine."""
+    statements = []
+    engine = db_session.bind.sync_engine
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+
+
+async def _add_products(db_session, prices):
+    db_session.add_all(
+        Product(name=name, category="spożywcze", unit="szt", price_per_unit=price, user_id=1)
+        for name, price in prices.items()
+    )
+    await db_session.commit()
+
+
+class TestPriceLookup:
+    """Test batched price lookups for shopping list costs."""
+
+    @pytest.mark.asyncio
+    async def test_get_prices_by_name(self, db_session):
+        """Test known priced products are returned, others left out"""
+        await _add_products(db_session, {"mleko": 3.5, "chleb": 5.0, "sól": None})
+        db_session.add(Product(name="ser", category="nabiał", unit="szt", price_per_unit=20.0, user_id=2))
+        await db_session.commit()
+
+        prices = await CookingProductService(db_session).get_prices_by_name(
+            ["mleko", "chleb", "mleko", "sól", "ser", "kawa"], user_id=1
+        )
+
+        assert prices == {"mleko": 3.5, "chleb": 5.0}
+
+    @pytest.mark.asyncio
+    async def test_calculate_list_cost_two_queries(self, db_session):
+        """Test a 60-item list costs an exact and a fuzzy query, then falls back to estimated prices"""
+        await _add_products(db_session, {f"produkt {i}": 1.0 + i for i in range(50)})
+        items = [{"product_name": f"produkt {i}", "quantity": 2} for i in range(50)]
+        items += [{"product_name": f"nowy {i}", "quantity": 1, "estimated_price": 4.0} for i in range(10)]
+        service = CookingShoppingListService(db_session)
+
+        with _count_queries(db_session) as statements:
+            total = await service._calculate_list_cost(items, user_id=1)
+
+        assert total == pytest.approx(sum((1.0 + i) * 2 for i in range(50)) + 40.0)
+        assert len(statements) == 2
+
+    @pytest.mark.asyncio
+    async def test_lookup_is_chunked(self, db_session, monkeypatch):
+        """Test long lists are split into several IN queries"""
+        monkeypatch.setattr(cooking_service, "PRICE_LOOKUP_CHUNK", 4)
+        await _add_products(db_session, {f"produkt {i}": 2.0 for i in range(10)})
+
+        with _count_queries(db_session) as statements:
+            prices = await CookingProductService(db_session).get_prices_by_name(
+                [f"produkt {i}" for i in range(10)], user_id=1
+            )
+
+        assert len(prices) == 10
+        assert len(statements) == 3
+
+    @pytest.mark.asyncio
+    async def test_fuzzy_prices(self, db_session):
+        """Test inflected, unaccented and misspelled names find the product's price"""
+        await _add_products(db_session, {"Pomidor malinowy": 12.0, "Żółty ser": 30.0, "Mleko 2%": 3.5})
+
+        prices = await CookingProductService(db_session).get_prices_by_name(
+            ["pomidory", "zolty ser", "mlekko", "kawa"], user_id=1
+        )
+        exact = await CookingProductService(db_session).get_prices_by_name(["pomidory"], user_id=1, fuzzy=False)
+
+        assert prices == {"pomidory": 12.0, "zolty ser": 30.0, "mlekko": 3.5}
+        assert exact == {}
+
+    @pytest.mark.asyncio
+    async def test_match_products(self, db_session):
+        """Test bulk resolution returns products and skips unknown names"""
+        await _add_products(db_session, {"Jajka": 1.0, "Masło": 8.0})
+
+        matches = await CookingProductService(db_session).match_products(["jajko", "maslo", "", "kawa"], user_id=1)
+
+        assert {name: product.name for name, product in matches.items()} == {"jajko": "Jajka", "maslo": "Masło"}
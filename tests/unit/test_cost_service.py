@@ -0,0 +1,90 @@
+"""
+Unit tests for cost tracking service.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from backend.schemas.cost import CostRecordCreate
+from backend.services.cost_service import CostService
+
+
+def _cost(
+    provider: str, service_type: str, cost: str, tokens: int = 100, day: date = None, requests: int = 1
+) -> CostRecordCreate:
+    return CostRecordCreate(
+        date=day or date.today(),
+        provider=provider,
+        service_type=service_type,
+        model_used="model",
+        tokens_used=tokens,
+        cost=cost,
+        request_count=requests,
+        metadata={"session_id": "s1"},
+    )
+
+
+class TestCostService:
+    """Test CostService against the CostRecord model"""
+
+    @pytest.mark.asyncio
+    async def test_record_cost_maps_fields(self, db_session):
+        """Test schema fields map onto CostRecord columns"""
+        service = CostService(db_session)
+
+        record = await service.record_cost(_cost("mistral", "ocr", "0.002"))
+
+        assert record.provider_name == "mistral"
+        assert record.provider_type == "ocr"
+        assert record.request_type == "ocr"
+        assert record.cost_usd == pytest.approx(0.002)
+        assert record.session_id == "s1"
+
+    @pytest.mark.asyncio
+    async def test_cost_summary_groups(self, db_session):
+        """Test summary totals and grouping by provider and service"""
+        service = CostService(db_session)
+        await service.record_cost(_cost("openai", "chat", "0.01", tokens=10))
+        await service.record_cost(_cost("openai", "embedding", "0.02", tokens=20))
+        await service.record_cost(_cost("mistral", "chat", "0.03", tokens=30))
+        await service.record_cost(_cost("mistral", "chat", "1.00", day=date.today() - timedelta(days=40)))
+
+        summary = await service.get_cost_summary(start_date=date.today() - timedelta(days=7))
+
+        assert summary["total_requests"] == 3
+        assert summary["total_tokens"] == 60
+        assert summary["total_cost"] == pytest.approx(0.06)
+        assert summary["providers"]["openai"]["requests"] == 2
+        assert summary["services"]["chat"]["cost"] == pytest.approx(0.04)
+
+    @pytest.mark.asyncio
+    async def test_daily_costs(self, db_session):
+        """Test daily breakdown groups by calendar day"""
+        service = CostService(db_session)
+        await service.record_cost(_cost("openai", "chat", "0.01"))
+        await service.record_cost(_cost("openai", "chat", "0.02"))
+        await service.record_cost(_cost("openai", "chat", "0.05", day=date.today() - timedelta(days=2)))
+
+        days = await service.get_daily_costs()
+
+        assert [d["date"] for d in days] == [
+            date.today().isoformat(), (date.today() - timedelta(days=2)).isoformat(),
+        ]
+        assert days[0]["total_requests"] == 2
+        assert days[0]["total_cost"] == pytest.approx(0.03)
+
+    @pytest.mark.asyncio
+    async def test_request_count_is_summed(self, db_session):
+        """Test a record covering many requests counts them all in both summaries"""
+        service = CostService(db_session)
+        await service.record_cost(_cost("openai", "embedding", "0.05", requests=25))
+        await service.record_cost(_cost("openai", "chat", "0.01"))
+
+        summary = await service.get_cost_summary()
+        days = await service.get_daily_costs()
+
+        assert summary["total_requests"] == 26
+        assert summary["providers"]["openai"]["requests"] == 26
+        assert summary["services"]["embedding"]["requests"] == 25
+        assert days[0]["total_requests"] == 26
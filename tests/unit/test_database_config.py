@@ -0,0 +1,46 @@
+"""
+Unit tests for database engine configuration.
+"""
+
+from unittest.mock import patch
+
+from backend.database import database
+
+
+class TestDatabaseConfig:
+    """Test URL normalization and per-backend engine options."""
+
+    def test_postgres_urls_use_asyncpg(self):
+        """Test plain postgres URLs get the async driver and the sync URL drops it"""
+        url = "postgresql://ageny:secret@db:5432/ageny_online"
+
+        assert database.get_async_database_url(url) == "postgresql+asyncpg://ageny:secret@db:5432/ageny_online"
+        assert database.get_sync_database_url(url) == url
+        assert database.get_sync_database_url("sqlite+aiosqlite:///./x.db") == "sqlite:///./x.db"
+
+    def test_postgres_pool_options(self):
+        """Test pool sizing and the asyncpg statement cache come from settings"""
+        with patch.object(database.settings, "DB_POOL_SIZE", 7), \
+                patch.object(database.settings, "DB_STATEMENT_CACHE_SIZE", 0):
+            options = database.engine_options("postgresql+asyncpg://db/ageny_online")
+
+        assert options["pool_size"] == 7
+        assert options["pool_pre_ping"] is True
+        assert options["connect_args"]["prepared_statement_cache_size"] == 0
+
+    def test_sqlite_keeps_driver_defaults(self):
+        """Test SQLite gets no pool sizing"""
+        options = database.engine_options("sqlite+aiosqlite:///./x.db")
+
+        assert "pool_size" not in options
+        assert "connect_args" not in options
+
+    def test_sync_engine_is_lazy(self):
+        """Test importing the package does not create the sync engine"""
+        database.get_sync_engine.cache_clear()
+        with patch.object(database, "create_engine") as create_engine:
+            import backend.database  # noqa: F401
+
+            create_engine.assert_not_called()
+            assert database.engine is create_engine.return_value
+        database.get_sync_engine.cache_clear()
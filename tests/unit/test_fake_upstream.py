@@ -0,0 +1,220 @@
+"""
+Unit tests for the fake upstream provider server.
+"""
+
+import json
+
+import httpx
+import pytest
+
+from backend.core.llm_providers.anthropic_client import AnthropicProvider
+from backend.core.llm_providers.cohere_client import CohereProvider
+from backend.core.llm_providers.mistral_client import MistralProvider
+from backend.core.ocr_providers.mistral_vision import MistralVisionOCR
+from backend.testing.fake_upstream import (
+    FakeUpstreamConfig,
+    LatencyModel,
+    base_url_settings,
+    create_app,
+)
+
+FAKE_ROOT = "http://fake-upstream"
+
+
+def _client(app, headers=None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=FAKE_ROOT, headers=headers)
+
+
+def _attach(provider, app, prefix: str):
+    """Route an httpx based provider to the in-process fake upstream."""
+    provider.http_client = _client(app, headers=provider.http_client.headers)
+    provider.base_url = f"{FAKE_ROOT}{prefix}"
+    return provider
+
+
+class TestLatencyModel:
+    """Test latency spec parsing and sampling"""
+
+    def test_parse_specs(self):
+        """Test all supported distributions parse"""
+        assert LatencyModel.parse("fixed:0.2").kind == "fixed"
+        assert LatencyModel.parse("uniform:0.1,0.5").params == (0.1, 0.5)
+        assert LatencyModel.parse("lognormal:0.3,0.5").kind == "lognormal"
+
+    def test_parse_invalid(self):
+        """Test malformed spec is rejected"""
+        with pytest.raises(ValueError):
+            LatencyModel.parse("gamma:1")
+        with pytest.raises(ValueError):
+            LatencyModel.parse("uniform:0.1")
+
+    def test_sample_non_negative(self):
+        """Test samples never go negative"""
+        import random
+
+        model = LatencyModel.parse("normal:0.0,1.0")
+        rng = random.Random(1)
+        assert all(model.sample(rng) >= 0 for _ in range(100))
+
+
+class TestFakeUpstreamEndpoints:
+    """Test provider wire formats"""
+
+    def test_base_url_settings(self):
+        """Test generated *_BASE_URL settings"""
+        urls = base_url_settings("http://127.0.0.1:9100/")
+        assert urls["OPENAI_BASE_URL"] == "http://127.0.0.1:9100/openai/v1"
+        assert urls["ANTHROPIC_BASE_URL"] == "http://127.0.0.1:9100/anthropic"
+        assert set(urls) == {
+            "OPENAI_BASE_URL", "ANTHROPIC_BASE_URL", "MISTRAL_BASE_URL",
+            "COHERE_BASE_URL", "PERPLEXITY_BASE_URL",
+        }
+
+    @pytest.mark.asyncio
+    async def test_openai_chat_is_deterministic(self):
+        """Test identical requests produce identical responses"""
+        app = create_app(FakeUpstreamConfig(seed=7))
+        payload = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "Przepis na zupę"}]}
+        async with _client(app, headers={"Authorization": "Bearer k"}) as client:
+            first = (await client.post("/openai/v1/chat/completions", json=payload)).json()
+            second = (await client.post("/openai/v1/chat/completions", json=payload)).json()
+
+        assert first["choices"][0]["message"]["content"] == second["choices"][0]["message"]["content"]
+        assert first["usage"]["total_tokens"] == first["usage"]["prompt_tokens"] + first["usage"]["completion_tokens"]
+
+    @pytest.mark.asyncio
+    async def test_openai_streaming(self):
+        """Test SSE chunks reassemble into the non-streamed text"""
+        app = create_app()
+        payload = {
+            "model": "gpt-4o-mini",
+            "messages": [{"role": "user", "content": "Hej"}],
+            "stream_options": {"include_usage": True},
+        }
+        async with _client(app, headers={"Authorization": "Bearer k"}) as client:
+            full = (await client.post("/openai/v1/chat/completions", json=payload)).json()
+            streamed = await client.post("/openai/v1/chat/completions", json={**payload, "stream": True})
+
+        events = [line[len("data: "):] for line in streamed.text.splitlines() if line.startswith("data: ")]
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(e) for e in events[:-1]]
+        text = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks)
+        assert text == full["choices"][0]["message"]["content"]
+        assert chunks[-1]["usage"]["completion_tokens"] == full["usage"]["completion_tokens"]
+
+    @pytest.mark.asyncio
+    async def test_anthropic_streaming_events(self):
+        """Test Anthropic event sequence"""
+        app = create_app()
+        payload = {"model": "claude-3-haiku-20240307", "max_tokens": 20, "stream": True,
+                   "messages": [{"role": "user", "content": "Hej"}]}
+        async with _client(app, headers={"x-api-key": "k"}) as client:
+            response = await client.post("/anthropic/v1/messages", json=payload)
+
+        events = [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event: ")]
+        assert events[0] == "message_start"
+        assert "content_block_delta" in events
+        assert events[-1] == "message_stop"
+
+    @pytest.mark.asyncio
+    async def test_missing_auth_rejected(self):
+        """Test requests without API key get 401"""
+        app = create_app()
+        async with _client(app) as client:
+            response = await client.post("/mistral/v1/chat/completions", json={"messages": []})
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_injection(self):
+        """Test 429 injection with Retry-After header"""
+        app = create_app(FakeUpstreamConfig(rate_limit_rate=1.0, retry_after=2.0))
+        async with _client(app, headers={"Authorization": "Bearer k"}) as client:
+            response = await client.post("/perplexity/chat/completions", json={"messages": []})
+            stats = (await client.get("/_fake/stats")).json()
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2.0"
+        assert stats["perplexity.429"] == 1
+
+    @pytest.mark.asyncio
+    async def test_runtime_config_update(self):
+        """Test control endpoint updates behaviour"""
+        app = create_app()
+        async with _client(app) as client:
+            updated = (await client.put("/_fake/config", json={"error_rate": 1.0})).json()
+            bad = await client.put("/_fake/config", json={"nope": 1})
+        assert updated["error_rate"] == 1.0
+        assert bad.status_code == 400
+
+
+class TestProvidersAgainstFakeUpstream:
+    """Test real provider clients parse fake upstream responses"""
+
+    @pytest.mark.asyncio
+    async def test_mistral_chat(self):
+        """Test MistralProvider chat"""
+        provider = _attach(MistralProvider(api_key="k"), create_app(), "/mistral/v1")
+        result = await provider.chat([{"role": "user", "content": "Co na obiad?"}], max_tokens=16)
+        assert result.text
+        assert result.output_tokens > 0 and result.cost > 0
+
+    @pytest.mark.asyncio
+    async def test_anthropic_chat(self):
+        """Test AnthropicProvider chat"""
+        provider = _attach(AnthropicProvider(api_key="k"), create_app(), "/anthropic")
+        result = await provider.chat([{"role": "user", "content": "Co na obiad?"}], max_tokens=16)
+        assert result.text
+        assert result.output_tokens > 0 and result.cost > 0
+
+    @pytest.mark.asyncio
+    async def test_cohere_chat(self):
+        """Test CohereProvider chat"""
+        provider = _attach(CohereProvider(api_key="k"), create_app(), "/cohere")
+        result = await provider.chat([{"role": "user", "content": "Co na obiad?"}], max_tokens=16)
+        assert result.text
+        assert result.output_tokens > 0 and result.cost > 0
+
+    @pytest.mark.asyncio
+    async def test_mistral_vision_ocr(self):
+        """Test MistralVisionOCR against the vision endpoint"""
+        ocr = _attach(MistralVisionOCR(api_key="k"), create_app(), "/mistral/v1")
+        result = await ocr.extract_text(b"\xff\xd8fake-jpeg")
+        assert len(result["text"].splitlines()) == 5
+        assert result["tokens_used"] > 0
+
+    @pytest.mark.asyncio
+    async def test_provider_error_surfaces(self):
+        """Test injected 500 surfaces as provider failure"""
+        app = create_app(FakeUpstreamConfig(error_rate=1.0))
+        provider = _attach(MistralProvider(api_key="k"), app, "/mistral/v1")
+        with pytest.raises(Exception, match="Mistral chat failed"):
+            await provider.chat([{"role": "user", "content": "Hej"}])
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("provider_class,prefix", [
+        (MistralProvider, "/mistral/v1"),
+        (AnthropicProvider, "/anthropic"),
+        (CohereProvider, "/cohere"),
+    ])
+    async def test_stream_chat_matches_chat(self, provider_class, prefix):
+        """Test streamed deltas reassemble into the chat text and report usage"""
+        provider = _attach(provider_class(api_key="k"), create_app(), prefix)
+        messages = [{"role": "user", "content": "Co na obiad?"}]
+        usage = {}
+
+        result = await provider.chat(messages, max_tokens=16)
+        deltas = [delta async for delta in provider.stream_chat(messages, max_tokens=16, usage=usage)]
+
+        assert len(deltas) > 1
+        assert "".join(deltas) == result.text
+        assert usage["output_tokens"] > 0
+        assert usage["cost"] > 0
+
+    @pytest.mark.asyncio
+    async def test_stream_chat_error_surfaces(self):
+        """Test rejected streaming request raises with the upstream status"""
+        app = create_app(FakeUpstreamConfig(error_rate=1.0))
+        provider = _attach(AnthropicProvider(api_key="k"), app, "/anthropic")
+        with pytest.raises(Exception, match="Anthropic API error: 500"):
+            async for _ in provider.stream_chat([{"role": "user", "content": "Hej"}]):
+                pass
@@ -94,6 +94,63 @@ class TestProviderFactory:
         with pytest.raises(ValueError):
             provider_factory.create_provider("invalid_provider")
 
+class _StreamStub:
+    """Provider stub for streaming fallback tests."""
+
+    def __init__(self, deltas, fail_after=None):
+        self.deltas = deltas
+        self.fail_after = fail_after
+
+    async def stream_chat(self, messages, usage=None, **kwargs):
+        for delta in self.deltas[:self.fail_after]:
+            yield delta
+        if self.fail_after is not None:
+            raise Exception("stream broke")
+        if usage is not None:
+            usage.update({"input_tokens": 3, "output_tokens": len(self.deltas), "cost": 0.01})
+
+
+class TestStreamWithFallback:
+    """Test streaming fallback across providers."""
+
+    @pytest.mark.asyncio
+    async def test_falls_back_before_first_delta(self):
+        """Test a provider failing before any text is skipped"""
+        stubs = {
+            ProviderType.OPENAI: _StreamStub([], fail_after=0),
+            ProviderType.MISTRAL: _StreamStub(["Ala ", "ma ", "kota"]),
+        }
+        usage = {}
+        with patch.object(provider_factory, "get_configured_providers", return_value=list(stubs)), \
+             patch.object(provider_factory, "get_provider_priority", side_effect=[1, 2]), \
+             patch.object(provider_factory, "create_provider", side_effect=stubs.get):
+            deltas = [d async for d in provider_factory.stream_with_fallback(
+                [{"role": "user", "content": "hi"}], model="gpt-4", usage=usage
+            )]
+
+        assert "".join(deltas) == "Ala ma kota"
+        assert usage["provider"] == "mistral"
+        assert usage["model"] == "mistral-large-latest"
+        assert usage["output_tokens"] == 3
+
+    @pytest.mark.asyncio
+    async def test_no_fallback_after_text_was_sent(self):
+        """Test a failure mid-stream is raised instead of restarting elsewhere"""
+        stubs = {
+            ProviderType.OPENAI: _StreamStub(["Ala "], fail_after=1),
+            ProviderType.MISTRAL: _StreamStub(["inna odpowiedź"]),
+        }
+        deltas = []
+        with patch.object(provider_factory, "get_configured_providers", return_value=list(stubs)), \
+             patch.object(provider_factory, "get_provider_priority", side_effect=[1, 2]), \
+             patch.object(provider_factory, "create_provider", side_effect=stubs.get):
+            with pytest.raises(Exception, match="stream broke"):
+                async for delta in provider_factory.stream_with_fallback([{"role": "user", "content": "hi"}]):
+                    deltas.append(delta)
+
+        assert deltas == ["Ala "]
+
+
 class TestOpenAIProvider:
     """Test OpenAI provider functionality."""
     
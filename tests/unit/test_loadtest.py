@@ -0,0 +1,100 @@
+"""
+Unit tests for the load-test harness.
+"""
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from backend.testing.loadtest import Recorder, compare_reports, run_stage
+from backend.testing.stats import percentile, summarize_latencies
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ok")
+    async def ok():
+        return {"status": "ok"}
+
+    @app.get("/fail")
+    async def fail():
+        raise HTTPException(status_code=503, detail="down")
+
+    return app
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test")
+
+
+class TestStats:
+    """Test latency statistics"""
+
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentile"""
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 50) == 0.0
+
+    def test_summarize_scales_to_milliseconds(self):
+        """Test summary is reported in milliseconds"""
+        summary = summarize_latencies([0.1, 0.2, 0.3])
+        assert summary["p50"] == 200.0
+        assert summary["max"] == 300.0
+
+
+class TestRunStage:
+    """Test stage execution"""
+
+    @pytest.mark.asyncio
+    async def test_counts_requests_and_errors(self):
+        """Test per-route aggregation and error rate"""
+
+        async def scenario(recorder: Recorder, iteration: int) -> None:
+            await recorder.request("GET /ok", "GET", "/ok")
+            if iteration % 2:
+                await recorder.request("GET /fail", "GET", "/fail")
+
+        async with _client() as client:
+            stage = await run_stage(client, scenario, concurrency=4, iterations=10)
+
+        routes = {r["route"]: r for r in stage["routes"]}
+        assert stage["requests"] == 15
+        assert routes["GET /ok"]["error_rate"] == 0.0
+        assert routes["GET /fail"]["errors"] == 5
+        assert routes["GET /fail"]["status_codes"] == {"503": 5}
+        assert stage["throughput_rps"] > 0
+
+    @pytest.mark.asyncio
+    async def test_check_predicate_marks_failure(self):
+        """Test response predicate turns a 200 into an error"""
+
+        async def scenario(recorder: Recorder, iteration: int) -> None:
+            await recorder.request("GET /ok", "GET", "/ok", check=lambda r: r.json()["status"] == "nope")
+
+        async with _client() as client:
+            stage = await run_stage(client, scenario, concurrency=1, iterations=3)
+
+        assert stage["error_rate"] == 1.0
+
+
+class TestCompareReports:
+    """Test report comparison"""
+
+    def test_compare_matching_stages(self):
+        """Test deltas are computed per scenario and concurrency"""
+        previous = {"results": [{"scenario": "chat", "concurrency": 4,
+                                 "latency_ms": {"p95": 100.0}, "throughput_rps": 10.0}]}
+        current = {"results": [
+            {"scenario": "chat", "concurrency": 4, "latency_ms": {"p95": 120.0}, "throughput_rps": 12.0},
+            {"scenario": "chat", "concurrency": 16, "latency_ms": {"p95": 300.0}, "throughput_rps": 20.0},
+        ]}
+
+        lines = compare_reports(current, previous)
+
+        assert len(lines) == 1
+        assert "p95 +20.0%" in lines[0]
+        assert "rps +20.0%" in lines[0]
@@ -0,0 +1,197 @@
+"""
+Unit tests for schema migrations and hot-query indexes.
+"""
+
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, delete, func, select
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.database import database
+from backend.exceptions.database import SchemaError
+from backend.models import (
+    Base, CostRecord, Message, OCRResult, Product, Recipe, RecipeNutrition, ShoppingList, recipe_ingredients
+)
+from backend.models.search import is_search_table
+
+SINCE = datetime(2026, 1, 1)
+
+# (description, statement, index the plan must use)
+HOT_QUERIES = [
+    ("product by name", select(Product).where(Product.name == "mleko", Product.user_id == 1), "uq_products_user_id_name"),
+    ("product listing", select(Product).where(Product.user_id == 1).order_by(Product.name), "uq_products_user_id_name"),
+    (
+        "product categories",
+        select(Product.category).where(Product.user_id == 1).distinct().order_by(Product.category),
+        "ix_products_user_id_category",
+    ),
+    ("recipe by name", select(Recipe).where(Recipe.name == "bigos", Recipe.user_id == 1), "uq_recipes_user_id_name"),
+    (
+        "recipes by ingredient",
+        select(recipe_ingredients.c.recipe_id).where(
+            recipe_ingredients.c.user_id == 1, recipe_ingredients.c.ingredient.in_(["pomidor", "ser"])
+        ),
+        "PRIMARY KEY",
+    ),
+    (
+        "nutrition by recipe",
+        select(RecipeNutrition).where(RecipeNutrition.recipe_id.in_([1, 2]), RecipeNutrition.table_version == "v"),
+        "uq_recipe_nutrition_recipe_id",
+    ),
+    (
+        "nutrition by user",
+        delete(RecipeNutrition).where(RecipeNutrition.user_id == 1),
+        "ix_recipe_nutrition_user_id",
+    ),
+    (
+        "shopping list by name",
+        select(ShoppingList).where(ShoppingList.name == "sobota", ShoppingList.user_id == 1),
+        "uq_shopping_lists_user_id_name",
+    ),
+    (
+        "shopping list listing",
+        select(ShoppingList).where(ShoppingList.user_id == 1).order_by(ShoppingList.created_at.desc()),
+        "ix_shopping_lists_user_id_created_at",
+    ),
+    (
+        "conversation history",
+        select(Message).where(Message.conversation_id == 1).order_by(Message.created_at),
+        "ix_messages_conversation_id_created_at",
+    ),
+    (
+        "OCR history",
+        select(OCRResult).where(OCRResult.user_id == 1).order_by(OCRResult.created_at.desc()),
+        "ix_ocr_results_user_id_created_at",
+    ),
+    (
+        "user daily costs",
+        select(
+            func.date(CostRecord.timestamp), func.sum(CostRecord.cost_usd),
+            func.sum(CostRecord.request_count), func.sum(CostRecord.tokens_used),
+        )
+        .where(CostRecord.user_id == 1, CostRecord.timestamp >= SINCE)
+        .group_by(func.date(CostRecord.timestamp)),
+        "COVERING INDEX ix_cost_records_user_id_timestamp",
+    ),
+    (
+        "all daily costs",
+        select(func.date(CostRecord.timestamp), func.sum(CostRecord.cost_usd), func.sum(CostRecord.request_count))
+        .where(CostRecord.timestamp >= SINCE)
+        .group_by(func.date(CostRecord.timestamp)),
+        "COVERING INDEX ix_cost_records_timestamp",
+    ),
+]
+
+
+@pytest.fixture
+def migrated(tmp_path):
+    """Async URL of a SQLite file upgraded to the latest migration."""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'migrated.db'}"
+    config = database.alembic_config()
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+    return url
+
+
+class TestMigrations:
+    """Test the migrations build the schema the models describe."""
+
+    def test_migrations_match_models(self, migrated):
+        """Test upgrading to head leaves no difference to the model metadata"""
+        engine = create_engine(migrated.replace("+aiosqlite", ""))
+        with engine.connect() as conn:
+            context = MigrationContext.configure(
+                conn, opts={"compare_type": True, "include_name": lambda name, type_, parents: not (
+                    type_ == "table" and is_search_table(name)
+                )}
+            )
+            diff = compare_metadata(context, Base.metadata)
+        engine.dispose()
+        assert diff == []
+
+    @pytest.mark.asyncio
+    async def test_verify_schema(self, tmp_path, migrated):
+        """Test startup verification fails on an unmigrated database and passes at head"""
+        empty = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'empty.db'}")
+        with patch.object(database, "async_engine", empty):
+            with pytest.raises(SchemaError) as exc:
+                await database.verify_schema()
+        assert exc.value.current is None
+        await empty.dispose()
+
+        engine = create_async_engine(migrated)
+        with patch.object(database, "async_engine", engine):
+            await database.verify_schema()
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_verify_does_not_create_schema(self, tmp_path):
+        """Test the default startup mode never creates tables"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'untouched.db'}")
+        with patch.object(database, "async_engine", engine), \
+                patch.object(database.settings, "DATABASE_SCHEMA_MODE", "verify"):
+            with pytest.raises(SchemaError):
+                await database.prepare_database()
+        async with engine.connect() as conn:
+            tables = await conn.run_sync(lambda c: c.exec_driver_sql("SELECT name FROM sqlite_master").fetchall())
+        await engine.dispose()
+        assert tables == []
+
+    @pytest.mark.asyncio
+    async def test_migrate_adopts_create_all_database(self, tmp_path):
+        """Test a database built by create_all is stamped and upgraded instead of failing"""
+        url = f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}"
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.exec_driver_sql("DROP INDEX uq_products_user_id_name")
+
+        with patch.object(database, "async_engine", engine):
+            await database.migrate()
+            await database.verify_schema()
+
+        async with engine.connect() as conn:
+            indexes = await conn.run_sync(lambda c: c.exec_driver_sql("PRAGMA index_list(products)").fetchall())
+        await engine.dispose()
+        assert "uq_products_user_id_name" in {row[1] for row in indexes}
+
+    def test_unique_names_refuse_duplicates(self, tmp_path):
+        """Test 0005 stops with a clear error instead of failing halfway on duplicate names"""
+        url = f"sqlite+aiosqlite:///{tmp_path / 'duplicates.db'}"
+        config = database.alembic_config()
+        config.set_main_option("sqlalchemy.url", url)
+        command.upgrade(config, "0004")
+        engine = create_engine(url.replace("+aiosqlite", ""))
+        with engine.begin() as conn:
+            for _ in range(2):
+                conn.exec_driver_sql(
+                    "INSERT INTO products (name, category, unit, user_id, created_at, updated_at) "
+                    "VALUES ('mleko', 'nabiał', 'l', 1, '2026-01-01', '2026-01-01')"
+                )
+        engine.dispose()
+
+        with pytest.raises(RuntimeError, match="duplicate"):
+            command.upgrade(config, "head")
+
+
+
+class TestHotQueryIndexes:
+    """Test every hot query is answered from an index (EXPLAIN QUERY PLAN)."""
+
+    @pytest.mark.parametrize("name,statement,index", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+    def test_query_uses_index(self, migrated, name, statement, index):
+        """Test the query plan searches the expected index"""
+        sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+        engine = create_engine(migrated.replace("+aiosqlite", ""))
+        with engine.connect() as conn:
+            plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+        engine.dispose()
+
+        assert any(index in step for step in plan), plan
+        assert not any(step.startswith("SCAN") and "INDEX" not in step for step in plan), plan
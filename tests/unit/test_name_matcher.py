@@ -0,0 +1,56 @@
+"""
+Unit tests for fuzzy product name matching.
+"""
+
+import pytest
+
+from backend.core.name_matcher import NameMatcher, name_key, trigrams
+
+
+@pytest.fixture
+def matcher():
+    """Matcher over a small pantry, values are product IDs."""
+    matcher = NameMatcher()
+    for index, name in enumerate(["Pomidor", "Pomidor malinowy", "Ser żółty", "Ser biały", "Mleko 3,2%", "Łosoś"]):
+        matcher.add(name, index)
+    return matcher
+
+
+class TestNameKey:
+    """Test normalization and trigrams."""
+
+    def test_name_key(self):
+        """Test case, diacritics and inflection collapse to one key"""
+        assert name_key("Pomidory") == name_key("pomidorów") == "pomidor"
+        assert name_key("ŁOSOŚ") == "losos"
+
+    def test_trigrams_padded_per_word(self):
+        """Test words are padded like pg_trgm"""
+        assert trigrams("ser") == {"  s", " se", "ser", "er "}
+
+
+class TestNameMatcher:
+    """Test match ranking and thresholds."""
+
+    @pytest.mark.parametrize("query,expected", [
+        ("pomidory", 0), ("POMIDORÓW", 0), ("pomidor malinowe", 1), ("malinowy pomidor", 1),
+        ("zolty ser", 2), ("ser biały", 3), ("mleko", 4), ("losos", 5), ("pomidr", 0),
+    ])
+    def test_match(self, matcher, query, expected):
+        """Test inflection, missing diacritics, word order and typos"""
+        assert matcher.match(query).value == expected
+
+    def test_exact_key_scores_one(self, matcher):
+        """Test equal keys match with similarity 1.0"""
+        match = matcher.match("pomidorami")
+        assert (match.name, match.similarity) == ("Pomidor", 1.0)
+
+    @pytest.mark.parametrize("query", ["kawa", "ser pleśniowy z orzechami", ""])
+    def test_no_match(self, matcher, query):
+        """Test unrelated names stay unmatched"""
+        assert matcher.match(query) is None
+
+    def test_match_many(self, matcher):
+        """Test bulk matching skips empty and unmatched names"""
+        matches = matcher.match_many(["losos", "kawa", "", "losos"])
+        assert {name: m.value for name, m in matches.items()} == {"losos": 5}
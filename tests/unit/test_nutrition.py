@@ -0,0 +1,162 @@
+"""
+Unit tests for the local nutrient table and stored recipe nutrition.
+"""
+
+import pytest
+from sqlalchemy import func, select
+
+from backend.core.nutrition import BUNDLED_TABLE, NUTRIENTS, Food, NutritionTable, load_foods, parse_amount, to_grams
+from backend.models import RecipeNutrition
+from backend.plugins.diet_plugin import RecipeNutritionBatchRequest, RecipeNutritionRequest, diet_plugin
+from backend.schemas.cooking import ProductCreate, ProductUpdate, RecipeCreate, RecipeUpdate
+from backend.services.cooking_service import CookingProductService, CookingRecipeService
+from backend.services.nutrition_service import NutritionService
+
+EGG = Food("jajko", (143.0, 12.6, 0.7, 9.5, 0.0, 0.4), piece_grams=50.0)
+MILK = Food("mleko", (61.0, 3.2, 4.8, 3.3, 0.0, 4.8), density=1.03)
+FLOUR = Food("mąka", (364.0, 10.3, 76.3, 1.0, 2.7, 0.3), density=0.53)
+
+
+def _recipe(name, ingredients, servings=2):
+    return RecipeCreate(
+        name=name, instructions="Wymieszaj.", servings=servings,
+        ingredients=[{"name": n, "amount": a, "unit": u} for n, a, u in ingredients],
+    )
+
+
+async def _stored(db_session):
+    return (await db_session.execute(select(func.count()).select_from(RecipeNutrition))).scalar()
+
+
+class TestAmounts:
+    """Test amount parsing and unit conversion."""
+
+    @pytest.mark.parametrize("value,expected", [
+        ("2", (2.0, "")), ("1,5", (1.5, "")), ("1/2", (0.5, "")), ("1 1/2", (1.5, "")),
+        ("2-3", (2.5, "")), ("pół", (0.5, "")), ("200 g", (200.0, "g")), (3, (3.0, "")),
+        (None, (1.0, "")), ("trochę", (None, "trochę")),
+    ])
+    def test_parse_amount(self, value, expected):
+        """Test numbers, fractions, ranges and words"""
+        assert parse_amount(value) == expected
+
+    @pytest.mark.parametrize("amount,unit,food,grams", [
+        ("0,5", "kg", FLOUR, 500.0), ("20", "dag", FLOUR, 200.0), ("1", "szklanka", MILK, 257.5),
+        ("2", "łyżki", FLOUR, 15.9), ("3", "szt.", EGG, 150.0), ("200 g", "", EGG, 200.0),
+    ])
+    def test_to_grams(self, amount, unit, food, grams):
+        """Test mass, volume (by density) and pieces (by piece weight)"""
+        assert to_grams(amount, unit, food) == pytest.approx(grams)
+
+    @pytest.mark.parametrize("amount,unit,food", [("1", "szt", MILK), ("1", "garść", FLOUR), ("dużo", "g", FLOUR)])
+    def test_unconvertible(self, amount, unit, food):
+        """Test unknown units, pieces without a weight and unreadable amounts"""
+        assert to_grams(amount, unit, food) is None
+
+
+class TestNutritionTable:
+    """Test name resolution and the vectorized totals."""
+
+    def test_compute_batch(self):
+        """Test totals of several recipes at once and the unresolved ingredients"""
+        table = NutritionTable([EGG, MILK, FLOUR])
+        totals, unresolved = table.compute([
+            [("Jajka", "2", "szt"), ("mleko", "100", "ml")],
+            [("mąki pszennej", "100", "g"), ("smoczy owoc", "1", "szt"), ("mleko", "1", "garść")],
+            [],
+        ])
+
+        assert totals.shape == (3, len(NUTRIENTS))
+        assert totals[0] == pytest.approx([2 * 71.5 + 61 * 1.03, 12.6 + 3.2 * 1.03, 0.7 + 4.8 * 1.03, 9.5 + 3.3 * 1.03, 0, 0.4 + 4.8 * 1.03])
+        assert totals[1] == pytest.approx(FLOUR.per_100g)
+        assert list(totals[2]) == [0.0] * len(NUTRIENTS)
+        assert unresolved == [[], ["smoczy owoc", "mleko"], []]
+
+    def test_bundled_table(self):
+        """Test the bundled table loads and resolves common inflected names"""
+        table = NutritionTable(load_foods(BUNDLED_TABLE))
+        assert len(table) > 50
+        for name, expected in [("pomidorów", "pomidor"), ("mąka pszenna", "mąka"), ("piersi z kurczaka", "pierś z kurczaka")]:
+            assert table.lookup(name).name == expected
+
+
+class TestNutritionService:
+    """Test stored results, invalidation and user products."""
+
+    @pytest.mark.asyncio
+    async def test_batch_and_storage(self, db_session):
+        """Test many recipes are computed in one pass, stored and reused"""
+        recipes = CookingRecipeService(db_session)
+        omelette = await recipes.save_recipe(_recipe("Omlet", [("jajka", "3", "szt"), ("mleko", "100", "ml")]), 1)
+        pancakes = await recipes.save_recipe(_recipe("Naleśniki", [("mąka", "200", "g"), ("mleko", "2", "szklanki")]), 1)
+        service = NutritionService(db_session)
+
+        results = await service.analyze_recipes([pancakes.id, 999, omelette.id, pancakes.id], 1)
+
+        assert list(results) == [pancakes.id, omelette.id]
+        assert results[omelette.id].totals["calories"] == pytest.approx(3 * 50 * 1.43 + 100 * 1.03 * 0.61)
+        assert await _stored(db_session) == 2
+        assert (await service.analyze_recipes([omelette.id], 2)) == {}
+
+        cached = await service.analyze_recipe(omelette.id, 1)
+        assert cached.totals == pytest.approx(results[omelette.id].totals)
+        assert await _stored(db_session) == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidated_by_recipe_changes(self, db_session):
+        """Test changing ingredients recomputes and deleting the recipe drops the row"""
+        recipes = CookingRecipeService(db_session)
+        recipe = await recipes.save_recipe(_recipe("Jajecznica", [("jajka", "2", "szt")]), 1)
+        service = NutritionService(db_session)
+        before = await service.analyze_recipe(recipe.id, 1)
+
+        await recipes.update_recipe(recipe.id, RecipeUpdate(servings=4), 1)
+        assert await _stored(db_session) == 1
+        await recipes.update_recipe(recipe.id, RecipeUpdate(ingredients=[{"name": "jajka", "amount": "4", "unit": "szt"}]), 1)
+        assert await _stored(db_session) == 0
+        after = await service.analyze_recipe(recipe.id, 1)
+        assert after.totals["calories"] == pytest.approx(2 * before.totals["calories"])
+
+        await recipes.delete_recipe(recipe.id, 1)
+        assert await _stored(db_session) == 0
+
+    @pytest.mark.asyncio
+    async def test_user_products_win(self, db_session):
+        """Test the user's product values replace the bundled ones and its changes invalidate"""
+        recipes = CookingRecipeService(db_session)
+        products = CookingProductService(db_session)
+        recipe = await recipes.save_recipe(_recipe("Kakao", [("Mleko roślinne", "1", "szklanka")]), 1)
+        service = NutritionService(db_session)
+        assert (await service.analyze_recipe(recipe.id, 1)).totals["calories"] == pytest.approx(250 * 1.03 * 0.61)
+
+        product = await products.add_product(
+            ProductCreate(name="Mleko roślinne", category="napoje", unit="l", calories_per_100g=40, proteins=1.0), 1
+        )
+        assert await _stored(db_session) == 0
+        result = await service.analyze_recipe(recipe.id, 1)
+        assert result.totals["calories"] == pytest.approx(250 * 1.03 * 0.40)  # density of bundled milk
+
+        await products.update_product(product.id, ProductUpdate(price_per_unit=7.5), 1)
+        assert await _stored(db_session) == 1
+        await products.update_product(product.id, ProductUpdate(calories_per_100g=30), 1)
+        assert await _stored(db_session) == 0
+
+    @pytest.mark.asyncio
+    async def test_plugin_responses(self, db_session):
+        """Test the diet plugin scores results per serving and reports skipped ingredients"""
+        recipes = CookingRecipeService(db_session)
+        recipe = await recipes.save_recipe(
+            _recipe("Placki", [("mąka", "200", "g"), ("jajka", "2", "szt"), ("sekretny sos", "1", "łyżka")], servings=4), 1
+        )
+
+        single = await diet_plugin._analyze_recipe_nutrition(RecipeNutritionRequest(recipe_id=recipe.id), db_session, 1)
+        batch = await diet_plugin._analyze_recipes_nutrition(
+            RecipeNutritionBatchRequest(recipe_ids=[recipe.id, 12345]), db_session, 1
+        )
+
+        assert [response.recipe_id for response in batch] == [recipe.id]
+        assert batch[0] == single
+        assert single.total_nutrition.calories == pytest.approx(2 * 364 + 100 * 1.43, abs=0.1)
+        assert single.per_serving_nutrition.calories == pytest.approx(single.total_nutrition.calories / 4, abs=0.1)
+        assert single.unresolved_ingredients == ["sekretny sos"]
+        assert "Nie uwzględniono: sekretny sos" in single.recommendations
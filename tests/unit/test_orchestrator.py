@@ -0,0 +1,191 @@
+"""
+Unit tests for the agent tool orchestrator.
+"""
+
+import asyncio
+import base64
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from backend.agents.base_agent import AgentContext, GeneralConversationAgent
+from backend.agents.orchestrator import Tool, ToolOrchestrator, ToolResult
+from backend.core.llm_providers.provider_factory import ProviderType
+from backend.core.llm_providers.result import ChatResult
+
+
+class StubTool(Tool):
+    """Tool returning fixed content after a delay."""
+
+    def __init__(self, name, content="", delay=0.0, error=None):
+        self.name = name
+        self.heading = f"{name}:"
+        self.content = content
+        self.delay = delay
+        self.error = error
+
+    async def run(self, query, images):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise Exception(self.error)
+        return ToolResult(self.name, content=self.content)
+
+
+@pytest.fixture
+def agent():
+    """General agent whose tools are stubs."""
+    return GeneralConversationAgent(orchestrator=ToolOrchestrator(tools={}))
+
+
+def orchestrator(*tools, deadline=1.0):
+    return ToolOrchestrator(tools={tool.name: tool for tool in tools}, deadline=deadline)
+
+
+class TestPlanning:
+    """Test which tools a query gets."""
+
+    def test_plain_query_needs_no_tools(self, agent):
+        """Test nothing is planned for small talk"""
+        orch = ToolOrchestrator()
+        assert orch.plan(agent, "Cześć, co słychać?") == []
+
+    def test_plan_uses_heuristics(self, agent):
+        """Test web search, RAG and OCR triggers"""
+        orch = ToolOrchestrator()
+
+        assert orch.plan(agent, "Jakie są najnowsze wiadomości dzisiaj?") == ["web_search"]
+        assert orch.plan(agent, "find the document about onboarding") == ["rag"]
+        assert orch.plan(agent, "Co jest na paragonie?", images=["aGVsbG8="]) == ["ocr"]
+        assert orch.plan(agent, "search the latest document", images=["aGVsbG8="]) == ["web_search", "rag", "ocr"]
+
+    def test_plan_skips_unavailable_tools(self, agent):
+        """Test only registered tools are planned"""
+        orch = orchestrator(StubTool("rag"))
+        assert orch.plan(agent, "search the latest document") == ["rag"]
+
+
+class TestRun:
+    """Test concurrent execution under a shared deadline."""
+
+    @pytest.mark.asyncio
+    async def test_latency_bounded_by_slowest_tool(self, agent):
+        """Test tools run concurrently rather than one after another"""
+        orch = orchestrator(StubTool("web_search", "news", delay=0.2), StubTool("rag", "docs", delay=0.2))
+
+        start = time.perf_counter()
+        results = await orch.run(agent, "search the latest document")
+        elapsed = time.perf_counter() - start
+
+        assert [r.name for r in results] == ["web_search", "rag"]
+        assert all(r.ok for r in results)
+        assert elapsed < 0.35
+
+    @pytest.mark.asyncio
+    async def test_deadline_keeps_partial_results(self, agent):
+        """Test a slow tool is cut off and the others still reach the prompt"""
+        orch = orchestrator(
+            StubTool("web_search", "news", delay=0.0),
+            StubTool("rag", "docs", delay=5.0),
+            deadline=0.05,
+        )
+
+        start = time.perf_counter()
+        results = await orch.run(agent, "search the latest document")
+
+        assert time.perf_counter() - start < 1.0
+        assert results[0].ok
+        assert results[1].error == "deadline exceeded"
+        assert [(section.name, section.items) for section in orch.sections(results)] == [("web_search", ["news"])]
+
+    @pytest.mark.asyncio
+    async def test_cut_off_tools_are_awaited(self, agent):
+        """Test a tool past the deadline has finished unwinding when run returns"""
+        unwound = []
+
+        class HangingTool(StubTool):
+            async def run(self, query, images):
+                try:
+                    await asyncio.sleep(5.0)
+                finally:
+                    await asyncio.sleep(0)
+                    unwound.append(self.name)
+
+        orch = orchestrator(HangingTool("rag"), deadline=0.05)
+
+        results = await orch.run(agent, "search the latest document")
+
+        assert results[0].error == "deadline exceeded"
+        assert unwound == ["rag"]
+
+    @pytest.mark.asyncio
+    async def test_failing_tool_is_isolated(self, agent):
+        """Test one tool's exception does not affect the rest"""
+        orch = orchestrator(StubTool("web_search", error="search down"), StubTool("rag", "docs"))
+
+        results = await orch.run(agent, "search the latest document")
+
+        assert results[0].error == "search down"
+        assert results[1].ok
+        assert results[0].summary()["ok"] is False
+
+    def test_sections_without_results(self):
+        """Test failed tools produce no prompt sections"""
+        orch = orchestrator(StubTool("rag"))
+        assert orch.sections([ToolResult("rag", error="rag down")]) == []
+
+
+class TestOCRTool:
+    """Test OCR of attached images."""
+
+    @pytest.mark.asyncio
+    async def test_images_are_extracted_concurrently(self, agent):
+        """Test every attached image is decoded and sent to the OCR provider"""
+        ocr = AsyncMock()
+        ocr.extract_text.side_effect = [{"text": "Mleko 3,49"}, {"text": "Chleb 4,99"}]
+        images = [base64.b64encode(b"img1").decode(), base64.b64encode(b"img2").decode()]
+
+        with patch("backend.agents.orchestrator.ocr_provider_factory") as factory:
+            factory.get_best_provider.return_value = "mistral_vision"
+            factory.create_provider.return_value = ocr
+            results = await ToolOrchestrator().run(agent, "Co jest na paragonach?", images)
+
+        assert results[0].name == "ocr"
+        assert "[obraz 1]\nMleko 3,49" in results[0].content
+        assert [call.args[0] for call in ocr.extract_text.call_args_list] == [b"img1", b"img2"]
+
+
+class TestGeneralConversationAgent:
+    """Test tool results reach the LLM prompt."""
+
+    @pytest.mark.asyncio
+    async def test_tool_output_is_merged_into_prompt(self):
+        """Test the agent sends the merged prompt and reports tool metadata"""
+        agent = GeneralConversationAgent(orchestrator=orchestrator(StubTool("ocr", "Mleko 3,49")))
+        provider = AsyncMock()
+        provider.chat.return_value = ChatResult(text="Na paragonie jest mleko.", model="gpt-4o-mini", provider="openai")
+
+        with patch("backend.agents.base_agent.provider_factory") as factory:
+            factory.get_configured_providers.return_value = [ProviderType.OPENAI]
+            factory.get_best_provider.return_value = ProviderType.OPENAI
+            factory.create_provider.return_value = provider
+            response = await agent.process_query(
+                "Co jest na paragonie?", AgentContext(metadata={"images": ["aW1n"]})
+            )
+
+        assert response.success is True
+        prompt = provider.chat.call_args.kwargs["messages"][1]["content"]
+        assert prompt == "Co jest na paragonie?\n\nocr:\nMleko 3,49"
+        assert response.metadata["tools"][0]["tool"] == "ocr"
+        assert "images" not in provider.chat.call_args.kwargs
+
+
+class TestLayering:
+    """Test the agents layer stays independent of the HTTP routes."""
+
+    def test_agents_do_not_import_endpoints(self):
+        """Test no agent module imports from backend.api"""
+        agents = Path(__file__).resolve().parents[2] / "src" / "backend" / "agents"
+        offenders = [path.name for path in agents.glob("*.py") if "backend.api" in path.read_text(encoding="utf-8")]
+        assert offenders == []
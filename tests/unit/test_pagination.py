@@ -0,0 +1,115 @@
+"""
+Unit tests for keyset (cursor) pagination.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.database.pagination import Page, decode_cursor, encode_cursor
+from backend.exceptions.database import ValidationError
+from backend.models import CostRecord, Product, ShoppingList
+from backend.schemas.cooking import ProductCreate
+from backend.services.cooking_service import CookingProductService, CookingShoppingListService
+from backend.services.cost_service import CostService
+
+
+async def _add_products(db_session, names):
+    db_session.add_all(Product(name=name, category="inne", user_id=1, unit="szt") for name in names)
+    await db_session.commit()
+
+
+async def _walk(fetch, limit):
+    """Follow next_cursor until the last page, returning all pages."""
+    pages, cursor = [], None
+    while True:
+        page = await fetch(limit=limit, cursor=cursor)
+        pages.append(page)
+        if page.next_cursor is None:
+            return pages
+        cursor = page.next_cursor
+
+
+class TestCursor:
+    """Test cursor encoding."""
+
+    def test_round_trip(self):
+        """Test strings, ints and datetimes survive a round trip"""
+        values = ["żurek", 7, datetime(2026, 10, 18, 12, 30, 5, 123)]
+        assert decode_cursor(encode_cursor(values), 3) == values
+
+    @pytest.mark.parametrize("cursor", ["not base64!", "bm90IGpzb24", encode_cursor(["a"]), encode_cursor({"a": 1})])
+    def test_invalid_cursor(self, cursor):
+        """Test malformed cursors or cursors for another sort key are rejected"""
+        with pytest.raises(ValidationError):
+            decode_cursor(cursor, 2)
+
+
+class TestPaginate:
+    """Test paging through service listings."""
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_every_row_once(self, db_session):
+        """Test equal timestamps are ordered by id so no row is skipped or repeated"""
+        moments = [datetime(2026, 10, 1, 12, i % 3) for i in range(7)]
+        db_session.add_all(
+            CostRecord(
+                session_id="s1", provider_type="llm", provider_name="openai", model_used="gpt-4o-mini",
+                tokens_used=10, cost_usd=0.001, request_type="chat", timestamp=moment,
+            )
+            for moment in moments
+        )
+        await db_session.commit()
+        service = CostService(db_session)
+
+        pages = await _walk(lambda **kw: service.get_cost_records(**kw), limit=2)
+
+        assert [len(page) for page in pages] == [2, 2, 2, 1]
+        rows = [(r.timestamp, r.id) for page in pages for r in page]
+        assert rows == sorted(rows, reverse=True)
+        assert len(set(rows)) == 7
+
+    @pytest.mark.asyncio
+    async def test_exact_multiple_has_no_empty_page(self, db_session):
+        """Test the last full page reports no next cursor"""
+        await _add_products(db_session, ["a", "b", "c", "d"])
+        page = await CookingProductService(db_session).list_products(1, limit=4)
+        assert isinstance(page, Page)
+        assert len(page) == 4 and page.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_descending_created_at(self, db_session):
+        """Test shopping lists page newest first, ties broken by id"""
+        base = datetime(2026, 10, 1)
+        db_session.add_all(
+            ShoppingList(name=f"lista {i}", items=[], user_id=1, created_at=base + timedelta(days=i // 2)) for i in range(5)
+        )
+        await db_session.commit()
+        service = CookingShoppingListService(db_session)
+
+        pages = await _walk(lambda **kw: service.list_shopping_lists(1, **kw), limit=2)
+
+        rows = [(s.created_at, s.id) for page in pages for s in page]
+        assert rows == sorted(rows, reverse=True)
+        assert len(rows) == 5
+
+    @pytest.mark.asyncio
+    async def test_offset_fallback(self, db_session):
+        """Test deprecated skip still pages by offset"""
+        await _add_products(db_session, ["a", "b", "c", "d"])
+        page = await CookingProductService(db_session).list_products(1, skip=1, limit=2)
+        assert [p.name for p in page] == ["b", "c"]
+        assert page.next_cursor is not None
+
+    @pytest.mark.asyncio
+    async def test_search_with_cursor(self, db_session):
+        """Test cursors keep search filters applied and follow the ranking"""
+        service = CookingProductService(db_session)
+        for name in ["mleko 2%", "mleko 3.2%", "ser", "mleko owsiane"]:
+            await service.add_product(ProductCreate(name=name, category="inne", unit="szt"), user_id=1)
+
+        pages = await _walk(lambda **kw: service.search_products("mleko", 1, **kw), limit=1)
+        hits = [hit for page in pages for hit in page]
+
+        assert sorted(hit.item.name for hit in hits) == ["mleko 2%", "mleko 3.2%", "mleko owsiane"]
+        assert [hit.score for hit in hits] == sorted((hit.score for hit in hits), reverse=True)
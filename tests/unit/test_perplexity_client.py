@@ -7,6 +7,7 @@ from unittest.mock import AsyncMock, Mock, patch
 import httpx
 
 from backend.core.llm_providers.perplexity_client import PerplexityProvider, PerplexityConfig
+from backend.core.llm_providers.result import ChatResult
 
 
 class TestPerplexityConfig:
@@ -88,12 +89,13 @@ class TestPerplexityProvider:
                 model="sonar-pro"
             )
             
-            assert result["text"] == "Test response"
-            assert result["model"] == "sonar-pro"
-            assert result["provider"] == "perplexity"
-            assert result["finish_reason"] == "stop"
-            assert "usage" in result
-            assert "cost" in result
+            assert result.text == "Test response"
+            assert result.model == "sonar-pro"
+            assert result.provider == "perplexity"
+            assert result.finish_reason == "stop"
+            assert result.input_tokens == 10
+            assert result.output_tokens == 20
+            assert result.cost == provider.calculate_cost("sonar-pro", 30)
     
     @pytest.mark.asyncio
     async def test_chat_api_error(self, provider):
@@ -132,20 +134,20 @@ class TestPerplexityProvider:
         """Test successful search."""
         # Mock chat method
         with patch.object(provider, 'chat', new_callable=AsyncMock) as mock_chat:
-            mock_chat.return_value = {
-                "text": "Search results for test query",
-                "model": "sonar-pro-online",
-                "provider": "perplexity"
-            }
+            mock_chat.return_value = ChatResult(
+                text="Search results for test query",
+                model="sonar-pro-online",
+                provider="perplexity"
+            )
             
             result = await provider.search(
                 query="test query",
                 model="sonar-pro-online"
             )
             
-            assert result["text"] == "Search results for test query"
-            assert result["model"] == "sonar-pro-online"
-            assert result["provider"] == "perplexity"
+            assert result.text == "Search results for test query"
+            assert result.model == "sonar-pro-online"
+            assert result.provider == "perplexity"
             
             # Verify chat was called with correct parameters
             mock_chat.assert_called_once()
@@ -156,7 +158,7 @@ class TestPerplexityProvider:
     async def test_search_with_filters(self, provider):
         """Test search with filters."""
         with patch.object(provider, 'chat', new_callable=AsyncMock) as mock_chat:
-            mock_chat.return_value = {"text": "Filtered results"}
+            mock_chat.return_value = ChatResult(text="Filtered results", model="sonar-pro", provider="perplexity")
             
             await provider.search(
                 query="test query",
@@ -0,0 +1,94 @@
+"""
+Unit tests for the rule-based prompt analyzer.
+"""
+
+import pytest
+
+from backend.agents.prompt_analyzer import ELEMENTS, PromptAnalyzer, ShortCircuitStats
+
+
+@pytest.fixture
+def analyzer():
+    """Create analyzer instance."""
+    return PromptAnalyzer()
+
+
+class TestPromptAnalyzer:
+    """Test detection of the six prompt elements."""
+
+    @pytest.mark.parametrize("element,prompt", [
+        ("context", "Przygotowuję prezentację dla klienta."),
+        ("context", "Background: we are a small bakery."),
+        ("instruction", "Wytłumacz mi zasadę działania silnika."),
+        ("instruction", "Jak działa fotosynteza?"),
+        ("constraints", "Maksymalnie 200 słów."),
+        ("constraints", "Do not use jargon."),
+        ("format", "Odpowiedź w formie tabeli."),
+        ("format", "Return it as JSON."),
+        ("examples", "Np. tak jak w poprzednim mailu."),
+        ("examples", 'Something like "Fresh apples straight from the orchard".'),
+        ("examples", "Input: 2+2\nOutput: 4"),
+        ("system_role", "Jesteś doświadczonym kucharzem."),
+        ("system_role", "Act as a senior reviewer."),
+    ])
+    def test_detects_element(self, analyzer, element, prompt):
+        """Test each element is found from PL and EN cues"""
+        assert analyzer.analyze(prompt).present[element] is True
+
+    def test_detects_without_diacritics(self, analyzer):
+        """Test prompts typed without Polish characters"""
+        analysis = analyzer.analyze("Stworz liste zakupow, jestes dietetykiem, ucze sie gotowac")
+
+        assert analysis.present["instruction"]
+        assert analysis.present["format"]
+        assert analysis.present["system_role"]
+        assert analysis.present["context"]
+
+    def test_missing_follows_tutor_order(self, analyzer):
+        """Test missing elements keep the SYSTEM_PROMPT order"""
+        analysis = analyzer.analyze("Napisz esej")
+
+        assert analysis.missing == [e for e in ELEMENTS if e != "instruction"]
+        assert analyzer.clarifying_question(analysis)[0] == "context"
+
+    def test_complete_prompt_is_left_to_llm(self, analyzer):
+        """Test no question when all elements are present"""
+        analysis = analyzer.analyze(
+            "Prowadzę bloga kulinarnego. Napisz przepis na sernik bez glutenu, "
+            "w punktach, np. jak na stronie X. Jesteś cukiernikiem."
+        )
+
+        assert analysis.complete
+        assert analyzer.clarifying_question(analysis) is None
+
+    def test_long_prompt_with_one_gap_is_left_to_llm(self, analyzer):
+        """Test long prompts are not short-circuited for a single gap"""
+        prompt = "Prowadzę bloga. Napisz artykuł bez żargonu w punktach, np. jak poprzednio. " * 12
+        analysis = analyzer.analyze(prompt)
+
+        assert analysis.missing == ["system_role"]
+        assert analyzer.clarifying_question(analysis) is None
+
+
+class TestShortCircuitStats:
+    """Test short-circuit rate reporting."""
+
+    def test_rate(self):
+        """Test counters and rate"""
+        stats = ShortCircuitStats()
+        stats.record("context")
+        stats.record("format")
+        stats.record(None)
+        stats.record(None)
+
+        assert stats.as_dict() == {
+            "analyzed": 4,
+            "short_circuited": 2,
+            "llm_calls": 2,
+            "short_circuit_rate": 0.5,
+            "by_element": {"context": 1, "format": 1},
+        }
+
+    def test_empty_rate(self):
+        """Test rate with no analyses"""
+        assert ShortCircuitStats().rate == 0.0
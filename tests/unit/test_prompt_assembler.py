@@ -0,0 +1,169 @@
+"""
+Unit tests for the prompt assembler and model token limits.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from backend.api.v2.endpoints.chat import ChatMessage, assemble_messages
+from backend.core.llm_providers.prompt_assembler import (
+    DEFAULT_LIMITS,
+    MODEL_LIMITS,
+    ModelLimits,
+    PromptAssembler,
+    PromptSection,
+    count_tokens,
+    get_model_limits,
+    input_budget,
+    truncate_tokens,
+)
+
+
+@pytest.fixture(autouse=True)
+def char_tokenizer():
+    """Use the 4-characters-per-token estimate so counts are deterministic."""
+    with patch("backend.core.llm_providers.prompt_assembler._encoding", return_value=None):
+        yield
+
+
+def words(n):
+    """Text of exactly ``n`` tokens under the character estimate."""
+    return "abc " * n
+
+
+class TestModelLimits:
+    """Test model registry lookups and budgets."""
+
+    def test_exact_and_prefix_lookup(self):
+        """Test exact names win and dated variants match the longest prefix"""
+        assert get_model_limits("gpt-4") == MODEL_LIMITS["gpt-4"]
+        assert get_model_limits("gpt-4o-mini-2024-07-18") == MODEL_LIMITS["gpt-4o-mini"]
+        assert get_model_limits("claude-3-haiku-20240307") == MODEL_LIMITS["claude-3"]
+
+    def test_provider_default_and_unknown(self):
+        """Test the provider's configured model is used and unknown models get the default"""
+        assert get_model_limits(None, "anthropic") == MODEL_LIMITS["claude-3"]
+        assert get_model_limits("some-local-model") == DEFAULT_LIMITS
+        assert get_model_limits() == DEFAULT_LIMITS
+
+    def test_input_budget(self):
+        """Test output tokens are reserved and the global cap applies"""
+        assert input_budget(ModelLimits(4096, 4000), max_tokens=1000) == 3096
+        with patch("backend.core.llm_providers.prompt_assembler.settings") as settings:
+            settings.PROMPT_MAX_INPUT_TOKENS = 5000
+            settings.PROMPT_RESERVED_OUTPUT_TOKENS = 1024
+            assert input_budget(ModelLimits(128000, 4096)) == 5000
+            assert input_budget(ModelLimits(2048, 4096)) == 1024
+
+    def test_token_helpers(self):
+        """Test counting and truncation at token granularity"""
+        assert count_tokens("") == 0
+        assert count_tokens(words(10)) == 10
+        assert count_tokens(truncate_tokens(words(10), 3)) == 3
+        assert truncate_tokens("krótki", 10) == "krótki"
+
+
+class TestPromptAssembler:
+    """Test budget allocation between prompt parts."""
+
+    def test_everything_fits(self):
+        """Test a small conversation passes through unchanged"""
+        messages = [
+            {"role": "system", "content": "Bądź pomocny."},
+            {"role": "user", "content": "Cześć"},
+            {"role": "assistant", "content": "Hej!"},
+            {"role": "user", "content": "Co słychać?"},
+        ]
+        prompt = PromptAssembler(1000).assemble(messages)
+
+        assert prompt.messages == messages
+        assert prompt.truncated == [] and prompt.dropped == {}
+        assert prompt.tokens <= prompt.budget
+
+    def test_oldest_history_is_dropped(self):
+        """Test history is kept newest-first and never opens with the assistant"""
+        messages = []
+        for i in range(10):
+            messages.append({"role": "user", "content": f"pytanie {i} " + words(50)})
+            messages.append({"role": "assistant", "content": f"odpowiedź {i} " + words(50)})
+        messages.append({"role": "user", "content": "ostatnie"})
+
+        prompt = PromptAssembler(400).assemble(messages)
+
+        assert prompt.tokens <= 400
+        assert prompt.messages[-1]["content"] == "ostatnie"
+        assert prompt.messages[0]["role"] == "user"
+        assert prompt.messages[-2]["content"].startswith("odpowiedź 9")
+        assert prompt.dropped["history"] > 0
+        assert len(prompt.messages) == 21 - prompt.dropped["history"]
+
+    def test_sections_rank_above_history(self):
+        """Test search results are packed in order, the last one cut, and history gets the rest"""
+        messages = [
+            {"role": "user", "content": words(80)},
+            {"role": "assistant", "content": words(80)},
+            {"role": "user", "content": "Jaka jest pogoda?"},
+        ]
+        section = PromptSection(
+            name="web_search",
+            heading="Wyniki:",
+            items=[f"{i}. " + words(60) for i in range(1, 6)],
+            share=0.6,
+        )
+        prompt = PromptAssembler(300).assemble(messages, [section])
+
+        current = prompt.messages[-1]["content"]
+        assert current.startswith("Jaka jest pogoda?\n\nWyniki:\n1. ")
+        assert "3. " in current and "4. " not in current
+        assert prompt.truncated == ["web_search"]
+        # The user turn no longer fits; the lone assistant reply goes with it
+        assert prompt.dropped == {"web_search": 2, "history": 2}
+        assert len(prompt.messages) == 1
+        assert prompt.tokens <= 300
+
+    def test_item_cap(self):
+        """Test the per-item cap keeps one long item from taking the whole section"""
+        section = PromptSection(name="rag", heading="Kontekst:", items=[words(500), "krótki fragment"], item_tokens=40)
+        prompt = PromptAssembler(2000).assemble([{"role": "user", "content": "?"}], [section])
+
+        assert prompt.messages[0]["content"].endswith("krótki fragment")
+        assert prompt.dropped == {}
+
+    def test_oversized_system_and_current_message(self):
+        """Test the system prompt is capped at its share and the current message cut to fit"""
+        messages = [
+            {"role": "system", "content": words(1000)},
+            {"role": "user", "content": words(1000)},
+        ]
+        prompt = PromptAssembler(500).assemble(messages)
+
+        assert count_tokens(prompt.messages[0]["content"]) <= 250
+        assert prompt.truncated == ["system", "current"]
+        assert prompt.tokens <= 500
+
+    def test_empty_messages(self):
+        """Test assembling nothing is an error"""
+        with pytest.raises(ValueError):
+            PromptAssembler(100).assemble([])
+
+
+class TestChatAssembly:
+    """Test the chat endpoint's use of the assembler."""
+
+    def test_search_results_and_history_fit_model_budget(self):
+        """Test long history is cut to the model budget and search results are attached"""
+        history = [
+            ChatMessage(role="user" if i % 2 == 0 else "assistant", content=words(400))
+            for i in range(40)
+        ]
+        history.append(ChatMessage(role="user", content="Jakie są najnowsze wiadomości?"))
+        results = [{"title": "Tytuł", "snippet": words(1000), "url": "https://example.com"}]
+
+        messages = assemble_messages(history, "gpt-4", "openai", 1000, results)
+
+        assert sum(count_tokens(m["content"]) for m in messages) < 8192 - 1000
+        assert len(messages) < len(history)
+        current = messages[-1]["content"]
+        assert current.startswith("Jakie są najnowsze wiadomości?\n\nAktualne informacje z internetu:\n1. Tytuł:")
+        assert count_tokens(current) < 200
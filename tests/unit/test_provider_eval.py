@@ -0,0 +1,108 @@
+"""
+Unit tests for the provider evaluation harness.
+"""
+
+import asyncio
+
+import pytest
+
+from backend.testing.provider_eval import measure, rank, summarize, write_env_settings
+
+
+def _result(provider, model, latency, cost, failures=0, requests=10):
+    return {
+        "provider": provider,
+        "model": model,
+        "requests": requests,
+        "failures": failures,
+        "failure_rate": failures / requests,
+        "ttft_ms": {"p50": latency / 2},
+        "latency_ms": {"p50": latency},
+        "tokens_per_second": 50.0,
+        "cost_per_request": cost,
+    }
+
+
+class _StreamingProvider:
+    """Provider stub streaming a fixed answer"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    async def stream_chat(self, messages, model=None, usage=None, **kwargs):
+        if self.fail:
+            raise Exception("upstream down")
+        for delta in ("Ala ", "ma ", "kota"):
+            await asyncio.sleep(0.01)
+            yield delta
+        usage.update({"input_tokens": 3, "output_tokens": 3, "cost": 0.001})
+
+
+class TestMeasure:
+    """Test single request measurement"""
+
+    @pytest.mark.asyncio
+    async def test_ttft_before_total_latency(self):
+        """Test time to first token and usage are captured"""
+        result = await measure(_StreamingProvider(), "m", "Hej", max_tokens=16)
+
+        assert result.ok
+        assert 0 < result.ttft < result.latency
+        assert result.output_tokens == 3
+        assert result.cost == 0.001
+        assert result.tokens_per_second > 0
+
+    @pytest.mark.asyncio
+    async def test_failure_recorded(self):
+        """Test provider errors become failed measurements"""
+        result = await measure(_StreamingProvider(fail=True), "m", "Hej", max_tokens=16)
+        summary = summarize([result])
+
+        assert not result.ok
+        assert summary["failure_rate"] == 1.0
+        assert summary["errors"] == ["upstream down"]
+
+
+class TestRank:
+    """Test scoring and ranking"""
+
+    def test_cheaper_and_faster_ranks_first(self):
+        """Test weighted score ordering"""
+        ranked = rank([
+            _result("openai", "gpt-4", latency=900, cost=0.03),
+            _result("mistral", "mistral-small-latest", latency=300, cost=0.001),
+            _result("anthropic", "claude-3-haiku-20240307", latency=500, cost=0.002),
+        ])
+
+        assert [r["provider"] for r in ranked] == ["mistral", "anthropic", "openai"]
+        assert ranked[0]["rank"] == 1
+        assert ranked[0]["score"] == 0.0
+
+    def test_unreliable_target_excluded(self):
+        """Test targets above the failure threshold rank last"""
+        ranked = rank([
+            _result("mistral", "fast-but-flaky", latency=100, cost=0.001, failures=5),
+            _result("openai", "gpt-4", latency=900, cost=0.03),
+            _result("cohere", "command", latency=100, cost=0.0, failures=10),
+        ])
+
+        assert ranked[0]["provider"] == "openai"
+        assert not ranked[1]["eligible"]
+        assert ranked[2]["score"] is None
+
+
+class TestWriteEnvSettings:
+    """Test config write-back"""
+
+    def test_updates_in_place_and_appends(self, tmp_path):
+        """Test existing keys are replaced and missing keys appended once"""
+        env = tmp_path / ".env"
+        env.write_text("OPENAI_API_KEY=sk\nPROVIDER_PRIORITY_OPENAI=1\n")
+
+        for _ in range(2):
+            write_env_settings(env, {"PROVIDER_PRIORITY_OPENAI": 2, "PROVIDER_PRIORITY_MISTRAL": 1}, comment="run")
+
+        lines = env.read_text().splitlines()
+        assert lines[:2] == ["OPENAI_API_KEY=sk", "PROVIDER_PRIORITY_OPENAI=2"]
+        assert lines.count("PROVIDER_PRIORITY_MISTRAL=1") == 1
+        assert lines.count("# provider_eval: run") == 1
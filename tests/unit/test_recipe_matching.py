@@ -0,0 +1,130 @@
+"""
+Unit tests for the inverted ingredient index and recipes-from-ingredients.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import func, select
+
+from backend.exceptions.cooking import RecipeGenerationError
+from backend.models import Recipe, recipe_ingredients
+from backend.schemas.cooking import RecipeCreate, RecipeGenerationRequest, RecipeUpdate
+from backend.services.cooking_service import CookingRecipeService
+
+
+def _recipe(name, ingredients):
+    return RecipeCreate(
+        name=name, instructions="Ugotuj.", servings=2,
+        ingredients=[{"name": item, "amount": "1", "unit": "szt"} for item in ingredients],
+    )
+
+
+async def _postings(db_session, recipe_id):
+    result = await db_session.execute(
+        select(recipe_ingredients.c.ingredient)
+        .where(recipe_ingredients.c.recipe_id == recipe_id)
+        .order_by(recipe_ingredients.c.ingredient)
+    )
+    return result.scalars().all()
+
+
+@pytest.fixture
+def service(db_session):
+    """Recipe service on the test database."""
+    return CookingRecipeService(db_session)
+
+
+class TestIngredientIndex:
+    """Test the index follows recipe writes."""
+
+    @pytest.mark.asyncio
+    async def test_save_update_delete(self, db_session, service):
+        """Test postings are written, replaced and removed with the recipe"""
+        recipe = await service.save_recipe(_recipe("Jajecznica", ["Jajka", "masło", "jajka", "Sól"]), user_id=1)
+        assert await _postings(db_session, recipe.id) == ["jajk", "masl", "sol"]
+
+        await service.update_recipe(recipe.id, RecipeUpdate(ingredients=[{"name": "Jajka"}, {"name": "Szczypiorek"}]), 1)
+        assert await _postings(db_session, recipe.id) == ["jajk", "szczypiorek"]
+
+        await service.delete_recipe(recipe.id, 1)
+        assert await _postings(db_session, recipe.id) == []
+
+
+class TestFindRecipes:
+    """Test ranking by coverage with at most k missing ingredients."""
+
+    @pytest.mark.asyncio
+    async def test_ranked_by_coverage(self, service):
+        """Test full matches come first, then fewer missing, and too many missing are left out"""
+        await service.save_recipe(_recipe("Jajecznica", ["jajka", "masło"]), user_id=1)
+        await service.save_recipe(_recipe("Omlet", ["jajka", "mleko", "mąka"]), user_id=1)
+        await service.save_recipe(_recipe("Naleśniki", ["jajka", "mleko", "mąka", "cukier", "olej"]), user_id=1)
+        await service.save_recipe(_recipe("Placki", ["ziemniaki", "cebula"]), user_id=1)
+        await service.save_recipe(_recipe("Kogel-mogel", ["jajka", "cukier"]), user_id=2)
+
+        matches = await service.find_recipes_by_ingredients(["jajko", "Masło", "mleka"], user_id=1, max_missing=1)
+
+        assert [(m.recipe.name, round(m.coverage, 2), m.missing) for m in matches] == [
+            ("Jajecznica", 1.0, []),
+            ("Omlet", 0.67, ["mąka"]),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_typos_and_unknown_names(self, service):
+        """Test misspelled names resolve to known ingredients and unknown ones match nothing"""
+        await service.save_recipe(_recipe("Frytki", ["ziemniaki", "olej"]), user_id=1)
+
+        matches = await service.find_recipes_by_ingredients(["ziemniaky", "olej"], user_id=1, max_missing=0)
+
+        assert [m.recipe.name for m in matches] == ["Frytki"]
+        assert await service.find_recipes_by_ingredients(["kawior"], user_id=1) == []
+        assert await service.find_recipes_by_ingredients([], user_id=1) == []
+
+
+class TestRecipeFromIngredients:
+    """Test the LLM is only asked when no saved recipe fits."""
+
+    @pytest.mark.asyncio
+    async def test_saved_recipe_skips_llm(self, service):
+        """Test a well-covered saved recipe is returned without generation"""
+        saved = await service.save_recipe(_recipe("Jajecznica", ["jajka", "masło", "szczypiorek"]), user_id=1)
+        request = RecipeGenerationRequest(ingredients=["jajka", "masło"])
+
+        with patch.object(service, "generate_recipe", AsyncMock()) as generate:
+            recipe = await service.generate_recipe_from_ingredients(request, user_id=1)
+
+        assert recipe.id == saved.id
+        generate.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_poor_coverage_generates_and_saves(self, db_session, service):
+        """Test poor coverage falls back to the LLM and stores the result under a free name"""
+        await service.save_recipe(_recipe("Zupa", ["woda", "marchew", "seler", "pietruszka", "por"]), user_id=1)
+        generated = {
+            "name": "Zupa", "description": "Szybka zupa", "instructions": "Gotuj 20 minut.",
+            "ingredients": [{"name": "marchew", "amount": "2", "unit": "szt"}], "servings": 2,
+        }
+        request = RecipeGenerationRequest(ingredients=["marchew"], max_missing=1)
+
+        with patch.object(service, "generate_recipe", AsyncMock(return_value=generated)) as generate:
+            recipe = await service.generate_recipe_from_ingredients(request, user_id=1)
+
+        generate.assert_awaited_once_with(["marchew"], "", 1, fallback=False)
+        assert (recipe.name, recipe.is_ai_generated) == ("Zupa (AI)", True)
+        assert await _postings(db_session, recipe.id) == ["marchew"]
+
+    @pytest.mark.asyncio
+    async def test_llm_failure_saves_nothing(self, db_session, service):
+        """Test a failed generation raises instead of saving the placeholder recipe"""
+        request = RecipeGenerationRequest(ingredients=["pomidor", "ser", "makaron"])
+        failing = AsyncMock(side_effect=RuntimeError("all providers failed"))
+
+        with patch("backend.core.llm_providers.provider_factory.provider_factory.chat_with_fallback", failing):
+            for _ in range(2):
+                with pytest.raises(RecipeGenerationError):
+                    await service.generate_recipe_from_ingredients(request, user_id=1)
+
+        assert failing.await_count == 2
+        assert (await db_session.execute(select(func.count()).select_from(Recipe))).scalar() == 0
+        assert await service.find_recipes_by_ingredients(["pomidor"], user_id=1) == []
@@ -0,0 +1,132 @@
+"""
+Unit tests for Polish text normalization and full-text search.
+"""
+
+import pytest
+from sqlalchemy import text
+
+from backend.core.polish_text import document, fold, snippet, stem, terms
+from backend.schemas.cooking import ProductCreate, ProductUpdate, RecipeCreate, RecipeUpdate
+from backend.services.cooking_service import CookingProductService, CookingRecipeService
+
+
+async def _recipe(service, name, **fields):
+    data = dict(
+        name=name, description="", ingredients=[], instructions="Ugotuj.", cooking_time=30,
+        difficulty="łatwy", servings=2, tags=[],
+    )
+    data.update(fields)
+    return await service.save_recipe(RecipeCreate(**data), user_id=1)
+
+
+def _ingredient(name):
+    return {"name": name, "amount": "1", "unit": "szt"}
+
+
+class TestPolishText:
+    """Test folding, stemming and snippets."""
+
+    def test_fold(self):
+        """Test diacritics are removed, including ł"""
+        assert fold("Żółć Łódź") == "zolc lodz"
+
+    @pytest.mark.parametrize("word,expected", [
+        ("pomidorów", "pomidor"), ("pomidorowa", "pomidor"), ("zupie", "zup"), ("ryżem", "ryz"), ("ser", "ser"),
+    ])
+    def test_stem(self, word, expected):
+        """Test inflected forms share a stem"""
+        assert stem(fold(word)) == expected
+
+    def test_terms_drop_stopwords(self):
+        """Test stopwords and punctuation are dropped"""
+        assert terms("Zupa z pomidorów, i ryżem!") == ["zup", "pomidor", "ryz"]
+        assert document("Zupa", None, "z ryżem") == "zup ryz"
+
+    def test_snippet(self):
+        """Test the excerpt highlights matches and escapes the text"""
+        text_ = "Pokrój <cebulę> i podsmaż. " + " ".join(["dalej"] * 30) + " Dodaj pomidory na koniec."
+        assert snippet(text_, ["ceb"]).startswith("Pokrój &lt;<mark>cebulę</mark>&gt; i podsmaż.")
+        assert snippet(text_, ["ceb"]).endswith("…")
+        assert "<mark>pomidory</mark>" in snippet(text_, ["pomidor"])
+        assert snippet(text_, ["pomidor"]).startswith("…")
+        assert snippet(text_, ["kurczak"]) is None
+
+
+class TestProductSearch:
+    """Test ranked product search."""
+
+    @pytest.mark.asyncio
+    async def test_name_outranks_category(self, db_session):
+        """Test a name match ranks above a category match"""
+        service = CookingProductService(db_session)
+        await service.add_product(ProductCreate(name="Jogurt naturalny", category="nabiał", unit="szt"), 1)
+        await service.add_product(ProductCreate(name="Nabiał mix", category="inne", unit="szt"), 1)
+
+        hits = await service.search_products("nabiał", 1)
+
+        assert [hit.item.name for hit in hits] == ["Nabiał mix", "Jogurt naturalny"]
+        assert hits[0].score > hits[1].score > 0
+        assert hits[0].snippet == "<mark>Nabiał</mark> mix"
+
+    @pytest.mark.asyncio
+    async def test_inflection_diacritics_and_user(self, db_session):
+        """Test word forms and unaccented queries match, scoped to the user"""
+        service = CookingProductService(db_session)
+        await service.add_product(ProductCreate(name="Pomidory koktajlowe", category="warzywa", unit="kg"), 1)
+        await service.add_product(ProductCreate(name="Pomidory", category="warzywa", unit="kg"), 2)
+
+        for query in ("pomidorów", "POMIDOR", "warzyw"):
+            assert [hit.item.name for hit in await service.search_products(query, 1)] == ["Pomidory koktajlowe"]
+        assert list(await service.search_products("ogórki", 1)) == []
+        assert list(await service.search_products("i z", 1)) == []
+
+    @pytest.mark.asyncio
+    async def test_index_follows_updates_and_deletes(self, db_session):
+        """Test renamed products are found by the new name and deleted ones disappear"""
+        service = CookingProductService(db_session)
+        product = await service.add_product(ProductCreate(name="Masło", category="nabiał", unit="szt"), 1)
+
+        await service.update_product(product.id, ProductUpdate(name="Margaryna"), 1)
+        assert list(await service.search_products("masło", 1)) == []
+        assert [hit.item.id for hit in await service.search_products("margaryna", 1)] == [product.id]
+
+        await service.delete_product(product.id, 1)
+        assert (await db_session.execute(text("SELECT count(*) FROM products_fts"))).scalar() == 0
+
+
+class TestRecipeSearch:
+    """Test ranked recipe search over names, tags, ingredients and text."""
+
+    @pytest.mark.asyncio
+    async def test_fields_and_ranking(self, db_session):
+        """Test tags and ingredients are searchable and the name weighs most"""
+        service = CookingRecipeService(db_session)
+        await _recipe(service, "Zupa pomidorowa", ingredients=[_ingredient("pomidory")], tags=["zupa"])
+        await _recipe(service, "Spaghetti", ingredients=[_ingredient("pomidory"), _ingredient("makaron")])
+        await _recipe(service, "Sałatka", instructions="Pokrój pomidory i ogórki.", tags=["wegańskie"])
+        await _recipe(service, "Żurek", ingredients=[_ingredient("kiełbasa")], tags=["zupa"])
+
+        hits = await service.search_recipes("pomidory", 1)
+        assert [hit.item.name for hit in hits] == ["Zupa pomidorowa", "Spaghetti", "Sałatka"]
+        assert hits[2].snippet == "Pokrój <mark>pomidory</mark> i ogórki."
+
+        assert [hit.item.name for hit in await service.search_recipes("weganskie", 1)] == ["Sałatka"]
+        assert [hit.item.name for hit in await service.search_recipes("zupa kiełbasą", 1)] == ["Żurek"]
+
+    @pytest.mark.asyncio
+    async def test_update_and_cursor(self, db_session):
+        """Test updated tags are indexed and cursors page through the ranking"""
+        service = CookingRecipeService(db_session)
+        recipes = [await _recipe(service, f"Placki {i}", tags=["obiad"]) for i in range(5)]
+        await service.update_recipe(recipes[0].id, RecipeUpdate(tags=["kolacja"]), 1)
+
+        assert [hit.item.id for hit in await service.search_recipes("kolacja", 1)] == [recipes[0].id]
+
+        seen, cursor = [], None
+        while True:
+            page = await service.search_recipes("placki obiad", 1, limit=2, cursor=cursor)
+            seen.extend(hit.item.id for hit in page)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert sorted(seen) == [r.id for r in recipes[1:]]
@@ -0,0 +1,92 @@
+"""
+Unit tests for the SQLite writer/reader split.
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.database.sqlite import create_sqlite_engines, is_sqlite_file, routing_session_class
+from backend.models.base import Base
+from backend.models.cost_tracking import CostRecord
+
+
+@pytest_asyncio.fixture
+async def engines(tmp_path):
+    """Writer and reader engines on a temporary database file."""
+    writer, reader = create_sqlite_engines(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}")
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield writer, reader
+    await writer.dispose()
+    await reader.dispose()
+
+
+@pytest.fixture
+def factory(engines):
+    """Session factory routing reads to the read pool."""
+    writer, reader = engines
+    return async_sessionmaker(
+        writer, class_=AsyncSession, expire_on_commit=False, sync_session_class=routing_session_class(reader)
+    )
+
+
+def _cost(i: int) -> CostRecord:
+    return CostRecord(
+        session_id=f"s{i}", provider_type="llm", provider_name="openai", model_used="gpt-4o-mini",
+        tokens_used=i, cost_usd=0.001, request_type="chat",
+    )
+
+
+class TestSQLiteTuning:
+    """Test pragmas, routing and concurrent writes."""
+
+    def test_only_file_databases_are_tuned(self):
+        """Test in-memory databases keep a single shared connection"""
+        assert is_sqlite_file("sqlite+aiosqlite:///./data/ageny_online.db")
+        assert not is_sqlite_file("sqlite+aiosqlite:///:memory:")
+        assert not is_sqlite_file("postgresql+asyncpg://db/ageny_online")
+
+    @pytest.mark.asyncio
+    async def test_pragmas_applied_per_connection(self, engines):
+        """Test WAL and synchronous=NORMAL on the writer, query_only on readers"""
+        writer, reader = engines
+        async with writer.connect() as conn:
+            assert (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar() == "wal"
+            assert (await conn.exec_driver_sql("PRAGMA synchronous")).scalar() == 1
+        async with reader.connect() as conn:
+            assert (await conn.exec_driver_sql("PRAGMA query_only")).scalar() == 1
+            with pytest.raises(OperationalError):
+                await conn.execute(text("DELETE FROM cost_records"))
+
+    @pytest.mark.asyncio
+    async def test_transaction_reads_its_own_writes(self, factory):
+        """Test reads after a flush stay on the writer until commit"""
+        async with factory() as session:
+            session.add(_cost(1))
+            await session.flush()
+            assert (await session.execute(select(func.count()).select_from(CostRecord))).scalar() == 1
+            await session.commit()
+
+            # New transaction: back on the read pool, which sees the committed row
+            assert session.get_bind() is session.sync_session.reader
+            assert (await session.execute(select(func.count()).select_from(CostRecord))).scalar() == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writers_do_not_lock(self, factory):
+        """Test concurrent request-style writes queue for the writer instead of failing"""
+        async def write(i):
+            async with factory() as session:
+                record = _cost(i)
+                session.add(record)
+                await session.commit()
+                await session.refresh(record)
+
+        await asyncio.gather(*(write(i) for i in range(30)))
+
+        async with factory() as session:
+            assert (await session.execute(select(func.count()).select_from(CostRecord))).scalar() == 30
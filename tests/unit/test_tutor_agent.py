@@ -5,6 +5,8 @@ Unit tests for Tutor Antonina agent.
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from backend.agents.tutor_agent import TutorAntonina
+from backend.agents.prompt_analyzer import CLARIFYING_QUESTIONS, short_circuit_stats
+from backend.core.llm_providers.result import ChatResult
 
 
 @pytest.fixture
@@ -13,9 +15,7 @@ def mock_llm_factory():
     with patch('backend.agents.tutor_agent.llm_factory') as mock:
         # Mock provider
         mock_provider = AsyncMock()
-        mock_provider.chat.return_value = {
-            "choices": [{"message": {"content": "Test response"}}]
-        }
+        mock_provider.chat.return_value = ChatResult(text="Test response", model="gpt-4", provider="openai")
         
         # Mock provider factory methods
         mock.get_available_providers.return_value = [MagicMock(value="openai")]
@@ -27,8 +27,16 @@ def mock_llm_factory():
 
 @pytest.fixture
 def tutor_agent():
-    """Create Tutor Antonina agent instance."""
-    return TutorAntonina(model="gpt-4", provider="openai")
+    """Create Tutor Antonina agent instance (LLM path only)."""
+    return TutorAntonina(model="gpt-4", provider="openai", pre_analyze=False)
+
+
+@pytest.fixture
+def stats():
+    """Fresh short-circuit counters."""
+    short_circuit_stats.reset()
+    yield short_circuit_stats
+    short_circuit_stats.reset()
 
 
 class TestTutorAntonina:
@@ -45,9 +53,7 @@ class TestTutorAntonina:
     async def test_guide_with_question(self, tutor_agent, mock_llm_factory):
         """Test guide method when prompt needs clarification."""
         # Mock response that asks a question
-        mock_llm_factory.get_provider.return_value.chat.return_value = {
-            "choices": [{"message": {"content": "W jakim kontekście chcesz użyć tego prompta?"}}]
-        }
+        mock_llm_factory.get_provider.return_value.chat.return_value = ChatResult(text="W jakim kontekście chcesz użyć tego prompta?", model="gpt-4", provider="openai")
         
         result = await tutor_agent.guide("Napisz esej", [])
         
@@ -58,9 +64,7 @@ class TestTutorAntonina:
     async def test_guide_with_feedback(self, tutor_agent, mock_llm_factory):
         """Test guide method when prompt is complete."""
         # Mock response with suggestion
-        mock_llm_factory.get_provider.return_value.chat.return_value = {
-            "choices": [{"message": {"content": "Sugestia: Twój prompt jest dobry.\n\nUlepszony prompt: [ulepszona wersja]"}}]
-        }
+        mock_llm_factory.get_provider.return_value.chat.return_value = ChatResult(text="Sugestia: Twój prompt jest dobry.\n\nUlepszony prompt: [ulepszona wersja]", model="gpt-4", provider="openai")
         
         result = await tutor_agent.guide("Kompletny prompt", [])
         
@@ -98,9 +102,7 @@ class TestTutorAntonina:
     @pytest.mark.asyncio
     async def test_process_query_success(self, tutor_agent, mock_llm_factory):
         """Test process_query method success case."""
-        mock_llm_factory.get_provider.return_value.chat.return_value = {
-            "choices": [{"message": {"content": "Test question"}}]
-        }
+        mock_llm_factory.get_provider.return_value.chat.return_value = ChatResult(text="Test question", model="gpt-4", provider="openai")
         
         result = await tutor_agent.process_query("Test prompt")
         
@@ -127,4 +129,53 @@ class TestTutorAntonina:
         
         assert isinstance(time1, float)
         assert isinstance(time2, float)
-        assert time2 >= time1 
\ No newline at end of file
+        assert time2 >= time1 
+
+COMPLETE_PROMPT = (
+    "Jestem nauczycielką w liceum i przygotowuję lekcję o fotosyntezie. "
+    "Napisz plan lekcji na 45 minut, maksymalnie 300 słów, w formie listy punktów. "
+    "Przykład: 1. Wstęp (5 min). Jesteś doświadczonym metodykiem, pisz przystępnym stylem."
+)
+
+
+class TestTutorPreAnalysis:
+    """Test the local short-circuit in front of the LLM call."""
+
+    @pytest.mark.asyncio
+    async def test_incomplete_prompt_skips_llm(self, mock_llm_factory, stats):
+        """Test a clearly incomplete prompt gets the templated question"""
+        tutor = TutorAntonina(model="gpt-4", provider="openai", pre_analyze=True)
+
+        result = await tutor.guide("Napisz esej", [])
+
+        assert result == {"question": CLARIFYING_QUESTIONS["context"], "feedback": None}
+        mock_llm_factory.get_provider.return_value.chat.assert_not_called()
+        assert stats.as_dict()["by_element"] == {"context": 1}
+
+    @pytest.mark.asyncio
+    async def test_history_answers_count(self, mock_llm_factory, stats):
+        """Test elements given in earlier user messages are not asked again"""
+        tutor = TutorAntonina(model="gpt-4", provider="openai", pre_analyze=True)
+        history = [
+            {"role": "user", "content": "Napisz esej"},
+            {"role": "assistant", "content": CLARIFYING_QUESTIONS["context"]},
+        ]
+
+        result = await tutor.guide("To zadanie na potrzeby szkoły", history)
+
+        assert result["question"] == CLARIFYING_QUESTIONS["constraints"]
+
+    @pytest.mark.asyncio
+    async def test_complete_prompt_goes_to_llm(self, mock_llm_factory, stats):
+        """Test only complete prompts pay for the improved-prompt LLM call"""
+        mock_llm_factory.get_provider.return_value.chat.return_value = ChatResult(
+            text="Sugestia: Dodaj grupę wiekową.\n\nUlepszony prompt: [wersja]", model="gpt-4", provider="openai"
+        )
+        tutor = TutorAntonina(model="gpt-4", provider="openai", pre_analyze=True)
+
+        await tutor.guide("Napisz esej", [])
+        result = await tutor.guide(COMPLETE_PROMPT, [])
+
+        assert "Ulepszony prompt:" in result["feedback"]
+        mock_llm_factory.get_provider.return_value.chat.assert_called_once()
+        assert stats.as_dict()["short_circuit_rate"] == 0.5
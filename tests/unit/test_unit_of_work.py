@@ -0,0 +1,117 @@
+"""
+Unit tests for request-scoped units of work and conflict-handling inserts.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.database.unit_of_work import on_commit, unit_of_work
+from backend.exceptions.database import ValidationError
+from backend.models import Product, User
+from backend.schemas.cooking import ProductCreate
+from backend.schemas.user import UserCreate
+from backend.services.cooking_service import CookingProductService
+from backend.services.user_service import UserService
+
+
+@pytest.fixture
+def factory(db_session):
+    """Session factory sharing the test database."""
+    return async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+
+@pytest.fixture
+def round_trips(db_session):
+    """Statements and commits sent to the test database."""
+    engine = db_session.bind.sync_engine
+    seen = {"statements": [], "commits": 0}
+
+    def before_execute(conn, cursor, statement, *args):
+        seen["statements"].append(statement)
+
+    def commit(conn):
+        seen["commits"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    event.listen(engine, "commit", commit)
+    yield seen
+    event.remove(engine, "before_cursor_execute", before_execute)
+    event.remove(engine, "commit", commit)
+
+
+def _product(name: str) -> ProductCreate:
+    return ProductCreate(name=name, category="nabiał", unit="l", price_per_unit=3.5)
+
+
+class TestUnitOfWork:
+    """Test one commit per unit of work and after-commit callbacks."""
+
+    @pytest.mark.asyncio
+    async def test_add_product_single_statement_and_commit(self, factory, round_trips):
+        """Test a create is one INSERT ... RETURNING plus its search document, committed once"""
+        async with unit_of_work(factory) as session:
+            product = await CookingProductService(session).add_product(_product("mleko"), user_id=1)
+            assert product.id is not None and product.created_at is not None
+
+        assert len(round_trips["statements"]) == 2
+        assert "RETURNING" in round_trips["statements"][0]
+        assert "products_fts" in round_trips["statements"][1]
+        assert round_trips["commits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rollback_on_error(self, factory, db_session):
+        """Test an exception discards the flushed writes and the callbacks"""
+        callback = AsyncMock()
+        with pytest.raises(RuntimeError):
+            async with unit_of_work(factory) as session:
+                await CookingProductService(session).add_product(_product("mleko"), user_id=1)
+                await on_commit(session, callback)
+                raise RuntimeError("request failed")
+
+        assert (await db_session.execute(select(func.count()).select_from(Product))).scalar() == 0
+        callback.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_on_commit_runs_after_commit(self, factory):
+        """Test callbacks wait for the commit; outside a unit of work they run at once"""
+        order = []
+        async with unit_of_work(factory) as session:
+            await on_commit(session, AsyncMock(side_effect=lambda: order.append("callback")))
+            order.append("body")
+        assert order == ["body", "callback"]
+
+        async with factory() as session:
+            await on_commit(session, AsyncMock(side_effect=lambda: order.append("immediate")))
+        assert order[-1] == "immediate"
+
+
+class TestConflicts:
+    """Test uniqueness enforced by constraints instead of pre-queries."""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_product_name(self, db_session):
+        """Test a duplicate name is rejected without disturbing the transaction"""
+        service = CookingProductService(db_session)
+        await service.add_product(_product("mleko"), user_id=1)
+
+        with pytest.raises(ValidationError, match="already exists"):
+            await service.add_product(_product("mleko"), user_id=1)
+
+        # Same name for another user is fine, and the session is still usable
+        await service.add_product(_product("mleko"), user_id=2)
+        assert (await db_session.execute(select(func.count()).select_from(Product))).scalar() == 2
+
+    @pytest.mark.asyncio
+    async def test_duplicate_user(self, db_session):
+        """Test email or username conflicts are reported as validation errors"""
+        service = UserService(db_session)
+        with patch("backend.services.user_service.pwd_context.hash", return_value="hashed"):
+            await service.create_user(UserCreate(username="ania", email="ania@example.com", password="tajnehaslo1"))
+
+            for username, email in (("ania", "inna@example.com"), ("inna", "ania@example.com")):
+                with pytest.raises(ValidationError, match="already exists"):
+                    await service.create_user(UserCreate(username=username, email=email, password="tajnehaslo1"))
+        assert (await db_session.execute(select(func.count()).select_from(User))).scalar() == 1
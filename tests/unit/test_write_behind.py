@@ -0,0 +1,140 @@
+"""
+Unit tests for the write-behind persistence queue.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.database.write_behind import WriteBehindQueue
+from backend.models.conversation import Conversation, Message
+from backend.models.cost_tracking import CostRecord
+from backend.schemas.conversation import ConversationCreate
+from backend.services.conversation_cache import LRUConversationCache
+from backend.services.conversation_memory import ConversationMemory
+from backend.services.conversation_service import ConversationService
+
+
+def _cost(i: int) -> dict:
+    return dict(
+        session_id="wb", provider_type="llm", provider_name="openai", model_used="gpt-4o-mini",
+        tokens_used=i, cost_usd=0.001 * i, request_type="chat",
+    )
+
+
+async def _count(db_session, model) -> int:
+    return (await db_session.execute(select(func.count()).select_from(model))).scalar()
+
+
+@pytest.fixture
+def factory(db_session):
+    """Session factory on the test database."""
+    return async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+
+class TestWriteBehindQueue:
+    """Test batching, draining and failure handling."""
+
+    @pytest.mark.asyncio
+    async def test_records_are_flushed_in_batches(self, db_session, factory):
+        """Test a full batch is written in one flush without waiting for the interval"""
+        queue = WriteBehindQueue(factory, batch_size=5, flush_interval=60, max_pending=100)
+        queue._flush = AsyncMock(wraps=queue._flush)
+        queue.start()
+
+        futures = [await queue.put(CostRecord, _cost(i)) for i in range(10)]
+        await asyncio.wait_for(asyncio.gather(*futures), timeout=5)
+
+        assert [len(call.args[0]) for call in queue._flush.await_args_list] == [5, 5]
+        assert await _count(db_session, CostRecord) == 10
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_pending_records(self, db_session, factory):
+        """Test records waiting for the interval are written on shutdown"""
+        queue = WriteBehindQueue(factory, batch_size=100, flush_interval=60)
+        queue.start()
+        for i in range(3):
+            await queue.put(CostRecord, _cost(i))
+
+        await queue.stop()
+
+        assert await _count(db_session, CostRecord) == 3
+        assert not queue.running
+
+    @pytest.mark.asyncio
+    async def test_full_queue_applies_backpressure(self, factory):
+        """Test producers wait for space instead of growing the buffer"""
+        queue = WriteBehindQueue(factory, batch_size=1, flush_interval=0, max_pending=1)
+        release = asyncio.Event()
+
+        async def slow_flush(batch):
+            await release.wait()
+            for _, _, future in batch:
+                future.set_result(None)
+
+        queue._flush = slow_flush
+        queue.start()
+        await queue.put(CostRecord, _cost(1))  # taken by the worker
+        await queue.put(CostRecord, _cost(2))  # fills the queue
+        blocked = asyncio.create_task(queue.put(CostRecord, _cost(3)))
+        await asyncio.sleep(0.05)
+
+        assert not blocked.done()
+        release.set()
+        await asyncio.wait_for(blocked, timeout=5)
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried_then_reported(self, factory):
+        """Test a batch failing on every attempt resolves its futures with the error"""
+        broken = MagicMock(side_effect=ConnectionError("db down"))
+        queue = WriteBehindQueue(broken, batch_size=10, flush_interval=0, retries=2, retry_backoff=0)
+        queue.start()
+
+        future = await queue.put(CostRecord, _cost(1))
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(future, timeout=5)
+
+        assert broken.call_count == 3
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_submit_writes_inline_when_stopped(self, db_session, factory):
+        """Test services keep their synchronous behaviour without a running queue"""
+        queue = WriteBehindQueue(factory)
+
+        record = await queue.submit(CostRecord, _cost(1), db_session)
+
+        assert record.id is not None
+        assert await _count(db_session, CostRecord) == 1
+
+    @pytest.mark.asyncio
+    async def test_session_turns_are_batched(self, db_session, factory):
+        """Test chat turns recorded through the memory land in order via the queue"""
+        queue = WriteBehindQueue(factory, batch_size=100, flush_interval=0.01)
+        memory = ConversationMemory(session_factory=factory, cache=LRUConversationCache(), enabled=False, writer=queue)
+        conversation = await ConversationService(db_session, cache=memory.cache).create_conversation(
+            ConversationCreate(session_id="wb-chat", agent_type="general_conversation")
+        )
+        queue.start()
+
+        for i in range(3):
+            await memory.record_turn(conversation.id, [
+                {"role": "user", "content": f"pytanie {i}"},
+                {"role": "assistant", "content": f"odpowiedź {i}", "metadata": {"turn": i}},
+            ])
+        await memory.stop()
+        await queue.stop()
+
+        messages = (await db_session.execute(
+            select(Message).where(Message.conversation_id == conversation.id).order_by(Message.id)
+        )).scalars().all()
+        assert [m.content for m in messages] == [
+            "pytanie 0", "odpowiedź 0", "pytanie 1", "odpowiedź 1", "pytanie 2", "odpowiedź 2"
+        ]
+        assert messages[1].meta_data == {"turn": 0}
+        assert await _count(db_session, Conversation) == 1